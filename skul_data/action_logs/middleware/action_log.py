@@ -6,6 +6,7 @@ from rest_framework import status
 from skul_data.schools.models.schoolclass import ClassTimetable
 from django.contrib.auth.models import AnonymousUser
 from django.conf import settings
+from skul_data.users.utils.request_context import get_request_id
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +63,7 @@ class ActionLogMiddleware:
                     "status_code": response.status_code,
                     "user_agent": user_agent,
                     "ip": ip,
+                    "request_id": get_request_id(),
                 }
 
                 # Document specific logging
@@ -124,6 +124,49 @@ def log_action(user, action, category, obj=None, metadata=None):
         return None
 
 
+def log_actions_bulk(user, action, category, objects, metadata=None):
+    """
+    Write one ``action`` log per object with a single INSERT, for bulk
+    writes that skip the per-row post_save logging. ``metadata`` may be a
+    dict shared by every row or a callable returning one per object.
+    """
+    test_mode_enabled = _TEST_MODE or getattr(settings, "ACTION_LOG_TEST_MODE", False)
+    if not test_mode_enabled and ("test" in sys.argv or "TEST" in os.environ):
+        return []
+
+    objects = list(objects)
+    if not objects:
+        return []
+
+    user_tag = (
+        user.user_tag if user else uuid.UUID("00000000-0000-0000-0000-000000000000")
+    )
+    content_type = ContentType.objects.get_for_model(objects[0])
+    try:
+        return ActionLog.objects.bulk_create(
+            [
+                ActionLog(
+                    user=user,
+                    user_tag=user_tag,
+                    action=action,
+                    category=category,
+                    content_type=content_type,
+                    object_id=obj.pk,
+                    metadata=json.loads(
+                        json.dumps(
+                            metadata(obj) if callable(metadata) else metadata or {},
+                            cls=CustomJSONEncoder,
+                        )
+                    ),
+                )
+                for obj in objects
+            ]
+        )
+    except Exception as e:
+        logger.warning(f"Failed to create {len(objects)} action logs: {str(e)}")
+        return []
+
+
 def log_action_async(user, action, category, obj=None, metadata=None):
     """
     Non-blocking action logger for high-frequency operations.
@@ -0,0 +1,67 @@
+import copy
+from django.db.models import DEFERRED
+
+
+def _snapshot_value(value):
+    # JSON fields are edited in place; keep our own copy to compare against
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+class DirtyFieldsMixin:
+    """
+    Track which fields changed since an instance was loaded or last saved.
+
+    Original values are captured in ``from_db`` (and after every save), so
+    saving no longer needs to re-read the row. Before each update
+    ``_changed_fields`` is set to the names of the fields whose values
+    differ, which the action log signal records. ``save(update_fields=...)``
+    only compares the fields being written.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot = {
+            attname: _snapshot_value(value)
+            for attname, value in zip(field_names, values)
+            if value is not DEFERRED
+        }
+        return instance
+
+    def _take_snapshot(self, fields=None):
+        snapshot = self.__dict__.setdefault("_snapshot", {})
+        deferred = self.get_deferred_fields()
+        for field in self._meta.concrete_fields:
+            if fields is not None and not {field.name, field.attname} & fields:
+                continue
+            if field.attname in deferred:
+                continue
+            snapshot[field.attname] = _snapshot_value(getattr(self, field.attname))
+
+    def get_dirty_fields(self, fields=None):
+        """Names of fields (optionally limited to ``fields``) that changed"""
+        snapshot = self.__dict__.get("_snapshot", {})
+        fields = set(fields) if fields is not None else None
+        changed = []
+        for field in self._meta.concrete_fields:
+            if fields is not None and not {field.name, field.attname} & fields:
+                continue
+            if field.attname not in snapshot:
+                continue
+            if getattr(self, field.attname) != snapshot[field.attname]:
+                changed.append(field.name)
+        return changed
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        fields = set(update_fields) if update_fields is not None else None
+
+        if not self._state.adding:
+            self._changed_fields = self.get_dirty_fields(fields)
+
+        super().save(*args, **kwargs)
+        self._take_snapshot(fields)
+
+    def refresh_from_db(self, using=None, fields=None, *args, **kwargs):
+        super().refresh_from_db(using, fields, *args, **kwargs)
+        self._take_snapshot(set(fields) if fields is not None else None)
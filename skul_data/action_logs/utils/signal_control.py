@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+_suppressed = ContextVar("suppressed_receivers", default=frozenset())
+
+
+def suppressible(func):
+    """
+    Mark a signal receiver as one that ``suppress_signals`` can skip. Apply
+    it below ``@receiver`` so the wrapper is what gets connected::
+
+        @receiver(m2m_changed, sender=ClassAttendance.present_students.through)
+        @suppressible
+        def log_attendance_changes(sender, instance, action, **kwargs):
+            ...
+    """
+
+    @wraps(func)
+    def wrapper(sender, **kwargs):
+        if wrapper in _suppressed.get():
+            return None
+        return func(sender, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def suppress_signals(*receivers):
+    """
+    Skip the given receivers inside the block. Only the current thread or
+    coroutine is affected, unlike ``Signal.disconnect``.
+    """
+    token = _suppressed.set(_suppressed.get() | frozenset(receivers))
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
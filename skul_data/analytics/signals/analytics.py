@@ -162,12 +162,10 @@ def check_late_report_generation(sender, instance, created, **kwargs):
 @receiver(post_save, sender=ClassAttendance)
 def check_low_class_attendance(sender, instance, created, **kwargs):
     if created:
-        total = instance.school_class.students.count()
-        present = instance.present_students.count()
-        if total == 0:
+        if instance.total_students == 0:
             return
 
-        attendance_rate = (present / total) * 100
+        attendance_rate = instance.snapshot_attendance_rate
         if attendance_rate < 70:
             AnalyticsAlert.objects.create(
                 school=instance.school_class.school,
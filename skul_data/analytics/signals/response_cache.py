@@ -0,0 +1,80 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from skul_data.analytics.utils.response_cache import invalidate_on_commit
+from skul_data.documents.models.document import Document
+from skul_data.reports.models.academic_record import AcademicRecord
+from skul_data.reports.models.report import GeneratedReport, ReportAccessLog
+from skul_data.schools.models.schoolclass import ClassAttendance, SchoolClass
+from skul_data.students.models.student import Student, StudentAttendance
+from skul_data.users.models.parent import Parent, ParentNotification
+from skul_data.users.models.teacher import Teacher, TeacherAttendance
+
+# model -> (path to the school id, analytics sections built from that model).
+# ActionLog and Notification are left to the cache timeout: they are written
+# on almost every request and would keep every entry cold. Bulk writes call
+# invalidate_model_sections with the same sections.
+DEPENDENCIES = {
+    Teacher: ("school_id", ["teachers", "classes", "school_wide"]),
+    TeacherAttendance: ("teacher.school_id", ["teachers"]),
+    Student: ("school_id", ["students", "classes", "parents", "school_wide"]),
+    StudentAttendance: ("student.school_id", ["students"]),
+    SchoolClass: ("school_id", ["classes"]),
+    ClassAttendance: ("school_class.school_id", ["classes"]),
+    AcademicRecord: (
+        "student.school_id",
+        ["teachers", "students", "classes", "reports"],
+    ),
+    Document: ("school_id", ["documents", "students"]),
+    GeneratedReport: ("school_id", ["teachers", "reports", "school_wide"]),
+    ReportAccessLog: ("report.school_id", ["reports", "parents"]),
+    Parent: ("school_id", ["parents"]),
+    ParentNotification: ("parent.school_id", ["parents", "notifications"]),
+}
+
+
+def _school_id(instance, path):
+    value = instance
+    try:
+        for attr in path.split("."):
+            value = getattr(value, attr)
+            if value is None:
+                return None
+    except ObjectDoesNotExist:
+        # Related row already gone, e.g. during a cascade delete
+        return None
+    return value
+
+
+def invalidate_analytics(sender, instance, **kwargs):
+    path, sections = DEPENDENCIES[sender]
+    invalidate_on_commit(_school_id(instance, path), sections)
+
+
+def invalidate_class_membership(sender, instance, action, **kwargs):
+    """Class rosters and attendance lists change through m2m only"""
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+    school_id = getattr(instance, "school_id", None)
+    if school_id is None:
+        school_id = _school_id(instance, "school_class.school_id")
+    invalidate_on_commit(school_id, ["classes", "students"])
+
+
+for model in DEPENDENCIES:
+    post_save.connect(
+        invalidate_analytics,
+        sender=model,
+        dispatch_uid=f"analytics_cache_save_{model.__name__}",
+    )
+    post_delete.connect(
+        invalidate_analytics,
+        sender=model,
+        dispatch_uid=f"analytics_cache_delete_{model.__name__}",
+    )
+
+for through in (SchoolClass.students.through, ClassAttendance.present_students.through):
+    m2m_changed.connect(
+        invalidate_class_membership,
+        sender=through,
+        dispatch_uid=f"analytics_cache_m2m_{through.__name__}",
+    )
@@ -0,0 +1,60 @@
+from django.db.models import Count
+from skul_data.analytics.models.analytics import AnalyticsAlert
+from skul_data.reports.models.academic_record import AcademicRecord
+
+# Same threshold as the AcademicRecord post_save alert receivers
+LOW_SCORE = 40
+
+
+def create_low_performance_alerts(
+    school, new_records, failing_student_ids, school_year
+):
+    """
+    Raise the alerts ``check_low_performance`` and
+    ``check_consistently_low_performance`` would have, for records written
+    with ``bulk_create`` (which sends no post_save). ``new_records`` are the
+    records created by the upload; ``failing_student_ids`` the students
+    whose score in it is below LOW_SCORE, as the receiver only checks a
+    student when the saved record is failing.
+    Returns the number of alerts created.
+    """
+    alerts = [
+        AnalyticsAlert(
+            school=school,
+            alert_type="PERFORMANCE_SINGLE",
+            title=f"Low Score: {record.student.full_name} in {record.subject.name}",
+            message=f"Scored {record.score} (below passing grade)",
+            related_model="AcademicRecord",
+            related_id=record.id,
+        )
+        for record in new_records.filter(score__lt=LOW_SCORE).select_related(
+            "student", "subject"
+        )
+    ]
+
+    repeat_failures = (
+        AcademicRecord.objects.filter(
+            student_id__in=failing_student_ids,
+            score__lt=LOW_SCORE,
+            school_year=school_year,
+        )
+        .values("student_id", "student__first_name", "student__last_name")
+        .annotate(failing_count=Count("id"))
+        .filter(failing_count__gte=3)
+        .order_by()
+    )
+    for row in repeat_failures:
+        full_name = f"{row['student__first_name']} {row['student__last_name']}"
+        alerts.append(
+            AnalyticsAlert(
+                school=school,
+                alert_type="PERFORMANCE",
+                title=f"Consistent Low Performance: {full_name}",
+                message=f"{full_name} has {row['failing_count']} failing grades",
+                related_model="Student",
+                related_id=row["student_id"],
+            )
+        )
+
+    AnalyticsAlert.objects.bulk_create(alerts)
+    return len(alerts)
@@ -33,6 +33,13 @@ from skul_data.action_logs.models.action_log import ActionLog, ActionCategory
 from django.contrib.contenttypes.models import ContentType
 from skul_data.notifications.models.notification import Notification
 from skul_data.users.models.school_admin import SchoolAdmin
+from skul_data.notifications.utils.unread_counters import get_school_unread_breakdown
+from skul_data.analytics.utils.metric_planner import (
+    Metric,
+    run_metric,
+    run_metrics,
+    sort_rows,
+)
 
 
 def get_most_active_teacher(school):
@@ -72,27 +79,14 @@ def get_student_attendance_rate(school):
     Calculate the average daily attendance rate using historical student counts
     Returns: float (percentage between 0-100)
     """
-    attendance_records = ClassAttendance.objects.filter(
-        school_class__school=school
-    ).prefetch_related("present_students")
+    average = ClassAttendance.objects.filter(
+        school_class__school=school, total_students__gt=0
+    ).aggregate(rate=Avg("snapshot_attendance_rate"))["rate"]
 
-    if not attendance_records.exists():
+    if average is None:
         return 0.0
 
-    daily_rates = []
-
-    for record in attendance_records:
-        if record.total_students == 0:
-            continue
-
-        present_count = record.present_students.count()
-        daily_rate = (present_count / record.total_students) * 100
-        daily_rates.append(daily_rate)
-
-    if not daily_rates:
-        return 0.0
-
-    return round(sum(daily_rates) / len(daily_rates), 1)
+    return round(average, 1)
 
 
 def get_most_downloaded_document(school):
@@ -374,54 +368,76 @@ def get_class_sizes(school):
     )
 
 
+def _academic_records_in_range(school, date_filter):
+    return Q(
+        student__school=school,
+        created_at__range=(date_filter["start"], date_filter["end"]),
+    )
+
+
+def _with_average_score(rows):
+    for row in rows:
+        total, scored = row.pop("score_total"), row.pop("score_count")
+        row["avg_score"] = total / scored if scored else None
+    return rows
+
+
+CLASS_AVERAGE_GRADES = Metric(
+    "average_grades",
+    AcademicRecord,
+    where=_academic_records_in_range,
+    group_by=["student__student_class__name", "term"],
+    aggregates={"score_total": Sum("score"), "score_count": Count("score")},
+    finalize=lambda rows: sort_rows(
+        sort_rows(_with_average_score(rows), "term"), "student__student_class__name"
+    ),
+)
+
+TOP_CLASSES = Metric(
+    "top_classes",
+    AcademicRecord,
+    where=_academic_records_in_range,
+    group_by=["student__student_class__name"],
+    aggregates={
+        "score_total": Sum("score"),
+        "score_count": Count("score"),
+        "top_student": Max("score"),
+    },
+    finalize=lambda rows: sort_rows(
+        _with_average_score(rows), "avg_score", reverse=True
+    ),
+)
+
+
 def get_class_average_grades(school, filters):
     """Get class average grades per term"""
-    date_filter = get_date_filter(filters)
-    return (
-        AcademicRecord.objects.filter(
-            student__school=school,
-            created_at__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values("student__student_class__name", "term")
-        .annotate(avg_score=Avg("score"))
-        .order_by("student__student_class__name", "term")
-    )
+    return run_metric(CLASS_AVERAGE_GRADES, school, get_date_filter(filters))
 
 
 def get_top_classes(school, filters):
     """Get top performing classes"""
-    date_filter = get_date_filter(filters)
-    return (
-        AcademicRecord.objects.filter(
-            student__school=school,
-            created_at__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values("student__student_class__name")
-        .annotate(avg_score=Avg("score"), top_student=Max("score"))
-        .order_by("-avg_score")
-    )
+    return run_metric(TOP_CLASSES, school, get_date_filter(filters))
 
 
 def get_class_attendance_rates(school, filters):
     """Get class attendance rates"""
     date_filter = get_date_filter(filters)
-    return (
+    rates = (
         ClassAttendance.objects.filter(
             school_class__school=school,
             date__range=(date_filter["start"], date_filter["end"]),
         )
         .values("school_class__name")
-        .annotate(
-            attendance_rate=Avg(
-                Case(
-                    When(present_students__isnull=False, then=1),
-                    default=0,
-                    output_field=models.FloatField(),
-                )
-            )
-        )
+        .annotate(attendance_rate=Avg("snapshot_attendance_rate"))
         .order_by("-attendance_rate")
     )
+    return [
+        {
+            "school_class__name": row["school_class__name"],
+            "attendance_rate": round(row["attendance_rate"], 2),
+        }
+        for row in rates
+    ]
 
 
 def get_teacher_ratios(school):
@@ -444,66 +460,82 @@ def get_teacher_ratios(school):
     )
 
 
+def _document_actions_in_range(school, date_filter, categories):
+    return Q(
+        document__school=school,
+        category__in=categories,
+        timestamp__range=(date_filter["start"], date_filter["end"]),
+    )
+
+
+DOCUMENT_DOWNLOAD_FREQUENCY = Metric(
+    "download_frequency",
+    ActionLog,
+    where=lambda school, date_filter: _document_actions_in_range(
+        school, date_filter, [ActionCategory.DOWNLOAD]
+    ),
+    group_by=["document__title", "document__category__name"],
+    aggregates={"download_count": Count("id")},
+    finalize=lambda rows: sort_rows(rows, "download_count", reverse=True),
+)
+
+
 def get_document_download_frequency(school, filters):
-    date_filter = get_date_filter(filters)
+    return run_metric(DOCUMENT_DOWNLOAD_FREQUENCY, school, get_date_filter(filters))
 
-    return (
-        ActionLog.objects.filter(
-            document__school=school,  # Use the reverse relation
-            category=ActionCategory.DOWNLOAD,
-            timestamp__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values("document__title", "document__category__name")
-        .annotate(download_count=Count("id"))
-        .order_by("-download_count")
-    )
+
+DOCUMENT_TYPES_DISTRIBUTION = Metric(
+    "types_distribution",
+    Document,
+    where=lambda school, date_filter: Q(school=school),
+    group_by=["category__name"],
+    aggregates={"count": Count("id")},
+    finalize=lambda rows: sort_rows(rows, "count", reverse=True),
+)
 
 
 def get_document_types_distribution(school):
     """Get distribution of document types"""
-    return (
-        Document.objects.filter(school=school)
-        .values("category__name")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
+    return run_metric(DOCUMENT_TYPES_DISTRIBUTION, school, None)
+
+
+DOCUMENT_ACCESS_BY_ROLE = Metric(
+    "access_by_role",
+    ActionLog,
+    where=lambda school, date_filter: _document_actions_in_range(
+        school, date_filter, [ActionCategory.VIEW, ActionCategory.DOWNLOAD]
+    ),
+    group_by=["user__user_type"],
+    aggregates={"access_count": Count("id")},
+    finalize=lambda rows: sort_rows(rows, "access_count", reverse=True),
+)
 
 
 def get_document_access_by_role(school, filters):
     """Get document access by user role"""
-    date_filter = get_date_filter(filters)
-    return (
-        ActionLog.objects.filter(
-            content_type=ContentType.objects.get_for_model(Document),
-            object_id__in=Document.objects.filter(school=school).values("id"),
-            category__in=[
-                ActionCategory.VIEW,
-                ActionCategory.DOWNLOAD,
-            ],
-            timestamp__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values("user__user_type")
-        .annotate(access_count=Count("id"))
-        .order_by("-access_count")
-    )
+    return run_metric(DOCUMENT_ACCESS_BY_ROLE, school, get_date_filter(filters))
+
+
+UPLOADS_BY_USER = Metric(
+    "uploads_by_user",
+    Document,
+    where=lambda school, date_filter: Q(
+        school=school,
+        uploaded_at__range=(date_filter["start"], date_filter["end"]),
+    ),
+    group_by=[
+        "uploaded_by__first_name",
+        "uploaded_by__last_name",
+        "uploaded_by__user_type",
+    ],
+    aggregates={"upload_count": Count("id")},
+    finalize=lambda rows: sort_rows(rows, "upload_count", reverse=True),
+)
 
 
 def get_uploads_by_user(school, filters):
     """Get document uploads by user"""
-    date_filter = get_date_filter(filters)
-    return (
-        Document.objects.filter(
-            school=school,
-            uploaded_at__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values(
-            "uploaded_by__first_name",
-            "uploaded_by__last_name",
-            "uploaded_by__user_type",
-        )
-        .annotate(upload_count=Count("id"))
-        .order_by("-upload_count")
-    )
+    return run_metric(UPLOADS_BY_USER, school, get_date_filter(filters))
 
 
 # ===== REPORT ANALYTICS HELPERS =====
@@ -521,18 +553,36 @@ def get_reports_generated(school, filters):
     )
 
 
+def _report_access_in_range(school, date_filter):
+    return Q(
+        report__school=school,
+        accessed_at__range=(date_filter["start"], date_filter["end"]),
+    )
+
+
+MOST_ACCESSED_REPORTS = Metric(
+    "most_accessed",
+    ReportAccessLog,
+    where=_report_access_in_range,
+    group_by=["report__report_type__name"],
+    aggregates={"access_count": Count("id")},
+    finalize=lambda rows: sort_rows(rows, "access_count", reverse=True),
+)
+
+PARENT_REPORT_VIEWS = Metric(
+    "parent_views",
+    ReportAccessLog,
+    where=lambda school, date_filter: _report_access_in_range(school, date_filter)
+    & Q(accessed_by__user_type="parent"),
+    group_by=["action"],
+    aggregates={"count": Count("id")},
+    finalize=lambda rows: sort_rows(rows, "count", reverse=True),
+)
+
+
 def get_most_accessed_reports(school, filters):
     """Get most accessed report types"""
-    date_filter = get_date_filter(filters)
-    return (
-        ReportAccessLog.objects.filter(
-            report__school=school,
-            accessed_at__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values("report__report_type__name")
-        .annotate(access_count=Count("id"))
-        .order_by("-access_count")
-    )
+    return run_metric(MOST_ACCESSED_REPORTS, school, get_date_filter(filters))
 
 
 def get_missing_reports(school, filters):
@@ -594,17 +644,7 @@ def get_top_students_from_reports(school, filters):
 
 def get_parent_report_views(school, filters):
     """Get parent report view/download rates"""
-    date_filter = get_date_filter(filters)
-    return (
-        ReportAccessLog.objects.filter(
-            report__school=school,
-            accessed_at__range=(date_filter["start"], date_filter["end"]),
-            accessed_by__user_type="parent",
-        )
-        .values("action")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
+    return run_metric(PARENT_REPORT_VIEWS, school, get_date_filter(filters))
 
 
 def get_most_engaged_parents(school, filters):
@@ -702,76 +742,78 @@ def get_parent_login_trends(school, filters):
 
 
 # ===== NOTIFICATION ANALYTICS HELPERS =====
+def _parent_notifications_in_range(school, date_filter):
+    return Q(
+        parent__school=school,
+        created_at__range=(date_filter["start"], date_filter["end"]),
+    )
+
+
+def _with_open_rate(rows):
+    for row in rows:
+        row["open_rate"] = row["read"] * 100.0 / row["total"]
+    return sort_rows(rows, "open_rate", reverse=True)
+
+
+def _with_click_through(rows):
+    for row in rows:
+        total, with_action = row.pop("total"), row.pop("with_action")
+        row["ctr"] = with_action * 100.0 / total
+    return sort_rows(rows, "ctr", reverse=True)
+
+
+NOTIFICATION_OPEN_RATES = Metric(
+    "open_rates",
+    ParentNotification,
+    where=_parent_notifications_in_range,
+    group_by=["notification_type"],
+    aggregates={"total": Count("id"), "read": Count("id", filter=Q(is_read=True))},
+    finalize=_with_open_rate,
+)
+
+MESSAGE_TYPES = Metric(
+    "message_types",
+    ParentNotification,
+    where=_parent_notifications_in_range,
+    group_by=["notification_type"],
+    aggregates={"count": Count("id")},
+    finalize=lambda rows: sort_rows(rows, "count", reverse=True),
+)
+
+CLICK_THROUGH_RATES = Metric(
+    "click_through",
+    ParentNotification,
+    where=lambda school, date_filter: _parent_notifications_in_range(
+        school, date_filter
+    )
+    & Q(notification_type__in=["REPORT", "EVENT"]),
+    group_by=["notification_type"],
+    aggregates={
+        "total": Count("id"),
+        "with_action": Count("id", filter=Q(message__icontains="action=")),
+    },
+    finalize=_with_click_through,
+)
+
+
 def get_notification_open_rates(school, filters):
     """Get notification open rates by type"""
-    date_filter = get_date_filter(filters)
-    return (
-        ParentNotification.objects.filter(
-            parent__school=school,
-            created_at__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values("notification_type")
-        .annotate(
-            total=Count("id"),
-            read=Count("id", filter=Q(is_read=True)),
-            open_rate=ExpressionWrapper(
-                Count("id", filter=Q(is_read=True)) * 100.0 / Count("id"),
-                output_field=models.FloatField(),
-            ),
-        )
-        .order_by("-open_rate")
-    )
+    return run_metric(NOTIFICATION_OPEN_RATES, school, get_date_filter(filters))
 
 
 def get_message_types(school, filters):
     """Get distribution of message types"""
-    date_filter = get_date_filter(filters)
-    return (
-        ParentNotification.objects.filter(
-            parent__school=school,
-            created_at__range=(date_filter["start"], date_filter["end"]),
-        )
-        .values("notification_type")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
+    return run_metric(MESSAGE_TYPES, school, get_date_filter(filters))
 
 
 def get_click_through_rates(school, filters):
     """Get notification click-through rates"""
-    date_filter = get_date_filter(filters)
-    return (
-        ParentNotification.objects.filter(
-            parent__school=school,
-            created_at__range=(date_filter["start"], date_filter["end"]),
-            notification_type__in=["REPORT", "EVENT"],
-        )
-        .annotate(
-            has_action=Case(
-                When(message__icontains="action=", then=1),
-                default=0,
-                output_field=models.IntegerField(),
-            )
-        )
-        .values("notification_type")
-        .annotate(
-            ctr=ExpressionWrapper(
-                Sum("has_action") * 100.0 / Count("id"),
-                output_field=models.FloatField(),
-            )
-        )
-        .order_by("-ctr")
-    )
+    return run_metric(CLICK_THROUGH_RATES, school, get_date_filter(filters))
 
 
 def get_unread_notifications(school):
-    """Get count of unread notifications"""
-    return (
-        ParentNotification.objects.filter(parent__school=school, is_read=False)
-        .values("notification_type")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
+    """Get count of unread notifications (served from the unread counter cache)"""
+    return get_school_unread_breakdown(school.id)
 
 
 def get_active_users(school, filters):
@@ -794,25 +836,38 @@ def get_active_users(school, filters):
     }
 
 
-def get_engagement_rates(school, filters):
-    date_filter = get_date_filter(filters)
+def _engagement_counts(rows):
+    counts = {row["content_type__model"]: row["count"] for row in rows}
+    return {
+        "documents": counts.get("document", 0),
+        "reports": counts.get("generatedreport", 0),
+    }
 
-    # Get ContentType for relevant models
-    doc_content_type = ContentType.objects.get_for_model(Document)
-    report_content_type = ContentType.objects.get_for_model(GeneratedReport)
 
-    return {
-        "documents": ActionLog.objects.filter(
-            content_type=doc_content_type,
+ENGAGEMENT_RATES = Metric(
+    "engagement",
+    ActionLog,
+    where=lambda school, date_filter: Q(
+        timestamp__range=(date_filter["start"], date_filter["end"])
+    )
+    & (
+        Q(
+            content_type=ContentType.objects.get_for_model(Document),
             object_id__in=Document.objects.filter(school=school).values("id"),
-            timestamp__range=(date_filter["start"], date_filter["end"]),
-        ).count(),
-        "reports": ActionLog.objects.filter(
-            content_type=report_content_type,
+        )
+        | Q(
+            content_type=ContentType.objects.get_for_model(GeneratedReport),
             object_id__in=GeneratedReport.objects.filter(school=school).values("id"),
-            timestamp__range=(date_filter["start"], date_filter["end"]),
-        ).count(),
-    }
+        )
+    ),
+    group_by=["content_type__model"],
+    aggregates={"count": Count("id")},
+    finalize=_engagement_counts,
+)
+
+
+def get_engagement_rates(school, filters):
+    return run_metric(ENGAGEMENT_RATES, school, get_date_filter(filters))
 
 
 def get_report_generation_stats(school, filters):
@@ -919,3 +974,118 @@ def get_class_filter(filters):
     if "class_id" in filters:
         return {"student__student_class__id": filters["class_id"]}
     return {}
+
+
+def build_teacher_analytics(school, filters):
+    return {
+        "total_teachers": Teacher.objects.filter(school=school).count(),
+        "logins": get_teacher_logins(school, filters),
+        "reports_per_teacher": get_reports_per_teacher(school, filters),
+        "attendance_accuracy": get_attendance_accuracy(school, filters),
+        "performance_per_teacher": get_performance_per_teacher(school, filters),
+        "response_times": get_response_times(school, filters),
+    }
+
+
+def build_student_analytics(school, filters):
+    return {
+        "total_students": Student.objects.filter(school=school).count(),
+        "attendance": get_student_attendance(school, filters),
+        "performance": get_student_performance(school, filters),
+        "dropouts": get_student_dropouts(school, filters),
+        "document_access": get_document_access(school, filters),
+    }
+
+
+def build_class_analytics(school, filters):
+    metrics = run_metrics(
+        [CLASS_AVERAGE_GRADES, TOP_CLASSES], school, get_date_filter(filters)
+    )
+    return {
+        "class_sizes": get_class_sizes(school),
+        "average_grades": metrics["average_grades"],
+        "top_classes": metrics["top_classes"],
+        "attendance_rates": get_class_attendance_rates(school, filters),
+        "teacher_ratios": get_teacher_ratios(school),
+    }
+
+
+def build_document_analytics(school, filters):
+    metrics = run_metrics(
+        [
+            DOCUMENT_DOWNLOAD_FREQUENCY,
+            DOCUMENT_TYPES_DISTRIBUTION,
+            DOCUMENT_ACCESS_BY_ROLE,
+            UPLOADS_BY_USER,
+        ],
+        school,
+        get_date_filter(filters),
+    )
+    return {
+        "total_documents": sum(row["count"] for row in metrics["types_distribution"]),
+        "download_frequency": metrics["download_frequency"],
+        "types_distribution": metrics["types_distribution"],
+        "access_by_role": metrics["access_by_role"],
+        "uploads_by_user": metrics["uploads_by_user"],
+    }
+
+
+def build_report_analytics(school, filters):
+    metrics = run_metrics(
+        [MOST_ACCESSED_REPORTS, PARENT_REPORT_VIEWS], school, get_date_filter(filters)
+    )
+    return {
+        "reports_generated": get_reports_generated(school, filters),
+        "most_accessed": metrics["most_accessed"],
+        "missing_reports": get_missing_reports(school, filters),
+        "top_students": get_top_students_from_reports(school, filters),
+        "parent_views": metrics["parent_views"],
+    }
+
+
+def build_parent_analytics(school, filters):
+    return {
+        "most_engaged": get_most_engaged_parents(school, filters),
+        "students_per_parent": get_students_per_parent(school),
+        "feedback": get_parent_feedback(school, filters),
+        "login_trends": get_parent_login_trends(school, filters),
+        "report_views": get_parent_report_views(school, filters),
+    }
+
+
+def build_notification_analytics(school, filters):
+    metrics = run_metrics(
+        [NOTIFICATION_OPEN_RATES, MESSAGE_TYPES, CLICK_THROUGH_RATES],
+        school,
+        get_date_filter(filters),
+    )
+    return {
+        "open_rates": metrics["open_rates"],
+        "message_types": metrics["message_types"],
+        "click_through": metrics["click_through"],
+        "unread": get_unread_notifications(school),
+        "response_times": get_response_times(school, filters),
+    }
+
+
+def build_school_wide_analytics(school, filters):
+    return {
+        "active_users": get_active_users(school, filters),
+        "engagement": get_engagement_rates(school, filters),
+        "report_generation": get_report_generation_stats(school, filters),
+        "teacher_ratios": get_teacher_ratios(school),
+        "growth": get_school_growth(school, filters),
+    }
+
+
+# AnalyticsViewSet action -> builder for its response
+ANALYTICS_SECTIONS = {
+    "teachers": build_teacher_analytics,
+    "students": build_student_analytics,
+    "classes": build_class_analytics,
+    "documents": build_document_analytics,
+    "reports": build_report_analytics,
+    "parents": build_parent_analytics,
+    "notifications": build_notification_analytics,
+    "school_wide": build_school_wide_analytics,
+}
@@ -0,0 +1,130 @@
+from functools import reduce
+from operator import or_
+from django.db.models import Count, Max, Min, Sum
+
+
+class Metric:
+    """
+    An analytics metric declared as data rather than as its own query.
+
+    Rows of ``model`` matching ``where(school, date_filter)`` are grouped by
+    ``group_by`` and reduced with ``aggregates`` (Count, Sum, Min or Max,
+    keyed by output name). ``finalize`` turns the grouped rows into the
+    metric's result. Because the aggregates are additive, metrics over the
+    same model can share one query grouped by the union of their fields and
+    be rolled up afterwards; see ``run_metrics``.
+    """
+
+    ROLLUPS = (Count, Sum, Min, Max)
+
+    def __init__(self, name, model, where, group_by, aggregates, finalize=list):
+        for aggregate in aggregates.values():
+            if not isinstance(aggregate, self.ROLLUPS) or aggregate.distinct:
+                raise ValueError(
+                    f"Metric {name} can only use Count, Sum, Min or Max without distinct"
+                )
+        self.name = name
+        self.model = model
+        self.where = where
+        self.group_by = tuple(group_by)
+        self.aggregates = aggregates
+        self.finalize = finalize
+
+    def __repr__(self):
+        return f"<Metric {self.name} on {self.model.__name__}>"
+
+
+def _scoped(aggregate, scope):
+    if scope is None:
+        return aggregate
+    aggregate = aggregate.copy()
+    aggregate.filter = scope & aggregate.filter if aggregate.filter else scope
+    return aggregate
+
+
+def _combine(aggregate, current, value):
+    if current is None:
+        return value
+    if value is None:
+        return current
+    if isinstance(aggregate, Max):
+        return max(current, value)
+    if isinstance(aggregate, Min):
+        return min(current, value)
+    return current + value
+
+
+def _rollup(metric, rows, prefix):
+    """Regroup the shared query's rows by the metric's own fields"""
+    groups = {}
+    for row in rows:
+        # Rows that only matched another metric's filter
+        if not row[f"{prefix}rows"]:
+            continue
+        key = tuple(row[field] for field in metric.group_by)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = dict(zip(metric.group_by, key))
+            for name in metric.aggregates:
+                group[name] = row[prefix + name]
+            continue
+        for name, aggregate in metric.aggregates.items():
+            group[name] = _combine(aggregate, group[name], row[prefix + name])
+    return list(groups.values())
+
+
+def plan(metrics, school, date_filter):
+    """
+    Group ``metrics`` into one query per base model. Returns a list of
+    ``(queryset, [(metric, annotation prefix), ...])``.
+    """
+    by_model = {}
+    for metric in metrics:
+        by_model.setdefault(metric.model, []).append(metric)
+
+    queries = []
+    for model, model_metrics in by_model.items():
+        wheres = [metric.where(school, date_filter) for metric in model_metrics]
+        shared = all(where == wheres[0] for where in wheres)
+
+        fields = []
+        annotations = {}
+        members = []
+        for index, (metric, where) in enumerate(zip(model_metrics, wheres)):
+            prefix = f"metric{index}_"
+            scope = None if shared else where
+            fields.extend(field for field in metric.group_by if field not in fields)
+            annotations[f"{prefix}rows"] = Count("pk", filter=scope)
+            for name, aggregate in metric.aggregates.items():
+                annotations[prefix + name] = _scoped(aggregate, scope)
+            members.append((metric, prefix))
+
+        queryset = (
+            model.objects.filter(wheres[0] if shared else reduce(or_, wheres))
+            .values(*fields)
+            .annotate(**annotations)
+            .order_by()
+        )
+        queries.append((queryset, members))
+    return queries
+
+
+def run_metrics(metrics, school, date_filter):
+    """Compute ``metrics`` with one grouped query per base model"""
+    results = {}
+    for queryset, members in plan(metrics, school, date_filter):
+        rows = list(queryset)
+        for metric, prefix in members:
+            results[metric.name] = metric.finalize(_rollup(metric, rows, prefix))
+    return results
+
+
+def run_metric(metric, school, date_filter):
+    return run_metrics([metric], school, date_filter)[metric.name]
+
+
+def sort_rows(rows, field, reverse=False):
+    """Sort like the database would: missing values last"""
+    present = [row for row in rows if row[field] is not None]
+    missing = [row for row in rows if row[field] is None]
+    return sorted(present, key=lambda row: row[field], reverse=reverse) + missing
@@ -0,0 +1,188 @@
+import datetime
+import hashlib
+import json
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.query import QuerySet
+from skul_data.analytics.utils.analytics_generator import ANALYTICS_SECTIONS
+from skul_data.notifications.utils.presence import (
+    cache_is_shared,
+    warn_if_local_cache,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Entries are served as-is for FRESH_TIMEOUT seconds, then served stale (and
+# refreshed in the background) until STALE_TIMEOUT. With a per-process cache
+# a background refresh would fill the worker's cache, not this one, so
+# expired entries are rebuilt in the request instead.
+FRESH_TIMEOUT = getattr(settings, "ANALYTICS_CACHE_FRESH_TIMEOUT", 60 * 5)
+STALE_TIMEOUT = getattr(settings, "ANALYTICS_CACHE_STALE_TIMEOUT", 60 * 60)
+# How long a scheduled refresh blocks further refreshes of the same entry
+REFRESH_LOCK_TIMEOUT = getattr(settings, "ANALYTICS_CACHE_REFRESH_LOCK_TIMEOUT", 60)
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+OUTCOMES = (HIT, STALE, MISS)
+
+
+def normalize_filters(filters):
+    """
+    Validated ``AnalyticsFilterSerializer`` data as a JSON-safe dict with
+    empty values dropped, so equivalent filters share a cache entry.
+    """
+    normalized = {}
+    for name, value in filters.items():
+        if value in (None, ""):
+            continue
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            value = value.isoformat()
+        normalized[name] = value
+    return dict(sorted(normalized.items()))
+
+
+def _version_key(school_id, section):
+    return f"analytics:version:{school_id}:{section}"
+
+
+def _entry_key(school_id, section, version, filters):
+    digest = hashlib.md5(
+        json.dumps(filters, sort_keys=True).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"analytics:response:{school_id}:{section}:{version}:{digest}"
+
+
+def _metric_key(section, outcome):
+    return f"analytics:cache_metrics:{section}:{outcome}"
+
+
+def _get_version(school_id, section):
+    key = _version_key(school_id, section)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate_sections(school_id, sections):
+    """Make cached responses for these sections of a school unreachable"""
+    cache.set_many(
+        {_version_key(school_id, section): uuid.uuid4().hex for section in sections},
+        None,
+    )
+
+
+def invalidate_on_commit(school_id, sections):
+    """``invalidate_sections`` once the current transaction commits"""
+    if school_id is not None:
+        transaction.on_commit(lambda: invalidate_sections(school_id, sections))
+
+
+def invalidate_model_sections(model, school_id):
+    """
+    Invalidate the sections built from ``model`` for writes that bypass its
+    post_save receiver, such as ``bulk_create``
+    """
+    from skul_data.analytics.signals.response_cache import DEPENDENCIES
+
+    invalidate_on_commit(school_id, DEPENDENCIES[model][1])
+
+
+def _record(section, outcome):
+    key = _metric_key(section, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+    logger.debug(f"Analytics cache {outcome} for {section}")
+
+
+def get_cache_metrics():
+    """``{section: {"HIT": n, "STALE": n, "MISS": n}}`` since counters were reset"""
+    keys = {
+        _metric_key(section, outcome): (section, outcome)
+        for section in ANALYTICS_SECTIONS
+        for outcome in OUTCOMES
+    }
+    counts = cache.get_many(keys)
+    metrics = {section: dict.fromkeys(OUTCOMES, 0) for section in ANALYTICS_SECTIONS}
+    for key, count in counts.items():
+        section, outcome = keys[key]
+        metrics[section][outcome] = count
+    return metrics
+
+
+def _plain(data):
+    # Generator functions return lazy querysets; store their rows instead
+    if isinstance(data, QuerySet):
+        return [_plain(row) for row in data]
+    if isinstance(data, dict):
+        return {key: _plain(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_plain(item) for item in data]
+    return data
+
+
+def compute_section(school, section, filters):
+    """Build a section and store it under the school's current version"""
+    version = _get_version(school.id, section)
+    data = _plain(ANALYTICS_SECTIONS[section](school, filters))
+    cache.set(
+        _entry_key(school.id, section, version, filters),
+        {"data": data, "fresh_until": time.time() + FRESH_TIMEOUT},
+        STALE_TIMEOUT,
+    )
+    return data
+
+
+def _schedule_refresh(school, section, filters, entry_key):
+    from skul_data.analytics.utils.tasks import refresh_analytics_section
+
+    if not cache.add(f"{entry_key}:refreshing", 1, REFRESH_LOCK_TIMEOUT):
+        return
+    try:
+        refresh_analytics_section.delay(school.id, section, filters)
+    except Exception as e:
+        # No broker: the stale copy is still served; the next miss rebuilds it
+        logger.warning(f"Could not schedule analytics refresh: {str(e)}")
+        cache.delete(f"{entry_key}:refreshing")
+
+
+def get_section(school, section, filters):
+    """
+    Return ``(data, outcome)`` for an analytics section. Fresh entries are
+    hits. Expired ones are returned stale while a background task rebuilds
+    them, or rebuilt in the request when the cache is per-process. Entries
+    invalidated by data changes, or never built, are computed in the
+    request.
+    """
+    filters = normalize_filters(filters)
+    version = _get_version(school.id, section)
+    entry_key = _entry_key(school.id, section, version, filters)
+    entry = cache.get(entry_key)
+
+    if entry is None:
+        outcome = MISS
+        data = compute_section(school, section, filters)
+    elif entry["fresh_until"] < time.time():
+        outcome = STALE
+        if cache_is_shared():
+            data = entry["data"]
+            _schedule_refresh(school, section, filters, entry_key)
+        else:
+            warn_if_local_cache("Analytics background refresh")
+            data = compute_section(school, section, filters)
+    else:
+        outcome = HIT
+        data = entry["data"]
+
+    _record(section, outcome)
+    return data, outcome
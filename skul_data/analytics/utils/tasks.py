@@ -24,6 +24,7 @@ from skul_data.analytics.views.analytics import (
     get_top_classes,
 )
 from skul_data.schools.models.schoolclass import ClassAttendance
+from skul_data.analytics.utils.response_cache import compute_section
 from django.db.models.query import QuerySet
 
 
@@ -219,13 +220,11 @@ def check_and_generate_alerts():
 
     # 4. Classes with low attendance (<70%)
     print("DEBUG: Checking for classes with low attendance")
-    class_attendances = ClassAttendance.objects.all()
+    class_attendances = ClassAttendance.objects.filter(
+        total_students__gt=1
+    ).select_related("school_class__school")
     for attendance in class_attendances:
-        present_count = attendance.present_students.count()
-        if attendance.total_students <= 1:
-            continue
-
-        attendance_rate = (present_count / attendance.total_students) * 100
+        attendance_rate = attendance.snapshot_attendance_rate
         print(
             f"DEBUG: Class {attendance.school_class.id} attendance: {attendance_rate:.1f}%"
         )
@@ -252,3 +251,12 @@ def check_and_generate_alerts():
 
     print("DEBUG: Completed check_and_generate_alerts task")
     return True
+
+
+@shared_task(name="skul_data.analytics.utils.tasks.refresh_analytics_section")
+def refresh_analytics_section(school_id, section, filters):
+    """Rebuild a stale cached analytics response"""
+    school = School.objects.filter(id=school_id).first()
+    if school is None:
+        return
+    compute_section(school, section, filters)
@@ -67,6 +67,7 @@ from skul_data.analytics.utils.analytics_generator import (
     get_response_times,
     get_performance_per_teacher,
 )
+from skul_data.analytics.utils.response_cache import get_section
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
 from skul_data.action_logs.models.action_log import ActionLog
@@ -229,78 +230,36 @@ class AnalyticsViewSet(viewsets.ViewSet):
 
         return transformed
 
-    @action(detail=False, methods=["get"])
-    def teachers(self, request):
-        """Teacher-specific analytics"""
+    def _section_response(self, request, section):
+        """Serve a section from the analytics response cache"""
         school = self.get_school()
         serializer = AnalyticsFilterSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
 
-        data = {
-            "total_teachers": Teacher.objects.filter(school=school).count(),
-            "logins": get_teacher_logins(school, filters),
-            "reports_per_teacher": get_reports_per_teacher(school, filters),
-            "attendance_accuracy": get_attendance_accuracy(school, filters),
-            "performance_per_teacher": get_performance_per_teacher(school, filters),
-            "response_times": get_response_times(school, filters),
-        }
+        data, outcome = get_section(school, section, serializer.validated_data)
+        response = Response(data)
+        response["X-Analytics-Cache"] = outcome
+        return response
 
-        return Response(data)
+    @action(detail=False, methods=["get"])
+    def teachers(self, request):
+        """Teacher-specific analytics"""
+        return self._section_response(request, "teachers")
 
     @action(detail=False, methods=["get"])
     def students(self, request):
         """Student-specific analytics"""
-        school = self.get_school()
-        serializer = AnalyticsFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
-
-        data = {
-            "total_students": Student.objects.filter(school=school).count(),
-            "attendance": get_student_attendance(school, filters),
-            "performance": get_student_performance(school, filters),
-            "dropouts": get_student_dropouts(school, filters),
-            "document_access": get_document_access(school, filters),
-        }
-
-        return Response(data)
+        return self._section_response(request, "students")
 
     @action(detail=False, methods=["get"])
     def classes(self, request):
         """Class-specific analytics"""
-        school = self.get_school()
-        serializer = AnalyticsFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
-
-        data = {
-            "class_sizes": get_class_sizes(school),
-            "average_grades": get_class_average_grades(school, filters),
-            "top_classes": get_top_classes(school, filters),
-            "attendance_rates": get_class_attendance_rates(school, filters),
-            "teacher_ratios": get_teacher_ratios(school),
-        }
-
-        return Response(data)
+        return self._section_response(request, "classes")
 
     @action(detail=False, methods=["get"])
     def documents(self, request):
         """Document-specific analytics"""
-        school = self.get_school()
-        serializer = AnalyticsFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
-
-        data = {
-            "total_documents": Document.objects.filter(school=school).count(),
-            "download_frequency": get_document_download_frequency(school, filters),
-            "types_distribution": get_document_types_distribution(school),
-            "access_by_role": get_document_access_by_role(school, filters),
-            "uploads_by_user": get_uploads_by_user(school, filters),
-        }
-
-        return Response(data)
+        return self._section_response(request, "documents")
 
     # @action(detail=False, methods=["get"])
     # def documents(self, request):
@@ -381,74 +340,22 @@ class AnalyticsViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["get"])
     def reports(self, request):
         """Report-specific analytics"""
-        school = self.get_school()
-        serializer = AnalyticsFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
-
-        data = {
-            "reports_generated": get_reports_generated(school, filters),
-            "most_accessed": get_most_accessed_reports(school, filters),
-            "missing_reports": get_missing_reports(school, filters),
-            "top_students": get_top_students_from_reports(school, filters),
-            "parent_views": get_parent_report_views(school, filters),
-        }
-
-        return Response(data)
+        return self._section_response(request, "reports")
 
     @action(detail=False, methods=["get"])
     def parents(self, request):
         """Parent-specific analytics"""
-        school = self.get_school()
-        serializer = AnalyticsFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
-
-        data = {
-            "most_engaged": get_most_engaged_parents(school, filters),
-            "students_per_parent": get_students_per_parent(school),
-            "feedback": get_parent_feedback(school, filters),
-            "login_trends": get_parent_login_trends(school, filters),
-            "report_views": get_parent_report_views(school, filters),
-        }
-
-        return Response(data)
+        return self._section_response(request, "parents")
 
     @action(detail=False, methods=["get"])
     def notifications(self, request):
         """Notification and communication analytics"""
-        school = self.get_school()
-        serializer = AnalyticsFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
-
-        data = {
-            "open_rates": get_notification_open_rates(school, filters),
-            "message_types": get_message_types(school, filters),
-            "click_through": get_click_through_rates(school, filters),
-            "unread": get_unread_notifications(school),
-            "response_times": get_response_times(school, filters),
-        }
-
-        return Response(data)
+        return self._section_response(request, "notifications")
 
     @action(detail=False, methods=["get"])
     def school_wide(self, request):
         """General school-wide KPIs"""
-        school = self.get_school()
-        serializer = AnalyticsFilterSerializer(data=request.query_params)
-        serializer.is_valid(raise_exception=True)
-        filters = serializer.validated_data
-
-        data = {
-            "active_users": get_active_users(school, filters),
-            "engagement": get_engagement_rates(school, filters),
-            "report_generation": get_report_generation_stats(school, filters),
-            "teacher_ratios": get_teacher_ratios(school),
-            "growth": get_school_growth(school, filters),
-        }
-
-        return Response(data)
+        return self._section_response(request, "school_wide")
 
 
 class AnalyticsDashboardViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,103 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from skul_data.documents.utils.template_cache import (
+    CLASS_ROSTER,
+    SCHOOL_STUDENTS,
+    SCHOOL_SUBJECTS,
+    bump_versions,
+)
+from skul_data.schools.models.schoolclass import SchoolClass
+from skul_data.students.models.student import Student, Subject
+from skul_data.users.models.base_user import User
+from skul_data.users.models.parent import Parent
+
+# Parent user fields printed in the fee template
+TEMPLATE_PARENT_USER_FIELDS = {"first_name", "last_name", "email"}
+
+# Student fields that appear in (or select rows of) the upload templates
+TEMPLATE_STUDENT_FIELDS = {
+    "first_name",
+    "last_name",
+    "admission_number",
+    "student_class",
+    "parent",
+    "school",
+    "status",
+    "is_active",
+}
+
+
+def _student_scopes(student, class_ids):
+    return [(CLASS_ROSTER, class_id) for class_id in class_ids] + [
+        (SCHOOL_STUDENTS, student.school_id)
+    ]
+
+
+@receiver(post_save, sender=Student, dispatch_uid="template_cache_student_saved")
+def bump_student_templates(sender, instance, created, **kwargs):
+    if created:
+        class_ids = {instance.student_class_id}
+    elif TEMPLATE_STUDENT_FIELDS & set(getattr(instance, "_changed_fields", [])):
+        # The dirty-fields snapshot still holds the values from before this save
+        previous_class_id = instance.__dict__.get("_snapshot", {}).get(
+            "student_class_id"
+        )
+        class_ids = {instance.student_class_id, previous_class_id}
+    else:
+        return
+    bump_versions(_student_scopes(instance, class_ids))
+
+
+@receiver(post_delete, sender=Student, dispatch_uid="template_cache_student_deleted")
+def bump_deleted_student_templates(sender, instance, **kwargs):
+    bump_versions(_student_scopes(instance, {instance.student_class_id}))
+
+
+def _bump_parent_classes(**student_filter):
+    class_ids = Student.objects.filter(**student_filter).values_list(
+        "student_class_id", flat=True
+    )
+    bump_versions([(CLASS_ROSTER, class_id) for class_id in set(class_ids)])
+
+
+@receiver(post_save, sender=Parent, dispatch_uid="template_cache_parent_saved")
+def bump_parent_templates(sender, instance, created, **kwargs):
+    # The fee template lists each student's parent contact
+    if created or "phone_number" not in getattr(instance, "_changed_fields", []):
+        return
+    _bump_parent_classes(parent=instance)
+
+
+@receiver(post_save, sender=User, dispatch_uid="template_cache_parent_user_saved")
+def bump_parent_user_templates(sender, instance, created, **kwargs):
+    # ...and the parent's name and email, which live on the user
+    if created or instance.user_type != User.PARENT:
+        return
+    if TEMPLATE_PARENT_USER_FIELDS & set(getattr(instance, "_changed_fields", [])):
+        _bump_parent_classes(parent__user=instance)
+
+
+@receiver(pre_save, sender=SchoolClass, dispatch_uid="template_cache_class_renaming")
+def note_class_rename(sender, instance, **kwargs):
+    # SchoolClass has no dirty-field tracking; compare with the stored name
+    instance._template_name_changed = bool(instance.pk) and (
+        sender.objects.filter(pk=instance.pk).exclude(name=instance.name).exists()
+    )
+
+
+@receiver(post_save, sender=SchoolClass, dispatch_uid="template_cache_class_saved")
+def bump_class_templates(sender, instance, created, **kwargs):
+    # The KCSE template prints class names and selects students by them
+    if getattr(instance, "_template_name_changed", False):
+        bump_versions([(SCHOOL_STUDENTS, instance.school_id)])
+
+
+@receiver(post_delete, sender=SchoolClass, dispatch_uid="template_cache_class_deleted")
+def bump_deleted_class_templates(sender, instance, **kwargs):
+    bump_versions([(SCHOOL_STUDENTS, instance.school_id)])
+
+
+@receiver(post_save, sender=Subject, dispatch_uid="template_cache_subject_saved")
+@receiver(post_delete, sender=Subject, dispatch_uid="template_cache_subject_deleted")
+def bump_subject_templates(sender, instance, **kwargs):
+    bump_versions([(SCHOOL_SUBJECTS, instance.school_id)])
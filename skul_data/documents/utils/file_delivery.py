@@ -0,0 +1,183 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    content_disposition_header,
+    http_date,
+    parse_http_date_safe,
+    quote_etag,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd) hands the
+# transfer to the front proxy; None streams the file from Python.
+BACKEND = getattr(settings, "FILE_DELIVERY_BACKEND", None)
+# Internal nginx location aliased to MEDIA_ROOT
+ACCEL_PREFIX = getattr(settings, "FILE_DELIVERY_ACCEL_PREFIX", "/protected-media/")
+CHUNK_SIZE = getattr(settings, "FILE_DELIVERY_CHUNK_SIZE", 64 * 1024)
+
+RANGE_RE = re.compile(r"^\s*bytes=(\d*)-(\d*)\s*$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single byte range, or None when the
+    whole file should be sent. Multiple ranges are answered with the whole
+    file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _accel_response(path, content_type):
+    if BACKEND == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = path
+        return response
+
+    relative = os.path.relpath(path, settings.MEDIA_ROOT)
+    if relative.startswith(os.pardir):
+        # Outside the location the proxy can see
+        return None
+    response = HttpResponse(content_type=content_type)
+    response["X-Accel-Redirect"] = quote(
+        ACCEL_PREFIX.rstrip("/") + "/" + relative.replace(os.sep, "/")
+    )
+    return response
+
+
+def is_new_download(request, response):
+    """
+    Whether a ``file_response`` starts a transfer: a full 200 or a range from
+    byte 0. Revalidations (304) and follow-up ranges are not new downloads.
+    Offloaded responses are always 200 and the proxy answers the range, so
+    for those the request's Range header decides.
+    """
+    if response.status_code == 206:
+        return response.get("Content-Range", "").startswith("bytes 0-")
+    if response.status_code != 200:
+        return False
+    if response.has_header("X-Accel-Redirect") or response.has_header("X-Sendfile"):
+        match = RANGE_RE.match(request.META.get("HTTP_RANGE") or "")
+        return match is None or match.group(1) == "0"
+    return True
+
+
+def file_response(
+    request,
+    field_file,
+    filename=None,
+    content_type=None,
+    as_attachment=True,
+    ranges=True,
+):
+    """
+    Serve a stored file with ETag/Last-Modified validation and byte ranges.
+
+    When FILE_DELIVERY_BACKEND is set the proxy sends the bytes (and handles
+    ranges itself); otherwise single ranges are streamed from disk and full
+    downloads go through ``FileResponse`` so the WSGI server can use
+    sendfile. Storages without local paths fall back to a plain stream.
+
+    With ``ranges=False`` every transfer is the whole file and is served
+    from Python, so each non-304 response is exactly one download.
+    """
+    filename = filename or os.path.basename(field_file.name)
+    content_type = (
+        content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    )
+
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        response = FileResponse(field_file.open("rb"), content_type=content_type)
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment, filename
+        )
+        return response
+
+    stat = os.stat(path)
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = quote_etag(f"{last_modified:x}-{size:x}")
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None and BACKEND and ranges:
+        response = _accel_response(path, content_type)
+
+    if response is None:
+        byte_range = None
+        if ranges and _if_range_matches(request, etag, last_modified):
+            try:
+                byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+
+        if response is None and byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(path, start, end - start + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = str(end - start + 1)
+        elif response is None:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+
+    response["Accept-Ranges"] = "bytes" if ranges else "none"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if response.status_code in (200, 206):
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment, filename
+        )
+    return response
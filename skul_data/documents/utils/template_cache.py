@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models.fields.files import FieldFile, FileField
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, quote_etag
+from skul_data.documents.utils.file_delivery import file_response
+from skul_data.notifications.utils.presence import (
+    cache_is_shared,
+    warn_if_local_cache,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rendered templates hold parent contacts, so they are kept outside
+# MEDIA_ROOT and only reachable through the template views
+TEMPLATE_CACHE_ROOT = getattr(
+    settings,
+    "TEMPLATE_CACHE_ROOT",
+    os.path.join(settings.BASE_DIR, "private", "template_cache"),
+)
+template_storage = FileSystemStorage(location=TEMPLATE_CACHE_ROOT)
+# Bump when the layout of a template changes in code
+TEMPLATE_LAYOUT_VERSION = 1
+
+# Data scopes a template can depend on; each has a version token per id
+CLASS_ROSTER = "class"  # students (and their parents) of one class
+SCHOOL_STUDENTS = "students"  # every student of a school
+SCHOOL_SUBJECTS = "subjects"  # the subject list of a school
+
+
+def _version_key(scope, scope_id):
+    return f"template_cache:version:{scope}:{scope_id}"
+
+
+def data_version(scopes):
+    """
+    Combined version token of ``scopes`` (``(scope, id)`` pairs). Tokens
+    are created on first use, so a cache flush only costs a re-render.
+    """
+    keys = [_version_key(scope, scope_id) for scope, scope_id in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            token = uuid.uuid4().hex
+            if not cache.add(key, token, None):
+                token = cache.get(key, token)
+            versions[key] = token
+    return "-".join(versions[key] for key in keys)
+
+
+def bump_versions(scopes):
+    """Invalidate templates built on ``scopes`` once the transaction commits"""
+    keys = {_version_key(scope, scope_id) for scope, scope_id in scopes if scope_id}
+    if keys:
+        transaction.on_commit(
+            lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+        )
+
+
+def _encode(content):
+    return content.encode("utf-8") if isinstance(content, str) else content
+
+
+def _digest(value):
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.md5(encoded, usedforsecurity=False).hexdigest()[:16]
+
+
+def cached_template(
+    template_type,
+    render,
+    extension,
+    school_id=None,
+    class_id=None,
+    params=None,
+    scopes=(),
+):
+    """
+    Storage name of the rendered template, calling ``render()`` (returning
+    str or bytes) only when no file exists for the current data version.
+
+    Files live under ``<school>/<class>/<type>-<params>-<version>.<ext>``;
+    rendering a new version removes the older ones for the same params.
+    """
+    directory = f"{school_id or 'all'}/{class_id or 'all'}"
+    prefix = f"{template_type}-{_digest(params or {})}-"
+    version = _digest([TEMPLATE_LAYOUT_VERSION, data_version(scopes)])
+    name = f"{directory}/{prefix}{version}.{extension}"
+    if template_storage.exists(name):
+        return name
+
+    saved = template_storage.save(name, ContentFile(_encode(render())))
+    if saved != name:
+        # Rendered concurrently by another request; theirs is identical
+        template_storage.delete(saved)
+    logger.debug(f"Rendered {template_type} template {name}")
+
+    _prune(directory, prefix, keep=os.path.basename(name))
+    return name
+
+
+def _prune(directory, prefix, keep):
+    try:
+        _, files = template_storage.listdir(directory)
+        for filename in files:
+            if filename.startswith(prefix) and filename != keep:
+                template_storage.delete(f"{directory}/{filename}")
+    except Exception as e:
+        logger.warning(f"Failed to prune template cache {directory}: {str(e)}")
+
+
+def template_response(request, name, filename, content_type):
+    """Serve a cached template with ETag/Last-Modified validation"""
+    stored = FieldFile(None, FileField(storage=template_storage), name)
+    return file_response(request, stored, filename=filename, content_type=content_type)
+
+
+def rendered_response(request, content, filename, content_type):
+    """Serve freshly rendered template content with ETag validation"""
+    content = _encode(content)
+    etag = quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest())
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+    response["ETag"] = etag
+    return response
+
+
+def template_download(
+    request, filename, content_type, template_type, render, extension, **options
+):
+    """
+    Serve an upload template through ``cached_template``.
+
+    Version tokens must be seen by every worker, otherwise each one renders
+    its own versions and prunes the files the others are serving; on a
+    per-process cache the template is rendered for every request instead.
+    A file pruned by a newer version before it is opened is rendered again.
+    """
+    if not cache_is_shared():
+        warn_if_local_cache("Upload template cache")
+        return rendered_response(request, render(), filename, content_type)
+
+    name = cached_template(template_type, render, extension, **options)
+    try:
+        return template_response(request, name, filename, content_type)
+    except FileNotFoundError:
+        logger.info(f"Template {name} was pruned before serving; rendering it again")
+        return rendered_response(request, render(), filename, content_type)
@@ -27,6 +27,7 @@ from skul_data.documents.serializers.document import (
 )
 from skul_data.action_logs.signals.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.documents.utils.file_delivery import file_response, is_new_download
 
 
 class DocumentCategoryViewSet(viewsets.ModelViewSet):
@@ -422,20 +423,26 @@ class DocumentShareLinkViewSet(viewsets.ModelViewSet):
                 {"detail": "Invalid password"}, status=status.HTTP_403_FORBIDDEN
             )
 
-        # Increment download count with proper tracking
-        share_link._current_user = share_link.created_by
-        share_link.download_count += 1
-        share_link._download_increment = True
-        share_link.save()
-
         document = share_link.document
         if not document.file:
             raise Http404("Document file not found")
 
-        response = FileResponse(document.file.open("rb"))
-        response["Content-Disposition"] = (
-            f'attachment; filename="{os.path.basename(document.file.name)}"'
-        )
+        if share_link.download_limit is None:
+            response = file_response(request, document.file)
+            counts = is_new_download(request, response)
+        else:
+            # Whole files only, so a limited link can't be read in ranges
+            # without counting, and a viewer's ranges don't use it up
+            response = file_response(request, document.file, ranges=False)
+            counts = response.status_code != 304
+
+        if counts:
+            # Increment download count with proper tracking
+            share_link._current_user = share_link.created_by
+            share_link.download_count += 1
+            share_link._download_increment = True
+            share_link.save()
+
         return response
 
     def get_client_ip(self, request):
@@ -0,0 +1,168 @@
+import csv
+from django.conf import settings
+from openpyxl import Workbook
+
+# Rows fetched per database round trip, and CSV rows per streamed chunk
+EXPORT_CHUNK_SIZE = getattr(settings, "FEE_EXPORT_CHUNK_SIZE", 1000)
+# Exports larger than this run as a background job
+EXPORT_BACKGROUND_ROWS = getattr(settings, "FEE_EXPORT_BACKGROUND_ROWS", 5000)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+EXPORT_HEADERS = [
+    "Student Name",
+    "Admission Number",
+    "Class",
+    "Parent Name",
+    "Parent Email",
+    "Parent Phone",
+    "Term",
+    "Year",
+    "Amount Owed",
+    "Amount Paid",
+    "Balance",
+    "Payment Status",
+    "Due Date",
+    "Overdue",
+    "Last Payment Date",
+]
+
+
+def filter_fee_records(queryset, params):
+    """Apply the fee record list filters in ``params`` (query params or dict)"""
+    # Filter by student if provided
+    student_id = params.get("student_id")
+    if student_id:
+        queryset = queryset.filter(student_id=student_id)
+
+    # Filter by parent if provided
+    parent_id = params.get("parent_id")
+    if parent_id:
+        queryset = queryset.filter(parent_id=parent_id)
+
+    # Filter by class if provided
+    class_id = params.get("class_id")
+    if class_id:
+        queryset = queryset.filter(fee_structure__school_class_id=class_id)
+
+    # Filter by term if provided
+    term = params.get("term")
+    if term:
+        queryset = queryset.filter(fee_structure__term=term)
+
+    # Filter by year if provided
+    year = params.get("year")
+    if year:
+        queryset = queryset.filter(fee_structure__year=year)
+
+    # Filter by payment status if provided
+    status = params.get("status")
+    if status:
+        queryset = queryset.filter(payment_status=status)
+
+    # Filter by overdue if provided
+    overdue = params.get("overdue")
+    if overdue and overdue.lower() == "true":
+        queryset = queryset.filter(is_overdue=True)
+
+    return queryset
+
+
+def export_rows(queryset, progress=None):
+    """
+    One list per fee record, read with a server-side cursor so memory stays
+    flat however many records are exported.
+    """
+    records = (
+        queryset.select_related(
+            "student", "parent__user", "fee_structure__school_class"
+        )
+        .only(
+            "amount_owed",
+            "amount_paid",
+            "balance",
+            "payment_status",
+            "due_date",
+            "is_overdue",
+            "last_payment_date",
+            "student__first_name",
+            "student__last_name",
+            "student__admission_number",
+            "parent__phone_number",
+            "parent__user__first_name",
+            "parent__user__last_name",
+            "parent__user__email",
+            "fee_structure__term",
+            "fee_structure__year",
+            "fee_structure__school_class__name",
+        )
+        .order_by("fee_structure__school_class__name", "student__last_name", "id")
+    )
+    for record in records.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        school_class = record.fee_structure.school_class
+        yield [
+            record.student.full_name,
+            record.student.admission_number,
+            school_class.name if school_class else "",
+            record.parent.user.get_full_name(),
+            record.parent.user.email,
+            record.parent.phone_number,
+            record.fee_structure.term,
+            record.fee_structure.year,
+            record.amount_owed,
+            record.amount_paid,
+            record.balance,
+            record.payment_status,
+            record.due_date,
+            "Yes" if record.is_overdue else "No",
+            record.last_payment_date,
+        ]
+        if progress:
+            progress.advance()
+
+
+class _Echo:
+    """File-like object whose write returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """CSV text of ``rows`` in chunks of EXPORT_CHUNK_SIZE lines"""
+    writer = csv.writer(_Echo())
+    chunk = [writer.writerow(EXPORT_HEADERS)]
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def write_xlsx(rows, output):
+    """Write ``rows`` to the binary file ``output`` as a write-only workbook"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Fee Records")
+    ws.append(EXPORT_HEADERS)
+    for row in rows:
+        ws.append(row)
+    wb.save(output)
+
+
+def write_export(queryset, file_format, output, progress=None):
+    """Write the export of ``queryset`` to the binary file ``output``"""
+    rows = export_rows(queryset, progress=progress)
+    if file_format == "xlsx":
+        write_xlsx(rows, output)
+    else:
+        for chunk in iter_csv(rows):
+            output.write(chunk.encode("utf-8"))
+
+
+def export_filename(school, file_format):
+    return f"fee_records_{school.code}.{file_format}"
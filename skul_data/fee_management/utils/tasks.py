@@ -1,9 +1,11 @@
 import csv
 import io
 import decimal
+import tempfile
 from decimal import Decimal
 from datetime import datetime
 from celery import shared_task
+from django.core.files import File
 from django.db import transaction
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
@@ -16,6 +18,12 @@ from skul_data.fee_management.models.fee_management import (
     FeeReminder,
     FeeInvoiceTemplate,
 )
+from skul_data.fee_management.utils.fee_export import (
+    export_filename,
+    filter_fee_records,
+    write_export,
+)
+from skul_data.schools.models.school import School
 from skul_data.students.models.student import Student
 from skul_data.users.models.parent import Parent
 from skul_data.notifications.utils.notification import (
@@ -23,14 +31,17 @@ from skul_data.notifications.utils.notification import (
 )
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.jobs.utils.progress import ProgressReporter
 
 
 @shared_task(bind=True)
-def process_fee_upload(self, upload_log_id):
+def process_fee_upload(self, upload_log_id, job_id=None):
     """Process fee upload CSV file"""
     upload_log = FeeUploadLog.objects.get(id=upload_log_id)
     upload_log.status = "processing"
     upload_log.save()
+    progress = ProgressReporter.for_job(job_id)
+    progress.start(message="Processing fee upload")
 
     successful = 0
     failed = 0
@@ -47,10 +58,11 @@ def process_fee_upload(self, upload_log_id):
                     content = content.decode("utf-8")
                 csv_file = io.StringIO(content)
 
-            reader = csv.DictReader(csv_file)
+            rows = list(csv.DictReader(csv_file))
+            progress.set_total(len(rows))
 
             with transaction.atomic():
-                for row_num, row in enumerate(reader, start=1):
+                for row_num, row in enumerate(rows, start=1):
                     try:
                         # Validate required fields
                         required_fields = [
@@ -154,10 +166,12 @@ def process_fee_upload(self, upload_log_id):
                             fee_record.save()
 
                         successful += 1
+                        progress.advance()
 
                     except Exception as e:
                         failed += 1
                         errors.append(f"Row {row_num}: {str(e)}")
+                        progress.advance(failed=1)
 
         # Update upload log with results
         upload_log.total_records = row_num
@@ -181,6 +195,7 @@ def process_fee_upload(self, upload_log_id):
             upload_log,
             {"error": str(e)},
         )
+        progress.fail(e)
         raise
 
     # Log success
@@ -192,12 +207,16 @@ def process_fee_upload(self, upload_log_id):
         {"successful": successful, "failed": failed},
     )
 
-    return {
+    result = {
         "upload_log_id": upload_log.id,
         "successful": successful,
         "failed": failed,
         "errors": errors,
     }
+    progress.succeed(
+        result=result, message=f"{successful} records imported, {failed} failed"
+    )
+    return result
 
 
 @shared_task(bind=True)
@@ -528,3 +547,42 @@ def generate_fee_invoices(fee_record_ids, user_id):
     )
 
     return {"successful": successful, "failed": failed, "errors": errors}
+
+
+@shared_task
+def export_fee_records(school_id, params, file_format, user_id, job_id=None):
+    """Write a fee record export to the job's artifact for download"""
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+
+    progress = ProgressReporter.for_job(job_id)
+    progress.start(message="Exporting fee records")
+    try:
+        school = School.objects.get(id=school_id)
+        queryset = filter_fee_records(
+            FeeRecord.objects.filter(fee_structure__school=school), params
+        )
+        total = queryset.count()
+        progress.set_total(total)
+
+        with tempfile.TemporaryFile() as output:
+            write_export(queryset, file_format, output, progress=progress)
+            output.seek(0)
+            progress.succeed(
+                result={"rows": total, "file_format": file_format},
+                artifact=File(output, name=export_filename(school, file_format)),
+                message=f"Exported {total} fee records",
+            )
+    except Exception as e:
+        progress.fail(e)
+        raise
+
+    log_action(
+        User.objects.filter(id=user_id).first(),
+        f"Exported {total} fee records",
+        ActionCategory.DOWNLOAD,
+        None,
+        {"rows": total, "file_format": file_format, "filters": params},
+    )
+    return {"rows": total, "file_format": file_format}
@@ -1,8 +1,13 @@
 import csv
+import hashlib
 import io
+import json
+import tempfile
 from datetime import datetime
 from decimal import Decimal
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.db import transaction
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
@@ -38,6 +43,21 @@ from skul_data.students.models.student import Student
 from skul_data.users.models.parent import Parent
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.documents.utils.template_cache import (
+    CLASS_ROSTER,
+    template_download,
+)
+from skul_data.fee_management.utils.fee_export import (
+    EXPORT_BACKGROUND_ROWS,
+    EXPORT_FORMATS,
+    export_filename,
+    export_rows,
+    filter_fee_records,
+    iter_csv,
+    write_xlsx,
+)
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.jobs.utils.progress import enqueue_job
 from skul_data.users.permissions.permission import IsParent
 from skul_data.schools.serializers.schoolclass import SchoolClassSerializer
 
@@ -120,42 +140,7 @@ class FeeRecordViewSet(viewsets.ModelViewSet):
         if school:
             queryset = queryset.filter(fee_structure__school=school)
 
-        # Filter by student if provided
-        student_id = self.request.query_params.get("student_id")
-        if student_id:
-            queryset = queryset.filter(student_id=student_id)
-
-        # Filter by parent if provided
-        parent_id = self.request.query_params.get("parent_id")
-        if parent_id:
-            queryset = queryset.filter(parent_id=parent_id)
-
-        # Filter by class if provided
-        class_id = self.request.query_params.get("class_id")
-        if class_id:
-            queryset = queryset.filter(fee_structure__school_class_id=class_id)
-
-        # Filter by term if provided
-        term = self.request.query_params.get("term")
-        if term:
-            queryset = queryset.filter(fee_structure__term=term)
-
-        # Filter by year if provided
-        year = self.request.query_params.get("year")
-        if year:
-            queryset = queryset.filter(fee_structure__year=year)
-
-        # Filter by payment status if provided
-        status = self.request.query_params.get("status")
-        if status:
-            queryset = queryset.filter(payment_status=status)
-
-        # Filter by overdue if provided
-        overdue = self.request.query_params.get("overdue")
-        if overdue and overdue.lower() == "true":
-            queryset = queryset.filter(is_overdue=True)
-
-        return queryset
+        return filter_fee_records(queryset, self.request.query_params)
 
     @action(detail=True, methods=["post"], serializer_class=FeePaymentSerializer)
     def add_payment(self, request, pk=None):
@@ -184,6 +169,87 @@ class FeeRecordViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["get"])
+    def download(self, request):
+        """
+        Export the filtered fee records as CSV (streamed) or XLSX. Exports
+        over EXPORT_BACKGROUND_ROWS rows, or with background=true, run as a
+        job whose file is downloaded from the job once it finishes.
+        """
+        school = request.user.school
+        if not school:
+            return Response(
+                {"detail": "No school associated with this user."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"file_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.get_queryset()
+        total = queryset.count()
+        background = request.query_params.get("background", "").lower() == "true"
+
+        if background or total > EXPORT_BACKGROUND_ROWS:
+            from skul_data.fee_management.utils.tasks import export_fee_records
+
+            params = {
+                key: request.query_params.get(key)
+                for key in request.query_params
+                if key not in ("file_format", "background")
+            }
+            job = enqueue_job(
+                export_fee_records,
+                BackgroundJob.EXPORT,
+                owner=request.user,
+                school=school,
+                description=f"Fee records export ({file_format})",
+                school_id=school.id,
+                params=params,
+                file_format=file_format,
+                user_id=request.user.id,
+            )
+            return Response(
+                {
+                    "detail": "The export is being prepared in the background.",
+                    "job_id": job.id,
+                    "task_id": job.task_id,
+                    "rows": total,
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        filename = export_filename(school, file_format)
+        if file_format == "xlsx":
+            # Write-only workbooks are built in a temporary file, not in memory
+            output = tempfile.TemporaryFile()
+            write_xlsx(export_rows(queryset), output)
+            output.seek(0)
+            response = FileResponse(
+                output,
+                as_attachment=True,
+                filename=filename,
+                content_type=EXPORT_FORMATS["xlsx"],
+            )
+        else:
+            response = StreamingHttpResponse(
+                iter_csv(export_rows(queryset)), content_type=EXPORT_FORMATS["csv"]
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+        log_action(
+            request.user,
+            f"Exported {total} fee records",
+            ActionCategory.DOWNLOAD,
+            None,
+            {"rows": total, "file_format": file_format},
+        )
+        return response
+
     @action(detail=False, methods=["get"])
     def summary(self, request):
         school = request.user.school
@@ -226,6 +292,20 @@ class FeeRecordViewSet(viewsets.ModelViewSet):
             overdue_count=Count("id", filter=Q(is_overdue=True)),
         )
 
+        # Serialize each class once, from one query
+        summaries = list(summaries)
+        classes = (
+            SchoolClass.objects.filter(
+                id__in={summary["fee_structure__school_class"] for summary in summaries}
+            )
+            .select_related("class_teacher__user", "stream")
+            .prefetch_related("students", "subjects")
+        )
+        class_data = {
+            school_class.id: SchoolClassSerializer(school_class).data
+            for school_class in classes
+        }
+
         # Calculate percentages and prepare response
         result = []
         for summary in summaries:
@@ -236,15 +316,13 @@ class FeeRecordViewSet(viewsets.ModelViewSet):
                 (total_paid / total_expected * 100) if total_expected > 0 else 0
             )
 
-            school_class = SchoolClass.objects.get(
-                id=summary["fee_structure__school_class"]
-            )
-
             result.append(
                 {
                     "term": summary["fee_structure__term"],
                     "year": summary["fee_structure__year"],
-                    "school_class": SchoolClassSerializer(school_class).data,
+                    "school_class": class_data.get(
+                        summary["fee_structure__school_class"], {}
+                    ),
                     "total_students": summary["total_students"],
                     "total_expected": total_expected,
                     "total_paid": total_paid,
@@ -378,6 +456,12 @@ class FeeUploadLogViewSet(
 
         return queryset
 
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        # Progress is polled from /api/jobs/<job_id>/
+        response.data["job_id"] = self.job.id
+        return response
+
     def perform_create(self, serializer):
         school = self.request.user.school
         if not school:
@@ -387,7 +471,14 @@ class FeeUploadLogViewSet(
         # Trigger async processing of the CSV file
         from skul_data.fee_management.utils.tasks import process_fee_upload
 
-        process_fee_upload.delay(serializer.instance.id)
+        self.job = enqueue_job(
+            process_fee_upload,
+            BackgroundJob.FEE_UPLOAD,
+            owner=self.request.user,
+            school=school,
+            description=f"Fee upload {serializer.instance}",
+            upload_log_id=serializer.instance.id,
+        )
 
         log_action(
             self.request.user,
@@ -557,50 +648,90 @@ class FeeReminderViewSet(
         )
 
 
+FEE_UPLOAD_HEADERS = [
+    "Parent Name",
+    "Parent Email",
+    "Parent Phone",
+    "Student Name",
+    "Student Admission Number",
+    "Amount Due",
+    "Term",
+    "Year",
+    "Due Date (YYYY-MM-DD)",
+    "Notes",
+]
+
+# Static, so its ETag is computed once
+FEE_UPLOAD_SAMPLE = {
+    "headers": FEE_UPLOAD_HEADERS,
+    "sample_rows": [
+        {
+            "Parent Name": "John Doe",
+            "Parent Email": "john@example.com",
+            "Parent Phone": "+254712345678",
+            "Student Name": "Jane Doe",
+            "Student Admission Number": "SCH-2023-0042",
+            "Amount Due": "15000.00",
+            "Term": "term_1",
+            "Year": "2023",
+            "Due Date (YYYY-MM-DD)": "2023-03-15",
+            "Notes": "Includes activity fee",
+        },
+        {
+            "Parent Name": "Mary Smith",
+            "Parent Email": "mary@example.com",
+            "Parent Phone": "+254712345679",
+            "Student Name": "Peter Smith",
+            "Student Admission Number": "SCH-2023-0043",
+            "Amount Due": "16000.00",
+            "Term": "term_1",
+            "Year": "2023",
+            "Due Date (YYYY-MM-DD)": "2023-03-15",
+            "Notes": "",
+        },
+    ],
+    "notes": [
+        "Do not modify the header row",
+        "Leave empty fields as empty strings",
+        "Term values must be one of: term_1, term_2, term_3",
+        "Year should be in YYYY format",
+        "Due date should be in YYYY-MM-DD format",
+    ],
+}
+FEE_UPLOAD_SAMPLE_ETAG = quote_etag(
+    hashlib.md5(
+        json.dumps(FEE_UPLOAD_SAMPLE, sort_keys=True).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+)
+
+
 class FeeCSVTemplateViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated, HasRolePermission]
     required_permission = "manage_fees"
 
-    @action(detail=False, methods=["post"])
+    @action(detail=False, methods=["get", "post"])
     def download(self, request):
-        serializer = FeeCSVTemplateSerializer(data=request.data)
+        serializer = FeeCSVTemplateSerializer(
+            data=request.data if request.method == "POST" else request.query_params
+        )
         serializer.is_valid(raise_exception=True)
 
         school_class = serializer.validated_data["school_class_id"]
         term = serializer.validated_data["term"]
         year = serializer.validated_data["year"]
 
-        # Get all students in the class
-        students = Student.objects.filter(student_class=school_class)
-
-        # Create CSV response
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = (
-            f'attachment; filename="fee_template_{school_class.name}_{term}_{year}.csv"'
-        )
-
-        writer = csv.writer(response)
-
-        # Write header
-        writer.writerow(
-            [
-                "Parent Name",
-                "Parent Email",
-                "Parent Phone",
-                "Student Name",
-                "Student Admission Number",
-                "Amount Due",
-                "Term",
-                "Year",
-                "Due Date (YYYY-MM-DD)",
-                "Notes",
-            ]
-        )
-
-        # Write sample rows for each student
-        for student in students:
-            parent = student.parent
-            if parent:
+        def render():
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(FEE_UPLOAD_HEADERS)
+
+            # Write sample rows for each student
+            students = Student.objects.filter(
+                student_class=school_class, parent__isnull=False
+            ).select_related("parent__user")
+            for student in students:
+                parent = student.parent
                 writer.writerow(
                     [
                         parent.user.get_full_name(),
@@ -615,6 +746,21 @@ class FeeCSVTemplateViewSet(viewsets.ViewSet):
                         "",  # Notes
                     ]
                 )
+            return output.getvalue()
+
+        # Rendered once per roster version and served from the template cache
+        response = template_download(
+            request,
+            f"fee_template_{school_class.name}_{term}_{year}.csv",
+            "text/csv",
+            "fee",
+            render,
+            "csv",
+            school_id=school_class.school_id,
+            class_id=school_class.id,
+            params={"term": term, "year": year},
+            scopes=[(CLASS_ROSTER, school_class.id)],
+        )
 
         log_action(
             request.user,
@@ -629,55 +775,11 @@ class FeeCSVTemplateViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["get"])
     def sample(self, request):
         # Return a sample CSV structure as JSON for frontend reference
-        sample_data = {
-            "headers": [
-                "Parent Name",
-                "Parent Email",
-                "Parent Phone",
-                "Student Name",
-                "Student Admission Number",
-                "Amount Due",
-                "Term",
-                "Year",
-                "Due Date (YYYY-MM-DD)",
-                "Notes",
-            ],
-            "sample_rows": [
-                {
-                    "Parent Name": "John Doe",
-                    "Parent Email": "john@example.com",
-                    "Parent Phone": "+254712345678",
-                    "Student Name": "Jane Doe",
-                    "Student Admission Number": "SCH-2023-0042",
-                    "Amount Due": "15000.00",
-                    "Term": "term_1",
-                    "Year": "2023",
-                    "Due Date (YYYY-MM-DD)": "2023-03-15",
-                    "Notes": "Includes activity fee",
-                },
-                {
-                    "Parent Name": "Mary Smith",
-                    "Parent Email": "mary@example.com",
-                    "Parent Phone": "+254712345679",
-                    "Student Name": "Peter Smith",
-                    "Student Admission Number": "SCH-2023-0043",
-                    "Amount Due": "16000.00",
-                    "Term": "term_1",
-                    "Year": "2023",
-                    "Due Date (YYYY-MM-DD)": "2023-03-15",
-                    "Notes": "",
-                },
-            ],
-            "notes": [
-                "Do not modify the header row",
-                "Leave empty fields as empty strings",
-                "Term values must be one of: term_1, term_2, term_3",
-                "Year should be in YYYY format",
-                "Due date should be in YYYY-MM-DD format",
-            ],
-        }
-
-        return Response(sample_data)
+        response = get_conditional_response(request, etag=FEE_UPLOAD_SAMPLE_ETAG)
+        if response is None:
+            response = Response(FEE_UPLOAD_SAMPLE)
+        response["ETag"] = FEE_UPLOAD_SAMPLE_ETAG
+        return response
 
 
 class ParentFeeViewSet(viewsets.ViewSet):
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from skul_data.jobs.models.job import BackgroundJob
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "job_type", "status", "owner", "school", "created_at")
+    list_filter = ("job_type", "status", "school")
+    search_fields = ("task_id", "description")
+    readonly_fields = ("created_at", "started_at", "finished_at", "updated_at")
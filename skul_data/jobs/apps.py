@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "skul_data.jobs"
+    label = "jobs"
+
+    def ready(self):
+        from skul_data.jobs.utils import tasks  # noqa
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.27 on 2026-10-19 01:58
+
+from django.db import migrations, models
+import skul_data.jobs.models.job
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backgroundjob",
+            name="artifact_name",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="backgroundjob",
+            name="artifact",
+            field=models.FileField(
+                blank=True,
+                null=True,
+                storage=skul_data.jobs.models.job.artifact_storage,
+                upload_to=skul_data.jobs.models.job.artifact_path,
+            ),
+        ),
+    ]
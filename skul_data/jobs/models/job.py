@@ -0,0 +1,109 @@
+import os
+import uuid
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils import timezone
+from skul_data.schools.models.school import School
+
+# Outside MEDIA_ROOT, so artifacts are only reachable through the jobs API
+ARTIFACT_ROOT = getattr(
+    settings,
+    "JOB_ARTIFACT_ROOT",
+    os.path.join(settings.BASE_DIR, "private", "job_artifacts"),
+)
+
+
+def artifact_storage():
+    return FileSystemStorage(location=ARTIFACT_ROOT)
+
+
+def artifact_path(instance, filename):
+    """A random name per artifact; the download name is kept in ``artifact_name``"""
+    extension = os.path.splitext(filename)[1]
+    return f"{timezone.now():%Y/%m}/{uuid.uuid4().hex}{extension}"
+
+
+class BackgroundJob(models.Model):
+    """
+    Progress and outcome of a long-running task, written by the worker
+    through ``ProgressReporter`` and read by the status endpoint, so polling
+    never touches the Celery result backend.
+    """
+
+    REPORT_GENERATION = "REPORT_GENERATION"
+    FEE_UPLOAD = "FEE_UPLOAD"
+    EXPORT = "EXPORT"
+    TIMETABLE_GENERATION = "TIMETABLE_GENERATION"
+    JOB_TYPES = [
+        (REPORT_GENERATION, "Report Generation"),
+        (FEE_UPLOAD, "Fee Upload"),
+        (EXPORT, "Export"),
+        (TIMETABLE_GENERATION, "Timetable Generation"),
+    ]
+
+    # Named after the Celery states the old status endpoint returned
+    PENDING = "PENDING"
+    STARTED = "STARTED"
+    SUCCESS = "SUCCESS"
+    FAILURE = "FAILURE"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (STARTED, "Started"),
+        (SUCCESS, "Success"),
+        (FAILURE, "Failure"),
+    ]
+
+    job_type = models.CharField(max_length=30, choices=JOB_TYPES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="background_jobs",
+    )
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="background_jobs",
+    )
+    task_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    description = models.CharField(max_length=255, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    eta = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    artifact = models.FileField(
+        storage=artifact_storage, upload_to=artifact_path, null=True, blank=True
+    )
+    artifact_name = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "-created_at"]),
+            models.Index(fields=["school", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} #{self.id} ({self.status})"
+
+    @property
+    def percent(self):
+        if self.status == self.SUCCESS:
+            return 100
+        if not self.total:
+            return 0
+        return min(100, round(self.processed * 100 / self.total))
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCESS, self.FAILURE)
@@ -0,0 +1,42 @@
+from django.urls import reverse
+from rest_framework import serializers
+from skul_data.jobs.models.job import BackgroundJob
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    job_type_display = serializers.CharField(
+        source="get_job_type_display", read_only=True
+    )
+    percent = serializers.IntegerField(read_only=True)
+    artifact_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            "id",
+            "job_type",
+            "job_type_display",
+            "status",
+            "task_id",
+            "description",
+            "total",
+            "processed",
+            "failed",
+            "percent",
+            "message",
+            "eta",
+            "result",
+            "artifact_url",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_artifact_url(self, obj):
+        if not obj.artifact:
+            return None
+        request = self.context.get("request")
+        # Served through the API so only users who can see the job get it
+        url = reverse("background-job-download", args=[obj.id])
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,3 @@
+from .urls import urlpatterns as urls
+
+urlpatterns = urls
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from skul_data.jobs.views.job import BackgroundJobViewSet
+
+router = SimpleRouter()
+router.register(r"", BackgroundJobViewSet, basename="background-job")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
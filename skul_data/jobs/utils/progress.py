@@ -0,0 +1,142 @@
+import os
+import uuid
+from time import monotonic
+from django.conf import settings
+from django.utils import timezone
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.jobs.serializers.job import BackgroundJobSerializer
+from skul_data.users.models.base_user import User
+from skul_data.notifications.utils.presence import notification_group, send_to_group
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress writes for one job
+PROGRESS_INTERVAL = getattr(settings, "JOB_PROGRESS_INTERVAL", 2)
+
+PROGRESS_FIELDS = ["processed", "failed", "message", "eta", "updated_at"]
+
+
+def visible_jobs(user):
+    """Jobs the user started; school administrators see their whole school's"""
+    if user.user_type == User.SCHOOL_ADMIN:
+        return BackgroundJob.objects.filter(school=user.school)
+    return BackgroundJob.objects.filter(owner=user)
+
+
+def enqueue_job(task, job_type, owner, school=None, description="", **kwargs):
+    """
+    Create a BackgroundJob and queue ``task`` with ``job_id`` added to its
+    kwargs. The Celery task id is chosen up front so the job row is
+    written once and already carries it.
+    """
+    job = BackgroundJob.objects.create(
+        job_type=job_type,
+        owner=owner,
+        school=school,
+        description=description[:255],
+        task_id=str(uuid.uuid4()),
+    )
+    task.apply_async(kwargs={**kwargs, "job_id": job.id}, task_id=job.task_id)
+    return job
+
+
+class ProgressReporter:
+    """
+    Records a job's progress from inside the worker.
+
+    Counters are kept on the instance and written, then pushed to the
+    owner's notification socket, at most once every PROGRESS_INTERVAL
+    seconds, plus on start and finish, so a loop over thousands of rows
+    costs a handful of UPDATEs. Built without a job (``job_id`` None) every
+    call is a no-op, which keeps the tasks callable directly.
+    """
+
+    def __init__(self, job, interval=PROGRESS_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self.last_write = 0.0
+
+    @classmethod
+    def for_job(cls, job_id, **kwargs):
+        job = BackgroundJob.objects.filter(id=job_id).first() if job_id else None
+        return cls(job, **kwargs)
+
+    def start(self, total=0, message=""):
+        if not self.job:
+            return
+        self.job.status = BackgroundJob.STARTED
+        self.job.total = total
+        self.job.message = message
+        self.job.started_at = timezone.now()
+        self._write(["status", "total", "started_at", *PROGRESS_FIELDS])
+
+    def set_total(self, total):
+        if not self.job:
+            return
+        self.job.total = total
+        self._write(["total", *PROGRESS_FIELDS])
+
+    def advance(self, count=1, failed=0, message=None):
+        if not self.job:
+            return
+        self.job.processed += count
+        self.job.failed += failed
+        if message is not None:
+            self.job.message = message[:255]
+        if monotonic() - self.last_write >= self.interval:
+            self._write(PROGRESS_FIELDS)
+
+    def succeed(self, result=None, artifact=None, message=""):
+        if not self.job:
+            return
+        fields = ["status", "result", "finished_at", *PROGRESS_FIELDS]
+        self.job.status = BackgroundJob.SUCCESS
+        self.job.result = result
+        self.job.message = message[:255]
+        self.job.finished_at = timezone.now()
+        if artifact is not None:
+            self.job.artifact_name = os.path.basename(artifact.name)
+            self.job.artifact = artifact
+            fields += ["artifact", "artifact_name"]
+        self._write(fields)
+
+    def fail(self, error):
+        if not self.job:
+            return
+        self.job.status = BackgroundJob.FAILURE
+        self.job.message = str(error)[:255]
+        self.job.finished_at = timezone.now()
+        self._write(["status", "finished_at", *PROGRESS_FIELDS])
+
+    def _estimate_eta(self):
+        job = self.job
+        if not (job.started_at and job.processed and job.total > job.processed):
+            return None
+        per_item = (timezone.now() - job.started_at) / job.processed
+        return timezone.now() + per_item * (job.total - job.processed)
+
+    def _write(self, fields):
+        if self.job.status == BackgroundJob.STARTED:
+            self.job.eta = self._estimate_eta()
+        else:
+            self.job.eta = None
+        self.last_write = monotonic()
+        try:
+            self.job.save(update_fields=fields)
+        except Exception as e:
+            # Progress is advisory; never fail the job over it
+            logger.error(f"Failed to record progress for job {self.job.id}: {str(e)}")
+            return
+        self._push()
+
+    def _push(self):
+        if not self.job.owner_id:
+            return
+        send_to_group(
+            notification_group(self.job.owner_id),
+            {
+                "type": "job.progress",
+                "job": dict(BackgroundJobSerializer(self.job).data),
+            },
+        )
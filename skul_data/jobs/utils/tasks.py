@@ -0,0 +1,39 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from skul_data.jobs.models.job import BackgroundJob
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Days a finished job's file stays downloadable
+ARTIFACT_RETENTION_DAYS = getattr(settings, "JOB_ARTIFACT_RETENTION_DAYS", 7)
+
+
+@shared_task(name="skul_data.jobs.utils.tasks.cleanup_job_artifacts")
+def cleanup_job_artifacts():
+    """Delete the files of jobs that finished before the retention period"""
+    cutoff = timezone.now() - timedelta(days=ARTIFACT_RETENTION_DAYS)
+    jobs = (
+        BackgroundJob.objects.filter(finished_at__lt=cutoff)
+        .exclude(artifact="")
+        .exclude(artifact__isnull=True)
+    )
+
+    deleted = 0
+    for job in jobs.iterator():
+        try:
+            job.artifact.delete(save=False)
+        except Exception as e:
+            logger.error(f"Error deleting artifact of job {job.id}: {str(e)}")
+            continue
+        job.save(update_fields=["artifact", "updated_at"])
+        deleted += 1
+
+    logger.info(f"Deleted {deleted} expired job artifacts")
+    return {
+        "status": "success",
+        "deleted_count": deleted,
+        "timestamp": timezone.now().isoformat(),
+    }
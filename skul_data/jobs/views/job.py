@@ -0,0 +1,44 @@
+import os
+from django.http import Http404
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from skul_data.documents.utils.file_delivery import file_response
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.jobs.serializers.job import BackgroundJobSerializer
+from skul_data.jobs.utils.progress import visible_jobs
+
+
+class BackgroundJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status of background jobs. Users see the jobs they started; school
+    administrators see every job in their school.
+    """
+
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return BackgroundJob.objects.none()
+
+        queryset = visible_jobs(self.request.user)
+        job_type = self.request.query_params.get("job_type")
+        if job_type:
+            queryset = queryset.filter(job_type=job_type)
+        status = self.request.query_params.get("status")
+        if status:
+            queryset = queryset.filter(status=status)
+        return queryset
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """The file a finished job produced, e.g. a large export"""
+        job = self.get_object()
+        if not job.artifact:
+            raise Http404("This job has no file to download.")
+        return file_response(
+            request,
+            job.artifact,
+            filename=job.artifact_name or os.path.basename(job.artifact.name),
+        )
@@ -26,6 +26,10 @@ from skul_data.users.permissions.permission import (
 )
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.documents.utils.template_cache import (
+    SCHOOL_STUDENTS,
+    template_download,
+)
 import pandas as pd
 from io import BytesIO
 from reportlab.pdfgen import canvas
@@ -114,17 +118,26 @@ class KCSEResultViewSet(viewsets.ModelViewSet):
 
         return Response(result, status=status.HTTP_201_CREATED)
 
-    @action(detail=False, methods=["post"], url_path="download-template")
+    @action(detail=False, methods=["get", "post"], url_path="download-template")
     def download_template(self, request):
         serializer = KCSEStudentTemplateSerializer(
-            data=request.data, context={"request": request}
+            data=request.data if request.method == "POST" else request.query_params,
+            context={"request": request},
         )
         serializer.is_valid(raise_exception=True)
 
-        result = serializer.save()
-        response = HttpResponse(result["csv_data"], content_type="text/csv")
-        response["Content-Disposition"] = (
-            f'attachment; filename="kcse_template_{serializer.validated_data["year"]}.csv"'
+        # Re-rendered only when the school's students change
+        school = request.user.school
+        response = template_download(
+            request,
+            f"kcse_template_{serializer.validated_data['year']}.csv",
+            "text/csv",
+            "kcse",
+            lambda: serializer.save()["csv_data"],
+            "csv",
+            school_id=school.id,
+            params={"class_name": serializer.validated_data["class_name"].strip()},
+            scopes=[(SCHOOL_STUDENTS, school.id)],
         )
 
         log_action(
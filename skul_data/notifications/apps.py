@@ -5,3 +5,8 @@ class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "skul_data.notifications"
     label = "notifications"
+
+    def ready(self):
+        from skul_data.notifications.signals import notification
+        from skul_data.notifications.utils import tasks  # noqa
+        from skul_data.notifications import checks  # noqa
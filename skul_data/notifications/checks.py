@@ -0,0 +1,25 @@
+from django.core.checks import Warning, register
+from skul_data.notifications.utils.presence import cache_is_shared
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """
+    Presence, refreshed analytics, calendar feeds, upload templates, role
+    permissions and job progress all share state between processes through
+    the default cache.
+    """
+    if cache_is_shared():
+        return []
+    return [
+        Warning(
+            "The default cache is per-process (LocMemCache).",
+            hint=(
+                "Set CACHE_URL to a Redis instance. Without it Celery workers "
+                "see every user as offline, cached analytics refreshed by "
+                "workers are never seen by the web processes, and role "
+                "permissions are read from the database on every request."
+            ),
+            id="notifications.W001",
+        )
+    ]
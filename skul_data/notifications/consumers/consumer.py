@@ -1,8 +1,21 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from skul_data.notifications.models.notification import Notification, Message
+from skul_data.notifications.utils.message_buffer import get_message_buffer
+from skul_data.notifications.utils.presence import (
+    mark_connected,
+    mark_disconnected,
+    refresh_presence,
+    is_online,
+    notification_group,
+    message_group,
+)
+
+import logging
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
@@ -11,12 +24,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         try:
             self.user_id = str(self.scope["url_route"]["kwargs"]["user_id"])
-            self.user_group_name = f"notifications_{self.user_id}"
+            self.user_group_name = notification_group(self.user_id)
 
             await self.channel_layer.group_add(self.user_group_name, self.channel_name)
             await self.accept()
+            await sync_to_async(mark_connected)(self.user_group_name)
+            self.presence_registered = True
         except Exception as e:
-            print(f"Connection failed: {str(e)}")
+            logger.error(f"Connection failed: {str(e)}")
             await self.close()
 
     async def disconnect(self, close_code):
@@ -24,10 +39,17 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.channel_layer.group_discard(
                 self.user_group_name, self.channel_name
             )
+        if getattr(self, "presence_registered", False):
+            await sync_to_async(mark_disconnected)(self.user_group_name)
 
     async def receive(self, text_data):
+        await sync_to_async(refresh_presence)(self.user_group_name)
         try:
             text_data_json = json.loads(text_data)
+            if text_data_json.get("type") == "ping":
+                # Heartbeat: keeps the presence counter of an idle socket alive
+                await self.send(text_data=json.dumps({"type": "pong"}))
+                return
             message = text_data_json["message"]
 
             await self.channel_layer.group_send(
@@ -35,22 +57,32 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 {"type": "notification.message", "message": message},
             )
         except Exception as e:
-            print(f"Error processing message: {str(e)}")
+            logger.error(f"Error processing message: {str(e)}")
 
     async def notification_message(self, event):
         await self.send(text_data=json.dumps({"message": event["message"]}))
 
+    async def notification_batch(self, event):
+        """Several notifications for this user coalesced into one frame"""
+        await self.send(text_data=json.dumps({"messages": event["messages"]}))
+
+    async def job_progress(self, event):
+        """Progress of one of this user's background jobs"""
+        await self.send(text_data=json.dumps({"job": event["job"]}))
+
 
 class MessageConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         try:
             self.user_id = str(self.scope["url_route"]["kwargs"]["user_id"])
-            self.user_group_name = f"messages_{self.user_id}"
+            self.user_group_name = message_group(self.user_id)
 
             await self.channel_layer.group_add(self.user_group_name, self.channel_name)
             await self.accept()
+            await sync_to_async(mark_connected)(self.user_group_name)
+            self.presence_registered = True
         except Exception as e:
-            print(f"Connection failed: {str(e)}")
+            logger.error(f"Connection failed: {str(e)}")
             await self.close()
 
     async def disconnect(self, close_code):
@@ -58,42 +90,83 @@ class MessageConsumer(AsyncWebsocketConsumer):
             await self.channel_layer.group_discard(
                 self.user_group_name, self.channel_name
             )
+        if getattr(self, "presence_registered", False):
+            await sync_to_async(mark_disconnected)(self.user_group_name)
 
     async def receive(self, text_data):
+        await sync_to_async(refresh_presence)(self.user_group_name)
         try:
             data = json.loads(text_data)
+            if data.get("type") == "ping":
+                await self.send(text_data=json.dumps({"type": "pong"}))
+                return
             message = data["message"]
             sender_id = data["sender_id"]
             recipient_id = data["recipient_id"]
 
-            # Save message to database
-            await self.save_message(sender_id, recipient_id, message)
-
-            # Send to recipient
-            await self.channel_layer.group_send(
-                f"messages_{recipient_id}",
-                {"type": "chat.message", "message": message, "sender_id": sender_id},
-            )
+            users = await self.get_users(sender_id, recipient_id)
+            sender = users.get(str(sender_id))
+            if not sender or str(recipient_id) not in users:
+                logger.warning(
+                    f"Unknown sender or recipient: {sender_id} -> {recipient_id}"
+                )
+                return
+
+            # Push to the recipient first so a slow database never delays delivery
+            recipient_group = message_group(recipient_id)
+            if await sync_to_async(is_online)(recipient_group):
+                await self.channel_layer.group_send(
+                    recipient_group,
+                    {
+                        "type": "chat.message",
+                        "message": message,
+                        "sender_id": sender_id,
+                    },
+                )
+
+            # Persist through the write-behind buffer. The sender only sees
+            # "delivered" once the message has been committed.
+            try:
+                message_id = await get_message_buffer().submit(
+                    {
+                        "sender_id": sender_id,
+                        "recipient_id": recipient_id,
+                        "body": message,
+                        "message_type": (
+                            "TEACHER"
+                            if sender["user_type"] == User.TEACHER
+                            else "PARENT"
+                        ),
+                        "notification_title": f"New message from {sender['full_name']}",
+                    }
+                )
+                delivery_status = "delivered"
+            except Exception as e:
+                logger.error(f"Error saving message: {str(e)}")
+                message_id = None
+                delivery_status = "failed"
 
             # Send confirmation to sender
             await self.channel_layer.group_send(
-                f"messages_{sender_id}",
+                message_group(sender_id),
                 {
                     "type": "chat.message",
                     "message": message,
+                    "message_id": message_id,
                     "sender_id": sender_id,
                     "recipient_id": recipient_id,
-                    "status": "delivered",
+                    "status": delivery_status,
                 },
             )
         except Exception as e:
-            print(f"Error processing message: {str(e)}")
+            logger.error(f"Error processing message: {str(e)}")
 
     async def chat_message(self, event):
         await self.send(
             text_data=json.dumps(
                 {
                     "message": event["message"],
+                    "message_id": event.get("message_id"),
                     "sender_id": event.get("sender_id"),
                     "recipient_id": event.get("recipient_id"),
                     "status": event.get("status", "received"),
@@ -101,23 +174,27 @@ class MessageConsumer(AsyncWebsocketConsumer):
             )
         )
 
-    @database_sync_to_async
-    def save_message(self, sender_id, recipient_id, content):
-        sender = User.objects.get(id=sender_id)
-        recipient = User.objects.get(id=recipient_id)
-
-        message = Message.objects.create(
-            sender=sender,
-            recipient=recipient,
-            body=content,
-            message_type="TEACHER" if sender.user_type == User.TEACHER else "PARENT",
-        )
+    async def get_users(self, *user_ids):
+        """
+        Sender/recipient metadata, loaded once and kept for the life of the
+        connection.
+        """
+        if not hasattr(self, "user_cache"):
+            self.user_cache = {}
 
-        Notification.objects.create(
-            user=recipient,
-            notification_type="MESSAGE",
-            title=f"New message from {sender.get_full_name()}",
-            message=content[:100],
-            related_model="Message",
-            related_id=message.id,
-        )
+        missing = {str(user_id) for user_id in user_ids} - set(self.user_cache)
+        if missing:
+            self.user_cache.update(await self.load_users(missing))
+        return self.user_cache
+
+    @database_sync_to_async
+    def load_users(self, user_ids):
+        return {
+            str(user.id): {
+                "full_name": user.get_full_name(),
+                "user_type": user.user_type,
+            }
+            for user in User.objects.filter(id__in=user_ids).only(
+                "id", "first_name", "last_name", "user_type"
+            )
+        }
@@ -25,6 +25,12 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of a user's inbox on (created_at, id)
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="notif_user_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_notification_type_display()} for {self.user}"
@@ -57,6 +63,16 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of inbox and sent folders on (created_at, id)
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="msg_recipient_created_idx",
+            ),
+            models.Index(
+                fields=["sender", "-created_at", "-id"], name="msg_sender_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.subject} - {self.sender} to {self.recipient}"
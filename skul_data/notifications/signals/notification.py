@@ -0,0 +1,53 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from skul_data.notifications.models.notification import Notification, Message
+from skul_data.users.models.parent import ParentNotification
+from skul_data.notifications.utils.unread_counters import (
+    NOTIFICATIONS,
+    MESSAGES,
+    PARENT_NOTIFICATIONS,
+    adjust_unread_count,
+    invalidate_unread_count,
+    invalidate_school_unread_breakdown,
+)
+
+
+def _track_unread(kind, owner_id, instance, created):
+    if created:
+        if not instance.is_read:
+            adjust_unread_count(kind, owner_id, 1)
+    else:
+        # Updates may flip is_read either way, so recount on the next read
+        invalidate_unread_count(kind, owner_id)
+
+
+@receiver(post_save, sender=Notification)
+def update_notification_unread_count(sender, instance, created, **kwargs):
+    _track_unread(NOTIFICATIONS, instance.user_id, instance, created)
+
+
+@receiver(post_save, sender=Message)
+def update_message_unread_count(sender, instance, created, **kwargs):
+    _track_unread(MESSAGES, instance.recipient_id, instance, created)
+
+
+@receiver(post_save, sender=ParentNotification)
+def update_parent_notification_unread_count(sender, instance, created, **kwargs):
+    _track_unread(PARENT_NOTIFICATIONS, instance.parent_id, instance, created)
+    invalidate_school_unread_breakdown(instance.parent.school_id)
+
+
+@receiver(post_delete, sender=Notification)
+def clear_notification_unread_count(sender, instance, **kwargs):
+    invalidate_unread_count(NOTIFICATIONS, instance.user_id)
+
+
+@receiver(post_delete, sender=Message)
+def clear_message_unread_count(sender, instance, **kwargs):
+    invalidate_unread_count(MESSAGES, instance.recipient_id)
+
+
+@receiver(post_delete, sender=ParentNotification)
+def clear_parent_notification_unread_count(sender, instance, **kwargs):
+    invalidate_unread_count(PARENT_NOTIFICATIONS, instance.parent_id)
+    invalidate_school_unread_breakdown(instance.parent.school_id)
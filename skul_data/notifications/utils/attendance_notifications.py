@@ -1,9 +1,8 @@
 from django.conf import settings
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
-from skul_data.notifications.models.notification import Notification
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from skul_data.notifications.utils.notification import bulk_create_notifications
+from skul_data.notifications.utils.presence import send_to_group, notification_group
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,7 +21,7 @@ def send_attendance_notification(student, attendance, is_present=True):
     parents = []
     if student.parent:
         parents.append(student.parent)
-    parents.extend(list(student.guardians.all()))
+    parents.extend(student.guardians.select_related("user"))
 
     if not parents:
         logger.warning(f"No parent found for student {student.full_name}")
@@ -66,35 +65,36 @@ def send_attendance_notification(student, attendance, is_present=True):
         message += f"\nIf this is incorrect, please contact {attendance.taken_by.get_full_name() if attendance.taken_by else 'the school'}."
         notification_type = "EVENT"
 
-    # Send to all parents/guardians
-    for parent in parents:
-        try:
-            # 1. Create database notification
-            notification = Notification.objects.create(
-                user=parent.user,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                related_model="ClassAttendance",
-                related_id=attendance.id,
-            )
-
-            # 2. Send WebSocket notification (real-time)
-            send_websocket_notification(
-                parent.user.id,
+    # 1 & 2. Database notifications in one insert; WebSocket pushes go only
+    # to parents with an open socket
+    try:
+        bulk_create_notifications(
+            [
                 {
-                    "id": notification.id,
-                    "type": notification_type,
+                    "user_id": parent.user_id,
                     "title": title,
                     "message": message,
-                    "student_name": student.full_name,
-                    "class_name": attendance.school_class.name,
-                    "date": attendance.date.isoformat(),
-                    "is_present": is_present,
-                    "created_at": notification.created_at.isoformat(),
-                },
-            )
+                    "payload": {
+                        "student_name": student.full_name,
+                        "class_name": attendance.school_class.name,
+                        "date": attendance.date.isoformat(),
+                        "is_present": is_present,
+                    },
+                }
+                for parent in parents
+            ],
+            notification_type=notification_type,
+            related_model="ClassAttendance",
+            related_id=attendance.id,
+        )
+    except Exception as e:
+        # The in-app rows failed; the emails below are still worth sending
+        logger.error(
+            f"Failed to create attendance notifications for {student.full_name}: {str(e)}"
+        )
 
+    for parent in parents:
+        try:
             # 3. Send Email notification
             send_attendance_email(
                 parent,
@@ -122,16 +122,15 @@ def send_attendance_notification(student, attendance, is_present=True):
 
 
 def send_websocket_notification(user_id, notification_data):
-    """Send real-time WebSocket notification"""
+    """Send real-time WebSocket notification (skipped when the user is offline)"""
     try:
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            async_to_sync(channel_layer.group_send)(
-                f"notifications_{user_id}",
-                {"type": "notification.message", "message": notification_data},
-            )
+        return send_to_group(
+            notification_group(user_id),
+            {"type": "notification.message", "message": notification_data},
+        )
     except Exception as e:
         logger.error(f"WebSocket notification failed for user {user_id}: {str(e)}")
+        return False
 
 
 def send_attendance_email(parent, student, attendance, is_present, absence_reason=None):
@@ -0,0 +1,137 @@
+import asyncio
+import weakref
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from channels.db import database_sync_to_async
+from skul_data.notifications.models.notification import Notification, Message
+from skul_data.notifications.utils.unread_counters import (
+    NOTIFICATIONS,
+    MESSAGES,
+    adjust_unread_count,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_MS = getattr(settings, "MESSAGE_WRITE_BUFFER_INTERVAL_MS", 50)
+MAX_BATCH_SIZE = getattr(settings, "MESSAGE_WRITE_BUFFER_MAX_BATCH", 200)
+
+
+def persist_messages(pending):
+    """
+    Write a batch of chat messages and their MESSAGE notifications.
+    Each item is a dict with sender_id, recipient_id, body, message_type and
+    notification_title. Returns the new Message ids in the order given.
+    """
+    with transaction.atomic():
+        messages = Message.objects.bulk_create(
+            [
+                Message(
+                    sender_id=item["sender_id"],
+                    recipient_id=item["recipient_id"],
+                    body=item["body"],
+                    message_type=item["message_type"],
+                )
+                for item in pending
+            ]
+        )
+        Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=item["recipient_id"],
+                    notification_type="MESSAGE",
+                    title=item["notification_title"],
+                    message=item["body"][:100],
+                    related_model="Message",
+                    related_id=message.id,
+                )
+                for item, message in zip(pending, messages)
+            ]
+        )
+
+    # bulk_create skips post_save, so bump the cached unread badges here
+    for recipient_id, count in Counter(
+        item["recipient_id"] for item in pending
+    ).items():
+        adjust_unread_count(MESSAGES, recipient_id, count)
+        adjust_unread_count(NOTIFICATIONS, recipient_id, count)
+
+    return [message.id for message in messages]
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind buffer for chat messages.
+
+    Consumers push a message to the recipient first and then await
+    ``submit``; inserts queued within ``interval_ms`` of each other are
+    written in one transaction. ``submit`` only resolves once the row is
+    committed, so callers can report "delivered" safely.
+    """
+
+    def __init__(self, interval_ms=FLUSH_INTERVAL_MS, max_batch=MAX_BATCH_SIZE):
+        self.interval = interval_ms / 1000
+        self.max_batch = max_batch
+        self.pending = []
+        self._timer = None
+        # The loop only keeps weak references to tasks; hold flushes here
+        # so one cannot be garbage-collected mid-write
+        self._tasks = set()
+
+    async def submit(self, pending_message):
+        """Queue a message and wait until it is durably written. Returns its id."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((pending_message, future))
+
+        if len(self.pending) >= self.max_batch:
+            self._cancel_timer()
+            self._start_flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.interval, self._start_flush, loop)
+
+        return await future
+
+    def _start_flush(self, loop):
+        task = loop.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def flush(self):
+        self._cancel_timer()
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        try:
+            ids = await database_sync_to_async(persist_messages)(
+                [item for item, _ in batch]
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist {len(batch)} buffered messages: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), message_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(message_id)
+
+
+_buffers = weakref.WeakKeyDictionary()
+
+
+def get_message_buffer():
+    """Return the write buffer bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    buffer = _buffers.get(loop)
+    if buffer is None:
+        buffer = _buffers[loop] = MessageWriteBuffer()
+    return buffer
@@ -1,12 +1,26 @@
 # skul_data/notifications/utils/notifications.py
+from collections import Counter
 from django.conf import settings
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 import logging
+from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.action_logs.utils.action_log import log_action
+from skul_data.notifications.models.notification import Notification
 from skul_data.notifications.utils import sms_service
+from skul_data.notifications.utils.presence import NotificationBatcher
+from skul_data.notifications.utils.unread_counters import (
+    NOTIFICATIONS,
+    PARENT_NOTIFICATIONS,
+    adjust_unread_count,
+    invalidate_school_unread_breakdown,
+)
+from skul_data.users.models.parent import ParentNotification
 
 logger = logging.getLogger(__name__)
 
+BULK_NOTIFICATION_BATCH_SIZE = getattr(settings, "BULK_NOTIFICATION_BATCH_SIZE", 500)
+
 
 def send_parent_email_fees(parent, subject, message, context=None, attachment=None):
     """
@@ -75,3 +89,236 @@ def send_parent_sms(parent, message, context=None):
 
     result = sms_service.send_sms(parent.phone_number, message)
     return result.get("success", False)
+
+
+def _render(template, context):
+    """Render a ``str.format`` template, skipping the work for static text"""
+    if not context or "{" not in template:
+        return template
+    try:
+        return template.format_map(context)
+    except (KeyError, IndexError, AttributeError) as e:
+        logger.error(f"Missing context key for notification template: {e}")
+        return template
+
+
+def _notification_payload(notification, extra=None):
+    payload = {
+        "id": notification.id,
+        "type": notification.notification_type,
+        "title": notification.title,
+        "message": notification.message,
+        "created_at": notification.created_at.isoformat(),
+    }
+    payload.update(extra or {})
+    return payload
+
+
+def _parent_notification_payload(notification, extra=None):
+    payload = {
+        "id": notification.id,
+        "type": notification.notification_type,
+        "message": notification.message,
+        "student_id": notification.related_student_id,
+        "created_at": notification.created_at.isoformat(),
+    }
+    payload.update(extra or {})
+    return payload
+
+
+def bulk_create_notifications(
+    entries,
+    notification_type="SYSTEM",
+    related_model=None,
+    related_id=None,
+    push=True,
+    batch_size=BULK_NOTIFICATION_BATCH_SIZE,
+):
+    """
+    Create many Notification rows with one INSERT per batch.
+
+    Each entry is a dict with ``user_id``, ``title`` and ``message``. It may
+    also set ``notification_type``, ``related_model`` and ``related_id`` to
+    override the defaults, and ``payload`` with extra WebSocket fields.
+    Online users receive one WebSocket frame per batch.
+
+    Returns ``{"created": int, "pushed": int, "ids": [...]}``.
+    """
+    result = {"created": 0, "pushed": 0, "ids": []}
+    entries = list(entries)
+
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start : start + batch_size]
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=entry["user_id"],
+                    notification_type=entry.get("notification_type", notification_type),
+                    title=entry["title"],
+                    message=entry["message"],
+                    related_model=entry.get("related_model", related_model),
+                    related_id=entry.get("related_id", related_id),
+                )
+                for entry in batch
+            ]
+        )
+
+        # bulk_create skips post_save, so bump the cached unread badges here
+        for user_id, count in Counter(entry["user_id"] for entry in batch).items():
+            adjust_unread_count(NOTIFICATIONS, user_id, count)
+
+        if push:
+            batcher = NotificationBatcher()
+            for entry, notification in zip(batch, notifications):
+                batcher.add(
+                    entry["user_id"],
+                    _notification_payload(notification, entry.get("payload")),
+                )
+            try:
+                result["pushed"] += batcher.flush()
+            except Exception as e:
+                logger.warning(f"WebSocket notification failed: {str(e)}")
+
+        result["created"] += len(notifications)
+        result["ids"].extend(notification.id for notification in notifications)
+
+    return result
+
+
+def bulk_notify_users(
+    recipients,
+    title,
+    message,
+    context=None,
+    recipient_context=None,
+    **kwargs,
+):
+    """
+    Send the same templated notification to every user in ``recipients``.
+
+    ``title`` and ``message`` are ``str.format`` templates rendered with
+    ``context`` plus ``user`` and, if given, ``recipient_context(user)``.
+    Templates without placeholders are used as-is. Remaining keyword
+    arguments are passed to bulk_create_notifications.
+    """
+    entries = []
+    for user in recipients:
+        user_context = dict(context or {}, user=user)
+        if recipient_context:
+            user_context.update(recipient_context(user))
+        entries.append(
+            {
+                "user_id": user.id,
+                "title": _render(title, user_context),
+                "message": _render(message, user_context),
+            }
+        )
+
+    return bulk_create_notifications(entries, **kwargs)
+
+def bulk_create_parent_notifications(
+    entries,
+    notification_type="SYSTEM",
+    sent_by=None,
+    push=True,
+    batch_size=BULK_NOTIFICATION_BATCH_SIZE,
+):
+    """
+    Create many ParentNotification rows with one INSERT per batch.
+
+    Each entry is a dict with a ``parent`` (with ``user_id`` and
+    ``school_id`` loaded) and a ``message``; ``notification_type``,
+    ``related_student_id`` and ``payload`` are optional. One action log
+    entry is written for the whole send instead of one per row.
+
+    Returns ``{"created": int, "pushed": int, "ids": [...]}``.
+    """
+    result = {"created": 0, "pushed": 0, "ids": []}
+    entries = list(entries)
+    school_ids = set()
+    type_counts = Counter()
+
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start : start + batch_size]
+        notifications = ParentNotification.objects.bulk_create(
+            [
+                ParentNotification(
+                    parent=entry["parent"],
+                    message=entry["message"],
+                    notification_type=entry.get("notification_type", notification_type),
+                    sent_by=sent_by,
+                    related_student_id=entry.get("related_student_id"),
+                )
+                for entry in batch
+            ]
+        )
+
+        for parent_id, count in Counter(entry["parent"].id for entry in batch).items():
+            adjust_unread_count(PARENT_NOTIFICATIONS, parent_id, count)
+        school_ids.update(entry["parent"].school_id for entry in batch)
+        type_counts.update(n.notification_type for n in notifications)
+
+        if push:
+            batcher = NotificationBatcher()
+            for entry, notification in zip(batch, notifications):
+                batcher.add(
+                    entry["parent"].user_id,
+                    _parent_notification_payload(notification, entry.get("payload")),
+                )
+            try:
+                result["pushed"] += batcher.flush()
+            except Exception as e:
+                logger.warning(f"WebSocket notification failed: {str(e)}")
+
+        result["created"] += len(notifications)
+        result["ids"].extend(notification.id for notification in notifications)
+
+    for school_id in school_ids:
+        invalidate_school_unread_breakdown(school_id)
+
+    if result["created"]:
+        log_action(
+            user=sent_by,
+            action=f"Sent {result['created']} notifications to parents",
+            category=ActionCategory.OTHER,
+            metadata={
+                "notification_types": dict(type_counts),
+                "parent_count": len({entry["parent"].id for entry in entries}),
+            },
+        )
+
+    return result
+
+
+def bulk_notify_parents(
+    parents,
+    message,
+    context=None,
+    recipient_context=None,
+    related_student=None,
+    **kwargs,
+):
+    """
+    Send the same templated ParentNotification to every parent in ``parents``.
+
+    ``message`` is a ``str.format`` template rendered with ``context`` plus
+    ``parent`` and, if given, ``recipient_context(parent)``. Remaining
+    keyword arguments are passed to bulk_create_parent_notifications.
+    """
+    if hasattr(parents, "select_related"):
+        parents = parents.select_related("user")
+
+    entries = []
+    for parent in parents:
+        parent_context = dict(context or {}, parent=parent)
+        if recipient_context:
+            parent_context.update(recipient_context(parent))
+        entries.append(
+            {
+                "parent": parent,
+                "message": _render(message, parent_context),
+                "related_student_id": related_student.id if related_student else None,
+            }
+        )
+
+    return bulk_create_parent_notifications(entries, **kwargs)
@@ -0,0 +1,115 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(instance):
+    raw = f"{instance.created_at.isoformat()}|{instance.pk}"
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Turn a cursor string back into ``(created_at, id)``"""
+    try:
+        created_at, pk = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise NotFound("Invalid cursor")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over ``(created_at, id)``.
+
+    ``?cursor=<c>`` walks back through history, newest first, without OFFSET
+    or COUNT queries. ``?since=<c>`` returns rows newer than ``c``, oldest
+    first, so clients can fetch deltas until ``has_more`` is false.
+    """
+
+    page_size = 25
+    cursor_query_param = "cursor"
+    since_query_param = "since"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.since = request.query_params.get(self.since_query_param)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if self.since:
+            created_at, pk = decode_cursor(self.since)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by("created_at", "id")
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
+            if cursor:
+                created_at, pk = decode_cursor(cursor)
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                )
+
+        # Fetch one extra row to know whether there is another page
+        rows = list(queryset[: self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_more:
+            return None
+        param = self.since_query_param if self.since else self.cursor_query_param
+        return replace_query_param(self.base_url, param, encode_cursor(self.page[-1]))
+
+    def get_latest_cursor(self):
+        """Cursor a client should send as ``since`` to receive newer rows"""
+        if not self.page:
+            return self.since
+        newest = self.page[-1] if self.since else self.page[0]
+        return encode_cursor(newest)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "has_more": self.has_more,
+                "latest_cursor": self.get_latest_cursor(),
+                "results": data,
+            }
+        )
+
+
+class InboxPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; switches to KeysetPagination when the
+    client sends ``cursor``, ``since`` or ``pagination=cursor``.
+    """
+
+    keyset_class = KeysetPagination
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def wants_keyset(self, request):
+        params = request.query_params
+        return (
+            params.get("pagination") == "cursor"
+            or self.keyset_class.cursor_query_param in params
+            or self.keyset_class.since_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.wants_keyset(request):
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.get_page_size(request)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Counters expire on their own so a worker that dies without running
+# ``disconnect`` cannot leave a user marked online forever.
+PRESENCE_TIMEOUT = getattr(settings, "NOTIFICATION_PRESENCE_TIMEOUT", 60 * 60 * 12)
+
+# Cache backends whose contents are private to one process
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+_local_cache_warned = set()
+
+
+def cache_is_shared():
+    """Whether the default cache is visible to every web and Celery process"""
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_CACHE_BACKENDS
+
+
+def warn_if_local_cache(feature):
+    """
+    Log once per process that ``feature`` relies on a shared cache but runs
+    on a per-process one, where state written by Celery workers or other
+    web workers is invisible to this process.
+    """
+    if cache_is_shared() or feature in _local_cache_warned:
+        return
+    _local_cache_warned.add(feature)
+    logger.warning(
+        f"{feature} needs a shared cache but CACHES uses a per-process backend; "
+        f"set CACHE_URL to a Redis instance"
+    )
+
+
+def _presence_key(group_name):
+    return f"presence:{group_name}"
+
+
+def notification_group(user_id):
+    return f"notifications_{user_id}"
+
+
+def message_group(user_id):
+    return f"messages_{user_id}"
+
+
+def mark_connected(group_name):
+    """
+    Register one live socket for a per-user group.
+    Returns the number of sockets currently open for that group.
+    """
+    key = _presence_key(group_name)
+    cache.add(key, 0, PRESENCE_TIMEOUT)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Key expired between add() and incr()
+        cache.set(key, 1, PRESENCE_TIMEOUT)
+        count = 1
+    cache.touch(key, PRESENCE_TIMEOUT)
+    return count
+
+
+def refresh_presence(group_name):
+    """
+    Extend a live socket's presence counter, called on heartbeat/receive so
+    long-lived connections never outlast PRESENCE_TIMEOUT.
+    """
+    key = _presence_key(group_name)
+    if not cache.touch(key, PRESENCE_TIMEOUT):
+        # Expired while the socket was open; it is at least this one
+        cache.add(key, 1, PRESENCE_TIMEOUT)
+
+
+def mark_disconnected(group_name):
+    """
+    Remove one live socket for a per-user group.
+    Returns the number of sockets still open for that group.
+    """
+    key = _presence_key(group_name)
+    try:
+        count = cache.decr(key)
+    except ValueError:
+        return 0
+
+    if count <= 0:
+        cache.delete(key)
+        return 0
+    return count
+
+
+def connection_count(group_name):
+    return cache.get(_presence_key(group_name), 0)
+
+
+def is_online(group_name):
+    return connection_count(group_name) > 0
+
+
+def online_groups(group_names):
+    """Return the subset of ``group_names`` that have at least one live socket"""
+    group_names = list(group_names)
+    if not group_names:
+        return set()
+
+    counts = cache.get_many([_presence_key(name) for name in group_names])
+    return {name for name in group_names if counts.get(_presence_key(name), 0) > 0}
+
+
+def send_to_group(group_name, event, channel_layer=None):
+    """
+    group_send wrapper that skips groups with nobody listening.
+    Returns True if the event was handed to the channel layer.
+    """
+    warn_if_local_cache("WebSocket presence")
+    if not is_online(group_name):
+        return False
+    return _group_send(group_name, event, channel_layer)
+
+
+def _group_send(group_name, event, channel_layer=None):
+    channel_layer = channel_layer or get_channel_layer()
+    if not channel_layer:
+        return False
+
+    try:
+        async_to_sync(channel_layer.group_send)(group_name, event)
+        return True
+    except Exception as e:
+        logger.error(f"WebSocket send to {group_name} failed: {str(e)}")
+        return False
+
+
+class NotificationBatcher:
+    """
+    Collects WebSocket notification payloads per user and flushes them as one
+    frame per online user.
+
+    Usage:
+        with NotificationBatcher() as batcher:
+            for parent in parents:
+                batcher.add(parent.user_id, payload)
+    """
+
+    def __init__(self, channel_layer=None):
+        self.channel_layer = channel_layer
+        self.pending = defaultdict(list)
+
+    def add(self, user_id, payload):
+        self.pending[user_id].append(payload)
+
+    def flush(self):
+        """Send pending payloads and return the number of frames sent"""
+        if not self.pending:
+            return 0
+
+        warn_if_local_cache("WebSocket presence")
+        groups = {notification_group(user_id): user_id for user_id in self.pending}
+        online = online_groups(groups.keys())
+
+        sent = 0
+        for group_name in online:
+            payloads = self.pending[groups[group_name]]
+            if len(payloads) == 1:
+                event = {"type": "notification.message", "message": payloads[0]}
+            else:
+                event = {"type": "notification.batch", "messages": payloads}
+
+            if _group_send(group_name, event, self.channel_layer):
+                sent += 1
+
+        skipped = len(groups) - len(online)
+        if skipped:
+            logger.debug(f"Skipped WebSocket push for {skipped} offline users")
+
+        self.pending.clear()
+        return sent
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
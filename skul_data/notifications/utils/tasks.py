@@ -0,0 +1,25 @@
+from celery import shared_task
+from django.utils import timezone
+from skul_data.notifications.utils.unread_counters import reconcile_unread_counts
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="skul_data.notifications.utils.tasks.reconcile_unread_counters")
+def reconcile_unread_counters():
+    """Periodically rebuild the cached unread counters from the database"""
+    try:
+        refreshed = reconcile_unread_counts()
+        return {
+            "status": "success",
+            "refreshed": refreshed,
+            "timestamp": timezone.now().isoformat(),
+        }
+    except Exception as e:
+        logger.error(f"Error reconciling unread counters: {str(e)}")
+        return {
+            "status": "error",
+            "error": str(e),
+            "timestamp": timezone.now().isoformat(),
+        }
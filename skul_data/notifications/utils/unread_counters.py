@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from skul_data.notifications.models.notification import Notification, Message
+from skul_data.users.models.parent import ParentNotification
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Counters are also refreshed by reconcile_unread_counts, so the timeout only
+# bounds how long a missed update can survive.
+COUNTER_TIMEOUT = getattr(settings, "UNREAD_COUNTER_TIMEOUT", 60 * 30)
+
+NOTIFICATIONS = "notifications"
+MESSAGES = "messages"
+PARENT_NOTIFICATIONS = "parent_notifications"
+
+# kind -> (model, owner field). Notifications and messages are counted per
+# user, parent notifications per Parent.
+COUNTERS = {
+    NOTIFICATIONS: (Notification, "user_id"),
+    MESSAGES: (Message, "recipient_id"),
+    PARENT_NOTIFICATIONS: (ParentNotification, "parent_id"),
+}
+
+
+def _counter_key(kind, owner_id):
+    return f"unread:{kind}:{owner_id}"
+
+
+def count_unread(kind, owner_id):
+    """Count unread rows straight from the database"""
+    model, owner_field = COUNTERS[kind]
+    return model.objects.filter(**{owner_field: owner_id, "is_read": False}).count()
+
+
+def get_unread_count(kind, owner_id):
+    """Return the cached unread count, loading it from the database on a miss"""
+    key = _counter_key(kind, owner_id)
+    count = cache.get(key)
+    if count is None:
+        count = count_unread(kind, owner_id)
+        cache.set(key, count, COUNTER_TIMEOUT)
+    return count
+
+
+def adjust_unread_count(kind, owner_id, delta):
+    """
+    Apply ``delta`` to a cached counter. Counters that are not cached are left
+    alone; they will be loaded on the next read.
+    """
+    if not delta:
+        return
+
+    key = _counter_key(kind, owner_id)
+    try:
+        count = cache.incr(key, delta)
+    except ValueError:
+        return
+
+    if count < 0:
+        # We missed an update somewhere; recount on next read
+        cache.delete(key)
+
+
+def invalidate_unread_count(kind, owner_id):
+    cache.delete(_counter_key(kind, owner_id))
+
+
+def _school_breakdown_key(school_id):
+    return f"unread:parent_notifications_by_type:school:{school_id}"
+
+
+def get_school_unread_breakdown(school_id):
+    """Unread parent notifications for a school, grouped by notification type"""
+    key = _school_breakdown_key(school_id)
+    breakdown = cache.get(key)
+    if breakdown is None:
+        breakdown = list(
+            ParentNotification.objects.filter(
+                parent__school_id=school_id, is_read=False
+            )
+            .values("notification_type")
+            .annotate(count=Count("id"))
+            .order_by("-count")
+        )
+        cache.set(key, breakdown, COUNTER_TIMEOUT)
+    return breakdown
+
+
+def invalidate_school_unread_breakdown(school_id):
+    cache.delete(_school_breakdown_key(school_id))
+
+
+def reconcile_unread_counts(kinds=None, active_window_hours=24):
+    """
+    Recompute counters from the database in one grouped query per kind.
+
+    Owners with unread rows get their exact count. Owners who received rows in
+    the last ``active_window_hours`` but have read everything are set to zero,
+    so recently active badges stay warm.
+    """
+    since = timezone.now() - timezone.timedelta(hours=active_window_hours)
+    refreshed = {}
+
+    for kind in kinds or COUNTERS:
+        model, owner_field = COUNTERS[kind]
+        counts = {
+            row[owner_field]: row["count"]
+            for row in model.objects.filter(is_read=False)
+            .values(owner_field)
+            .annotate(count=Count("id"))
+            .order_by()
+        }
+
+        recent_owners = (
+            model.objects.filter(created_at__gte=since)
+            .values_list(owner_field, flat=True)
+            .distinct()
+        )
+        for owner_id in recent_owners:
+            counts.setdefault(owner_id, 0)
+
+        cache.set_many(
+            {_counter_key(kind, owner_id): count for owner_id, count in counts.items()},
+            COUNTER_TIMEOUT,
+        )
+        refreshed[kind] = len(counts)
+
+    logger.info(f"Reconciled unread counters: {refreshed}")
+    return refreshed
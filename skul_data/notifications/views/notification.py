@@ -8,10 +8,16 @@ from skul_data.notifications.serializers.notification import (
     MessageSerializer,
 )
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from skul_data.notifications.utils.presence import send_to_group, message_group
+from skul_data.notifications.utils.unread_counters import (
+    NOTIFICATIONS,
+    MESSAGES,
+    get_unread_count,
+    adjust_unread_count,
+)
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from rest_framework.pagination import PageNumberPagination
+from skul_data.notifications.utils.pagination import InboxPagination
 from django.db.models import Q
 from skul_data.users.models.base_user import User
 from skul_data.notifications.serializers.notification import (
@@ -23,7 +29,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class MessagePagination(PageNumberPagination):
+class MessagePagination(InboxPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 50
@@ -68,7 +74,6 @@ class MessageViewSet(viewsets.ModelViewSet):
                     .select_related("sender", "recipient")
                     .order_by("-created_at")
                 )
-                logger.info(f"Sent messages count: {queryset.count()}")
                 return queryset
 
             # For inbox - messages received by current user
@@ -79,7 +84,6 @@ class MessageViewSet(viewsets.ModelViewSet):
                 .order_by("-created_at")
             )
 
-            logger.info(f"Inbox messages count: {queryset.count()}")
             return queryset
 
         except Exception as e:
@@ -146,8 +150,6 @@ class MessageViewSet(viewsets.ModelViewSet):
             elif status_filter == "read":
                 queryset = queryset.filter(is_read=True)
 
-            logger.info(f"Filtered queryset count: {queryset.count()}")
-
             page = self.paginate_queryset(queryset)
             if page is not None:
                 serializer = self.get_serializer(page, many=True)
@@ -216,10 +218,7 @@ class MessageViewSet(viewsets.ModelViewSet):
     def unread_count(self, request):
         """Get unread message count with error handling"""
         try:
-            count = Message.objects.filter(
-                recipient=request.user, is_read=False
-            ).count()
-            logger.info(f"Unread count for user {request.user.id}: {count}")
+            count = get_unread_count(MESSAGES, request.user.id)
             return Response({"unread_count": count})
 
         except Exception as e:
@@ -299,8 +298,9 @@ class MessageViewSet(viewsets.ModelViewSet):
                 )
 
             updated_count = Message.objects.filter(
-                id__in=message_ids, recipient=request.user
+                id__in=message_ids, recipient=request.user, is_read=False
             ).update(is_read=True)
+            adjust_unread_count(MESSAGES, request.user.id, -updated_count)
 
             logger.info(
                 f"Bulk marked {updated_count} messages as read for user {request.user.id}"
@@ -346,11 +346,11 @@ class MessageViewSet(viewsets.ModelViewSet):
                 related_id=message.id,
             )
 
-            # WebSocket notification
+            # WebSocket notification, only for users with an open socket
             channel_layer = get_channel_layer()
             if channel_layer:
-                async_to_sync(channel_layer.group_send)(
-                    f"messages_{message.recipient.id}",
+                send_to_group(
+                    message_group(message.recipient.id),
                     {
                         "type": "chat_message",
                         "message_id": message.id,
@@ -362,11 +362,12 @@ class MessageViewSet(viewsets.ModelViewSet):
                         "created_at": message.created_at.isoformat(),
                         "status": "new",
                     },
+                    channel_layer=channel_layer,
                 )
 
                 # Notify sender that message was delivered
-                async_to_sync(channel_layer.group_send)(
-                    f"messages_{message.sender.id}",
+                send_to_group(
+                    message_group(message.sender.id),
                     {
                         "type": "chat_message",
                         "message_id": message.id,
@@ -374,6 +375,7 @@ class MessageViewSet(viewsets.ModelViewSet):
                         "recipient_id": str(message.recipient.id),
                         "created_at": message.created_at.isoformat(),
                     },
+                    channel_layer=channel_layer,
                 )
 
             logger.info(f"Notifications sent for message {message.id}")
@@ -389,6 +391,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = InboxPagination
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
@@ -420,9 +423,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
         try:
-            count = Notification.objects.filter(
-                user=request.user, is_read=False
-            ).count()
+            count = get_unread_count(NOTIFICATIONS, request.user.id)
             return Response({"unread_count": count})
         except Exception as e:
             logger.error(f"Error getting unread notification count: {str(e)}")
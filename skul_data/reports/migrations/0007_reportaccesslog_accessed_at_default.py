@@ -0,0 +1,22 @@
+# Generated by Django 4.2.27 on 2026-10-18 23:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "reports",
+            "0006_academicrecord_end_score_academicrecord_entry_score_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="reportaccesslog",
+            name="accessed_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
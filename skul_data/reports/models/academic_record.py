@@ -2,6 +2,10 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
 
+# (minimum score, grade), highest first; anything lower is FAILING_GRADE
+GRADE_BOUNDARIES = [(80, "A"), (70, "B"), (60, "C"), (50, "D"), (30, "E")]
+FAILING_GRADE = "F"
+
 
 class AcademicRecord(models.Model):
     """Tracks a student's academic performance in a subject for a term"""
@@ -110,18 +114,10 @@ class AcademicRecord(models.Model):
 
     def calculate_grade(self):
         """Calculate grade based on score"""
-        if self.score >= 80:
-            return "A"
-        elif self.score >= 70:
-            return "B"
-        elif self.score >= 60:
-            return "C"
-        elif self.score >= 50:
-            return "D"
-        elif self.score >= 30:
-            return "E"
-        else:
-            return "F"
+        for minimum, grade in GRADE_BOUNDARIES:
+            if self.score >= minimum:
+                return grade
+        return FAILING_GRADE
 
     @property
     def performance_assessment(self):
@@ -137,7 +137,8 @@ class ReportAccessLog(models.Model):
 
     report = models.ForeignKey(GeneratedReport, on_delete=models.CASCADE)
     accessed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
-    accessed_at = models.DateTimeField(auto_now_add=True)
+    # Set when the access happens; buffered logs are written later
+    accessed_at = models.DateTimeField(default=timezone.now)
     action = models.CharField(
         max_length=20,
         choices=[
@@ -16,6 +16,7 @@ from skul_data.reports.views.academic_record import (
 )
 from skul_data.reports.views.report import (
     generate_reports_for_class,
+    class_record_completeness,
     check_report_generation_status,
     upload_performance,
     generate_performance_template,
@@ -56,6 +57,11 @@ urlpatterns = router.urls + [
         generate_reports_for_class,
         name="generate-reports-for-class",
     ),
+    path(
+        "class-record-completeness/",
+        class_record_completeness,
+        name="class-record-completeness",
+    ),
     path(
         "check-report-status/<str:task_id>/",
         check_report_generation_status,
@@ -0,0 +1,134 @@
+import threading
+from functools import reduce
+from operator import or_
+from time import monotonic
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+from skul_data.reports.models.report import GeneratedReportAccess, ReportAccessLog
+from skul_data.users.utils.periodic_flush import PeriodicFlusher
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Buffered access logs are written at least this often
+FLUSH_INTERVAL = getattr(settings, "REPORT_ACCESS_LOG_FLUSH_INTERVAL", 10)
+MAX_PENDING = getattr(settings, "REPORT_ACCESS_LOG_MAX_PENDING", 200)
+
+
+class AccessLogBuffer:
+    """
+    Process-wide buffer of report views and downloads, written with one
+    bulk INSERT (plus one UPDATE for first parent access) per flush instead
+    of several writes in every download request. Flushed by the next access
+    past ``flush_interval`` and by a background flusher on the same
+    interval, so entries don't wait for traffic or worker shutdown.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = []
+        self.last_flush = monotonic()
+        self._lock = threading.Lock()
+        self.flusher = PeriodicFlusher(
+            self.flush, flush_interval, name="report-access-log-flush"
+        )
+
+    def add(self, report, user, action, ip_address=None, user_agent=None):
+        entry = ReportAccessLog(
+            report=report,
+            accessed_by=user,
+            action=action,
+            accessed_at=timezone.now(),
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        with self._lock:
+            self.pending.append(entry)
+        self.flusher.ensure_started()
+
+    def maybe_flush(self):
+        if (
+            len(self.pending) >= self.max_pending
+            or monotonic() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            entries, self.pending = self.pending, []
+            self.last_flush = monotonic()
+        if not entries:
+            return 0
+
+        saved = self._insert(entries)
+        if not saved:
+            return 0
+
+        try:
+            self._mark_first_parent_access(saved)
+        except Exception as e:
+            logger.error(f"Failed to record first report access: {str(e)}")
+
+        # bulk_create skips post_save, which keeps the analytics cache fresh
+        from skul_data.analytics.utils.response_cache import invalidate_sections
+
+        for school_id in {entry.report.school_id for entry in saved}:
+            invalidate_sections(school_id, ["reports", "parents"])
+        return len(saved)
+
+    def _insert(self, entries):
+        """
+        Insert ``entries`` in one query, or one by one if that fails so a
+        single bad row (e.g. for a report deleted since) only loses itself.
+        Returns the entries written.
+        """
+        try:
+            with transaction.atomic():
+                ReportAccessLog.objects.bulk_create(entries)
+            return entries
+        except Exception as e:
+            logger.warning(
+                f"Bulk report access log insert failed, retrying row by row: {str(e)}"
+            )
+
+        saved = []
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    ReportAccessLog.objects.bulk_create([entry])
+                saved.append(entry)
+            except Exception as e:
+                logger.error(
+                    f"Dropped access log for report {entry.report_id}: {str(e)}"
+                )
+        return saved
+
+    def _mark_first_parent_access(self, entries):
+        first_access = {}
+        for entry in entries:
+            if entry.accessed_by and entry.accessed_by.user_type == "parent":
+                key = (entry.report_id, entry.accessed_by_id)
+                first_access.setdefault(key, entry.accessed_at)
+
+        if not first_access:
+            return
+        pairs = [
+            Q(report_id=report_id, user_id=user_id)
+            for report_id, user_id in first_access
+        ]
+        GeneratedReportAccess.objects.filter(
+            reduce(or_, pairs), accessed_at__isnull=True
+        ).update(
+            accessed_at=Case(
+                *[
+                    When(pair, then=Value(accessed_at))
+                    for pair, accessed_at in zip(pairs, first_access.values())
+                ]
+            )
+        )
+
+
+access_log_buffer = AccessLogBuffer()
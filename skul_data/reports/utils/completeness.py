@@ -0,0 +1,97 @@
+from skul_data.reports.models.academic_record import AcademicRecord
+from skul_data.students.models.student import Subject
+
+
+class CompletenessMatrix:
+    """
+    Which subjects each student has an academic record for in a term.
+
+    ``present`` maps a student id to the set of required subject ids that
+    have a record; everything else is missing.
+    """
+
+    def __init__(self, students, subjects, present):
+        self.students = students
+        self.subjects = subjects
+        self.present = present
+
+    def subjects_completed(self, student):
+        return len(self.present.get(student.id, ()))
+
+    def missing_subjects(self, student):
+        recorded = self.present.get(student.id, set())
+        return [subject for subject in self.subjects if subject.id not in recorded]
+
+    def is_complete(self, student):
+        return self.subjects_completed(student) == len(self.subjects)
+
+    @property
+    def incomplete_students(self):
+        return [student for student in self.students if not self.is_complete(student)]
+
+    @property
+    def complete_subjects(self):
+        """Subjects every student has a record for"""
+        return [
+            subject
+            for subject in self.subjects
+            if all(
+                subject.id in self.present.get(student.id, ())
+                for student in self.students
+            )
+        ]
+
+    @property
+    def ready_for_reports(self):
+        return bool(self.students) and not self.incomplete_students
+
+    def as_dict(self):
+        """Rows per student for the API, subjects listed once"""
+        return {
+            "subjects": [
+                {"id": subject.id, "name": subject.name} for subject in self.subjects
+            ],
+            "students": [
+                {
+                    "id": student.id,
+                    "name": student.full_name,
+                    "subjects_completed": self.subjects_completed(student),
+                    "subjects_required": len(self.subjects),
+                    "missing_subject_ids": [
+                        subject.id for subject in self.missing_subjects(student)
+                    ],
+                }
+                for student in self.students
+            ],
+            "complete_students": sum(
+                1 for student in self.students if self.is_complete(student)
+            ),
+        }
+
+
+def completeness_matrix(school_class, term, school_year, students=None):
+    """
+    Build the matrix for the active students of ``school_class`` (or the
+    given ``students`` queryset) against the subjects of its school. The
+    presence pairs come from one query however many students there are.
+    """
+    if students is None:
+        students = school_class.students.filter(is_active=True)
+    students = list(students.only("id", "first_name", "last_name"))
+    subjects = list(Subject.objects.filter(school_id=school_class.school_id))
+
+    present = {}
+    pairs = (
+        AcademicRecord.objects.filter(
+            student__in=[student.id for student in students],
+            subject__in=[subject.id for subject in subjects],
+            term=term,
+            school_year=school_year,
+        )
+        .values_list("student_id", "subject_id")
+        .distinct()
+    )
+    for student_id, subject_id in pairs:
+        present.setdefault(student_id, set()).add(subject_id)
+
+    return CompletenessMatrix(students, subjects, present)
@@ -0,0 +1,261 @@
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.action_logs.utils.action_log import log_action
+from skul_data.analytics.utils.alerts import LOW_SCORE, create_low_performance_alerts
+from skul_data.analytics.utils.response_cache import invalidate_model_sections
+from skul_data.reports.models.academic_record import (
+    FAILING_GRADE,
+    GRADE_BOUNDARIES,
+    AcademicRecord,
+)
+from skul_data.students.models.student import Student
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows read, validated and written per batch
+CHUNK_SIZE = getattr(settings, "PERFORMANCE_UPLOAD_CHUNK_SIZE", 500)
+INSTRUCTION_ROW = "(DO NOT EDIT)"
+# column -> maximum score
+SCORE_LIMITS = {"entry_score": 15, "mid_score": 15, "end_score": 70}
+UNIQUE_FIELDS = ["student", "subject", "term", "school_year"]
+UPDATE_FIELDS = [
+    "teacher",
+    "score",
+    "entry_score",
+    "mid_score",
+    "end_score",
+    "grade",
+    "subject_comments",
+    "is_published",
+    "updated_at",
+]
+
+
+def grade_scores(scores):
+    """``AcademicRecord.calculate_grade`` for a whole column of scores"""
+    scores = np.asarray(scores, dtype=float)
+    return np.select(
+        [scores >= minimum for minimum, _ in GRADE_BOUNDARIES],
+        [grade for _, grade in GRADE_BOUNDARIES],
+        default=FAILING_GRADE,
+    )
+
+
+class PerformanceUpload:
+    """
+    Upsert one subject's scores for a term from a performance CSV.
+
+    The file is read in chunks of CHUNK_SIZE rows. Each chunk is validated
+    and graded column-wise, its students are looked up in one query, and
+    it is written with a single ``bulk_create(update_conflicts=True)``.
+    Rows that fail validation are reported in ``errors`` by row number and
+    skipped. bulk_create sends no signals, so ``finish`` performs the
+    analytics cache invalidation, alerts and action log that per-record
+    saves used to trigger.
+    """
+
+    def __init__(self, school, subject, teacher, term, school_year, user=None):
+        self.school = school
+        self.subject = subject
+        self.teacher = teacher
+        self.term = term
+        self.school_year = school_year
+        self.user = user
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.student_ids = set()
+        self.failing_student_ids = set()
+        self.new_failing_student_ids = set()
+
+    def process(self, file, chunk_size=CHUNK_SIZE):
+        try:
+            reader = pd.read_csv(
+                file,
+                dtype=str,
+                keep_default_na=False,
+                chunksize=chunk_size,
+                encoding="utf-8",
+            )
+            for chunk in reader:
+                if "admission_number" not in chunk.columns:
+                    raise ValueError("The file has no admission_number column")
+                self._process_chunk(chunk)
+        except pd.errors.EmptyDataError:
+            raise ValueError("The file is empty")
+
+        self.errors.sort(key=lambda error: error["row"])
+        self.finish()
+        return self
+
+    def _error(self, rows, message, include_name=True):
+        for row_num, row in rows.iterrows():
+            error = {"row": row_num + 1}
+            if include_name:
+                error["student"] = row.get("student_name") or "Unknown"
+            error["error"] = message(row) if callable(message) else message
+            self.errors.append(error)
+
+    def _process_chunk(self, chunk):
+        chunk = chunk.copy()
+        chunk["admission_number"] = chunk["admission_number"].str.strip()
+        chunk = chunk[chunk["admission_number"] != INSTRUCTION_ROW]
+
+        missing = chunk["admission_number"] == ""
+        self._error(chunk[missing], "Missing admission number", include_name=False)
+        chunk = chunk[~missing].copy()
+
+        chunk = self._validate_scores(chunk)
+        chunk = self._map_students(chunk)
+        if chunk.empty:
+            return
+
+        # A student listed twice keeps the last row, as sequential saves did
+        chunk = chunk.drop_duplicates("student_id", keep="last")
+        self._upsert(chunk)
+
+    def _validate_scores(self, chunk):
+        invalid = pd.Series("", index=chunk.index)
+        for column, limit in SCORE_LIMITS.items():
+            raw = (
+                chunk[column]
+                if column in chunk.columns
+                else pd.Series("", index=chunk.index)
+            )
+            values = pd.to_numeric(raw.str.strip().replace("", "0"), errors="coerce")
+            label = column.split("_")[0].capitalize()
+            not_whole = values.isna() | (values % 1 != 0)
+            out_of_range = ~not_whole & ((values < 0) | (values > limit))
+
+            first_problem = invalid == ""
+            invalid[first_problem & not_whole] = f"{label} score must be a whole number"
+            invalid[first_problem & out_of_range] = f"{label} score must be 0-{limit}"
+            chunk[column] = values
+
+        bad = invalid != ""
+        self._error(chunk[bad], lambda row: f"Invalid score: {invalid[row.name]}")
+        chunk = chunk[~bad].copy()
+        for column in SCORE_LIMITS:
+            chunk[column] = chunk[column].astype(int)
+        chunk["score"] = chunk[list(SCORE_LIMITS)].sum(axis=1)
+        chunk["grade"] = grade_scores(chunk["score"])
+        return chunk
+
+    def _map_students(self, chunk):
+        if chunk.empty:
+            return chunk
+        student_ids = dict(
+            Student.objects.filter(
+                school=self.school,
+                admission_number__in=chunk["admission_number"].unique().tolist(),
+            ).values_list("admission_number", "id")
+        )
+        chunk = chunk.assign(student_id=chunk["admission_number"].map(student_ids))
+
+        unknown = chunk["student_id"].isna()
+        self._error(
+            chunk[unknown],
+            lambda row: f"Student with admission number {row['admission_number']} not found",
+            include_name=False,
+        )
+        return chunk[~unknown].astype({"student_id": int})
+
+    def _upsert(self, chunk):
+        student_ids = chunk["student_id"].tolist()
+        existing = set(
+            AcademicRecord.objects.filter(
+                student_id__in=student_ids,
+                subject=self.subject,
+                term=self.term,
+                school_year=self.school_year,
+            ).values_list("student_id", flat=True)
+        )
+
+        comments = (
+            chunk["comments"]
+            if "comments" in chunk.columns
+            else pd.Series("", index=chunk.index)
+        )
+        records = [
+            AcademicRecord(
+                student_id=student_id,
+                subject=self.subject,
+                teacher=self.teacher,
+                term=self.term,
+                school_year=self.school_year,
+                score=Decimal(int(score)),
+                entry_score=Decimal(int(entry)),
+                mid_score=Decimal(int(mid)),
+                end_score=Decimal(int(end)),
+                grade=grade,
+                subject_comments=comment,
+                is_published=False,  # Not published until reviewed
+            )
+            for student_id, score, entry, mid, end, grade, comment in zip(
+                student_ids,
+                chunk["score"],
+                chunk["entry_score"],
+                chunk["mid_score"],
+                chunk["end_score"],
+                chunk["grade"],
+                comments,
+            )
+        ]
+
+        with transaction.atomic():
+            AcademicRecord.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=UNIQUE_FIELDS,
+                update_fields=UPDATE_FIELDS,
+            )
+
+        new_ids = set(student_ids) - existing
+        self.created += len(new_ids)
+        self.updated += len(student_ids) - len(new_ids)
+        self.student_ids.update(student_ids)
+        failing = {
+            student_id
+            for student_id, score in zip(student_ids, chunk["score"])
+            if score < LOW_SCORE
+        }
+        self.failing_student_ids |= failing
+        self.new_failing_student_ids |= failing & new_ids
+
+    def finish(self):
+        if not self.student_ids:
+            return
+
+        invalidate_model_sections(AcademicRecord, self.school.id)
+
+        new_failing = AcademicRecord.objects.filter(
+            student_id__in=self.new_failing_student_ids,
+            subject=self.subject,
+            term=self.term,
+            school_year=self.school_year,
+        )
+        try:
+            create_low_performance_alerts(
+                self.school, new_failing, self.failing_student_ids, self.school_year
+            )
+        except Exception as e:
+            logger.error(f"Failed to create performance alerts: {str(e)}")
+
+        log_action(
+            user=self.user,
+            action=f"Uploaded {self.subject.name} scores for {self.term} {self.school_year}",
+            category=ActionCategory.UPLOAD,
+            obj=self.subject,
+            metadata={
+                "created": self.created,
+                "updated": self.updated,
+                "errors": len(self.errors),
+                "term": self.term,
+                "school_year": self.school_year,
+            },
+        )
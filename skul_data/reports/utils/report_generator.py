@@ -17,6 +17,7 @@ from skul_data.reports.models.report import (
     GeneratedReportAccess,
 )
 from django.db.models import Avg
+from skul_data.reports.utils.access_log import access_log_buffer
 from rest_framework.exceptions import PermissionDenied
 from skul_data.users.models.base_user import User
 from skul_data.schools.models.schoolclass import SchoolClass
@@ -182,25 +183,18 @@ class ReportGenerator:
 
     @staticmethod
     def log_report_access(report, user, action="VIEWED", request=None):
-        """Log when a report is accessed"""
+        """Log when a report is accessed (buffered, see access_log_buffer)"""
         ip_address = request.META.get("REMOTE_ADDR") if request else None
         user_agent = request.META.get("HTTP_USER_AGENT") if request else None
 
-        ReportAccessLog.objects.create(
+        access_log_buffer.add(
             report=report,
-            accessed_by=user,
+            user=user,
             action=action,
             ip_address=ip_address,
             user_agent=user_agent,
         )
-
-        if user.user_type == "parent":
-            access_grant = GeneratedReportAccess.objects.filter(
-                report=report, user=user
-            ).first()
-            if access_grant and not access_grant.accessed_at:
-                access_grant.accessed_at = timezone.now()
-                access_grant.save()
+        access_log_buffer.maybe_flush()
 
 
 def get_previous_term(current_term):
@@ -601,8 +595,13 @@ def generate_student_term_report(request_instance):
         raise e
 
 
-def generate_class_term_reports(class_id, term, school_year, generated_by_id):
-    """Generate academic reports for all students in a class using async logging."""
+def generate_class_term_reports(
+    class_id, term, school_year, generated_by_id, progress=None
+):
+    """
+    Generate academic reports for all students in a class using async logging.
+    ``progress`` is an optional jobs ProgressReporter advanced per student.
+    """
     try:
         # Get the user who initiated the generation
         from skul_data.users.models import User
@@ -723,6 +722,9 @@ def generate_class_term_reports(class_id, term, school_year, generated_by_id):
 
         generated_reports = []
         skipped_students = []
+        report_recipients = []
+        if progress:
+            progress.set_total(students.count())
 
         for student in students:
             student_start_time = timezone.now()
@@ -765,6 +767,8 @@ def generate_class_term_reports(class_id, term, school_year, generated_by_id):
                             ).total_seconds(),
                         },
                     )
+                    if progress:
+                        progress.advance(failed=1)
                     continue
 
                 generated_reports.append(report)
@@ -810,7 +814,12 @@ def generate_class_term_reports(class_id, term, school_year, generated_by_id):
                         },
                     )
 
-                    send_report_notification(parent, report)
+                    report_recipients.append((parent.user, report))
+
+                if progress:
+                    progress.advance(
+                        message=f"Generated report for {student.full_name}"
+                    )
 
             except Exception as e:
                 error_duration = (timezone.now() - student_start_time).total_seconds()
@@ -831,8 +840,14 @@ def generate_class_term_reports(class_id, term, school_year, generated_by_id):
                         "severity": "medium",
                     },
                 )
+                if progress:
+                    progress.advance(failed=1)
                 continue
 
+        # Tell parents their reports are ready in one pass
+        if report_recipients:
+            send_report_notifications(report_recipients, sent_by=user)
+
         # Log bulk operation completion - async
         total_duration = (timezone.now() - start_time).total_seconds()
         success_rate = (
@@ -1009,6 +1024,55 @@ def send_report_notification(user, report):
     )
 
 
+def send_report_notifications(recipients, sent_by=None):
+    """
+    Notify many users about generated reports at once.
+    ``recipients`` is a list of ``(user, report)`` pairs. In-app rows are
+    bulk created; emails still go out one by one.
+    """
+    from skul_data.notifications.utils.notification import (
+        bulk_create_notifications,
+    )
+
+    ReportNotification.objects.bulk_create(
+        [
+            ReportNotification(
+                report=report,
+                sent_to=user,
+                method="BOTH" if user.email else "IN_APP",
+                message=f"New academic report available: {report.title}",
+            )
+            for user, report in recipients
+        ]
+    )
+    result = bulk_create_notifications(
+        [
+            {
+                "user_id": user.id,
+                "title": "New report available",
+                "message": f"New academic report available: {report.title}",
+                "related_id": report.id,
+                "payload": {"report_id": report.id},
+            }
+            for user, report in recipients
+        ],
+        notification_type="REPORT",
+        related_model="GeneratedReport",
+    )
+
+    for user, report in recipients:
+        if user.email:
+            send_report_email_notification(user, report)
+
+    log_action(
+        user=sent_by,
+        action=f"Shared {len({r.id for _, r in recipients})} reports with {len(recipients)} recipients",
+        category=ActionCategory.SHARE,
+        metadata={"notifications_created": result["created"]},
+    )
+    return result
+
+
 def send_report_email_notification(user, report):
     """Send email notification about a report"""
     try:
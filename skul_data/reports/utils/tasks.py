@@ -35,6 +35,8 @@ from skul_data.reports.utils.report_generator import (
     generate_student_term_report,
 )
 from skul_data.action_logs.utils.action_log import log_action_async
+from skul_data.jobs.utils.progress import ProgressReporter
+from skul_data.users.utils.request_context import request_context
 import traceback
 
 logger = get_task_logger(__name__)
@@ -168,19 +170,31 @@ def generate_student_term_report_task(self, request_id):
 
 
 @shared_task
-def generate_class_term_reports_task(class_id, term, school_year, generated_by_id):
+def generate_class_term_reports_task(
+    class_id, term, school_year, generated_by_id, job_id=None
+):
     """Generate term reports for all students in a class"""
+    progress = ProgressReporter.for_job(job_id)
+    progress.start(message="Generating reports")
     try:
-        # Call the actual report generation function with named arguments
-        result = generate_class_term_reports(
-            class_id=class_id,
-            term=term,
-            school_year=school_year,
-            generated_by_id=generated_by_id,
+        # Attribute signals and logs to the user who asked for the reports
+        with request_context(user_id=generated_by_id):
+            # Call the actual report generation function with named arguments
+            result = generate_class_term_reports(
+                class_id=class_id,
+                term=term,
+                school_year=school_year,
+                generated_by_id=generated_by_id,
+                progress=progress,
+            )
+        progress.succeed(
+            result=result,
+            message=f"Generated {result.get('reports_generated', 0)} reports",
         )
         return result
     except Exception as e:
         logger.error(f"Failed to generate class reports: {str(e)}")
+        progress.fail(e)
         raise
 
 
@@ -43,9 +43,25 @@ from skul_data.schools.models.schoolclass import SchoolClass
 from skul_data.students.models.student import Student, Subject
 from skul_data.reports.models.academic_record import AcademicRecord
 from skul_data.users.models.base_user import User
+from skul_data.reports.utils.report_generator import ReportGenerator
+from skul_data.reports.utils.completeness import completeness_matrix
+from skul_data.reports.utils.performance_upload import PerformanceUpload
+from skul_data.documents.utils.file_delivery import file_response, is_new_download
+from skul_data.documents.utils.template_cache import (
+    CLASS_ROSTER,
+    SCHOOL_SUBJECTS,
+    template_download,
+)
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.jobs.serializers.job import BackgroundJobSerializer
+from skul_data.jobs.utils.progress import enqueue_job, visible_jobs
 from decimal import Decimal
 import csv
 import io
+import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class ReportTemplateViewSet(viewsets.ModelViewSet):
@@ -187,20 +203,13 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
         """Download a generated report file"""
         report = self.get_object()
 
-        # Log the download
-        ReportGenerator.log_report_access(
-            report=report, user=request.user, action="DOWNLOADED", request=request
-        )
-
         try:
             if not report.file:
                 return Response(
                     {"error": "Report file not found"}, status=status.HTTP_404_NOT_FOUND
                 )
 
-            # Open the file
-            file_path = report.file.path
-            if not os.path.exists(file_path):
+            if not os.path.exists(report.file.path):
                 return Response(
                     {"error": "Report file does not exist"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -217,9 +226,17 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
             # Generate filename
             filename = f"{report.title}.{report.file_format.lower()}"
 
-            # Return file response
-            response = FileResponse(open(file_path, "rb"), content_type=content_type)
-            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            response = file_response(
+                request, report.file, filename=filename, content_type=content_type
+            )
+            # Revalidations and follow-up range requests are not new downloads
+            if is_new_download(request, response):
+                ReportGenerator.log_report_access(
+                    report=report,
+                    user=request.user,
+                    action="DOWNLOADED",
+                    request=request,
+                )
             return response
 
         except Exception as e:
@@ -234,19 +251,13 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
         """View/preview a report in browser"""
         report = self.get_object()
 
-        # Log the view
-        ReportGenerator.log_report_access(
-            report=report, user=request.user, action="VIEWED", request=request
-        )
-
         try:
             if not report.file:
                 return Response(
                     {"error": "Report file not found"}, status=status.HTTP_404_NOT_FOUND
                 )
 
-            file_path = report.file.path
-            if not os.path.exists(file_path):
+            if not os.path.exists(report.file.path):
                 return Response(
                     {"error": "Report file does not exist"},
                     status=status.HTTP_404_NOT_FOUND,
@@ -258,9 +269,15 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
                 "HTML": "text/html",
             }.get(report.file_format, "application/octet-stream")
 
-            # Return inline response for viewing
-            response = FileResponse(open(file_path, "rb"), content_type=content_type)
-            response["Content-Disposition"] = "inline"
+            # Inline so browsers and PDF viewers can fetch ranges of it
+            response = file_response(
+                request, report.file, content_type=content_type, as_attachment=False
+            )
+            # PDF viewers fetch many ranges per view; count the first only
+            if is_new_download(request, response):
+                ReportGenerator.log_report_access(
+                    report=report, user=request.user, action="VIEWED", request=request
+                )
             return response
 
         except Exception as e:
@@ -450,30 +467,40 @@ class AcademicReportViewSet(viewsets.ViewSet):
                     "You can only generate reports for your assigned class"
                 )
 
-        # In a real implementation, this would call a Celery task
         from skul_data.reports.utils.tasks import generate_class_term_reports_task
 
-        task_id = generate_class_term_reports_task.delay(
+        job = enqueue_job(
+            generate_class_term_reports_task,
+            BackgroundJob.REPORT_GENERATION,
+            owner=request.user,
+            school=request.user.school,
+            description=f"Term reports for class {class_id}, {term} {school_year}",
             class_id=class_id,
             term=term,
             school_year=school_year,
             generated_by_id=request.user.id,
         )
 
-        return Response({"task_id": str(task_id)}, status=status.HTTP_202_ACCEPTED)
+        return Response(
+            {"task_id": job.task_id, "job_id": job.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
-@api_view(["POST"])
+@api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated])
 def generate_performance_template(request):
     """
     Generate a CSV template for teachers to fill in student performance.
     Teachers can only generate templates for their assigned classes.
+    The CSV is rendered once per class roster and served from the template
+    cache; GET requests can revalidate it with If-None-Match.
     """
-    class_id = request.data.get("class_id")
-    subject_code = request.data.get("subject_code")
-    term = request.data.get("term", "Term 1")
-    school_year = request.data.get("school_year", "2025")
+    params = request.data if request.method == "POST" else request.query_params
+    class_id = params.get("class_id")
+    subject_code = params.get("subject_code")
+    term = params.get("term", "Term 1")
+    school_year = params.get("school_year", "2025")
 
     if not class_id or not subject_code:
         return Response(
@@ -516,57 +543,67 @@ def generate_performance_template(request):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Generate CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Header row
-        writer.writerow(
-            [
-                "admission_number",
-                "student_name",
-                "subject_code",
-                "entry_score",
-                "mid_score",
-                "end_score",
-                "comments",
-            ]
-        )
+        def render():
+            output = io.StringIO()
+            writer = csv.writer(output)
 
-        # Instructions row
-        writer.writerow(
-            [
-                "(DO NOT EDIT)",
-                "(DO NOT EDIT)",
-                subject_code,
-                "(0-15)",
-                "(0-15)",
-                "(0-70)",
-                "(Optional remarks)",
-            ]
-        )
+            # Header row
+            writer.writerow(
+                [
+                    "admission_number",
+                    "student_name",
+                    "subject_code",
+                    "entry_score",
+                    "mid_score",
+                    "end_score",
+                    "comments",
+                ]
+            )
 
-        # Student rows
-        for student in students:
+            # Instructions row
             writer.writerow(
                 [
-                    student.admission_number,
-                    student.full_name,
+                    "(DO NOT EDIT)",
+                    "(DO NOT EDIT)",
                     subject_code,
-                    "",  # entry_score - to be filled
-                    "",  # mid_score - to be filled
-                    "",  # end_score - to be filled
-                    "",  # comments - to be filled
+                    "(0-15)",
+                    "(0-15)",
+                    "(0-70)",
+                    "(Optional remarks)",
                 ]
             )
 
-        # Create HTTP response with CSV
-        output.seek(0)
-        response = HttpResponse(output.getvalue(), content_type="text/csv")
-        filename = f"{school_class.name}_{subject.name}_{term}_{school_year}.csv"
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            # Student rows
+            for student in students.only("admission_number", "first_name", "last_name"):
+                writer.writerow(
+                    [
+                        student.admission_number,
+                        student.full_name,
+                        subject_code,
+                        "",  # entry_score - to be filled
+                        "",  # mid_score - to be filled
+                        "",  # end_score - to be filled
+                        "",  # comments - to be filled
+                    ]
+                )
+            return output.getvalue()
 
-        return response
+        filename = f"{school_class.name}_{subject.name}_{term}_{school_year}.csv"
+        return template_download(
+            request,
+            filename,
+            "text/csv",
+            "performance",
+            render,
+            "csv",
+            school_id=school_class.school_id,
+            class_id=school_class.id,
+            params={"subject": subject.id},
+            scopes=[
+                (CLASS_ROSTER, school_class.id),
+                (SCHOOL_SUBJECTS, school_class.school_id),
+            ],
+        )
 
     except SchoolClass.DoesNotExist:
         return Response({"error": "Class not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -635,93 +672,21 @@ def upload_performance(request):
         subject = Subject.objects.get(code=subject_code, school=teacher.school)
 
         # Process CSV file
-        decoded_file = csv_file.read().decode("utf-8")
-        io_string = io.StringIO(decoded_file)
-        reader = csv.DictReader(io_string)
-
-        created = 0
-        updated = 0
-        errors = []
-
-        for row_num, row in enumerate(reader, start=1):
-            # Skip instruction row
-            if row["admission_number"] == "(DO NOT EDIT)":
-                continue
-
-            try:
-                # Validate required fields
-                if not row.get("admission_number"):
-                    errors.append({"row": row_num, "error": "Missing admission number"})
-                    continue
-
-                # Get student
-                student = Student.objects.get(
-                    admission_number=row["admission_number"], school=teacher.school
-                )
-
-                # Validate and calculate scores
-                try:
-                    entry = int(row.get("entry_score") or 0)
-                    mid = int(row.get("mid_score") or 0)
-                    end = int(row.get("end_score") or 0)
-
-                    # Validate score ranges
-                    if not (0 <= entry <= 15):
-                        raise ValueError("Entry score must be 0-15")
-                    if not (0 <= mid <= 15):
-                        raise ValueError("Mid score must be 0-15")
-                    if not (0 <= end <= 70):
-                        raise ValueError("End score must be 0-70")
-
-                    total_score = entry + mid + end
-
-                except ValueError as e:
-                    errors.append(
-                        {
-                            "row": row_num,
-                            "student": row.get("student_name", "Unknown"),
-                            "error": f"Invalid score: {str(e)}",
-                        }
-                    )
-                    continue
-
-                # Create or update academic record
-                record, is_new = AcademicRecord.objects.update_or_create(
-                    student=student,
-                    subject=subject,
-                    term=term,
-                    school_year=school_year,
-                    defaults={
-                        "teacher": teacher,
-                        "score": Decimal(str(total_score)),
-                        "entry_score": Decimal(str(entry)),
-                        "mid_score": Decimal(str(mid)),
-                        "end_score": Decimal(str(end)),
-                        "subject_comments": row.get("comments", ""),
-                        "is_published": False,  # Not published until reviewed
-                    },
-                )
-
-                if is_new:
-                    created += 1
-                else:
-                    updated += 1
-
-            except Student.DoesNotExist:
-                errors.append(
-                    {
-                        "row": row_num,
-                        "error": f"Student with admission number {row.get('admission_number')} not found",
-                    }
-                )
-            except Exception as e:
-                errors.append(
-                    {
-                        "row": row_num,
-                        "student": row.get("student_name", "Unknown"),
-                        "error": str(e),
-                    }
-                )
+        try:
+            upload = PerformanceUpload(
+                school=teacher.school,
+                subject=subject,
+                teacher=teacher,
+                term=term,
+                school_year=school_year,
+                user=user,
+            ).process(csv_file)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        created = upload.created
+        updated = upload.updated
+        errors = upload.errors
 
         # NEW: Check if all subjects have been uploaded for report generation
         response_data = {
@@ -732,28 +697,15 @@ def upload_performance(request):
             "message": f"Successfully processed {created + updated} records",
         }
 
-        # Check readiness for report generation
+        # Ready once every student has a record for every subject
         school_class = SchoolClass.objects.get(id=class_id)
         students = school_class.students.filter(is_active=True)
+        matrix = completeness_matrix(school_class, term, school_year, students)
 
-        # Get all subjects for the school
-        all_subjects = Subject.objects.filter(school=teacher.school)
-
-        # Check how many subjects have records for this term
-        subjects_with_records = (
-            AcademicRecord.objects.filter(
-                student__in=students, term=term, school_year=school_year
-            )
-            .values("subject")
-            .distinct()
-            .count()
-        )
-
-        response_data["subjects_completed"] = subjects_with_records
-        response_data["total_subjects"] = all_subjects.count()
-        response_data["ready_for_reports"] = (
-            subjects_with_records >= all_subjects.count()
-        )
+        response_data["subjects_completed"] = len(matrix.complete_subjects)
+        response_data["total_subjects"] = len(matrix.subjects)
+        response_data["incomplete_students"] = len(matrix.incomplete_students)
+        response_data["ready_for_reports"] = matrix.ready_for_reports
 
         # NEW: Auto-generate reports if requested and all subjects are complete
         if auto_generate_reports and response_data["ready_for_reports"]:
@@ -768,14 +720,20 @@ def upload_performance(request):
                     generate_class_term_reports_task,
                 )
 
-                task = generate_class_term_reports_task.delay(
+                job = enqueue_job(
+                    generate_class_term_reports_task,
+                    BackgroundJob.REPORT_GENERATION,
+                    owner=user,
+                    school=school_class.school,
+                    description=f"Term reports for {school_class.name}, {term} {school_year}",
                     class_id=class_id,
                     term=term,
                     school_year=school_year,
                     generated_by_id=user.id,
                 )
 
-                response_data["report_generation_task_id"] = str(task.id)
+                response_data["report_generation_task_id"] = job.task_id
+                response_data["report_generation_job_id"] = job.id
                 response_data["report_generation_status"] = "queued"
                 response_data["message"] += " Report generation has been queued."
 
@@ -834,27 +792,16 @@ def generate_reports_for_class(request):
 
         # Check if all students have complete records
         students = school_class.students.filter(is_active=True)
-        all_subjects = Subject.objects.filter(school=school_class.school)
-
-        incomplete_students = []
-        for student in students:
-            student_subjects = (
-                AcademicRecord.objects.filter(
-                    student=student, term=term, school_year=school_year
-                )
-                .values("subject")
-                .distinct()
-                .count()
-            )
+        matrix = completeness_matrix(school_class, term, school_year, students)
 
-            if student_subjects < all_subjects.count():
-                incomplete_students.append(
-                    {
-                        "name": student.full_name,
-                        "subjects_completed": student_subjects,
-                        "subjects_required": all_subjects.count(),
-                    }
-                )
+        incomplete_students = [
+            {
+                "name": student.full_name,
+                "subjects_completed": matrix.subjects_completed(student),
+                "subjects_required": len(matrix.subjects),
+            }
+            for student in matrix.incomplete_students
+        ]
 
         if incomplete_students:
             return Response(
@@ -873,7 +820,12 @@ def generate_reports_for_class(request):
         # Trigger report generation
         from skul_data.reports.utils.tasks import generate_class_term_reports_task
 
-        task = generate_class_term_reports_task.delay(
+        job = enqueue_job(
+            generate_class_term_reports_task,
+            BackgroundJob.REPORT_GENERATION,
+            owner=user,
+            school=school_class.school,
+            description=f"Term reports for {school_class.name}, {term} {school_year}",
             class_id=class_id,
             term=term,
             school_year=school_year,
@@ -883,11 +835,12 @@ def generate_reports_for_class(request):
         return Response(
             {
                 "message": "Report generation has been queued",
-                "task_id": str(task.id),
+                "task_id": job.task_id,
+                "job_id": job.id,
                 "class": school_class.name,
                 "term": term,
                 "school_year": school_year,
-                "total_students": students.count(),
+                "total_students": len(matrix.students),
             },
             status=status.HTTP_202_ACCEPTED,
         )
@@ -904,25 +857,94 @@ def generate_reports_for_class(request):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def class_record_completeness(request):
+    """
+    Student x subject matrix of which academic records exist for a class
+    and term, for the "missing marks" view before generating reports.
+    """
+    class_id = request.query_params.get("class_id")
+    term = request.query_params.get("term")
+    school_year = request.query_params.get("school_year")
+
+    if not all([class_id, term, school_year]):
+        return Response(
+            {"error": "class_id, term, and school_year are required"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        school_class = SchoolClass.objects.get(
+            id=int(class_id), school=request.user.school
+        )
+    except ValueError:
+        return Response(
+            {"error": "class_id must be an integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except SchoolClass.DoesNotExist:
+        return Response(
+            {"error": "Class not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    # Same rule as generate_reports_for_class, and only staff see marks
+    user = request.user
+    if user.user_type == User.TEACHER:
+        if school_class.class_teacher_id != user.teacher_profile.id:
+            return Response(
+                {"error": "You can only view records for your assigned classes"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+    elif user.user_type not in [User.SCHOOL_ADMIN, User.ADMINISTRATOR]:
+        return Response(
+            {"error": "Only administrators and class teachers can view records"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    matrix = completeness_matrix(school_class, term, school_year)
+    return Response(
+        {
+            "class": school_class.name,
+            "term": term,
+            "school_year": school_year,
+            **matrix.as_dict(),
+        }
+    )
+
+
 # NEW: Add endpoint to check report generation status
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def check_report_generation_status(request, task_id):
     """
-    Check the status of a report generation task.
+    Check the status of a report generation task. Reads the task's
+    BackgroundJob; tasks queued without one fall back to the Celery result.
     """
-    from celery.result import AsyncResult
+    if not BackgroundJob.objects.filter(task_id=task_id).exists():
+        from celery.result import AsyncResult
 
-    task = AsyncResult(task_id)
+        task = AsyncResult(task_id)
+        response_data = {"task_id": task_id, "status": task.state}
+        if task.state == "SUCCESS":
+            response_data["result"] = task.result
+        elif task.state == "FAILURE":
+            response_data["error"] = str(task.info)
+        return Response(response_data)
+
+    job = visible_jobs(request.user).filter(task_id=task_id).first()
+    if job is None:
+        raise PermissionDenied("You do not have access to this task")
 
     response_data = {
         "task_id": task_id,
-        "status": task.state,
+        "status": job.status,
+        "job": BackgroundJobSerializer(job, context={"request": request}).data,
     }
-
-    if task.state == "SUCCESS":
-        response_data["result"] = task.result
-    elif task.state == "FAILURE":
-        response_data["error"] = str(task.info)
+    if job.status == BackgroundJob.SUCCESS:
+        response_data["result"] = job.result
+    elif job.status == BackgroundJob.FAILURE:
+        response_data["error"] = job.message
 
     return Response(response_data)
@@ -5,3 +5,6 @@ class SchedulerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "skul_data.scheduler"
     label = "scheduler"
+
+    def ready(self):
+        from skul_data.scheduler.signals import audience, calendar_feed
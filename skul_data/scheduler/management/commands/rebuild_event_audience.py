@@ -0,0 +1,40 @@
+# skul_data/scheduler/management/commands/rebuild_event_audience.py
+"""
+Management command to rebuild the stored audience of school events after
+bulk updates that bypass the scheduler signals. Migration 0009 filled it
+for events that predate the EventAudience table.
+Run with: python manage.py rebuild_event_audience [--school <id>]
+"""
+
+from django.core.management.base import BaseCommand
+from skul_data.scheduler.models.scheduler import SchoolEvent
+from skul_data.scheduler.utils.audience import sync_event_audience
+
+
+class Command(BaseCommand):
+    help = "Recompute which users each school event is aimed at"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--school", type=int, help="Only rebuild events for this school id"
+        )
+
+    def handle(self, *args, **options):
+        events = SchoolEvent.objects.all()
+        if options["school"]:
+            events = events.filter(school_id=options["school"])
+
+        total = events.count()
+        self.stdout.write(f"Rebuilding audience for {total} events...")
+
+        added = removed = 0
+        for event in events.iterator():
+            event_added, event_removed = sync_event_audience([event])
+            added += event_added
+            removed += event_removed
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Added {added} and removed {removed} audience rows across {total} events"
+            )
+        )
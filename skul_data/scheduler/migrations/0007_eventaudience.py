@@ -0,0 +1,66 @@
+# Generated by Django 4.2.27 on 2026-10-18 23:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("scheduler", "0006_schoolevent_is_template"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventAudience",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="audience_entries",
+                        to="scheduler.schoolevent",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_audience_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="schoolevent",
+            name="audience",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="audience_events",
+                through="scheduler.EventAudience",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventaudience",
+            index=models.Index(
+                fields=["user", "event"], name="scheduler_e_user_id_b220f6_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="eventaudience",
+            unique_together={("event", "user")},
+        ),
+    ]
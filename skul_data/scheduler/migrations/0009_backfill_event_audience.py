@@ -0,0 +1,60 @@
+from django.db import migrations
+from django.db.models import Q
+
+
+def backfill_event_audience(apps, schema_editor):
+    """
+    Fill EventAudience for events created before 0007 added it, so teachers
+    and parents keep seeing their events from the moment this deploys. Mirrors
+    scheduler.utils.audience.audience_users on the historical models;
+    rebuild_event_audience stays for later drift.
+    """
+    SchoolEvent = apps.get_model("scheduler", "SchoolEvent")
+    EventAudience = apps.get_model("scheduler", "EventAudience")
+    Teacher = apps.get_model("users", "Teacher")
+    Parent = apps.get_model("users", "Parent")
+
+    for event in SchoolEvent.objects.order_by("pk").iterator():
+        teachers = Teacher.objects.none()
+        parents = Parent.objects.none()
+
+        if event.target_type in ["all", "teachers"]:
+            teachers = Teacher.objects.filter(school_id=event.school_id)
+        if event.target_type in ["all", "parents"]:
+            parents = Parent.objects.filter(school_id=event.school_id)
+        if event.target_type == "specific":
+            teachers = event.targeted_teachers.all()
+            parents = event.targeted_parents.all()
+        if event.target_type == "classes":
+            classes = event.targeted_classes.values("pk")
+            teachers = Teacher.objects.filter(
+                assigned_classes__in=classes, school_id=event.school_id
+            )
+            parents = Parent.objects.filter(
+                Q(primary_students__student_class__in=classes)
+                | Q(guardian_students__student_class__in=classes)
+                | Q(children__student_class__in=classes),
+                school_id=event.school_id,
+            )
+
+        user_ids = set(teachers.values_list("user_id", flat=True)) | set(
+            parents.values_list("user_id", flat=True)
+        )
+        EventAudience.objects.bulk_create(
+            [EventAudience(event_id=event.pk, user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scheduler", "0008_calendarfeedkey"),
+        ("students", "0006_student_kcpe_marks_alter_student_photo"),
+        ("users", "0020_parentnotification_parentnotif_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_event_audience, migrations.RunPython.noop),
+    ]
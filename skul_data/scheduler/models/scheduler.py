@@ -58,6 +58,11 @@ class SchoolEvent(models.Model):
         SchoolClass, blank=True, related_name="class_events"
     )
 
+    # Resolved audience, kept in sync by scheduler.signals.audience
+    audience = models.ManyToManyField(
+        User, through="EventAudience", blank=True, related_name="audience_events"
+    )
+
     # Event details
     location = models.CharField(max_length=255, blank=True, null=True)
     is_all_day = models.BooleanField(default=False)
@@ -105,54 +110,12 @@ class SchoolEvent(models.Model):
     def get_target_users(self):
         """
         Returns the users who are targets for this event based on target_type.
+        Evaluated from the current targeting, saved or not; use ``audience``
+        for the stored copy.
         """
-        if self.target_type == "all":
-            # Get all users associated with this school through Teacher and Parent profiles
-            teachers = Teacher.objects.filter(school=self.school).values_list(
-                "user", flat=True
-            )
-            parents = Parent.objects.filter(school=self.school).values_list(
-                "user", flat=True
-            )
-            return User.objects.filter(Q(id__in=teachers) | Q(id__in=parents))
-
-        elif self.target_type == "teachers":
-            teacher_users = Teacher.objects.filter(school=self.school).values_list(
-                "user", flat=True
-            )
-            return User.objects.filter(id__in=teacher_users)
-
-        elif self.target_type == "parents":
-            parent_users = Parent.objects.filter(school=self.school).values_list(
-                "user", flat=True
-            )
-            return User.objects.filter(id__in=parent_users)
-
-        elif self.target_type == "specific":
-            teachers = self.targeted_teachers.values_list("user", flat=True)
-            parents = self.targeted_parents.values_list("user", flat=True)
-            return User.objects.filter(Q(id__in=teachers) | Q(id__in=parents))
-
-        elif self.target_type == "classes":
-            # Get teachers assigned to targeted classes
-            teachers = Teacher.objects.filter(
-                assigned_classes__in=self.targeted_classes.all(), school=self.school
-            ).values_list("user", flat=True)
-
-            # Get parents with children in targeted classes - checking both parent FK and guardians
-            parents = (
-                Parent.objects.filter(
-                    Q(primary_students__student_class__in=self.targeted_classes.all())
-                    | Q(
-                        guardian_students__student_class__in=self.targeted_classes.all()
-                    ),
-                    school=self.school,
-                )
-                .distinct()
-                .values_list("user", flat=True)
-            )
+        from skul_data.scheduler.utils.audience import audience_users
 
-            return User.objects.filter(Q(id__in=teachers) | Q(id__in=parents))
+        return audience_users(self)
 
     # ===================
     # ACTION LOGGING METHODS
@@ -279,3 +242,40 @@ class EventRSVP(models.Model):
 
     def __str__(self):
         return f"{self.user} - {self.event}: {self.status}"
+
+
+class EventAudience(models.Model):
+    """
+    One row per user an event is aimed at, so "events for this user" is an
+    indexed lookup instead of re-evaluating every event's targeting.
+    """
+
+    event = models.ForeignKey(
+        SchoolEvent, on_delete=models.CASCADE, related_name="audience_entries"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="event_audience_entries"
+    )
+
+    class Meta:
+        unique_together = ("event", "user")
+        indexes = [models.Index(fields=["user", "event"])]
+
+    def __str__(self):
+        return f"{self.user} - {self.event}"
+
+
+class CalendarFeedKey(models.Model):
+    """
+    Per-user secret mixed into signed calendar feed links. Replacing it
+    revokes every link issued before.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="calendar_feed_key"
+    )
+    key = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Calendar feed key for {self.user}"
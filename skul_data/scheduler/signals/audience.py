@@ -0,0 +1,170 @@
+"""
+Keep EventAudience in step with event targeting and with the teacher/parent
+relations the targeting is resolved through. Changes made with
+``QuerySet.update()`` or bulk operations are not seen here; run
+``manage.py rebuild_event_audience`` after those.
+"""
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from skul_data.scheduler.models.scheduler import SchoolEvent
+from skul_data.scheduler.utils.audience import (
+    class_parents,
+    sync_event_audience,
+    sync_user_audience,
+)
+from skul_data.schools.models.schoolclass import SchoolClass
+from skul_data.students.models.student import Student
+from skul_data.users.models.parent import Parent
+from skul_data.users.models.teacher import Teacher
+
+
+def _fk_name(through, model):
+    return next(
+        field.name for field in through._meta.fields if field.related_model is model
+    )
+
+
+def _changed_ids(sender, instance, action, pk_set, model):
+    """
+    Primary keys of ``model`` rows affected by an m2m change, or None for
+    actions that need no resync. ``pk_set`` is empty on clear, so the linked
+    rows are read on pre_clear and kept on the instance until post_clear.
+    """
+    if isinstance(instance, model):
+        return None if action.startswith("pre_") else {instance.pk}
+
+    key = f"_audience_cleared_{sender._meta.model_name}"
+    if action == "pre_clear":
+        instance.__dict__[key] = set(
+            sender.objects.filter(
+                **{_fk_name(sender, type(instance)): instance.pk}
+            ).values_list(f"{_fk_name(sender, model)}_id", flat=True)
+        )
+        return None
+    if action == "post_clear":
+        return instance.__dict__.pop(key, set())
+    if action in ["post_add", "post_remove"]:
+        return set(pk_set or ())
+    return None
+
+
+def _profile_user_ids(model, pks):
+    return model.objects.filter(pk__in=pks).values_list("user_id", flat=True)
+
+
+@receiver(post_save, sender=SchoolEvent, dispatch_uid="event_audience_event_saved")
+def sync_saved_event_audience(sender, instance, **kwargs):
+    sync_event_audience([instance])
+
+
+def sync_targeted_audience(sender, instance, action, pk_set, **kwargs):
+    event_ids = _changed_ids(sender, instance, action, pk_set, SchoolEvent)
+    if event_ids:
+        sync_event_audience(SchoolEvent.objects.filter(pk__in=event_ids))
+
+
+for through in (
+    SchoolEvent.targeted_teachers.through,
+    SchoolEvent.targeted_parents.through,
+    SchoolEvent.targeted_classes.through,
+):
+    m2m_changed.connect(
+        sync_targeted_audience,
+        sender=through,
+        dispatch_uid=f"event_audience_targets_{through.__name__}",
+    )
+
+
+def sync_saved_profile_audience(sender, instance, created, **kwargs):
+    # Only new profiles and school moves change what a teacher or parent sees
+    if created or "school" in getattr(instance, "_changed_fields", []):
+        sync_user_audience([instance.user_id])
+
+
+def sync_deleted_profile_audience(sender, instance, **kwargs):
+    sync_user_audience([instance.user_id])
+
+
+for profile in (Teacher, Parent):
+    post_save.connect(
+        sync_saved_profile_audience,
+        sender=profile,
+        dispatch_uid=f"event_audience_saved_{profile.__name__}",
+    )
+    post_delete.connect(
+        sync_deleted_profile_audience,
+        sender=profile,
+        dispatch_uid=f"event_audience_deleted_{profile.__name__}",
+    )
+
+
+def sync_relation_audience(sender, instance, action, pk_set, **kwargs):
+    """Class assignments and parent-student links change who a class reaches"""
+    profile = Teacher if sender is Teacher.assigned_classes.through else Parent
+    pks = _changed_ids(sender, instance, action, pk_set, profile)
+    if pks:
+        sync_user_audience(_profile_user_ids(profile, pks))
+
+
+for through in (
+    Teacher.assigned_classes.through,
+    Student.guardians.through,
+    Parent.children.through,
+):
+    m2m_changed.connect(
+        sync_relation_audience,
+        sender=through,
+        dispatch_uid=f"event_audience_relations_{through.__name__}",
+    )
+
+
+def _student_parent_ids(student):
+    return (
+        {student.parent_id}
+        | set(student.guardians.values_list("pk", flat=True))
+        | set(student.parents.values_list("pk", flat=True))
+    ) - {None}
+
+
+@receiver(post_save, sender=Student, dispatch_uid="event_audience_student_saved")
+def sync_student_audience(sender, instance, created, **kwargs):
+    if created:
+        parent_ids = {instance.parent_id}
+    elif {"student_class", "parent"} & set(getattr(instance, "_changed_fields", [])):
+        # The dirty-fields snapshot still holds the values from before this save
+        previous_parent_id = instance.__dict__.get("_snapshot", {}).get("parent_id")
+        parent_ids = _student_parent_ids(instance) | {previous_parent_id}
+    else:
+        return
+    sync_user_audience(_profile_user_ids(Parent, parent_ids - {None}))
+
+
+@receiver(pre_delete, sender=Student, dispatch_uid="event_audience_student_deleting")
+def remember_student_parents(sender, instance, **kwargs):
+    # The parent links go with the student, without m2m_changed
+    instance._audience_parent_ids = _student_parent_ids(instance)
+
+
+@receiver(post_delete, sender=Student, dispatch_uid="event_audience_student_deleted")
+def sync_deleted_student_audience(sender, instance, **kwargs):
+    parent_ids = instance.__dict__.pop("_audience_parent_ids", set())
+    sync_user_audience(_profile_user_ids(Parent, parent_ids))
+
+
+@receiver(pre_delete, sender=SchoolClass, dispatch_uid="event_audience_class_deleting")
+def remember_class_audience(sender, instance, **kwargs):
+    # Deleting a class drops its targeting and assignments without m2m_changed
+    instance._audience_user_ids = set(
+        instance.teachers.values_list("user_id", flat=True)
+    ) | set(class_parents([instance.pk]).values_list("user_id", flat=True))
+
+
+@receiver(post_delete, sender=SchoolClass, dispatch_uid="event_audience_class_deleted")
+def sync_deleted_class_audience(sender, instance, **kwargs):
+    sync_user_audience(instance.__dict__.pop("_audience_user_ids", set()))
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from skul_data.scheduler.models.scheduler import SchoolEvent
+from skul_data.scheduler.utils.calendar_feed import invalidate_calendar_feeds
+
+
+# Audience changes invalidate from scheduler.utils.audience; these cover
+# edits to the event itself and deletions, whose audience rows cascade.
+@receiver(post_save, sender=SchoolEvent, dispatch_uid="calendar_feed_event_saved")
+@receiver(post_delete, sender=SchoolEvent, dispatch_uid="calendar_feed_event_deleted")
+def invalidate_event_feeds(sender, instance, **kwargs):
+    invalidate_calendar_feeds([instance.school_id])
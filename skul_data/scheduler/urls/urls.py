@@ -6,6 +6,11 @@ from skul_data.scheduler.views.scheduler import (
 )
 from skul_data.scheduler.views.scheduler import EventRSVPView, EventRSVPListView
 from skul_data.scheduler.views.scheduler import SchoolCalendarExportView
+from skul_data.scheduler.views.scheduler import (
+    CalendarFeedView,
+    CalendarFeedLinkView,
+    CalendarFeedLinkRegenerateView,
+)
 
 urlpatterns = [
     path("user-events/", UserEventListView.as_view(), name="user-event-list"),
@@ -20,4 +25,20 @@ urlpatterns = [
     path(
         "export-calendar/", SchoolCalendarExportView.as_view(), name="export-calendar"
     ),
+    path("calendar/feed.ics", CalendarFeedView.as_view(), name="calendar-feed"),
+    path(
+        "calendar/feed/<str:token>.ics",
+        CalendarFeedView.as_view(),
+        name="calendar-feed-token",
+    ),
+    path(
+        "calendar/feed-link/",
+        CalendarFeedLinkView.as_view(),
+        name="calendar-feed-link",
+    ),
+    path(
+        "calendar/feed-link/regenerate/",
+        CalendarFeedLinkRegenerateView.as_view(),
+        name="calendar-feed-link-regenerate",
+    ),
 ]
@@ -0,0 +1,182 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from skul_data.scheduler.models.scheduler import EventAudience, SchoolEvent
+from skul_data.scheduler.utils.calendar_feed import invalidate_calendar_feeds
+from skul_data.students.models.student import Student
+from skul_data.users.models.parent import Parent
+from skul_data.users.models.teacher import Teacher
+
+User = get_user_model()
+
+
+def class_parents(classes):
+    """Parents linked to a student in ``classes`` by any of the three relations"""
+    return Parent.objects.filter(
+        Q(primary_students__student_class__in=classes)
+        | Q(guardian_students__student_class__in=classes)
+        | Q(children__student_class__in=classes)
+    ).distinct()
+
+
+def audience_users(event):
+    """
+    The users ``event`` is aimed at, from its current targeting:
+
+    - all: every teacher and parent of the school
+    - teachers / parents: every teacher or parent of the school
+    - specific: the targeted teachers and parents
+    - classes: teachers assigned to, and parents with a child in, a
+      targeted class of the school
+    """
+    teachers = Teacher.objects.none()
+    parents = Parent.objects.none()
+
+    if event.target_type in ["all", "teachers"]:
+        teachers = Teacher.objects.filter(school_id=event.school_id)
+    if event.target_type in ["all", "parents"]:
+        parents = Parent.objects.filter(school_id=event.school_id)
+    if event.target_type == "specific" and event.pk:
+        teachers = event.targeted_teachers.all()
+        parents = event.targeted_parents.all()
+    if event.target_type == "classes" and event.pk:
+        classes = event.targeted_classes.values("pk")
+        teachers = Teacher.objects.filter(
+            assigned_classes__in=classes, school_id=event.school_id
+        )
+        parents = class_parents(classes).filter(school_id=event.school_id)
+
+    return User.objects.filter(
+        Q(pk__in=teachers.values("user_id")) | Q(pk__in=parents.values("user_id"))
+    )
+
+
+def audience_events(user_id):
+    """The events whose targeting includes ``user_id``; the inverse of ``audience_users``"""
+    conditions = []
+
+    teacher = Teacher.objects.filter(user_id=user_id).first()
+    if teacher:
+        conditions.append(
+            Q(school_id=teacher.school_id, target_type__in=["all", "teachers"])
+            | Q(target_type="specific", targeted_teachers=teacher)
+            | Q(
+                school_id=teacher.school_id,
+                target_type="classes",
+                targeted_classes__in=teacher.assigned_classes.values("pk"),
+            )
+        )
+
+    parent = Parent.objects.filter(user_id=user_id).first()
+    if parent:
+        classes = (
+            Student.objects.filter(
+                Q(parent=parent) | Q(guardians=parent) | Q(parents=parent),
+                student_class__isnull=False,
+            )
+            .values("student_class")
+            .distinct()
+        )
+        conditions.append(
+            Q(school_id=parent.school_id, target_type__in=["all", "parents"])
+            | Q(target_type="specific", targeted_parents=parent)
+            | Q(
+                school_id=parent.school_id,
+                target_type="classes",
+                targeted_classes__in=classes,
+            )
+        )
+
+    if not conditions:
+        return SchoolEvent.objects.none()
+
+    query = conditions[0]
+    for condition in conditions[1:]:
+        query |= condition
+    return SchoolEvent.objects.filter(query).distinct()
+
+
+def _apply(wanted, existing, key_field, other_field):
+    """
+    Insert missing and delete stale rows. ``wanted`` and ``existing`` map a
+    ``key_field`` id to the set of ``other_field`` ids it should/does have.
+    Returns ``(added, removed)`` and invalidates the calendar feeds of the
+    schools whose events changed.
+    """
+    added = removed = 0
+    changed_events = set()
+    with transaction.atomic():
+        for key in wanted.keys() | existing.keys():
+            missing = wanted.get(key, set()) - existing.get(key, set())
+            stale = existing.get(key, set()) - wanted.get(key, set())
+            if missing:
+                EventAudience.objects.bulk_create(
+                    [
+                        EventAudience(**{key_field: key, other_field: other})
+                        for other in missing
+                    ],
+                    ignore_conflicts=True,
+                )
+                added += len(missing)
+            if stale:
+                EventAudience.objects.filter(
+                    **{key_field: key, f"{other_field}__in": stale}
+                ).delete()
+                removed += len(stale)
+            if missing or stale:
+                if key_field == "event_id":
+                    changed_events.add(key)
+                else:
+                    changed_events |= missing | stale
+
+    if changed_events:
+        invalidate_calendar_feeds(
+            SchoolEvent.objects.filter(pk__in=changed_events)
+            .values_list("school_id", flat=True)
+            .distinct()
+        )
+    return added, removed
+
+
+def sync_event_audience(events):
+    """
+    Bring the stored audience of ``events`` in line with their targeting.
+    Returns ``(added, removed)`` row counts.
+    """
+    events = list(events)
+    if not events:
+        return 0, 0
+
+    wanted = {
+        event.pk: set(audience_users(event).values_list("pk", flat=True))
+        for event in events
+    }
+    existing = {}
+    for event_id, user_id in EventAudience.objects.filter(
+        event_id__in=wanted
+    ).values_list("event_id", "user_id"):
+        existing.setdefault(event_id, set()).add(user_id)
+
+    return _apply(wanted, existing, "event_id", "user_id")
+
+
+def sync_user_audience(user_ids):
+    """
+    Bring the stored events of ``user_ids`` in line with their current
+    teacher/parent profile, classes and children. Returns ``(added, removed)``.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return 0, 0
+
+    wanted = {
+        user_id: set(audience_events(user_id).values_list("pk", flat=True))
+        for user_id in user_ids
+    }
+    existing = {}
+    for user_id, event_id in EventAudience.objects.filter(
+        user_id__in=user_ids
+    ).values_list("user_id", "event_id"):
+        existing.setdefault(user_id, set()).add(event_id)
+
+    return _apply(wanted, existing, "user_id", "event_id")
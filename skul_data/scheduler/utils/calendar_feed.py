@@ -0,0 +1,172 @@
+import hashlib
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string
+from skul_data.scheduler.models.scheduler import CalendarFeedKey, SchoolEvent
+from skul_data.notifications.utils.presence import (
+    cache_is_shared,
+    warn_if_local_cache,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Rendered feeds live until an event of the school changes, or at most this
+# long so events sliding out of the history window eventually drop off.
+FEED_TIMEOUT = getattr(settings, "CALENDAR_FEED_TIMEOUT", 60 * 60 * 24)
+FEED_HISTORY_DAYS = getattr(settings, "CALENDAR_FEED_HISTORY_DAYS", 30)
+FEED_TOKEN_SALT = "skul_data.scheduler.calendar_feed"
+
+
+def render_calendar(events):
+    """Serialize ``events`` as an iCalendar document (bytes)"""
+    from icalendar import Calendar, Event as ICalEvent
+
+    cal = Calendar()
+    cal.add("prodid", "-//School Calendar//example.com//")
+    cal.add("version", "2.0")
+
+    for event in events:
+        ical_event = ICalEvent()
+        ical_event.add("uid", f"{event.id}@example.com")
+        ical_event.add("dtstamp", event.updated_at)
+        ical_event.add("dtstart", event.start_datetime)
+        ical_event.add("dtend", event.end_datetime)
+        ical_event.add("summary", event.title)
+        ical_event.add("description", event.description or "")
+        ical_event.add("location", event.location or "")
+        cal.add_component(ical_event)
+
+    return cal.to_ical()
+
+
+def feed_events(user):
+    """Admins get every event of their school, everyone else their audience"""
+    events = SchoolEvent.objects.filter(
+        school=user.school,
+        start_datetime__gte=timezone.now() - timedelta(days=FEED_HISTORY_DAYS),
+    )
+    if user.user_type != User.SCHOOL_ADMIN:
+        events = events.filter(audience=user)
+    return events.order_by("start_datetime")
+
+
+def feed_token(user):
+    """
+    Signed token identifying ``user`` for calendar apps that cannot log in.
+    It carries the user's feed key, so it works until the key is rotated.
+    """
+    feed_key, _ = CalendarFeedKey.objects.get_or_create(
+        user=user, defaults={"key": get_random_string(32)}
+    )
+    return signing.dumps([user.pk, feed_key.key], salt=FEED_TOKEN_SALT)
+
+
+def rotate_feed_token(user):
+    """Revoke the user's feed links and return a new token"""
+    CalendarFeedKey.objects.update_or_create(
+        user=user, defaults={"key": get_random_string(32)}
+    )
+    return feed_token(user)
+
+
+def user_for_token(token):
+    # Subscriptions poll for as long as they exist, so tokens have no
+    # max_age; rotate_feed_token revokes them instead
+    try:
+        user_id, key = signing.loads(token, salt=FEED_TOKEN_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+    feed_key = (
+        CalendarFeedKey.objects.select_related("user")
+        .filter(user_id=user_id, user__is_active=True)
+        .first()
+    )
+    if feed_key is None or not constant_time_compare(feed_key.key, str(key)):
+        return None
+    return feed_key.user
+
+
+def _version_key(school_id):
+    return f"calendar_feed:version:{school_id}"
+
+
+def _entry_key(school_id, version, user_id):
+    return f"calendar_feed:{school_id}:{version}:{user_id}"
+
+
+def _get_version(school_id):
+    key = _version_key(school_id)
+    version = cache.get(key)
+    if version is None:
+        version = {"id": uuid.uuid4().hex, "changed_at": time.time()}
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate_calendar_feeds(school_ids):
+    """Drop the rendered feeds of these schools once the transaction commits"""
+    school_ids = list(school_ids)
+    if not school_ids:
+        return
+
+    def invalidate():
+        changed_at = time.time()
+        cache.set_many(
+            {
+                _version_key(school_id): {
+                    "id": uuid.uuid4().hex,
+                    "changed_at": changed_at,
+                }
+                for school_id in school_ids
+            },
+            None,
+        )
+
+    transaction.on_commit(invalidate)
+
+
+def _render_feed(user, last_modified):
+    body = render_calendar(feed_events(user))
+    logger.debug(f"Rendered calendar feed for user {user.pk}")
+    return {
+        "body": body,
+        "etag": hashlib.md5(body, usedforsecurity=False).hexdigest(),
+        "last_modified": last_modified,
+    }
+
+
+def get_feed(user):
+    """
+    Return ``{"body", "etag", "last_modified"}`` for the user's feed,
+    rendering it only when the school's events changed since it was cached.
+    ``last_modified`` is the time of that change, as a timestamp.
+
+    A per-process cache never sees invalidations made by other workers, so
+    there the feed is rendered for every request and ``last_modified`` is
+    None; the ETag of the body still answers conditional requests.
+    """
+    if not cache_is_shared():
+        warn_if_local_cache("Calendar feed cache")
+        return _render_feed(user, last_modified=None)
+
+    school_id = user.school.id if user.school else None
+    version = _get_version(school_id)
+    key = _entry_key(school_id, version["id"], user.pk)
+
+    feed = cache.get(key)
+    if feed is None:
+        feed = _render_feed(user, last_modified=version["changed_at"])
+        cache.set(key, feed, FEED_TIMEOUT)
+    return feed
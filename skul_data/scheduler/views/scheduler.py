@@ -20,6 +20,16 @@ from skul_data.users.permissions.permission import CanManageEvent
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
 from skul_data.schools.models.school import School
+from skul_data.scheduler.utils.calendar_feed import (
+    feed_token,
+    get_feed,
+    render_calendar,
+    rotate_feed_token,
+    user_for_token,
+)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
 User = get_user_model()
 
@@ -57,37 +67,9 @@ class SchoolEventListView(generics.ListCreateAPIView):
         if user.user_type == User.SCHOOL_ADMIN:
             return queryset.order_by("-start_datetime")
 
-        # Teachers see events targeted to them or their classes
-        if user.user_type == User.TEACHER:
-            teacher = user.teacher_profile
-            return (
-                queryset.filter(
-                    Q(target_type="all")
-                    | Q(target_type="teachers")
-                    | Q(targeted_teachers=teacher)
-                    | Q(targeted_classes__in=teacher.assigned_classes.all())
-                )
-                .distinct()
-                .order_by("-start_datetime")
-            )
-
-        # Parents see events targeted to them or their children's classes
-        if user.user_type == User.PARENT:
-            parent = user.parent_profile
-            return (
-                queryset.filter(
-                    Q(target_type="all")
-                    | Q(target_type="parents")
-                    | Q(targeted_parents=parent)
-                    | Q(
-                        targeted_classes__in=[
-                            child.school_class for child in parent.children.all()
-                        ]
-                    )
-                )
-                .distinct()
-                .order_by("-start_datetime")
-            )
+        # Teachers and parents see the events whose audience includes them
+        if user.user_type in [User.TEACHER, User.PARENT]:
+            return queryset.filter(audience=user).order_by("-start_datetime")
 
         return SchoolEvent.objects.none()
 
@@ -223,8 +205,6 @@ class SchoolCalendarExportView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        from icalendar import Calendar, Event as ICalEvent
-
         # Get the user's school - handle different ways the school might be associated
         user_school = None
         if hasattr(request.user, "school") and request.user.school:
@@ -245,21 +225,7 @@ class SchoolCalendarExportView(APIView):
             - timedelta(days=30),  # Use timedelta from datetime
         )
 
-        cal = Calendar()
-        cal.add("prodid", "-//School Calendar//example.com//")
-        cal.add("version", "2.0")
-
-        for event in events:
-            ical_event = ICalEvent()
-            ical_event.add("uid", f"{event.id}@example.com")
-            ical_event.add("dtstart", event.start_datetime)
-            ical_event.add("dtend", event.end_datetime)
-            ical_event.add("summary", event.title)
-            ical_event.add("description", event.description or "")
-            ical_event.add("location", event.location or "")
-            cal.add_component(ical_event)
-
-        response = HttpResponse(cal.to_ical(), content_type="text/calendar")
+        response = HttpResponse(render_calendar(events), content_type="text/calendar")
         response["Content-Disposition"] = 'attachment; filename="school_calendar.ics"'
 
         # Add logging
@@ -270,3 +236,70 @@ class SchoolCalendarExportView(APIView):
             metadata={"event_count": events.count(), "format": "ical"},
         )
         return response
+
+
+class CalendarFeedView(APIView):
+    """
+    The user's events as an iCalendar feed for calendar apps to subscribe
+    to. Served from a cached rendering with ETag/Last-Modified, so polling
+    clients mostly get 304s. Reached either logged in or through the signed
+    link from CalendarFeedLinkView.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get_authenticators(self):
+        # Token links are opened by calendar apps without credentials
+        if self.kwargs.get("token"):
+            return []
+        return super().get_authenticators()
+
+    def get(self, request, token=None):
+        user = user_for_token(token) if token else request.user
+        if user is None or not user.is_authenticated:
+            return Response(
+                {"error": "Invalid or missing calendar feed token"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        feed = get_feed(user)
+        etag = quote_etag(feed["etag"])
+        last_modified = feed["last_modified"]
+        if last_modified is not None:
+            last_modified = int(last_modified)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(feed["body"], content_type="text/calendar")
+            response["Content-Disposition"] = 'inline; filename="calendar.ics"'
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+def _feed_url(request, token):
+    path = reverse("scheduler:calendar-feed-token", kwargs={"token": token})
+    return request.build_absolute_uri(path)
+
+
+class CalendarFeedLinkView(APIView):
+    """Subscription URL for the user's calendar feed"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"url": _feed_url(request, feed_token(request.user))})
+
+
+class CalendarFeedLinkRegenerateView(APIView):
+    """Replace the user's subscription URL, revoking every earlier one"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        token = rotate_feed_token(request.user)
+        return Response({"url": _feed_url(request, token)})
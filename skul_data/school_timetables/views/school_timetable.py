@@ -35,6 +35,8 @@ from django.core.exceptions import PermissionDenied
 from skul_data.users.models.base_user import User
 from rest_framework import serializers
 from skul_data.students.models.student import Subject
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.jobs.utils.progress import ProgressReporter
 
 
 class TimeSlotViewSet(viewsets.ModelViewSet):
@@ -209,6 +211,18 @@ class TimetableViewSet(viewsets.ModelViewSet):
             print(f"Deleting {existing_timetables.count()} existing timetables")
             existing_timetables.delete()
 
+        # Generation runs in the request, but through a job so the client
+        # can follow it class by class over the notification socket
+        progress = ProgressReporter(
+            BackgroundJob.objects.create(
+                job_type=BackgroundJob.TIMETABLE_GENERATION,
+                owner=request.user,
+                school=classes[0].school,
+                description=f"Timetables for {len(class_ids)} classes, {term} {academic_year}",
+            )
+        )
+        progress.start(total=len(class_ids), message="Generating timetables")
+
         # Generate timetables
         timetables = []
         errors = []
@@ -223,23 +237,38 @@ class TimetableViewSet(viewsets.ModelViewSet):
                     subject_assignments,  # PASS ASSIGNMENTS
                 )
                 timetables.append(timetable)
+                progress.advance(message=f"Generated timetable for {school_class.name}")
 
             except Exception as e:
                 error_msg = (
                     f"Error generating timetable for {school_class.name}: {str(e)}"
                 )
                 errors.append(error_msg)
+                progress.advance(failed=1, message=error_msg)
                 print(error_msg)
                 import traceback
 
                 traceback.print_exc()
 
         if not timetables:
+            progress.fail("Failed to generate any timetables")
             return Response(
-                {"error": "Failed to generate any timetables", "details": errors},
+                {
+                    "error": "Failed to generate any timetables",
+                    "details": errors,
+                    "job_id": progress.job.id,
+                },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        progress.succeed(
+            result={
+                "timetable_ids": [timetable.id for timetable in timetables],
+                "errors": errors,
+            },
+            message=f"Generated timetables for {len(timetables)} classes",
+        )
+
         log_action(
             user=request.user,
             action=f"Generated timetables for {len(timetables)} classes",
@@ -269,6 +298,7 @@ class TimetableViewSet(viewsets.ModelViewSet):
             "lessons": [],
             "time_slots": [],
             "errors": errors,
+            "job_id": progress.job.id,
         }
 
         # Add lessons from all timetables
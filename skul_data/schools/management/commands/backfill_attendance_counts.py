@@ -0,0 +1,39 @@
+# skul_data/schools/management/commands/backfill_attendance_counts.py
+"""
+Management command to recount ClassAttendance.present_count and
+snapshot_attendance_rate on records that have drifted from their present
+students. Migration 0016 filled them for records that predate the columns.
+Run with: python manage.py backfill_attendance_counts [--school <id>]
+"""
+
+from django.core.management.base import BaseCommand
+from skul_data.schools.models.schoolclass import ClassAttendance
+
+
+class Command(BaseCommand):
+    help = "Recount present students and attendance rates on class attendance"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--school", type=int, help="Only backfill records for this school id"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of records read and written per query",
+        )
+
+    def handle(self, *args, **options):
+        queryset = ClassAttendance.objects.all()
+        if options["school"]:
+            queryset = queryset.filter(school_class__school_id=options["school"])
+
+        total = queryset.count()
+        self.stdout.write(f"Checking {total} attendance records...")
+
+        updated = ClassAttendance.recount(queryset, batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {updated} of {total} attendance records")
+        )
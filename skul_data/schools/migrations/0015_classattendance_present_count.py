@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-18 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0014_school_po_box_alter_school_website"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="classattendance",
+            name="snapshot_attendance_rate",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="classattendance",
+            name="present_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
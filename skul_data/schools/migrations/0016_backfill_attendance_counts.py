@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_attendance_counts(apps, schema_editor):
+    """
+    Fill present_count and snapshot_attendance_rate on records saved before
+    0015 added them, so alerts and summaries don't read 0% for every class
+    until backfill_attendance_counts is run. Mirrors ClassAttendance.recount,
+    which the historical model doesn't have.
+    """
+    ClassAttendance = apps.get_model("schools", "ClassAttendance")
+    records = (
+        ClassAttendance.objects.annotate(counted=Count("present_students"))
+        .only("id", "total_students", "present_count", "snapshot_attendance_rate")
+        .order_by("pk")
+    )
+
+    changed = []
+    for record in records.iterator(chunk_size=500):
+        if record.total_students > 0:
+            rate = round((record.counted / record.total_students) * 100, 2)
+        else:
+            rate = 0
+        if (record.present_count, record.snapshot_attendance_rate) != (
+            record.counted,
+            rate,
+        ):
+            record.present_count = record.counted
+            record.snapshot_attendance_rate = rate
+            changed.append(record)
+
+    ClassAttendance.objects.bulk_update(
+        changed, ["present_count", "snapshot_attendance_rate"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0015_classattendance_present_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_attendance_counts, migrations.RunPython.noop),
+    ]
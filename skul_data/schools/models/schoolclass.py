@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from skul_data.schools.models.school import School
@@ -6,6 +7,7 @@ from skul_data.schools.models.schoolstream import SchoolStream
 from skul_data.users.models import User
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.action_logs.utils.signal_control import suppress_signals
 
 
 class SchoolClass(models.Model):
@@ -219,6 +221,13 @@ class ClassAttendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     total_students = models.PositiveIntegerField(default=0)
+    # Kept in sync with present_students by recount_present_students, never
+    # by save(). The rate is against total_students as captured at creation,
+    # not the class's current roster.
+    present_count = models.PositiveIntegerField(default=0)
+    snapshot_attendance_rate = models.FloatField(default=0)
+
+    COUNT_FIELDS = ("present_count", "snapshot_attendance_rate")
 
     class Meta:
         unique_together = ("school_class", "date")
@@ -248,16 +257,25 @@ class ClassAttendance(models.Model):
                         "class_id": self.school_class.id,
                     },
                 )
+        elif not args and kwargs.get("update_fields") is None:
+            # A stale instance must not overwrite counts written since it
+            # was loaded
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNT_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def update_attendance(self, student_ids, user=None):
-        from skul_data.schools.signals.schoolclass import log_attendance_changes
-
         """
         Special method for updating attendance that handles bulk operations
         and optimized logging
         """
-        from django.db.models.signals import m2m_changed
+        from skul_data.schools.signals.schoolclass import (
+            log_attendance_changes,
+            update_attendance_counts,
+        )
 
         current_present = set(self.present_students.values_list("id", flat=True))
         new_present = set(student_ids)
@@ -265,41 +283,76 @@ class ClassAttendance(models.Model):
         added = new_present - current_present
         removed = current_present - new_present
 
-        # Temporarily disconnect the M2M signal to prevent duplicate logging
-        m2m_changed.disconnect(
-            log_attendance_changes, sender=ClassAttendance.present_students.through
-        )
+        # Skip the per-change M2M handlers for this call only; we recount and
+        # log once below
+        with transaction.atomic():
+            with suppress_signals(log_attendance_changes, update_attendance_counts):
+                self.present_students.set(student_ids)
+            self.recount_present_students()
 
-        try:
-            # Perform the update
-            self.present_students.set(student_ids)
+        # Create just one log entry
+        if user:
+            log_action(
+                user=user,
+                action=f"Updated attendance for {self.school_class} on {self.date}",
+                category=ActionCategory.UPDATE,
+                obj=self,
+                metadata={
+                    "students_added": list(added),
+                    "students_removed": list(removed),
+                    "total_present": self.present_count,
+                    "attendance_rate": self.snapshot_attendance_rate,
+                    "class_id": self.school_class.id,
+                },
+            )
 
-            # Create just one log entry
-            if user:
-                log_action(
-                    user=user,
-                    action=f"Updated attendance for {self.school_class} on {self.date}",
-                    category=ActionCategory.UPDATE,
-                    obj=self,
-                    metadata={
-                        "students_added": list(added),
-                        "students_removed": list(removed),
-                        "total_present": len(new_present),
-                        "attendance_rate": self.attendance_rate,
-                        "class_id": self.school_class.id,
-                    },
-                )
-        finally:
-            # Reconnect the signal
-            m2m_changed.connect(
-                log_attendance_changes, sender=ClassAttendance.present_students.through
+    @staticmethod
+    def calculate_rate(present_count, total_students):
+        if total_students > 0:
+            return round((present_count / total_students) * 100, 2)
+        return 0
+
+    def recount_present_students(self):
+        """
+        Store the present count and rate. The row is locked before counting
+        so concurrent changes to the same record are applied one at a time.
+        """
+        with transaction.atomic():
+            total_students = (
+                ClassAttendance.objects.select_for_update()
+                .values_list("total_students", flat=True)
+                .get(pk=self.pk)
+            )
+            self.present_count = self.present_students.count()
+            self.snapshot_attendance_rate = self.calculate_rate(
+                self.present_count, total_students
             )
+            ClassAttendance.objects.filter(pk=self.pk).update(
+                present_count=self.present_count,
+                snapshot_attendance_rate=self.snapshot_attendance_rate,
+            )
+
+    @classmethod
+    def recount(cls, queryset=None, batch_size=500):
+        """Recount present students for many records; returns rows changed"""
+        queryset = cls.objects.all() if queryset is None else queryset
+        records = (
+            queryset.annotate(counted=Count("present_students"))
+            .only("id", "total_students", *cls.COUNT_FIELDS)
+            .order_by("pk")
+        )
+
+        changed = []
+        for record in records.iterator(chunk_size=batch_size):
+            rate = cls.calculate_rate(record.counted, record.total_students)
+            current = (record.present_count, record.snapshot_attendance_rate)
+            if current != (record.counted, rate):
+                record.present_count = record.counted
+                record.snapshot_attendance_rate = rate
+                changed.append(record)
+
+        cls.objects.bulk_update(changed, list(cls.COUNT_FIELDS), batch_size=batch_size)
+        return len(changed)
 
     def __str__(self):
         return f"Attendance for {self.school_class} on {self.date}"
-
-    @property
-    def attendance_rate(self):
-        total = self.school_class.students.count()
-        present = self.present_students.count()
-        return round((present / total) * 100, 2) if total > 0 else 0
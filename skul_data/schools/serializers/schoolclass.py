@@ -169,7 +169,9 @@ class ClassDocumentSerializer(serializers.ModelSerializer):
 class ClassAttendanceSerializer(serializers.ModelSerializer):
     present_students = StudentSerializer(many=True, read_only=True)
     taken_by = BaseUserSerializer(read_only=True)
-    attendance_rate = serializers.FloatField(read_only=True)
+    attendance_rate = serializers.FloatField(
+        source="snapshot_attendance_rate", read_only=True
+    )
 
     class Meta:
         model = ClassAttendance
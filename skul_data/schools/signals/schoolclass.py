@@ -1,10 +1,12 @@
-from django.db.models.signals import m2m_changed
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
 from django.dispatch import receiver
 from skul_data.schools.models.schoolclass import SchoolClass
 from skul_data.users.models import User
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.action_logs.utils.signal_control import suppressible
 from skul_data.schools.models.schoolclass import ClassAttendance
+from skul_data.students.models.student import Student
 
 
 @receiver(m2m_changed, sender=SchoolClass.students.through)
@@ -35,10 +37,58 @@ def log_student_class_changes(
         )
 
 
+def _recount_attendances(attendance_ids):
+    for attendance in ClassAttendance.objects.filter(pk__in=attendance_ids):
+        attendance.recount_present_students()
+
+
 @receiver(m2m_changed, sender=ClassAttendance.present_students.through)
-def log_attendance_changes(sender, instance, action, reverse, model, pk_set, **kwargs):
+def remember_cleared_attendances(sender, instance, action, reverse, **kwargs):
+    # pk_set is empty when a student's attendances are cleared
+    if reverse and action == "pre_clear":
+        instance._cleared_attendance_ids = list(
+            instance.attendances.values_list("pk", flat=True)
+        )
+
+
+def _reverse_attendance_ids(instance, action, pk_set):
+    """Attendance records changed from the student side"""
+    if action == "post_clear":
+        return instance.__dict__.pop("_cleared_attendance_ids", [])
+    return pk_set or []
+
+
+# Connected before log_attendance_changes so the log sees the new counts
+@receiver(m2m_changed, sender=ClassAttendance.present_students.through)
+@suppressible
+def update_attendance_counts(sender, instance, action, reverse, pk_set, **kwargs):
     if action not in ["post_add", "post_remove", "post_clear"]:
         return
+    if not reverse:
+        instance.recount_present_students()
+    else:
+        _recount_attendances(_reverse_attendance_ids(instance, action, pk_set))
+
+
+@receiver(pre_delete, sender=Student)
+def remember_student_attendances(sender, instance, **kwargs):
+    # Deleting a student removes its attendance rows without m2m_changed
+    instance._deleted_attendance_ids = list(
+        instance.attendances.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Student)
+def recount_student_attendances(sender, instance, **kwargs):
+    _recount_attendances(instance.__dict__.pop("_deleted_attendance_ids", []))
+
+
+@receiver(m2m_changed, sender=ClassAttendance.present_students.through)
+@suppressible
+def log_attendance_changes(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # Only changes made through ClassAttendance.present_students are logged
+    if reverse or action not in ["post_add", "post_remove", "post_clear"]:
+        return
 
     user = getattr(instance, "_current_user", None) or User.get_current_user()
 
@@ -49,7 +99,7 @@ def log_attendance_changes(sender, instance, action, reverse, model, pk_set, **k
         obj=instance,
         metadata={
             "affected_students": list(pk_set) if pk_set else [],
-            "total_present": instance.present_students.count(),
-            "attendance_rate": instance.attendance_rate,
+            "total_present": instance.present_count,
+            "attendance_rate": instance.snapshot_attendance_rate,
         },
     )
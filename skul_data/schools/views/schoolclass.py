@@ -4,7 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, Sum
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from skul_data.schools.models.schoolclass import SchoolClass
@@ -228,11 +228,7 @@ class SchoolClassViewSet(viewsets.ModelViewSet):
                 # Process attendance records
                 for record in attendance_records[:6]:  # Limit to 6 records
                     try:
-                        present_count = (
-                            record.present_students.count()
-                            if hasattr(record, "present_students")
-                            else 0
-                        )
+                        present_count = record.present_count
                         total_count = (
                             record.total_students
                             if hasattr(record, "total_students")
@@ -259,11 +255,7 @@ class SchoolClassViewSet(viewsets.ModelViewSet):
                 latest_attendance = attendance_records.first()
                 if latest_attendance:
                     try:
-                        present_count = (
-                            latest_attendance.present_students.count()
-                            if hasattr(latest_attendance, "present_students")
-                            else 0
-                        )
+                        present_count = latest_attendance.present_count
                         total_count = (
                             latest_attendance.total_students
                             if hasattr(latest_attendance, "total_students")
@@ -442,8 +434,8 @@ class SchoolClassViewSet(viewsets.ModelViewSet):
         total_students = class_instance.students.count()
         attendance_rates = []
 
-        for record in attendance_records:
-            present_count = record.present_students.count()
+        for record in attendance_records.only("date", "present_count"):
+            present_count = record.present_count
             rate = (present_count / total_students * 100) if total_students > 0 else 0
             attendance_rates.append(
                 {
@@ -667,159 +659,118 @@ class ClassAttendanceViewSet(viewsets.ModelViewSet):
         This method handles Database notifications, WebSocket notifications,
         and Email notifications (when configured).
         """
-        from skul_data.notifications.models.notification import Notification
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
+        from skul_data.notifications.utils.notification import (
+            bulk_create_notifications,
+        )
         import logging
 
         logger = logging.getLogger(__name__)
 
-        # Get all students in the class
-        all_students = attendance.school_class.students.all()
-        present_students = set(attendance.present_students.all())
+        school_class = attendance.school_class
+        date_display = attendance.date.strftime("%B %d, %Y")
+        recorded_by = (
+            attendance.taken_by.get_full_name() if attendance.taken_by else None
+        )
 
-        # Get channel layer for WebSocket notifications
-        channel_layer = get_channel_layer()
+        # Get all students in the class with their parents and guardians
+        all_students = school_class.students.select_related(
+            "parent__user"
+        ).prefetch_related("guardians__user")
+        present_ids = set(attendance.present_students.values_list("id", flat=True))
 
-        # Notify parents of PRESENT students
-        for student in present_students:
-            parents = []
-            if student.parent:
-                parents.append(student.parent)
-            parents.extend(list(student.guardians.all()))
+        entries = []
+        emails = []
 
-            for parent in parents:
-                try:
-                    # 1. Create database notification
-                    notification = Notification.objects.create(
-                        user=parent.user,
-                        notification_type="SYSTEM",
-                        title=f"✓ Attendance Confirmed: {student.full_name}",
-                        message=(
-                            f"{student.full_name} attended {attendance.school_class.name} "
-                            f"on {attendance.date.strftime('%B %d, %Y')}.\n\n"
-                            f"Class: {attendance.school_class.name}\n"
-                            f"Time: {attendance.created_at.strftime('%I:%M %p')}\n"
-                            f"Recorded by: {attendance.taken_by.get_full_name() if attendance.taken_by else 'System'}"
-                        ),
-                        related_model="ClassAttendance",
-                        related_id=attendance.id,
-                    )
+        for student in all_students:
+            is_present = student.id in present_ids
+            absence_reason = ""
 
-                    # 2. Send WebSocket notification (real-time)
-                    if channel_layer:
-                        try:
-                            async_to_sync(channel_layer.group_send)(
-                                f"notifications_{parent.user.id}",
-                                {
-                                    "type": "notification.message",
-                                    "message": {
-                                        "id": notification.id,
-                                        "type": "SYSTEM",
-                                        "title": notification.title,
-                                        "message": notification.message,
-                                        "student_name": student.full_name,
-                                        "class_name": attendance.school_class.name,
-                                        "date": attendance.date.isoformat(),
-                                        "is_present": True,
-                                        "created_at": notification.created_at.isoformat(),
-                                    },
-                                },
+            if is_present:
+                title = f"✓ Attendance Confirmed: {student.full_name}"
+                message = (
+                    f"{student.full_name} attended {school_class.name} "
+                    f"on {date_display}.\n\n"
+                    f"Class: {school_class.name}\n"
+                    f"Time: {attendance.created_at.strftime('%I:%M %p')}\n"
+                    f"Recorded by: {recorded_by or 'System'}"
+                )
+            else:
+                # Extract absence reason for this student
+                if attendance.notes:
+                    for line in attendance.notes.split("\n"):
+                        if student.full_name in line:
+                            absence_reason = (
+                                line.split(":", 1)[1].strip() if ":" in line else ""
                             )
-                        except Exception as e:
-                            logger.warning(f"WebSocket notification failed: {str(e)}")
-
-                    # 3. Send Email notification (if configured)
-                    self._send_attendance_email(
-                        parent, student, attendance, is_present=True
-                    )
+                            break
 
-                except Exception as e:
-                    logger.error(
-                        f"Failed to notify parent {parent.user.email} about attendance: {str(e)}"
-                    )
+                title = f"⚠ Absence Alert: {student.full_name}"
+                message = (
+                    f"{student.full_name} was absent from {school_class.name} "
+                    f"on {date_display}.\n\n"
+                    f"Class: {school_class.name}\n"
+                    f"Date: {date_display}\n"
+                )
+                if absence_reason:
+                    message += f"Reason: {absence_reason}\n"
+                else:
+                    message += "Reason: Not specified\n"
 
-        # Notify parents of ABSENT students
-        absent_students = [s for s in all_students if s not in present_students]
+                message += f"\nIf this is incorrect, please contact {recorded_by or 'the school'}."
 
-        for student in absent_students:
-            # Extract absence reason for this student
-            absence_reason = ""
-            if attendance.notes:
-                for line in attendance.notes.split("\n"):
-                    if student.full_name in line:
-                        absence_reason = (
-                            line.split(":", 1)[1].strip() if ":" in line else ""
-                        )
-                        break
+            payload = {
+                "student_name": student.full_name,
+                "class_name": school_class.name,
+                "date": attendance.date.isoformat(),
+                "is_present": is_present,
+            }
+            if not is_present:
+                payload["absence_reason"] = absence_reason
 
             parents = []
             if student.parent:
                 parents.append(student.parent)
-            parents.extend(list(student.guardians.all()))
+            parents.extend(student.guardians.all())
 
             for parent in parents:
-                try:
-                    # 1. Create database notification
-                    message = (
-                        f"{student.full_name} was absent from {attendance.school_class.name} "
-                        f"on {attendance.date.strftime('%B %d, %Y')}.\n\n"
-                        f"Class: {attendance.school_class.name}\n"
-                        f"Date: {attendance.date.strftime('%B %d, %Y')}\n"
-                    )
-                    if absence_reason:
-                        message += f"Reason: {absence_reason}\n"
-                    else:
-                        message += "Reason: Not specified\n"
-
-                    message += f"\nIf this is incorrect, please contact {attendance.taken_by.get_full_name() if attendance.taken_by else 'the school'}."
-
-                    notification = Notification.objects.create(
-                        user=parent.user,
-                        notification_type="EVENT",
-                        title=f"⚠ Absence Alert: {student.full_name}",
-                        message=message,
-                        related_model="ClassAttendance",
-                        related_id=attendance.id,
-                    )
+                entries.append(
+                    {
+                        "user_id": parent.user_id,
+                        "notification_type": "SYSTEM" if is_present else "EVENT",
+                        "title": title,
+                        "message": message,
+                        "payload": payload,
+                    }
+                )
+                emails.append((parent, student, is_present, absence_reason))
 
-                    # 2. Send WebSocket notification
-                    if channel_layer:
-                        try:
-                            async_to_sync(channel_layer.group_send)(
-                                f"notifications_{parent.user.id}",
-                                {
-                                    "type": "notification.message",
-                                    "message": {
-                                        "id": notification.id,
-                                        "type": "EVENT",
-                                        "title": notification.title,
-                                        "message": notification.message,
-                                        "student_name": student.full_name,
-                                        "class_name": attendance.school_class.name,
-                                        "date": attendance.date.isoformat(),
-                                        "is_present": False,
-                                        "absence_reason": absence_reason,
-                                        "created_at": notification.created_at.isoformat(),
-                                    },
-                                },
-                            )
-                        except Exception as e:
-                            logger.warning(f"WebSocket notification failed: {str(e)}")
-
-                    # 3. Send Email notification
-                    self._send_attendance_email(
-                        parent,
-                        student,
-                        attendance,
-                        is_present=False,
-                        absence_reason=absence_reason,
-                    )
+        # 1 & 2. Database notifications in bulk, WebSocket pushes coalesced
+        # per online parent
+        try:
+            bulk_create_notifications(
+                entries,
+                related_model="ClassAttendance",
+                related_id=attendance.id,
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to create attendance notifications for {attendance}: {str(e)}"
+            )
 
-                except Exception as e:
-                    logger.error(
-                        f"Failed to notify parent {parent.user.email} about absence: {str(e)}"
-                    )
+        # 3. Send Email notifications (if configured)
+        for parent, student, is_present, absence_reason in emails:
+            try:
+                self._send_attendance_email(
+                    parent,
+                    student,
+                    attendance,
+                    is_present=is_present,
+                    absence_reason=absence_reason,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to email parent {parent.user.email} about attendance: {str(e)}"
+                )
 
     def _send_attendance_email(
         self, parent, student, attendance, is_present, absence_reason=None
@@ -1016,8 +967,8 @@ class ClassAttendanceViewSet(viewsets.ModelViewSet):
                 )
 
             # Calculate average attendance rate
-            total_present = sum(
-                record.present_students.count() for record in attendance_records
+            total_present = (
+                attendance_records.aggregate(total=Sum("present_count"))["total"] or 0
             )
             average_rate = (
                 (total_present / (total_records * total_students) * 100)
@@ -1027,15 +978,15 @@ class ClassAttendanceViewSet(viewsets.ModelViewSet):
 
             # Get recent records
             recent_records = []
-            for record in attendance_records[:10]:
-                present_count = record.present_students.count()
+            for record in attendance_records.select_related("taken_by")[:10]:
+                present_count = record.present_count
                 recent_records.append(
                     {
                         "id": record.id,
                         "date": record.date,
                         "present_count": present_count,
                         "absent_count": total_students - present_count,
-                        "attendance_rate": record.attendance_rate,
+                        "attendance_rate": record.snapshot_attendance_rate,
                         "taken_by": (
                             record.taken_by.get_full_name()
                             if record.taken_by
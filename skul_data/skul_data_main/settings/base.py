@@ -68,6 +68,7 @@ PROJECT_APPS = [
     "skul_data.fee_management",
     "skul_data.exams",
     "skul_data.kcse",
+    "skul_data.jobs",
 ]
 
 THIRD_PARTY_APPS = [
@@ -88,7 +89,7 @@ INSTALLED_APPS = DJANGO_APPS + PROJECT_APPS + THIRD_PARTY_APPS
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "skul_data.users.utils.authentication.IdentityJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
@@ -136,10 +137,10 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "skul_data.users.middleware.request_context.RequestContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "skul_data.action_logs.middleware.action_log.ActionLogMiddleware",
-    "skul_data.users.models.base_user.CurrentUserMiddleware",
 ]
 
 ROOT_URLCONF = "skul_data.skul_data_main.urls"
@@ -181,6 +182,33 @@ CHANNEL_LAYERS = {
         "BACKEND": "channels.layers.InMemoryChannelLayer",
     },
 }
+
+# Cache configuration. Shared runtime state (WebSocket presence, refreshed
+# analytics, calendar feeds, job progress) lives here, so set CACHE_URL to a
+# Redis instance whenever Celery or more than one worker runs. Without it the
+# notifications.W001 check and a runtime warning flag the per-process cache.
+CACHE_URL = config("CACHE_URL", default="")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
+# Seconds before a WebSocket presence counter expires if never decremented;
+# open sockets extend it on every heartbeat or message they send
+NOTIFICATION_PRESENCE_TIMEOUT = 60 * 60 * 12
+
+# Seconds a cached unread counter lives before it is recounted from the database
+UNREAD_COUNTER_TIMEOUT = 60 * 30
+
 # Database
 
 DATABASES = {
@@ -234,6 +262,12 @@ USE_TZ = True
 STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Files produced by background jobs (e.g. large exports). Kept out of
+# MEDIA_ROOT, which is served publicly, and deleted after the retention period
+JOB_ARTIFACT_ROOT = os.path.join(BASE_DIR, "private", "job_artifacts")
+JOB_ARTIFACT_RETENTION_DAYS = 7
+# Rendered upload templates, which list parent contacts; also kept private
+TEMPLATE_CACHE_ROOT = os.path.join(BASE_DIR, "private", "template_cache")
 
 # Verify it's correct
 print(f"MEDIA_ROOT is set to: {MEDIA_ROOT}")
@@ -304,10 +338,21 @@ CELERY_BEAT_SCHEDULE = {
             hour=10, minute=0, day_of_week=1
         ),  # Every Monday at 10:00 AM
     },
+    "cleanup-job-artifacts": {
+        "task": "skul_data.jobs.utils.tasks.cleanup_job_artifacts",
+        "schedule": crontab(hour=4, minute=45),  # Daily at 4:45am
+    },
     "cleanup-expired-otps": {
         "task": "skul_data.users.tasks.cleanup_expired_otps",
         "schedule": crontab(hour=2, minute=0),  # Daily at 2:00 AM
     },
+    "reconcile-unread-counters": {
+        "task": "skul_data.notifications.utils.tasks.reconcile_unread_counters",
+        "schedule": 600.0,  # Every 10 minutes
+        "options": {
+            "expires": 300.0,
+        },
+    },
 }
 
 # Add logging to debug authentication issues
@@ -42,6 +42,8 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "mediafiles"
+JOB_ARTIFACT_ROOT = BASE_DIR / "private" / "job_artifacts"
+TEMPLATE_CACHE_ROOT = BASE_DIR / "private" / "template_cache"
 
 # Security settings for production
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -79,6 +79,7 @@ urlpatterns = [
                 path("fees/", include("skul_data.fee_management.urls")),
                 path("exams/", include("skul_data.exams.urls")),
                 path("kcse/", include("skul_data.kcse.urls")),
+                path("jobs/", include("skul_data.jobs.urls")),
             ]
         ),
     ),
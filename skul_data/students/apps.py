@@ -5,3 +5,6 @@ class StudentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "skul_data.students"
     label = "students"
+
+    def ready(self):
+        from skul_data.students.utils import tasks  # noqa
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.action_logs.utils.dirty_fields import DirtyFieldsMixin
 from django.db.models import Max
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -13,7 +14,7 @@ class StudentStatus(models.TextChoices):
     SUSPENDED = "SUSPENDED", "Suspended"
 
 
-class Student(models.Model):
+class Student(DirtyFieldsMixin, models.Model):
     first_name = models.CharField(max_length=250)
     middle_name = models.CharField(max_length=250, blank=True, null=True)
     last_name = models.CharField(max_length=250)
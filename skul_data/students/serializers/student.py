@@ -136,10 +136,11 @@ class StudentCreateSerializer(serializers.ModelSerializer):
 
 class StudentBulkCreateSerializer(serializers.Serializer):
     file = serializers.FileField()
+    background = serializers.BooleanField(default=False)
 
     def validate_file(self, value):
-        if not value.name.endswith(".csv"):
-            raise serializers.ValidationError("Only CSV files are allowed")
+        if not value.name.lower().endswith((".csv", ".xlsx")):
+            raise serializers.ValidationError("Only CSV or XLSX files are allowed")
         return value
 
 
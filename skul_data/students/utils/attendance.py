@@ -0,0 +1,191 @@
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from skul_data.analytics.utils.response_cache import invalidate_model_sections
+from skul_data.students.models.student import (
+    Student,
+    StudentAttendance,
+    AttendanceStatus,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Statuses parents are told about after a bulk register
+NOTIFY_STATUSES = {AttendanceStatus.ABSENT, AttendanceStatus.LATE}
+
+UNIQUE_FIELDS = ["student", "date"]
+UPDATE_FIELDS = ["status", "reason", "time_in", "recorded_by", "updated_at"]
+
+
+def _parse_entries(student_statuses):
+    """
+    Turn raw ``student_statuses`` into ``{student_id: entry}`` plus per-entry
+    errors. A later entry for the same student wins.
+    """
+    time_field = models.TimeField()
+    entries = {}
+    errors = []
+
+    for student_status in student_statuses:
+        raw_id = student_status.get("student_id")
+        try:
+            student_id = int(raw_id)
+        except (TypeError, ValueError):
+            errors.append({"student_id": raw_id, "error": "Invalid student_id"})
+            continue
+
+        try:
+            time_in = time_field.to_python(student_status.get("time_in") or None)
+        except ValidationError as e:
+            errors.append({"student_id": raw_id, "error": " ".join(e.messages)})
+            continue
+
+        entries[student_id] = {
+            "status": student_status["status"],
+            "reason": student_status.get("reason"),
+            "time_in": time_in,
+        }
+
+    return entries, errors
+
+
+def bulk_upsert_attendance(school, date, student_statuses, recorded_by=None):
+    """
+    Record attendance for many students on one date.
+
+    Student ids are checked against the school in one query and every row
+    is written with one ``bulk_create(update_conflicts=True)`` upsert on
+    ``(student, date)``. The created/updated counts compare the rows
+    present before and after the upsert.
+
+    Returns ``{"created", "updated", "errors", "student_ids"}``.
+    """
+    entries, errors = _parse_entries(student_statuses)
+
+    valid_ids = set(
+        Student.objects.filter(id__in=entries, school=school).values_list(
+            "id", flat=True
+        )
+    )
+    for student_id in list(entries):
+        if student_id not in valid_ids:
+            errors.append(
+                {
+                    "student_id": student_id,
+                    "error": "Student not found or not in your school",
+                }
+            )
+            del entries[student_id]
+
+    with transaction.atomic():
+        existing_ids = set(
+            StudentAttendance.objects.filter(
+                student_id__in=entries, date=date
+            ).values_list("id", flat=True)
+        )
+
+        # One INSERT ... ON CONFLICT DO UPDATE: rows another request inserted
+        # since the lookup are overwritten with this register, not dropped
+        StudentAttendance.objects.bulk_create(
+            [
+                StudentAttendance(
+                    student_id=student_id,
+                    date=date,
+                    status=entry["status"],
+                    reason=entry["reason"],
+                    time_in=entry["time_in"],
+                    recorded_by=recorded_by,
+                )
+                for student_id, entry in entries.items()
+            ],
+            update_conflicts=True,
+            unique_fields=UNIQUE_FIELDS,
+            update_fields=UPDATE_FIELDS,
+        )
+        invalidate_model_sections(StudentAttendance, school.id)
+
+        # Django 4.2 returns no ids for upserts, so count the rows written:
+        # every row now present that was not there before was inserted
+        written = set(
+            StudentAttendance.objects.filter(
+                student_id__in=entries, date=date
+            ).values_list("id", flat=True)
+        )
+
+    created = len(written - existing_ids)
+    return {
+        "created": created,
+        "updated": len(written) - created,
+        "errors": errors,
+        "student_ids": list(entries),
+    }
+
+
+def build_attendance_notifications(date, student_ids):
+    """
+    Notification entries for parents and guardians of the given students
+    who were marked absent or late on ``date``.
+    """
+    records = (
+        StudentAttendance.objects.filter(
+            student_id__in=student_ids, date=date, status__in=NOTIFY_STATUSES
+        )
+        .select_related("student__parent")
+        .prefetch_related("student__guardians")
+    )
+
+    entries = []
+    for record in records:
+        student = record.student
+        if record.status == AttendanceStatus.ABSENT:
+            title = f"⚠ Absence Alert: {student.full_name}"
+            message = (
+                f"{student.full_name} was marked absent on "
+                f"{record.date.strftime('%B %d, %Y')}."
+            )
+        else:
+            title = f"Late Arrival: {student.full_name}"
+            message = (
+                f"{student.full_name} arrived late on "
+                f"{record.date.strftime('%B %d, %Y')}"
+                + (
+                    f" at {record.time_in.strftime('%I:%M %p')}."
+                    if record.time_in
+                    else "."
+                )
+            )
+        if record.reason:
+            message += f"\nReason: {record.reason}"
+
+        parents = {}
+        if student.parent:
+            parents[student.parent.id] = student.parent
+        for guardian in student.guardians.all():
+            parents[guardian.id] = guardian
+
+        for parent in parents.values():
+            entries.append(
+                {
+                    "user_id": parent.user_id,
+                    "title": title,
+                    "message": message,
+                    "related_id": record.id,
+                    "payload": {
+                        "student_name": student.full_name,
+                        "date": record.date.isoformat(),
+                        "status": record.status,
+                    },
+                }
+            )
+    return entries
+
+
+def queue_attendance_notifications(date, student_ids):
+    """Hand the parent notification fan-out for a register to a worker"""
+    from skul_data.students.utils.tasks import notify_student_attendance_task
+
+    try:
+        notify_student_attendance_task.delay(date.isoformat(), student_ids)
+    except Exception as e:
+        logger.warning(f"Could not queue attendance notifications, sending inline: {e}")
+        notify_student_attendance_task(date.isoformat(), student_ids)
@@ -0,0 +1,278 @@
+import os
+import re
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.action_logs.utils.action_log import log_action
+from skul_data.analytics.utils.response_cache import invalidate_model_sections
+from skul_data.students.models.student import Student
+from skul_data.users.models.parent import Parent
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = getattr(settings, "STUDENT_IMPORT_CHUNK_SIZE", 500)
+
+REQUIRED_FIELDS = ["first_name", "last_name", "date_of_birth"]
+OPTIONAL_FIELDS = ["middle_name", "gender", "parent_id"]
+GENDERS = {"M", "F", "N"}
+
+MAX_LENGTHS = {
+    "first_name": Student._meta.get_field("first_name").max_length,
+    "middle_name": Student._meta.get_field("middle_name").max_length,
+    "last_name": Student._meta.get_field("last_name").max_length,
+}
+
+
+def next_admission_sequence(school, year):
+    """Return the next free admission sequence number for a school and year"""
+    last_student = (
+        Student.objects.filter(school=school, admission_date__year=year)
+        .order_by("-admission_number")
+        .first()
+    )
+    if not last_student or not last_student.admission_number:
+        return 1
+
+    match = re.search(r"(\d+)$", last_student.admission_number)
+    return int(match.group()) + 1 if match else 1
+
+
+def read_chunks(file, chunk_size=CHUNK_SIZE):
+    """
+    Yield DataFrames of at most ``chunk_size`` rows from a CSV or XLSX file,
+    without loading the whole sheet into memory. All values are strings.
+    """
+    ext = os.path.splitext(file.name)[1].lower()
+
+    if ext == ".csv":
+        yield from pd.read_csv(
+            file, dtype=str, keep_default_na=False, chunksize=chunk_size
+        )
+        return
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [str(h).strip() if h is not None else "" for h in next(rows, [])]
+        start = 0
+        batch = []
+        for row in rows:
+            batch.append(["" if v is None else str(v) for v in row])
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(
+                    batch, columns=headers, index=range(start, start + len(batch))
+                )
+                start += len(batch)
+                batch = []
+        if batch:
+            yield pd.DataFrame(
+                batch, columns=headers, index=range(start, start + len(batch))
+            )
+    finally:
+        workbook.close()
+
+
+def _normalise_chunk(df):
+    df = df.copy()
+    for column in REQUIRED_FIELDS + OPTIONAL_FIELDS:
+        if column in df.columns:
+            df[column] = df[column].astype("string").str.strip().fillna("")
+        else:
+            df[column] = ""
+
+    df["gender"] = df["gender"].str.upper().replace("", "N")
+    # Excel stores dates as datetimes; keep only the date part
+    df["dob"] = pd.to_datetime(
+        df["date_of_birth"].str[:10], format="%Y-%m-%d", errors="coerce"
+    ).dt.date
+    df["parent"] = pd.to_numeric(
+        df["parent_id"].where(df["parent_id"].str.fullmatch(r"\d+")), errors="coerce"
+    )
+    return df
+
+
+class StudentImporter:
+    """
+    High-throughput student import.
+
+    Each chunk is validated column-wide, parents and duplicates are resolved
+    with one query each, students are inserted with ``bulk_create`` inside a
+    transaction and one summary action log is written per chunk.
+    """
+
+    def __init__(self, school, user=None, chunk_size=CHUNK_SIZE):
+        self.school = school
+        self.user = user
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.errors = []
+        self.total_rows = 0
+        self.seen = set()
+        self.year = timezone.now().year
+        self.next_sequence = None
+        self.source = "CSV"
+
+    def run(self, file):
+        self.source = os.path.splitext(file.name)[1].lstrip(".").upper() or "CSV"
+        for chunk in read_chunks(file, self.chunk_size):
+            self.import_chunk(chunk)
+        return self.result()
+
+    def result(self):
+        return {
+            "created": self.created,
+            "errors": self.errors,
+            "total_rows": self.total_rows,
+        }
+
+    def validate_chunk(self, df):
+        """Return ``(valid_df, errors)`` for a normalised chunk"""
+        errors = {}
+
+        def reject(mask, make_error):
+            for index in df.index[mask & ~df.index.isin(list(errors))]:
+                errors[index] = make_error(df.loc[index])
+
+        missing = pd.DataFrame({f: df[f] == "" for f in REQUIRED_FIELDS})
+        reject(
+            missing.any(axis=1),
+            lambda row: "Missing required fields: "
+            + ", ".join(f for f in REQUIRED_FIELDS if row[f] == ""),
+        )
+        reject(
+            df["dob"].isna(),
+            lambda row: f"Invalid date_of_birth '{row['date_of_birth']}', expected YYYY-MM-DD",
+        )
+        reject(
+            ~df["gender"].isin(GENDERS),
+            lambda row: f"Invalid gender '{row['gender']}'",
+        )
+        for field, max_length in MAX_LENGTHS.items():
+            reject(
+                df[field].str.len() > max_length,
+                lambda row, field=field, max_length=max_length: (
+                    f"{field} must be at most {max_length} characters"
+                ),
+            )
+        reject(
+            (df["parent_id"] != "") & df["parent"].isna(),
+            lambda row: f"Invalid parent_id '{row['parent_id']}'",
+        )
+
+        # Parents must exist in the importing school
+        parent_ids = {int(pid) for pid in df["parent"].dropna()}
+        valid_parents = set(
+            Parent.objects.filter(id__in=parent_ids, school=self.school).values_list(
+                "id", flat=True
+            )
+        )
+        reject(
+            df["parent"].notna() & ~df["parent"].isin(valid_parents),
+            lambda row: f"Parent {row['parent_id']} not found in your school",
+        )
+
+        # Duplicates within the file and against existing students
+        keys = list(zip(df["first_name"], df["last_name"], df["dob"]))
+        existing = set(
+            Student.objects.filter(
+                school=self.school,
+                first_name__in={k[0] for k in keys},
+                last_name__in={k[1] for k in keys},
+                date_of_birth__in={k[2] for k in keys if pd.notna(k[2])},
+            ).values_list("first_name", "last_name", "date_of_birth")
+        )
+        duplicate = []
+        for index, key in zip(df.index, keys):
+            duplicate.append(key in existing or key in self.seen)
+            if index not in errors:
+                self.seen.add(key)
+        reject(
+            pd.Series(duplicate, index=df.index),
+            lambda row: "Student with this name and date of birth already exists",
+        )
+
+        return df[~df.index.isin(list(errors))], errors
+
+    def import_chunk(self, chunk):
+        df = _normalise_chunk(chunk)
+        self.total_rows += len(df)
+        valid, errors = self.validate_chunk(df)
+
+        students = []
+        if len(valid):
+            try:
+                students = self.create_students(valid)
+            except Exception as e:
+                # The chunk was rolled back; report every row in it
+                logger.error(f"Student import chunk failed: {str(e)}")
+                self.next_sequence = None
+                errors.update({index: str(e) for index in valid.index})
+            self.created += len(students)
+
+        chunk_errors = [
+            {
+                "row": index + 1,
+                "error": error,
+                "data": chunk.loc[index].to_dict(),
+            }
+            for index, error in sorted(errors.items())
+        ]
+        self.errors.extend(chunk_errors)
+
+        first_row = int(df.index[0]) + 1 if len(df) else 0
+        log_action(
+            self.user,
+            f"Bulk created {len(students)} students via {self.source}",
+            ActionCategory.CREATE,
+            None,
+            {
+                "created_count": len(students),
+                "error_count": len(chunk_errors),
+                "rows": f"{first_row}-{first_row + len(df) - 1}",
+                "student_ids": [student.id for student in students],
+                "errors": chunk_errors[:10],  # Log first 10 errors to avoid huge logs
+            },
+        )
+        return students
+
+    def create_students(self, df):
+        with transaction.atomic():
+            if self.next_sequence is None:
+                self.next_sequence = next_admission_sequence(self.school, self.year)
+            sequence = self.next_sequence
+            today = timezone.now().date()
+
+            students = []
+            for row in df.to_dict("records"):
+                students.append(
+                    Student(
+                        first_name=row["first_name"],
+                        middle_name=row["middle_name"] or None,
+                        last_name=row["last_name"],
+                        date_of_birth=row["dob"],
+                        gender=row["gender"],
+                        parent_id=(
+                            int(row["parent"]) if pd.notna(row["parent"]) else None
+                        ),
+                        school=self.school,
+                        status="ACTIVE",
+                        admission_date=today,
+                        admission_number=f"{self.school.code}-{self.year}-{sequence:04d}",
+                    )
+                )
+                sequence += 1
+
+            Student.objects.bulk_create(students)
+            invalidate_model_sections(Student, self.school.id)
+
+        self.next_sequence = sequence
+        return students
+
+
+def import_students(file, school, user=None, chunk_size=CHUNK_SIZE):
+    """Import students from a CSV or XLSX file. See StudentImporter."""
+    return StudentImporter(school, user=user, chunk_size=chunk_size).run(file)
@@ -0,0 +1,59 @@
+from celery import shared_task
+from django.core.files.storage import default_storage
+from skul_data.schools.models.school import School
+from skul_data.students.utils.student_import import import_students
+from skul_data.users.models.base_user import User
+from skul_data.users.utils.request_context import request_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="skul_data.students.utils.tasks.import_students_task")
+def import_students_task(file_path, school_id, user_id=None):
+    """
+    Run a student import in the background, e.g. for whole-school
+    onboarding files. The uploaded file is removed once processed.
+    """
+    try:
+        school = School.objects.get(id=school_id)
+        user = User.objects.filter(id=user_id).first() if user_id else None
+
+        with request_context(user=user, school=school), default_storage.open(
+            file_path, "rb"
+        ) as file:
+            file.name = file_path
+            result = import_students(file, school, user=user)
+
+        logger.info(
+            f"Imported {result['created']} students for {school.name} "
+            f"({len(result['errors'])} errors)"
+        )
+        return {"status": "success", **result}
+    except Exception as e:
+        logger.error(f"Background student import failed: {str(e)}")
+        return {"status": "error", "error": str(e)}
+    finally:
+        default_storage.delete(file_path)
+
+
+@shared_task(name="skul_data.students.utils.tasks.notify_student_attendance_task")
+def notify_student_attendance_task(date, student_ids):
+    """
+    Notify parents of absent or late students after a bulk register, as one
+    bulk notification write and one WebSocket fan-out.
+    """
+    from skul_data.notifications.utils.notification import (
+        bulk_create_notifications,
+    )
+    from skul_data.students.utils.attendance import build_attendance_notifications
+
+    try:
+        entries = build_attendance_notifications(date, student_ids)
+        result = bulk_create_notifications(
+            entries, notification_type="EVENT", related_model="StudentAttendance"
+        )
+        return {"status": "success", "created": result["created"]}
+    except Exception as e:
+        logger.error(f"Attendance notification fan-out failed: {str(e)}")
+        return {"status": "error", "error": str(e)}
@@ -27,8 +27,7 @@ from skul_data.students.serializers.student import (
     BulkAttendanceSerializer,
 )
 from django.db.models import Q, Count
-from io import TextIOWrapper
-import csv
+from django.core.files.storage import default_storage
 from django.utils import timezone
 from django_filters import rest_framework as filters
 from django_filters.rest_framework import DjangoFilterBackend
@@ -36,8 +35,17 @@ from skul_data.users.models.base_user import User
 from skul_data.action_logs.models.action_log import ActionCategory
 from skul_data.action_logs.utils.action_log import log_action
 from rest_framework.permissions import OR
-from django.db import models
+from django.db import models, transaction
 from skul_data.schools.models.school import School
+from skul_data.students.utils.student_import import import_students
+from skul_data.students.utils.attendance import (
+    bulk_upsert_attendance,
+    queue_attendance_notifications,
+)
+from skul_data.students.utils.tasks import import_students_task
+from datetime import datetime
+import os
+import uuid
 
 
 class StudentFilter(filters.FilterSet):
@@ -290,58 +298,30 @@ class StudentViewSet(viewsets.ModelViewSet):
         serializer = StudentBulkCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        csv_file = TextIOWrapper(
-            serializer.validated_data["file"].file, encoding="utf-8"
-        )
-        reader = csv.DictReader(csv_file)
-
-        created = 0
-        errors = []
-        row_num = 0
+        upload = serializer.validated_data["file"]
+        school = request.user.school
 
-        for row_num, row in enumerate(reader, start=1):
-            try:
-                # Map CSV row to student data - Remove school from data
-                # Let the serializer handle school assignment
-                student_data = {
-                    "first_name": row["first_name"],
-                    "last_name": row["last_name"],
-                    "date_of_birth": row["date_of_birth"],
-                    "gender": row["gender"],
-                    "parent_id": row["parent_id"],
-                    # Don't include school here - let perform_create handle it
-                }
-
-                # Create student with proper context - but don't use perform_create
-                # to avoid individual logging for each student
-                student_serializer = StudentCreateSerializer(
-                    data=student_data, context={"request": request}
-                )
-                student_serializer.is_valid(raise_exception=True)
-                # Save directly with school assignment
-                student_serializer.save(school=request.user.school)
-                created += 1
+        if serializer.validated_data["background"]:
+            # Large onboarding files are imported by a worker
+            ext = os.path.splitext(upload.name)[1].lower()
+            file_path = default_storage.save(
+                f"student_imports/{uuid.uuid4().hex}{ext}", upload
+            )
+            task = import_students_task.delay(file_path, school.id, request.user.id)
+            return Response(
+                {"task_id": str(task.id), "status": "queued"},
+                status=status.HTTP_202_ACCEPTED,
+            )
 
-            except Exception as e:
-                errors.append({"row": row_num, "error": str(e), "data": row})
-
-        # Log the bulk create action
-        log_action(
-            request.user,
-            f"Bulk created {created} students via CSV",
-            ActionCategory.CREATE,
-            None,
-            {
-                "created_count": created,
-                "error_count": len(errors),
-                "total_rows": row_num,
-                "errors": errors[:10],  # Log first 10 errors to avoid huge logs
-            },
-        )
+        result = import_students(upload, school, user=request.user)
 
         return Response(
-            {"created": created, "errors": errors, "total_rows": row_num},
-            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+            result,
+            status=(
+                status.HTTP_201_CREATED
+                if result["created"]
+                else status.HTTP_400_BAD_REQUEST
+            ),
         )
 
     @action(detail=False, methods=["get"])
@@ -627,54 +607,25 @@ class StudentAttendanceViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         date = serializer.validated_data["date"]
+        if isinstance(date, datetime):
+            # The serializer default is timezone.now
+            date = timezone.localtime(date).date()
         student_statuses = serializer.validated_data["student_statuses"]
 
-        created = 0
-        updated = 0
-        errors = []
-
-        for student_status in student_statuses:
-            try:
-                student_id = student_status["student_id"]
-                status = student_status["status"]
-                reason = student_status.get("reason")
-                time_in = student_status.get("time_in")
-
-                # Check if student exists and belongs to user's school
-                try:
-                    student = Student.objects.get(
-                        id=student_id, school=request.user.school
-                    )
-                except Student.DoesNotExist:
-                    errors.append(
-                        {
-                            "student_id": student_id,
-                            "error": "Student not found or not in your school",
-                        }
-                    )
-                    continue
-
-                # Try to update existing attendance record or create new one
-                attendance, is_new = StudentAttendance.objects.update_or_create(
-                    student=student,
-                    date=date,
-                    defaults={
-                        "status": status,
-                        "reason": reason,
-                        "time_in": time_in,
-                        "recorded_by": request.user,
-                    },
-                )
-
-                if is_new:
-                    created += 1
-                else:
-                    updated += 1
+        result = bulk_upsert_attendance(
+            request.user.school, date, student_statuses, recorded_by=request.user
+        )
+        created = result["created"]
+        updated = result["updated"]
+        errors = result["errors"]
+
+        # Parents of absent/late students are notified by a worker once the
+        # register is committed
+        if result["student_ids"]:
+            transaction.on_commit(
+                lambda: queue_attendance_notifications(date, result["student_ids"])
+            )
 
-            except Exception as e:
-                errors.append(
-                    {"student_id": student_status.get("student_id"), "error": str(e)}
-                )
         log_action(
             request.user,
             f"Recorded bulk attendance for {date} - {created} created, {updated} updated",
@@ -1,7 +1,7 @@
 import uuid
 import time
 from django.db import transaction
-from django.test import TestCase
+from django.test import TestCase, SimpleTestCase
 from django.utils import timezone
 from datetime import timedelta
 from skul_data.action_logs.models.action_log import ActionLog, ActionCategory
@@ -18,6 +18,14 @@ from skul_data.action_logs.utils.action_log import (
     set_test_mode,
 )
 from skul_data.documents.models.document import DocumentShareLink
+from skul_data.students.models.student import Student
+from skul_data.action_logs.utils.signal_control import (
+    suppress_signals,
+    suppressible,
+)
+from django.dispatch import Signal
+import threading
+from skul_data.users.models.base_user import User
 
 
 class LogActionUtilityTest(TestCase):
@@ -256,4 +264,62 @@ class LogActionUtilityTest(TestCase):
         self.assertEqual(log.metadata["expires_in_days"], 7)
 
 
+class DirtyFieldsMixinTest(TestCase):
+    def setUp(self):
+        self.school, self.admin_user = create_test_school()
+        self.student = create_test_student(self.school)
+
+    def test_changed_fields_come_from_load_snapshot(self):
+        user = User.objects.get(pk=self.admin_user.pk)
+        user.first_name = "Changed"
+        user.email = "changed@example.com"
+        self.assertEqual(user.get_dirty_fields(), ["first_name", "email"])
+
+        user.save()
+        self.assertEqual(user._changed_fields, ["first_name", "email"])
+        # The snapshot moves forward after saving
+        self.assertEqual(user.get_dirty_fields(), [])
+
+    def test_update_fields_only_compares_written_fields(self):
+        student = Student.objects.get(pk=self.student.pk)
+        student.first_name = "Renamed"
+        student.last_name = "Unsaved"
+        student.save(update_fields=["first_name"])
+
+        self.assertEqual(student._changed_fields, ["first_name"])
+        self.assertEqual(student.get_dirty_fields(), ["last_name"])
+
+    def test_refresh_from_db_resets_snapshot(self):
+        student = Student.objects.get(pk=self.student.pk)
+        Student.objects.filter(pk=student.pk).update(first_name="Elsewhere")
+        student.refresh_from_db()
+
+        self.assertEqual(student.get_dirty_fields(), [])
+
+
+class SignalControlTest(SimpleTestCase):
+    def setUp(self):
+        self.signal = Signal()
+        self.received = []
+
+        @suppressible
+        def on_change(sender, value, **kwargs):
+            self.received.append(value)
+
+        self.receiver = on_change
+        self.signal.connect(on_change, weak=False)
+
+    def test_suppression_only_affects_current_thread(self):
+        with suppress_signals(self.receiver):
+            self.signal.send(sender=None, value=1)
+            worker = threading.Thread(
+                target=lambda: self.signal.send(sender=None, value=2)
+            )
+            worker.start()
+            worker.join()
+        self.signal.send(sender=None, value=3)
+
+        self.assertEqual(self.received, [2, 3])
+
+
 # python manage.py test skul_data.tests.action_logs_tests.test_action_logs_utils
@@ -34,6 +34,19 @@ from skul_data.documents.models.document import Document
 from skul_data.reports.models.report import GeneratedReport
 from skul_data.users.models.school_admin import SchoolAdmin
 from skul_data.schools.models.schoolclass import ClassAttendance
+from skul_data.analytics.utils import response_cache
+from skul_data.analytics.utils.analytics_generator import (
+    ANALYTICS_SECTIONS,
+    DOCUMENT_ACCESS_BY_ROLE,
+    DOCUMENT_DOWNLOAD_FREQUENCY,
+    DOCUMENT_TYPES_DISTRIBUTION,
+    UPLOADS_BY_USER,
+)
+from skul_data.students.utils.attendance import bulk_upsert_attendance
+from skul_data.analytics.utils.metric_planner import Metric, run_metric, run_metrics
+from django.db.models import Count
+from django.core.cache import cache
+from unittest import mock
 
 
 class AnalyticsUtilsTest(TestCase):
@@ -307,4 +320,153 @@ class AnalyticsUtilsTest(TestCase):
         self.assertEqual(result[0]["login_count"], 1)
 
 
+class AnalyticsResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.school, self.admin = create_test_school()
+        self.builder = mock.Mock(side_effect=lambda school, filters: {"n": 1})
+        patcher = mock.patch.dict(ANALYTICS_SECTIONS, {"documents": self.builder})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_requests_hit_the_cache(self):
+        filters = {"date_range": "last_30_days", "class_id": None}
+
+        data, outcome = response_cache.get_section(self.school, "documents", filters)
+        self.assertEqual((data, outcome), ({"n": 1}, response_cache.MISS))
+
+        # Same filters in another order, with empty values dropped
+        data, outcome = response_cache.get_section(
+            self.school, "documents", {"category": "", "date_range": "last_30_days"}
+        )
+        self.assertEqual((data, outcome), ({"n": 1}, response_cache.HIT))
+        self.assertEqual(self.builder.call_count, 1)
+
+        metrics = response_cache.get_cache_metrics()["documents"]
+        self.assertEqual(metrics[response_cache.HIT], 1)
+        self.assertEqual(metrics[response_cache.MISS], 1)
+
+    def test_domain_changes_invalidate_the_section(self):
+        response_cache.get_section(self.school, "documents", {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_test_document(self.school, self.admin)
+
+        _, outcome = response_cache.get_section(self.school, "documents", {})
+        self.assertEqual(outcome, response_cache.MISS)
+        self.assertEqual(self.builder.call_count, 2)
+
+    @mock.patch.object(response_cache, "cache_is_shared", return_value=True)
+    @mock.patch("skul_data.analytics.utils.tasks.refresh_analytics_section.delay")
+    def test_expired_entries_are_served_stale_and_refreshed(self, delay, _):
+        with mock.patch.object(response_cache, "FRESH_TIMEOUT", -1):
+            response_cache.get_section(self.school, "documents", {})
+
+        data, outcome = response_cache.get_section(self.school, "documents", {})
+        response_cache.get_section(self.school, "documents", {})
+
+        self.assertEqual((data, outcome), ({"n": 1}, response_cache.STALE))
+        # Only one refresh is scheduled while it is pending
+        delay.assert_called_once_with(self.school.id, "documents", {})
+        self.assertEqual(self.builder.call_count, 1)
+
+    @mock.patch("skul_data.analytics.utils.tasks.refresh_analytics_section.delay")
+    def test_expired_entries_are_rebuilt_inline_with_local_cache(self, delay):
+        with mock.patch.object(response_cache, "FRESH_TIMEOUT", -1):
+            response_cache.get_section(self.school, "documents", {})
+
+        self.builder.side_effect = lambda school, filters: {"n": 2}
+        data, outcome = response_cache.get_section(self.school, "documents", {})
+
+        # A worker's refresh would never reach this process's cache
+        self.assertEqual((data, outcome), ({"n": 2}, response_cache.STALE))
+        delay.assert_not_called()
+        _, outcome = response_cache.get_section(self.school, "documents", {})
+        self.assertEqual(outcome, response_cache.HIT)
+
+    def test_bulk_attendance_upsert_invalidates_students(self):
+        student = create_test_student(self.school)
+        builder = mock.Mock(return_value={"n": 1})
+        with mock.patch.dict(ANALYTICS_SECTIONS, {"students": builder}):
+            response_cache.get_section(self.school, "students", {})
+
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_upsert_attendance(
+                    self.school,
+                    timezone.now().date(),
+                    [{"student_id": student.id, "status": "PRESENT"}],
+                )
+
+            _, outcome = response_cache.get_section(self.school, "students", {})
+        self.assertEqual(outcome, response_cache.MISS)
+
+
+class MetricPlannerTest(TestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+        self.first = create_test_document(self.school, self.admin, title="First")
+        self.second = create_test_document(
+            self.school, self.admin, title="Second", category_name="Notes"
+        )
+        self.content_type = ContentType.objects.get_for_model(Document)
+        for category, document in [
+            (ActionCategory.DOWNLOAD, self.first),
+            (ActionCategory.DOWNLOAD, self.first),
+            (ActionCategory.VIEW, self.second),
+            (ActionCategory.LOGIN, None),
+        ]:
+            create_test_action_log(
+                user=self.admin,
+                category=category,
+                content_type=self.content_type if document else None,
+                object_id=document.id if document else None,
+            )
+        self.date_filter = get_date_filter({"date_range": "monthly"})
+
+    def test_metrics_on_one_table_share_a_query(self):
+        metrics = [
+            DOCUMENT_DOWNLOAD_FREQUENCY,
+            DOCUMENT_ACCESS_BY_ROLE,
+            DOCUMENT_TYPES_DISTRIBUTION,
+            UPLOADS_BY_USER,
+        ]
+        # One scan of ActionLog and one of Document
+        with self.assertNumQueries(2):
+            merged = run_metrics(metrics, self.school, self.date_filter)
+
+        for metric in metrics:
+            self.assertEqual(
+                merged[metric.name],
+                run_metric(metric, self.school, self.date_filter),
+            )
+
+        self.assertEqual(
+            merged["download_frequency"],
+            [
+                {
+                    "document__title": "First",
+                    "document__category__name": "Test Category",
+                    "download_count": 2,
+                }
+            ],
+        )
+        self.assertEqual(
+            merged["access_by_role"],
+            [{"user__user_type": self.admin.user_type, "access_count": 3}],
+        )
+        self.assertEqual(
+            sorted(row["count"] for row in merged["types_distribution"]), [1, 1]
+        )
+
+    def test_non_additive_aggregates_are_rejected(self):
+        with self.assertRaises(ValueError):
+            Metric(
+                "users",
+                Document,
+                where=lambda school, date_filter: None,
+                group_by=["category__name"],
+                aggregates={"uploaders": Count("uploaded_by", distinct=True)},
+            )
+
+
 # python manage.py test skul_data.tests.analytics_tests.test_analytics_utils
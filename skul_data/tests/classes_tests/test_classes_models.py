@@ -1,5 +1,7 @@
 from django.test import TestCase
 import os
+from importlib import import_module
+from django.apps import apps
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
@@ -30,6 +32,8 @@ from skul_data.action_logs.models.action_log import ActionCategory
 from skul_data.action_logs.utils.action_log import set_test_mode
 from django.test import TransactionTestCase
 from unittest import mock
+from io import StringIO
+from django.core.management import call_command
 
 
 class SchoolClassModelTest(TransactionTestCase):
@@ -86,7 +90,7 @@ class SchoolClassModelTest(TransactionTestCase):
 
     def test_student_count_property(self):
         # Set current user for any logging
-        User._current_user = self.admin_user
+        User.set_current_user(self.admin_user)
         SchoolClass._current_user = self.admin_user
 
         school_class = SchoolClass.objects.create(**self.class_data)
@@ -421,7 +425,7 @@ class ClassAttendanceModelTest(TransactionTestCase):
 
         # Set current user
         ClassAttendance._current_user = self.user
-        User._current_user = self.user
+        User.set_current_user(self.user)
 
         self.student = create_test_student(self.school)
         self.school_class = SchoolClass.objects.create(
@@ -452,7 +456,7 @@ class ClassAttendanceModelTest(TransactionTestCase):
 
         self.assertEqual(attendance.school_class, self.school_class)
         self.assertEqual(attendance.present_students.count(), 1)
-        self.assertEqual(attendance.attendance_rate, 100.0)
+        self.assertEqual(attendance.snapshot_attendance_rate, 100.0)
 
     def test_unique_constraint(self):
         date = timezone.now().date()
@@ -538,6 +542,131 @@ class ClassAttendanceModelTest(TransactionTestCase):
         self.assertEqual(logs.count(), 1)  # Should only be one log now
 
 
+class ClassAttendanceCountTest(TestCase):
+    def setUp(self):
+        # A user left over from another test would fail the log's FK
+        User.set_current_user(None)
+        set_test_mode(True)
+        self.school, self.admin_user = create_test_school()
+        self.user = User.objects.create_user(
+            email="counts@test.com", password="testpass", username="countsuser"
+        )
+        User.set_current_user(self.user)
+
+        self.student = create_test_student(self.school)
+        self.school_class = SchoolClass.objects.create(
+            name="Grade 1",
+            grade_level="Grade 1",
+            school=self.school,
+            academic_year="2023-2024",
+        )
+        self.school_class.students.add(self.student)
+
+    def tearDown(self):
+        set_test_mode(False)
+        User.set_current_user(None)
+
+    def test_present_count_follows_m2m_changes(self):
+        student2 = create_test_student(self.school, first_name="Jane")
+        self.school_class.students.add(student2)
+        attendance = ClassAttendance.objects.create(
+            school_class=self.school_class,
+            date=timezone.now().date(),
+            taken_by=self.user,
+        )
+
+        attendance.present_students.add(self.student, student2)
+        self.assertEqual(attendance.present_count, 2)
+        self.assertEqual(attendance.snapshot_attendance_rate, 100.0)
+
+        attendance.present_students.remove(student2)
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.present_count, 1)
+        self.assertEqual(attendance.snapshot_attendance_rate, 50.0)
+
+        # Changes made from the student side
+        student2.attendances.add(attendance)
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.present_count, 2)
+
+        student2.attendances.clear()
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.present_count, 1)
+
+    def test_update_attendance_stores_counts(self):
+        student2 = create_test_student(self.school, first_name="Jane")
+        self.school_class.students.add(student2)
+        attendance = ClassAttendance.objects.create(
+            school_class=self.school_class,
+            date=timezone.now().date(),
+            taken_by=self.user,
+        )
+
+        attendance.update_attendance([self.student.id], user=self.user)
+
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.present_count, 1)
+        self.assertEqual(attendance.snapshot_attendance_rate, 50.0)
+
+    def test_save_keeps_counts_written_since_load(self):
+        attendance = ClassAttendance.objects.create(
+            school_class=self.school_class,
+            date=timezone.now().date(),
+            taken_by=self.user,
+        )
+        stale = ClassAttendance.objects.get(pk=attendance.pk)
+        attendance.present_students.add(self.student)
+
+        stale.notes = "Edited"
+        stale.save()
+
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.notes, "Edited")
+        self.assertEqual(attendance.present_count, 1)
+        self.assertEqual(attendance.snapshot_attendance_rate, 100.0)
+
+    def test_recount_fixes_stale_rows(self):
+        attendance = ClassAttendance.objects.create(
+            school_class=self.school_class,
+            date=timezone.now().date(),
+            taken_by=self.user,
+        )
+        attendance.present_students.add(self.student)
+        ClassAttendance.objects.filter(pk=attendance.pk).update(
+            present_count=0, snapshot_attendance_rate=0
+        )
+
+        out = StringIO()
+        call_command("backfill_attendance_counts", stdout=out)
+
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.present_count, 1)
+        self.assertEqual(attendance.snapshot_attendance_rate, 100.0)
+        self.assertIn("Updated 1 of 1", out.getvalue())
+        # Nothing left to fix
+        self.assertEqual(ClassAttendance.recount(), 0)
+
+    def test_migration_backfills_existing_rows(self):
+        backfill = import_module(
+            "skul_data.schools.migrations.0016_backfill_attendance_counts"
+        ).backfill_attendance_counts
+        attendance = ClassAttendance.objects.create(
+            school_class=self.school_class,
+            date=timezone.now().date(),
+            taken_by=self.user,
+        )
+        attendance.present_students.add(self.student)
+        ClassAttendance.objects.filter(pk=attendance.pk).update(
+            present_count=0, snapshot_attendance_rate=0
+        )
+
+        backfill(apps, None)
+
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.present_count, 1)
+        self.assertEqual(attendance.snapshot_attendance_rate, 100.0)
+
+
 class SchoolStreamModelTest(TestCase):
     def setUp(self):
         self.school, self.admin_user = create_test_school()
@@ -1,3 +1,29 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.test import RequestFactory
+from skul_data.documents.utils import file_delivery
+from skul_data.documents.utils.file_delivery import file_response, is_new_download
+from skul_data.documents.utils import template_cache
+from skul_data.documents.utils.template_cache import (
+    CLASS_ROSTER,
+    SCHOOL_STUDENTS,
+    cached_template,
+    data_version,
+    template_download,
+    template_response,
+)
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from skul_data.tests.documents_tests.documents_factories import (
+    SchoolClassFactory,
+    StudentFactory,
+    UserFactory,
+)
+from skul_data.users.models.base_user import User
+from skul_data.users.models.parent import Parent
+import shutil
 from django.test import TestCase
 from skul_data.documents.utils.document_categories import seed_document_categories
 from skul_data.documents.models.document import DocumentCategory
@@ -42,4 +68,249 @@ class DocumentCategoriesUtilsTest(TestCase):
         self.assertEqual(DocumentCategory.objects.count(), initial_count)
 
 
+class FileDeliveryTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.media_root = tempfile.mkdtemp()
+        self.path = os.path.join(self.media_root, "reports", "report.pdf")
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"0123456789")
+        self.file = SimpleNamespace(name="reports/report.pdf", path=self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def get(self, **headers):
+        return file_response(self.factory.get("/", **headers), self.file)
+
+    def test_full_download(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn(
+            'attachment; filename="report.pdf"', response["Content-Disposition"]
+        )
+
+    def test_byte_ranges(self):
+        response = self.get(HTTP_RANGE="bytes=2-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+
+        response = self.get(HTTP_RANGE="bytes=-3")
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+
+        response = self.get(HTTP_RANGE="bytes=20-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_conditional_requests(self):
+        etag = self.get()["ETag"]
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A stale If-Range gets the whole file instead of a range
+        response = self.get(HTTP_RANGE="bytes=2-4", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_only_full_or_first_range_counts_as_download(self):
+        etag = self.get()["ETag"]
+
+        def counts(**headers):
+            request = self.factory.get("/", **headers)
+            return is_new_download(request, file_response(request, self.file))
+
+        self.assertTrue(counts())
+        self.assertTrue(counts(HTTP_RANGE="bytes=0-4"))
+        self.assertFalse(counts(HTTP_RANGE="bytes=5-"))
+        self.assertFalse(counts(HTTP_IF_NONE_MATCH=etag))
+
+        # Offloaded ranges are answered by the proxy with a 200 from us
+        with patch.object(file_delivery, "BACKEND", "x-sendfile"):
+            self.assertTrue(counts(HTTP_RANGE="bytes=0-4"))
+            self.assertFalse(counts(HTTP_RANGE="bytes=5-"))
+
+    def test_ranges_can_be_refused(self):
+        request = self.factory.get("/", HTTP_RANGE="bytes=5-")
+        with patch.object(file_delivery, "BACKEND", "x-sendfile"):
+            response = file_response(request, self.file, ranges=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("X-Sendfile"))
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Accept-Ranges"], "none")
+
+    def test_proxy_offload(self):
+        with self.settings(MEDIA_ROOT=self.media_root), patch.object(
+            file_delivery, "BACKEND", "x-accel-redirect"
+        ):
+            response = self.get()
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/reports/report.pdf"
+        )
+        self.assertEqual(response.content, b"")
+
+        with patch.object(file_delivery, "BACKEND", "x-sendfile"):
+            response = self.get()
+        self.assertEqual(response["X-Sendfile"], self.path)
+
+
+class TemplateCacheTest(TestCase):
+    def setUp(self):
+        self.cache_root = tempfile.mkdtemp()
+        storage_patch = patch.object(
+            template_cache,
+            "template_storage",
+            FileSystemStorage(location=self.cache_root),
+        )
+        self.storage = storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+        self.addCleanup(shutil.rmtree, self.cache_root, ignore_errors=True)
+        self.school_class = SchoolClassFactory()
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+        return f"render {self.renders}"
+
+    def cached(self, **params):
+        return cached_template(
+            "fee",
+            self.render,
+            "csv",
+            school_id=self.school_class.school_id,
+            class_id=self.school_class.id,
+            params=params,
+            scopes=[(CLASS_ROSTER, self.school_class.id)],
+        )
+
+    def test_templates_are_stored_outside_media_root(self):
+        root = os.path.abspath(template_cache.TEMPLATE_CACHE_ROOT)
+        self.assertNotEqual(
+            os.path.commonpath([root, os.path.abspath(settings.MEDIA_ROOT)]),
+            os.path.abspath(settings.MEDIA_ROOT),
+        )
+
+    def test_template_is_rendered_once_per_version(self):
+        name = self.cached(term="term_1")
+        self.assertEqual(self.cached(term="term_1"), name)
+        self.assertEqual(self.renders, 1)
+
+        # Other parameters get their own file
+        self.assertNotEqual(self.cached(term="term_2"), name)
+        self.assertEqual(self.renders, 2)
+
+    def test_roster_change_renders_a_new_version(self):
+        name = self.cached(term="term_1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentFactory(
+                school=self.school_class.school, student_class=self.school_class
+            )
+
+        new_name = self.cached(term="term_1")
+        self.assertNotEqual(new_name, name)
+        self.assertEqual(self.renders, 2)
+        # The superseded file is removed
+        self.assertFalse(self.storage.exists(name))
+        with self.storage.open(new_name) as f:
+            self.assertEqual(f.read(), b"render 2")
+
+    def test_template_response_revalidates(self):
+        name = self.cached(term="term_1")
+        factory = RequestFactory()
+
+        response = template_response(factory.get("/"), name, "fee.csv", "text/csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"render 1")
+        self.assertEqual(response["Content-Type"], "text/csv")
+
+        response = template_response(
+            factory.get("/", HTTP_IF_NONE_MATCH=response["ETag"]),
+            name,
+            "fee.csv",
+            "text/csv",
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def download(self, **headers):
+        return template_download(
+            RequestFactory().get("/", **headers),
+            "fee.csv",
+            "text/csv",
+            "fee",
+            self.render,
+            "csv",
+            school_id=self.school_class.school_id,
+            class_id=self.school_class.id,
+            scopes=[(CLASS_ROSTER, self.school_class.id)],
+        )
+
+    def test_download_renders_per_request_on_local_cache(self):
+        response = self.download()
+        self.assertEqual(response.content, b"render 1")
+        self.assertEqual(self.download().content, b"render 2")
+        # Nothing is written that another worker could prune or serve stale
+        self.assertFalse(os.listdir(self.cache_root))
+
+        # Unchanged content still revalidates
+        with patch.object(self, "render", return_value="render 1"):
+            response = self.download(HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    @patch.object(template_cache, "cache_is_shared", return_value=True)
+    def test_download_serves_cached_file_on_shared_cache(self, _):
+        self.assertEqual(b"".join(self.download().streaming_content), b"render 1")
+        self.assertEqual(b"".join(self.download().streaming_content), b"render 1")
+        self.assertEqual(self.renders, 1)
+
+    @patch.object(template_cache, "cache_is_shared", return_value=True)
+    def test_download_renders_again_when_file_was_pruned(self, _):
+        name = self.cached()
+        self.storage.delete(name)
+
+        with patch.object(template_cache, "cached_template", return_value=name):
+            response = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"render 2")
+
+    def test_parent_user_change_renders_a_new_version(self):
+        parent = Parent.objects.create(
+            user=UserFactory(user_type=User.PARENT),
+            school=self.school_class.school,
+        )
+        StudentFactory(
+            school=self.school_class.school,
+            student_class=self.school_class,
+            parent=parent,
+        )
+        scopes = [(CLASS_ROSTER, self.school_class.id)]
+        version = data_version(scopes)
+
+        user = User.objects.get(pk=parent.user_id)
+        user.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(data_version(scopes), version)
+
+        user.first_name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertNotEqual(data_version(scopes), version)
+
+    def test_class_rename_renders_a_new_version(self):
+        scopes = [(SCHOOL_STUDENTS, self.school_class.school_id)]
+        version = data_version(scopes)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.school_class.save()
+        self.assertEqual(data_version(scopes), version)
+
+        self.school_class.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.school_class.save()
+        self.assertNotEqual(data_version(scopes), version)
+
+
 # python manage.py test skul_data.tests.documents_tests.test_documents_utils
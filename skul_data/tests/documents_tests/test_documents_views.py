@@ -1,6 +1,7 @@
 import zipfile
 from io import BytesIO
 from datetime import timedelta
+from unittest.mock import patch
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
@@ -21,6 +22,7 @@ from skul_data.documents.models.document import (
     DocumentShareLink,
 )
 from skul_data.action_logs.models.action_log import ActionLog, ActionCategory
+from skul_data.documents.utils import file_delivery
 from skul_data.users.models import User
 from skul_data.users.models.teacher import Teacher
 
@@ -326,6 +328,23 @@ class DocumentShareLinkViewSetTest(APITestCase):
             response.status_code, [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND]
         )
 
+    def test_limited_link_counts_every_transfer(self):
+        url = reverse("documents:share-link-download", args=[self.share_link.token])
+
+        # A range past byte 0 still gets (and counts as) the whole file
+        with patch.object(file_delivery, "BACKEND", "x-accel-redirect"):
+            response = self.client.get(url, HTTP_RANGE="bytes=1-")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("X-Accel-Redirect"))
+        self.assertEqual(b"".join(response.streaming_content), b"file content")
+        self.share_link.refresh_from_db()
+        self.assertEqual(self.share_link.download_count, 1)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.share_link.refresh_from_db()
+        self.assertEqual(self.share_link.download_count, 1)
+
     def test_expired_share_link(self):
         expired_link = DocumentShareLinkFactory(
             document=self.document,
@@ -2,6 +2,7 @@ import io
 from datetime import date, timedelta, datetime
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
+from django.conf import settings
 from django.test import TestCase
 from django.utils import timezone
 from skul_data.tests.fee_management_tests.test_helpers import (
@@ -20,7 +21,15 @@ from skul_data.fee_management.utils.tasks import (
     send_fee_reminders,
     generate_fee_invoices,
     check_overdue_fees,
+    export_fee_records,
 )
+from skul_data.fee_management.utils.fee_export import (
+    EXPORT_HEADERS,
+    export_rows,
+    iter_csv,
+)
+from skul_data.jobs.models.job import BackgroundJob
+from openpyxl import load_workbook
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 
@@ -205,4 +214,49 @@ class FeeManagementTasksTest(TestCase):
         self.assertEqual(FeeReminder.objects.count(), 1)
 
 
+class FeeExportTest(TestCase):
+    def setUp(self):
+        self.test_data = create_test_school_with_fee_data()
+        self.school = self.test_data["school"]
+        self.admin = self.test_data["admin"]
+        self.fee_record = self.test_data["fee_record"]
+
+    def test_iter_csv_chunks_rows(self):
+        rows = [[i, f"name {i}"] for i in range(5)]
+        with patch("skul_data.fee_management.utils.fee_export.EXPORT_CHUNK_SIZE", 2):
+            chunks = list(iter_csv(iter(rows)))
+
+        self.assertEqual(len(chunks), 3)
+        lines = "".join(chunks).splitlines()
+        self.assertEqual(lines[0].split(",")[0], EXPORT_HEADERS[0])
+        self.assertEqual(lines[-1], "4,name 4")
+
+    def test_export_rows(self):
+        rows = list(export_rows(FeeRecord.objects.filter(id=self.fee_record.id)))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(len(rows[0]), len(EXPORT_HEADERS))
+        self.assertEqual(rows[0][0], self.fee_record.student.full_name)
+
+    def test_export_fee_records_saves_job_artifact(self):
+        job = BackgroundJob.objects.create(
+            job_type=BackgroundJob.EXPORT, owner=self.admin, school=self.school
+        )
+
+        result = export_fee_records(self.school.id, {}, "xlsx", self.admin.id, job.id)
+
+        job.refresh_from_db()
+        self.addCleanup(job.artifact.delete, save=False)
+        self.assertEqual(result["rows"], 1)
+        self.assertEqual(job.status, BackgroundJob.SUCCESS)
+        self.assertEqual(job.processed, 1)
+        # Stored under a random name outside the public media directory
+        self.assertEqual(job.artifact_name, f"fee_records_{self.school.code}.xlsx")
+        self.assertNotIn(self.school.code, job.artifact.name)
+        self.assertFalse(job.artifact.path.startswith(str(settings.MEDIA_ROOT)))
+        with job.artifact.open("rb") as artifact:
+            sheet = load_workbook(artifact).active
+            self.assertEqual(sheet.max_row, 2)
+
+
 # python manage.py test skul_data.tests.fee_management_tests.test_fee_management_tasks
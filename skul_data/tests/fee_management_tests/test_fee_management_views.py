@@ -1,6 +1,7 @@
 import io
 import csv
 from datetime import timedelta
+from unittest.mock import patch
 from decimal import Decimal
 from django.test import TestCase
 from django.urls import reverse
@@ -19,6 +20,7 @@ from skul_data.tests.fee_management_tests.test_helpers import (
 from skul_data.users.models import User
 import random
 from skul_data.fee_management.models.fee_management import FeeStructure, FeeRecord
+from skul_data.jobs.models.job import BackgroundJob
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 from io import BytesIO
@@ -209,6 +211,29 @@ class FeeRecordViewSetTest(TestCase):
         self.assertEqual(response.data[0]["term"], "term_1")
         self.assertEqual(response.data[0]["total_expected"], "15000.00")
 
+    def test_download_streams_csv(self):
+        response = self.client.get(reverse("fee-record-download"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(self.student.full_name, lines[1])
+
+    @patch("skul_data.fee_management.utils.tasks.export_fee_records.apply_async")
+    def test_download_in_background(self, mock_apply_async):
+        response = self.client.get(
+            reverse("fee-record-download"),
+            {"file_format": "xlsx", "background": "true", "status": "unpaid"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = BackgroundJob.objects.get(id=response.data["job_id"])
+        self.assertEqual(job.job_type, BackgroundJob.EXPORT)
+        kwargs = mock_apply_async.call_args.kwargs["kwargs"]
+        self.assertEqual(kwargs["params"], {"status": "unpaid"})
+        self.assertEqual(kwargs["file_format"], "xlsx")
+
 
 class FeePaymentViewSetTest(TestCase):
     def setUp(self):
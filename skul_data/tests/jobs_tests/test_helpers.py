@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.schools.models.school import School
+from skul_data.users.models.teacher import Teacher
+
+User = get_user_model()
+
+
+def create_test_school(name="Test School"):
+    unique_name = f"{name}_{timezone.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    admin_user = User.objects.create_user(
+        email=f"admin_{timezone.now().microsecond}@{unique_name.replace(' ', '').lower()}.com",
+        username=f"admin_{unique_name.lower().replace(' ', '_')}",
+        password="testpass",
+        user_type=User.SCHOOL_ADMIN,
+    )
+    school = School.objects.create(
+        name=unique_name,
+        email=f"contact_{timezone.now().microsecond}@{unique_name.replace(' ', '').lower()}.com",
+        schooladmin=admin_user,
+        code=f"{unique_name.replace(' ', '')[0:3].upper()}{timezone.now().strftime('%m%d%H%M%S')}",
+    )
+
+    from skul_data.users.models.school_admin import SchoolAdmin
+
+    SchoolAdmin.objects.create(user=admin_user, school=school, is_primary=True)
+    return school, admin_user
+
+
+def create_test_teacher(school, email="teacher@test.com"):
+    user = User.objects.create_user(
+        email=email,
+        username=email.split("@")[0],
+        password="testpass",
+        user_type=User.TEACHER,
+    )
+    return Teacher.objects.create(user=user, school=school)
+
+
+def create_test_job(owner, school, **kwargs):
+    return BackgroundJob.objects.create(
+        job_type=kwargs.pop("job_type", BackgroundJob.REPORT_GENERATION),
+        owner=owner,
+        school=school,
+        **kwargs,
+    )
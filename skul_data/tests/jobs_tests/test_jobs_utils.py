@@ -0,0 +1,123 @@
+import os
+from datetime import timedelta
+from unittest import mock
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.utils import timezone
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.jobs.utils.progress import ProgressReporter, enqueue_job
+from skul_data.jobs.utils.tasks import cleanup_job_artifacts
+from skul_data.tests.jobs_tests.test_helpers import (
+    create_test_job,
+    create_test_school,
+)
+
+
+class ProgressReporterTest(TestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+        self.job = create_test_job(self.admin, self.school)
+
+    def test_progress_writes_are_throttled(self):
+        progress = ProgressReporter(self.job, interval=60)
+        progress.start(total=100)
+
+        with mock.patch.object(BackgroundJob, "save") as save:
+            for _ in range(50):
+                progress.advance()
+            progress.advance(failed=1)
+        save.assert_not_called()
+
+        stored = BackgroundJob.objects.get(pk=self.job.pk)
+        self.assertEqual(stored.status, BackgroundJob.STARTED)
+        self.assertEqual(stored.processed, 0)
+
+        progress.succeed(result={"done": 51})
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, BackgroundJob.SUCCESS)
+        self.assertEqual((self.job.processed, self.job.failed), (51, 1))
+        self.assertEqual(self.job.result, {"done": 51})
+        self.assertEqual(self.job.percent, 100)
+        self.assertIsNotNone(self.job.finished_at)
+
+    def test_eta_is_estimated_while_running(self):
+        progress = ProgressReporter(self.job, interval=0)
+        progress.start(total=10)
+        progress.advance(count=5)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.percent, 50)
+        self.assertIsNotNone(self.job.eta)
+        self.assertGreaterEqual(self.job.eta, self.job.started_at)
+
+        progress.fail(ValueError("boom"))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, BackgroundJob.FAILURE)
+        self.assertEqual(self.job.message, "boom")
+        self.assertIsNone(self.job.eta)
+
+    @mock.patch("skul_data.jobs.utils.progress.send_to_group")
+    def test_progress_is_pushed_to_the_owner(self, send_to_group):
+        ProgressReporter(self.job).start(total=3)
+
+        group, event = send_to_group.call_args.args
+        self.assertEqual(group, f"notifications_{self.admin.id}")
+        self.assertEqual(event["type"], "job.progress")
+        self.assertEqual(event["job"]["id"], self.job.id)
+        self.assertEqual(event["job"]["total"], 3)
+
+    def test_reporter_without_job_is_a_no_op(self):
+        progress = ProgressReporter.for_job(None)
+        progress.start(total=3)
+        progress.advance()
+        progress.succeed(result={})
+        self.assertIsNone(progress.job)
+
+    def test_enqueue_job_passes_job_and_task_id(self):
+        task = mock.Mock()
+        job = enqueue_job(
+            task,
+            BackgroundJob.FEE_UPLOAD,
+            owner=self.admin,
+            school=self.school,
+            upload_log_id=7,
+        )
+
+        self.assertEqual(job.status, BackgroundJob.PENDING)
+        task.apply_async.assert_called_once_with(
+            kwargs={"upload_log_id": 7, "job_id": job.id}, task_id=job.task_id
+        )
+
+
+class CleanupJobArtifactsTest(TestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+
+    def create_finished_job(self, days_ago):
+        job = create_test_job(
+            self.admin,
+            self.school,
+            job_type=BackgroundJob.EXPORT,
+            status=BackgroundJob.SUCCESS,
+            finished_at=timezone.now() - timedelta(days=days_ago),
+        )
+        job.artifact.save("export.csv", ContentFile(b"a,b\n"))
+        self.addCleanup(job.artifact.delete, save=False)
+        return job
+
+    def test_expired_artifacts_are_deleted(self):
+        old_job = self.create_finished_job(days_ago=30)
+        old_path = old_job.artifact.path
+        recent_job = self.create_finished_job(days_ago=1)
+
+        result = cleanup_job_artifacts()
+
+        self.assertEqual(result["deleted_count"], 1)
+        old_job.refresh_from_db()
+        recent_job.refresh_from_db()
+        self.assertFalse(old_job.artifact)
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(recent_job.artifact.storage.exists(recent_job.artifact.name))
+
+
+# python manage.py test skul_data.tests.jobs_tests.test_jobs_utils
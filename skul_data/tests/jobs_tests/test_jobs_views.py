@@ -0,0 +1,86 @@
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from skul_data.jobs.models.job import BackgroundJob
+from skul_data.tests.jobs_tests.test_helpers import (
+    create_test_job,
+    create_test_school,
+    create_test_teacher,
+)
+
+
+class BackgroundJobViewSetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.school, self.admin = create_test_school()
+        self.teacher = create_test_teacher(self.school)
+        self.teacher_job = create_test_job(
+            self.teacher.user, self.school, task_id="teacher-task"
+        )
+        self.admin_job = create_test_job(
+            self.admin,
+            self.school,
+            job_type=BackgroundJob.FEE_UPLOAD,
+            total=4,
+            processed=1,
+        )
+
+    def test_users_only_see_their_own_jobs(self):
+        self.client.force_authenticate(user=self.teacher.user)
+
+        response = self.client.get(reverse("background-job-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [job["id"] for job in response.data["results"]], [self.teacher_job.id]
+        )
+
+        response = self.client.get(
+            reverse("background-job-detail", args=[self.admin_job.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_school_admin_sees_school_jobs(self):
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(
+            reverse("background-job-list"), {"job_type": BackgroundJob.FEE_UPLOAD}
+        )
+        self.assertEqual(
+            [job["id"] for job in response.data["results"]], [self.admin_job.id]
+        )
+        self.assertEqual(response.data["results"][0]["percent"], 25)
+
+    def test_report_status_reads_the_job(self):
+        self.teacher_job.status = BackgroundJob.SUCCESS
+        self.teacher_job.result = {"reports_generated": 3}
+        self.teacher_job.save()
+        self.client.force_authenticate(user=self.teacher.user)
+
+        response = self.client.get(
+            reverse("check-report-status", args=["teacher-task"])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "SUCCESS")
+        self.assertEqual(response.data["result"], {"reports_generated": 3})
+        self.assertEqual(response.data["job"]["id"], self.teacher_job.id)
+
+    def test_download_serves_the_artifact(self):
+        self.teacher_job.artifact.save("export.csv", ContentFile(b"a,b\n1,2\n"))
+        self.addCleanup(self.teacher_job.artifact.delete, save=False)
+        url = reverse("background-job-download", args=[self.teacher_job.id])
+
+        self.client.force_authenticate(user=self.teacher.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"a,b\n1,2\n")
+
+        response = self.client.get(
+            reverse("background-job-download", args=[self.admin_job.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# python manage.py test skul_data.tests.jobs_tests.test_jobs_views
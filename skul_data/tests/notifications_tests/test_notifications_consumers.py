@@ -9,8 +9,12 @@ from skul_data.notifications.consumers.consumer import (
     MessageConsumer,
 )
 from channels.routing import URLRouter
+from channels.layers import get_channel_layer
+from asgiref.sync import sync_to_async
+from skul_data.notifications.utils.presence import is_online, notification_group
 from django.urls import re_path
 import asyncio
+from unittest.mock import patch
 
 User = get_user_model()
 
@@ -106,6 +110,51 @@ class NotificationConsumerTest(TransactionTestCase):
             await comm1.disconnect()
             await comm2.disconnect()
 
+    async def test_presence_tracks_open_sockets(self):
+        group = notification_group(self.user.id)
+        communicator = await self.get_communicator(self.user.id, NotificationConsumer)
+        await communicator.connect()
+        self.assertTrue(await sync_to_async(is_online)(group))
+
+        await communicator.disconnect()
+        self.assertFalse(await sync_to_async(is_online)(group))
+
+    async def test_heartbeat_refreshes_presence(self):
+        communicator = await self.get_communicator(self.user.id, NotificationConsumer)
+        await communicator.connect()
+
+        with patch(
+            "skul_data.notifications.consumers.consumer.refresh_presence"
+        ) as mock_refresh:
+            await communicator.send_json_to({"type": "ping"})
+            response = await asyncio.wait_for(
+                communicator.receive_json_from(), timeout=1.0
+            )
+
+        self.assertEqual(response, {"type": "pong"})
+        mock_refresh.assert_called_once_with(notification_group(self.user.id))
+        await communicator.disconnect()
+
+    async def test_receive_notification_batch(self):
+        communicator = await self.get_communicator(self.user.id, NotificationConsumer)
+        await communicator.connect()
+
+        channel_layer = get_channel_layer()
+        await channel_layer.group_send(
+            notification_group(self.user.id),
+            {"type": "notification.batch", "messages": ["first", "second"]},
+        )
+
+        try:
+            response = await asyncio.wait_for(
+                communicator.receive_json_from(), timeout=1.0
+            )
+            self.assertEqual(response["messages"], ["first", "second"])
+        except asyncio.TimeoutError:
+            self.fail("Timeout waiting for batched notifications")
+        finally:
+            await communicator.disconnect()
+
 
 @override_settings(
     CHANNEL_LAYERS={
@@ -0,0 +1,359 @@
+# notifications/tests/test_utils.py
+import asyncio
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase
+from unittest.mock import patch, MagicMock
+from skul_data.notifications.models.notification import Notification, Message
+from skul_data.notifications.utils.message_buffer import (
+    MessageWriteBuffer,
+    persist_messages,
+)
+from skul_data.notifications.utils.notification import (
+    bulk_create_notifications,
+    bulk_notify_users,
+    bulk_notify_parents,
+)
+from skul_data.notifications.utils.unread_counters import (
+    NOTIFICATIONS,
+    MESSAGES,
+    PARENT_NOTIFICATIONS,
+    get_unread_count,
+    reconcile_unread_counts,
+)
+from skul_data.tests.notifications_tests.test_helpers import (
+    create_test_notification,
+    create_test_message,
+)
+from skul_data.tests.parents_tests.test_helpers import (
+    create_test_school,
+    create_test_parent,
+)
+from skul_data.users.models.parent import ParentNotification
+from skul_data.notifications.utils.presence import (
+    mark_connected,
+    mark_disconnected,
+    connection_count,
+    refresh_presence,
+    is_online,
+    online_groups,
+    send_to_group,
+    notification_group,
+    NotificationBatcher,
+)
+
+User = get_user_model()
+
+
+class PresenceRegistryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_connection_counting(self):
+        group = notification_group(1)
+        self.assertFalse(is_online(group))
+
+        self.assertEqual(mark_connected(group), 1)
+        self.assertEqual(mark_connected(group), 2)
+        self.assertEqual(connection_count(group), 2)
+
+        self.assertEqual(mark_disconnected(group), 1)
+        self.assertTrue(is_online(group))
+        self.assertEqual(mark_disconnected(group), 0)
+        self.assertFalse(is_online(group))
+
+    def test_refresh_presence_restores_expired_counter(self):
+        group = notification_group(7)
+        mark_connected(group)
+        cache.delete(f"presence:{group}")  # TTL ran out while still connected
+
+        refresh_presence(group)
+        self.assertTrue(is_online(group))
+
+        mark_connected(group)
+        refresh_presence(group)
+        self.assertEqual(connection_count(group), 2)
+
+    def test_shared_cache_check(self):
+        from skul_data.notifications.checks import shared_cache_check
+
+        self.assertEqual(
+            [warning.id for warning in shared_cache_check(None)],
+            ["notifications.W001"],
+        )
+        with self.settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                    "LOCATION": "redis://localhost:6379",
+                }
+            }
+        ):
+            self.assertEqual(shared_cache_check(None), [])
+
+    def test_disconnect_without_connect(self):
+        self.assertEqual(mark_disconnected(notification_group(99)), 0)
+        self.assertFalse(is_online(notification_group(99)))
+
+    def test_online_groups(self):
+        mark_connected(notification_group(1))
+        mark_connected(notification_group(3))
+
+        online = online_groups([notification_group(i) for i in (1, 2, 3)])
+        self.assertEqual(online, {notification_group(1), notification_group(3)})
+
+    def test_send_to_group_skips_offline_users(self):
+        channel_layer = MagicMock()
+        with patch(
+            "skul_data.notifications.utils.presence.async_to_sync"
+        ) as mock_async_to_sync:
+            sent = send_to_group(
+                notification_group(5),
+                {"type": "notification.message", "message": "hi"},
+                channel_layer=channel_layer,
+            )
+
+        self.assertFalse(sent)
+        mock_async_to_sync.assert_not_called()
+
+    def test_batcher_coalesces_per_user(self):
+        mark_connected(notification_group(1))
+        channel_layer = MagicMock()
+
+        with patch(
+            "skul_data.notifications.utils.presence.async_to_sync"
+        ) as mock_async_to_sync:
+            group_send = mock_async_to_sync.return_value
+            with NotificationBatcher(channel_layer=channel_layer) as batcher:
+                batcher.add(1, {"id": 1})
+                batcher.add(1, {"id": 2})
+                batcher.add(2, {"id": 3})  # offline
+
+        group_send.assert_called_once_with(
+            notification_group(1),
+            {"type": "notification.batch", "messages": [{"id": 1}, {"id": 2}]},
+        )
+
+    def test_batcher_single_payload_uses_message_frame(self):
+        mark_connected(notification_group(1))
+
+        with patch(
+            "skul_data.notifications.utils.presence.async_to_sync"
+        ) as mock_async_to_sync:
+            group_send = mock_async_to_sync.return_value
+            batcher = NotificationBatcher(channel_layer=MagicMock())
+            batcher.add(1, {"id": 1})
+            self.assertEqual(batcher.flush(), 1)
+
+        group_send.assert_called_once_with(
+            notification_group(1),
+            {"type": "notification.message", "message": {"id": 1}},
+        )
+
+
+class PersistMessagesTest(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user(
+            username="sender", email="sender@example.com", password="testpass"
+        )
+        self.recipient = User.objects.create_user(
+            username="recipient", email="recipient@example.com", password="testpass"
+        )
+
+    def test_persists_messages_and_notifications(self):
+        ids = persist_messages(
+            [
+                {
+                    "sender_id": self.sender.id,
+                    "recipient_id": self.recipient.id,
+                    "body": f"Message {i}",
+                    "message_type": "PARENT",
+                    "notification_title": "New message",
+                }
+                for i in range(3)
+            ]
+        )
+
+        self.assertEqual(len(ids), 3)
+        bodies = dict(Message.objects.filter(id__in=ids).values_list("id", "body"))
+        self.assertEqual(
+            [bodies[message_id] for message_id in ids],
+            ["Message 0", "Message 1", "Message 2"],
+        )
+        notifications = Notification.objects.filter(
+            user=self.recipient, related_model="Message"
+        )
+        self.assertEqual(
+            sorted(notifications.values_list("related_id", flat=True)), sorted(ids)
+        )
+
+
+class MessageWriteBufferTest(SimpleTestCase):
+    # database_sync_to_async may ping stale connections around the call
+    databases = {"default"}
+
+    async def test_submissions_are_flushed_together(self):
+        buffer = MessageWriteBuffer(interval_ms=10)
+
+        with patch(
+            "skul_data.notifications.utils.message_buffer.persist_messages",
+            return_value=[11, 12],
+        ) as mock_persist:
+            first, second = await asyncio.gather(
+                buffer.submit({"body": "first"}),
+                buffer.submit({"body": "second"}),
+            )
+
+        self.assertEqual((first, second), (11, 12))
+        mock_persist.assert_called_once_with([{"body": "first"}, {"body": "second"}])
+
+    async def test_failed_write_is_reported(self):
+        buffer = MessageWriteBuffer(interval_ms=10)
+
+        with patch(
+            "skul_data.notifications.utils.message_buffer.persist_messages",
+            side_effect=RuntimeError("db down"),
+        ):
+            with self.assertRaises(RuntimeError):
+                await buffer.submit({"body": "lost"})
+
+
+class UnreadCounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Don't attribute logs to a user left behind by an earlier test
+        User.set_current_user(None)
+        self.user = User.objects.create_user(
+            username="counter", email="counter@example.com", password="testpass"
+        )
+        create_test_notification(user=self.user)
+
+    def test_count_is_served_from_cache(self):
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
+
+    def test_create_increments_cached_count(self):
+        get_unread_count(NOTIFICATIONS, self.user.id)
+        create_test_notification(user=self.user)
+        create_test_notification(user=self.user, is_read=True)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 2)
+
+    def test_mark_read_is_reflected(self):
+        notification = Notification.objects.get(user=self.user)
+        get_unread_count(NOTIFICATIONS, self.user.id)
+
+        notification.is_read = True
+        notification.save(update_fields=["is_read"])
+
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 0)
+
+    def test_reconcile_fixes_drift(self):
+        get_unread_count(NOTIFICATIONS, self.user.id)
+        # Bypass signals so the cached value goes stale
+        Notification.objects.filter(user=self.user).update(is_read=True)
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
+
+        reconcile_unread_counts([NOTIFICATIONS])
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 0)
+
+    def test_message_counter(self):
+        message = create_test_message(recipient=self.user)
+        self.assertEqual(get_unread_count(MESSAGES, self.user.id), 1)
+        message.delete()
+        self.assertEqual(get_unread_count(MESSAGES, self.user.id), 0)
+
+
+class BulkNotificationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(
+                username=f"bulk{i}",
+                email=f"bulk{i}@example.com",
+                password="testpass",
+                first_name=f"User{i}",
+            )
+            for i in range(3)
+        ]
+
+    def test_bulk_notify_users_renders_per_recipient(self):
+        result = bulk_notify_users(
+            User.objects.filter(username__startswith="bulk").order_by("id"),
+            title="Fees due",
+            message="Hello {user.first_name}, fees for {term} are due",
+            context={"term": "Term 1"},
+            notification_type="PAYMENT",
+            push=False,
+        )
+
+        self.assertEqual(result["created"], 3)
+        self.assertEqual(len(result["ids"]), 3)
+        notifications = Notification.objects.filter(id__in=result["ids"])
+        self.assertEqual(
+            sorted(notifications.values_list("message", flat=True)),
+            [f"Hello User{i}, fees for Term 1 are due" for i in range(3)],
+        )
+        self.assertTrue(all(n.notification_type == "PAYMENT" for n in notifications))
+
+    def test_bulk_create_uses_one_insert_per_batch(self):
+        entries = [
+            {"user_id": user.id, "title": "Hi", "message": "Static"}
+            for user in self.users
+        ]
+        with self.assertNumQueries(2):
+            result = bulk_create_notifications(entries, push=False, batch_size=2)
+        self.assertEqual(result["created"], 3)
+
+    def test_counters_and_push(self):
+        user = self.users[0]
+        get_unread_count(NOTIFICATIONS, user.id)
+        mark_connected(notification_group(user.id))
+
+        with patch(
+            "skul_data.notifications.utils.presence.async_to_sync"
+        ) as mock_async_to_sync:
+            group_send = mock_async_to_sync.return_value
+            result = bulk_create_notifications(
+                [
+                    {"user_id": user.id, "title": "One", "message": "1"},
+                    {"user_id": user.id, "title": "Two", "message": "2"},
+                    {"user_id": self.users[1].id, "title": "Off", "message": "3"},
+                ],
+            )
+
+        self.assertEqual(result["pushed"], 1)
+        group_send.assert_called_once()
+        event = group_send.call_args[0][1]
+        self.assertEqual(event["type"], "notification.batch")
+        self.assertEqual([m["title"] for m in event["messages"]], ["One", "Two"])
+        self.assertEqual(get_unread_count(NOTIFICATIONS, user.id), 2)
+
+    def test_bulk_notify_parents(self):
+        school, _ = create_test_school()
+        parents = [
+            create_test_parent(school, email=f"bulkparent{i}@test.com")
+            for i in range(2)
+        ]
+        get_unread_count(PARENT_NOTIFICATIONS, parents[0].id)
+
+        result = bulk_notify_parents(
+            school.parents.all(),
+            "Dear {parent.user.first_name}, school closes early",
+            notification_type="EVENT",
+            push=False,
+        )
+
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(
+            ParentNotification.objects.filter(
+                id__in=result["ids"], notification_type="EVENT"
+            ).count(),
+            2,
+        )
+        self.assertEqual(get_unread_count(PARENT_NOTIFICATIONS, parents[0].id), 1)
+
+
+# python manage.py test skul_data.tests.notifications_tests.test_notifications_utils
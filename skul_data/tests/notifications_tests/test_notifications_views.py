@@ -69,6 +69,47 @@ class NotificationViewSetTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["unread_count"], 2)
 
+    def test_cursor_pagination(self):
+        for i in range(4):
+            create_test_notification(user=self.user, title=f"Notification {i}")
+        expected = list(
+            Notification.objects.filter(user=self.user)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+
+        url = reverse("notification-list")
+        response = self.client.get(url, {"pagination": "cursor", "page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertTrue(response.data["has_more"])
+
+        seen = [item["id"] for item in response.data["results"]]
+        next_url = response.data["next"]
+        while next_url:
+            response = self.client.get(next_url)
+            seen.extend(item["id"] for item in response.data["results"])
+            next_url = response.data["next"]
+
+        self.assertEqual(seen, expected)
+
+    def test_since_cursor_returns_newer_notifications(self):
+        url = reverse("notification-list")
+        response = self.client.get(url, {"pagination": "cursor"})
+        latest_cursor = response.data["latest_cursor"]
+
+        newer = create_test_notification(user=self.user, title="Newer")
+        response = self.client.get(url, {"since": latest_cursor})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data["results"]], [newer.id])
+        self.assertFalse(response.data["has_more"])
+
+    def test_invalid_cursor(self):
+        url = reverse("notification-list")
+        response = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class MessageViewSetTest(APITestCase):
     def setUp(self):
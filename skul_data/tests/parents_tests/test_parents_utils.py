@@ -1,10 +1,25 @@
+import pandas as pd
+from django.core import mail
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from skul_data.tests.parents_tests.test_helpers import (
     create_test_school,
     create_test_parent,
+    create_test_student,
+)
+from skul_data.users.tasks import send_parent_welcome_emails
+from skul_data.action_logs.models.action_log import ActionLog
+from skul_data.users.utils.parent_import import (
+    create_parents,
+    import_parents,
+    normalise_parent_frame,
 )
 from skul_data.users.models.base_user import User
 from skul_data.users.models.parent import Parent
+from skul_data.scheduler.models.scheduler import SchoolEvent
+from skul_data.schools.models.schoolclass import SchoolClass
+from django.utils import timezone
+from datetime import timedelta
 
 
 class ParentBulkImportUtilsTest(APITestCase):
@@ -41,4 +56,184 @@ class ParentBulkImportUtilsTest(APITestCase):
         self.assertFalse(result)
 
 
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ParentImportEngineTest(APITestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+        self.student1 = create_test_student(self.school, first_name="One")
+        self.student2 = create_test_student(self.school, first_name="Two")
+
+    def test_normalise_frame(self):
+        df = normalise_parent_frame(
+            pd.DataFrame(
+                {
+                    "email": [" a@test.com ", None],
+                    "first_name": ["A", "B"],
+                    "last_name": ["Z", "Y"],
+                    "phone_number": ["254712345678", None],
+                    "children_ids": ["1, 2;3", None],
+                }
+            )
+        )
+
+        self.assertEqual(df["email"].tolist(), ["a@test.com", ""])
+        self.assertEqual(df["phone_number"].tolist(), ["+254712345678", ""])
+        self.assertEqual(df["children_ids"].tolist(), [[1, 2, 3], []])
+
+    def test_import_creates_parents_and_links_children(self):
+        df = pd.DataFrame(
+            {
+                "email": ["p1@test.com", "p2@test.com"],
+                "first_name": ["John", "Jane"],
+                "last_name": ["Doe", "Smith"],
+                "children_ids": [
+                    str(self.student1.id),
+                    f"{self.student1.id},{self.student2.id}",
+                ],
+            }
+        )
+
+        results = import_parents(df, self.school, default_status="ACTIVE")
+
+        self.assertEqual(results["errors"], [])
+        self.assertEqual([r["row"] for r in results["success"]], [2, 3])
+        parent = Parent.objects.get(user__email="p2@test.com")
+        self.assertEqual(parent.status, "ACTIVE")
+        self.assertEqual(parent.user.user_type, User.PARENT)
+        self.assertTrue(parent.user.has_usable_password())
+        self.assertEqual(parent.children.count(), 2)
+
+    def test_per_row_errors(self):
+        existing = create_test_parent(self.school, email="taken@test.com")
+        df = pd.DataFrame(
+            {
+                "email": [
+                    "ok@test.com",
+                    "missing@test.com",
+                    existing.user.email,
+                    "not-an-email",
+                    "kids@test.com",
+                    "ok@test.com",
+                ],
+                "first_name": ["Ok", "Missing", "Taken", "Bad", "Kids", "Dup"],
+                "last_name": ["Parent", "", "Parent", "Parent", "Parent", "Parent"],
+                "children_ids": ["", "", "", "", f"{self.student1.id},99999", ""],
+            }
+        )
+
+        results = import_parents(df, self.school)
+
+        self.assertEqual(len(results["success"]), 1)
+        errors = {error["row"]: error["error"] for error in results["errors"]}
+        self.assertEqual(errors[3], "Missing required fields: last_name")
+        self.assertIn("email", errors[4])
+        self.assertIn("email", errors[5])
+        self.assertEqual(errors[6], "Invalid student IDs: [99999]")
+        self.assertIn("email", errors[7])
+        self.assertFalse(Parent.objects.filter(user__email="kids@test.com").exists())
+
+    def test_language_and_address_are_validated(self):
+        df = pd.DataFrame(
+            {
+                "email": ["lang@test.com", "addr@test.com", "ok@test.com"],
+                "first_name": ["Lang", "Addr", "Ok"],
+                "last_name": ["Parent", "Parent", "Parent"],
+                "preferred_language": ["klingon", "", "SW"],
+                "address": ["", "x" * 301, ""],
+            }
+        )
+
+        results = import_parents(df, self.school)
+
+        errors = {error["row"]: error["error"] for error in results["errors"]}
+        self.assertIn("preferred_language", errors[2])
+        self.assertIn("address", errors[3])
+        self.assertEqual(
+            Parent.objects.get(user__email="ok@test.com").preferred_language, "sw"
+        )
+
+    def test_insert_conflict_falls_back_to_rows(self):
+        df = normalise_parent_frame(
+            pd.DataFrame(
+                {
+                    "email": ["first@test.com", "race@test.com"],
+                    "first_name": ["First", "Race"],
+                    "last_name": ["Parent", "Parent"],
+                }
+            )
+        )
+        # Taken by another import after validation ran
+        create_test_parent(self.school, email="race@test.com")
+
+        created, errors = create_parents(df, self.school, "ACTIVE")
+
+        self.assertEqual([index for index, _ in created], [0])
+        self.assertEqual([error["row"] for error in errors], [3])
+        self.assertTrue(Parent.objects.filter(user__email="first@test.com").exists())
+
+    def test_imported_parents_join_event_audiences(self):
+        school_class = SchoolClass.objects.create(
+            name="Class 1", grade_level="Grade 1", school=self.school
+        )
+        self.student1.student_class = school_class
+        self.student1.save()
+        events = {}
+        for target_type in ["parents", "classes"]:
+            events[target_type] = SchoolEvent.objects.create(
+                title=f"Event for {target_type}",
+                start_datetime=timezone.now() + timedelta(days=1),
+                end_datetime=timezone.now() + timedelta(days=1, hours=2),
+                event_type="meeting",
+                target_type=target_type,
+                created_by=self.admin,
+                school=self.school,
+            )
+        events["classes"].targeted_classes.add(school_class)
+        df = pd.DataFrame(
+            {
+                "email": ["calendar@test.com"],
+                "first_name": ["Cal"],
+                "last_name": ["Endar"],
+                "children_ids": [str(self.student1.id)],
+            }
+        )
+
+        import_parents(df, self.school)
+
+        user = User.objects.get(email="calendar@test.com")
+        self.assertEqual(
+            set(SchoolEvent.objects.filter(audience=user)), set(events.values())
+        )
+
+    @override_settings(ACTION_LOG_TEST_MODE=True)
+    def test_import_writes_audit_log_per_parent(self):
+        df = pd.DataFrame(
+            {
+                "email": ["log1@test.com", "log2@test.com"],
+                "first_name": ["Log", "Log"],
+                "last_name": ["One", "Two"],
+            }
+        )
+
+        results = import_parents(df, self.school, user=self.admin)
+
+        logs = ActionLog.objects.filter(action="Created Parent", user=self.admin)
+        self.assertEqual(
+            sorted(logs.values_list("object_id", flat=True)),
+            sorted(row["parent_id"] for row in results["success"]),
+        )
+
+    def test_welcome_emails_use_one_batch(self):
+        parents = [
+            create_test_parent(self.school, email=f"welcome{i}@test.com")
+            for i in range(3)
+        ]
+
+        result = send_parent_welcome_emails([p.id for p in parents], self.school.name)
+
+        self.assertEqual(result["sent"], 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].subject, f"Welcome to {self.school.name}")
+
+
 # python manage.py test skul_data.tests.parents_tests.test_parents_utils
@@ -149,6 +149,7 @@ class ReportTasksTest(TestCase):
             term="Term 1",
             school_year="2023",
             generated_by_id=self.teacher.user.id,
+            progress=ANY,
         )
         self.assertEqual(result["reports_generated"], 1)
 
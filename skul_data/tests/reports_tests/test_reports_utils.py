@@ -1,3 +1,12 @@
+from datetime import timedelta
+from django.utils import timezone
+from skul_data.reports.models.report import GeneratedReportAccess, ReportAccessLog
+from skul_data.reports.utils.access_log import AccessLogBuffer
+from skul_data.reports.utils.completeness import completeness_matrix
+from skul_data.reports.utils.performance_upload import PerformanceUpload, grade_scores
+from skul_data.students.models.student import Student
+from skul_data.analytics.models.analytics import AnalyticsAlert
+from decimal import Decimal
 import json
 from unittest.mock import MagicMock, patch
 from io import BytesIO
@@ -235,7 +244,7 @@ class GenerateReportFunctionsTest(TestCase):
         mock_send_notification.assert_called_once_with(self.parent.user, mock_report)
 
     @patch("skul_data.reports.utils.report_generator.generate_report_for_student")
-    @patch("skul_data.reports.utils.report_generator.send_report_notification")
+    @patch("skul_data.reports.utils.report_generator.send_report_notifications")
     def test_generate_class_term_reports(self, mock_send_notification, mock_generate):
         # Create a class with academic year
         school_class = create_test_class(
@@ -454,4 +463,200 @@ class BulkReportGenerationLoggingTest(TestCase):
         print("=== Finished test_bulk_report_generation_skip_logging ===\n")
 
 
+class AccessLogBufferTest(TestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+        self.parent = create_test_parent(self.school)
+        template = create_test_report_template(
+            school=self.school, created_by=self.admin
+        )
+        self.report = create_test_generated_report(self.school, template, self.admin)
+        self.grant = GeneratedReportAccess.objects.create(
+            report=self.report,
+            user=self.parent.user,
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+        self.buffer = AccessLogBuffer(flush_interval=60, max_pending=3)
+
+    def test_entries_are_written_in_bulk(self):
+        self.buffer.add(self.report, self.parent.user, "VIEWED")
+        self.buffer.add(self.report, self.parent.user, "DOWNLOADED")
+        self.buffer.maybe_flush()
+        self.assertEqual(ReportAccessLog.objects.count(), 0)
+
+        self.buffer.add(self.report, self.admin, "VIEWED")
+        # Savepoint, INSERT, release, first-access UPDATE
+        with self.assertNumQueries(4):
+            self.buffer.maybe_flush()
+
+        self.assertEqual(ReportAccessLog.objects.count(), 3)
+        self.assertEqual(self.buffer.pending, [])
+
+    def test_bad_entry_does_not_drop_the_batch(self):
+        self.buffer.add(self.report, self.parent.user, "VIEWED")
+        self.buffer.add(self.report, self.admin, "VIEWED", ip_address="not-an-ip")
+        self.buffer.add(self.report, self.admin, "DOWNLOADED")
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(
+            sorted(ReportAccessLog.objects.values_list("action", flat=True)),
+            ["DOWNLOADED", "VIEWED"],
+        )
+        self.grant.refresh_from_db()
+        self.assertIsNotNone(self.grant.accessed_at)
+
+    def test_flush_records_first_parent_access(self):
+        self.buffer.add(self.report, self.parent.user, "VIEWED")
+        first_seen = self.buffer.pending[0].accessed_at
+        self.buffer.add(self.report, self.parent.user, "DOWNLOADED")
+        self.buffer.flush()
+
+        self.grant.refresh_from_db()
+        self.assertEqual(self.grant.accessed_at, first_seen)
+        self.assertEqual(
+            ReportAccessLog.objects.earliest("accessed_at").accessed_at, first_seen
+        )
+
+
+class CompletenessMatrixTest(TestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+        self.teacher = create_test_teacher(self.school)
+        self.school_class = create_test_class(self.school)
+        self.math = create_test_subject(self.school, name="Math")
+        self.english = create_test_subject(self.school, name="English")
+        self.complete = create_test_student(self.school, first_name="Complete")
+        self.partial = create_test_student(self.school, first_name="Partial")
+        self.school_class.students.add(self.complete, self.partial)
+
+        for subject in [self.math, self.english]:
+            create_test_academic_record(self.complete, subject, self.teacher)
+        create_test_academic_record(self.partial, self.math, self.teacher)
+        # Other terms don't count
+        create_test_academic_record(
+            self.partial, self.english, self.teacher, term="Term 2"
+        )
+
+    def test_matrix_reports_missing_subjects(self):
+        with self.assertNumQueries(3):
+            matrix = completeness_matrix(self.school_class, "Term 1", "2023")
+
+        self.assertTrue(matrix.is_complete(self.complete))
+        self.assertEqual(matrix.incomplete_students, [self.partial])
+        self.assertEqual(matrix.subjects_completed(self.partial), 1)
+        self.assertEqual(matrix.missing_subjects(self.partial), [self.english])
+
+        data = matrix.as_dict()
+        self.assertEqual(data["complete_students"], 1)
+        self.assertEqual(len(data["subjects"]), 2)
+        # English is missing for one student, so only Math is complete
+        self.assertEqual(matrix.complete_subjects, [self.math])
+        self.assertFalse(matrix.ready_for_reports)
+
+    def test_query_count_does_not_grow_with_students(self):
+        for index in range(10):
+            self.school_class.students.add(
+                create_test_student(self.school, first_name=f"Extra{index}")
+            )
+        with self.assertNumQueries(3):
+            matrix = completeness_matrix(self.school_class, "Term 1", "2023")
+        self.assertEqual(len(matrix.incomplete_students), 11)
+
+
+class PerformanceUploadTest(TestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+        self.teacher = create_test_teacher(self.school)
+        self.subject = create_test_subject(self.school, name="Math")
+        self.first = create_test_student(self.school, first_name="First")
+        self.second = create_test_student(self.school, first_name="Second")
+        Student.objects.filter(pk=self.first.pk).update(admission_number="ADM001")
+        Student.objects.filter(pk=self.second.pk).update(admission_number="ADM002")
+
+    def upload(self, rows, **kwargs):
+        content = (
+            "admission_number,student_name,entry_score,mid_score,end_score,comments\n"
+        )
+        content += "".join(f"{row}\n" for row in rows)
+        return PerformanceUpload(
+            self.school, self.subject, self.teacher, "Term 1", "2025"
+        ).process(BytesIO(content.encode()), **kwargs)
+
+    def test_upload_creates_grades_and_updates_records(self):
+        create_test_academic_record(
+            self.second, self.subject, self.teacher, term="Term 1", school_year="2025"
+        )
+        upload = self.upload(
+            [
+                "(DO NOT EDIT),,0-15,0-15,0-70,",
+                "ADM001,First,12,13,60,Well done",
+                "ADM002,Second,5,5,10,",
+            ],
+            chunk_size=2,
+        )
+
+        self.assertEqual((upload.created, upload.updated), (1, 1))
+        self.assertEqual(upload.errors, [])
+        first = AcademicRecord.objects.get(student=self.first)
+        self.assertEqual(first.score, 85)
+        self.assertEqual(first.grade, "A")
+        self.assertEqual(first.subject_comments, "Well done")
+        second = AcademicRecord.objects.get(student=self.second)
+        self.assertEqual((second.score, second.grade), (20, "F"))
+        self.assertFalse(second.is_published)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        upload = self.upload(
+            [
+                ",Nobody,1,1,1,",
+                "ADM001,First,16,1,1,",
+                "ADM002,Second,x,1,1,",
+                "ADM999,Ghost,1,1,1,",
+            ]
+        )
+
+        self.assertEqual(upload.created, 0)
+        self.assertEqual(
+            upload.errors,
+            [
+                {"row": 1, "error": "Missing admission number"},
+                {
+                    "row": 2,
+                    "student": "First",
+                    "error": "Invalid score: Entry score must be 0-15",
+                },
+                {
+                    "row": 3,
+                    "student": "Second",
+                    "error": "Invalid score: Entry score must be a whole number",
+                },
+                {"row": 4, "error": "Student with admission number ADM999 not found"},
+            ],
+        )
+        self.assertFalse(AcademicRecord.objects.exists())
+
+    def test_repeat_failure_alerts_only_for_failing_scores(self):
+        for name in ["English", "Science", "History"]:
+            subject = create_test_subject(self.school, name=name)
+            for student in [self.first, self.second]:
+                create_test_academic_record(
+                    student, subject, self.teacher, school_year="2025", score=20
+                )
+        AnalyticsAlert.objects.all().delete()
+
+        self.upload(["ADM001,First,12,13,60,", "ADM002,Second,5,5,10,"])
+
+        alerts = AnalyticsAlert.objects.filter(alert_type="PERFORMANCE")
+        self.assertEqual(
+            list(alerts.values_list("related_id", flat=True)), [self.second.id]
+        )
+
+    def test_grade_scores_matches_calculate_grade(self):
+        scores = [0, 29, 30, 49, 50, 60, 70, 79, 80, 100]
+        expected = [
+            AcademicRecord(score=Decimal(score)).calculate_grade() for score in scores
+        ]
+        self.assertEqual(list(grade_scores(scores)), expected)
+
+
 # python manage.py test skul_data.tests.reports_tests.test_reports_utils
@@ -312,4 +312,36 @@ class TermReportRequestViewSetTest(APITestCase):
         self.assertEqual(len(response.data), 1)
 
 
+class ClassRecordCompletenessViewTest(APITestCase):
+    def setUp(self):
+        self.school, self.admin = create_test_school()
+        self.teacher = create_test_teacher(self.school)
+        self.other_teacher = create_test_teacher(self.school, email="other@test.com")
+        self.school_class = create_test_class(school=self.school, teacher=self.teacher)
+        self.url = reverse("class-record-completeness")
+        self.params = {
+            "class_id": self.school_class.id,
+            "term": "Term 1",
+            "school_year": "2023",
+        }
+
+    def test_admin_and_class_teacher_can_view(self):
+        for user in [self.admin, self.teacher.user]:
+            self.client.force_authenticate(user=user)
+            response = self.client.get(self.url, self.params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_users_are_forbidden(self):
+        parent = create_test_parent(self.school)
+        for user in [self.other_teacher.user, parent.user]:
+            self.client.force_authenticate(user=user)
+            response = self.client.get(self.url, self.params)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_non_integer_class_id_is_rejected(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, {**self.params, "class_id": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 # python manage.py test skul_data.tests.reports_tests.test_reports_views
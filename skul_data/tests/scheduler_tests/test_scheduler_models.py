@@ -1,3 +1,7 @@
+import os
+from importlib import import_module
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -12,6 +16,9 @@ from skul_data.scheduler.models.scheduler import SchoolEvent, EventRSVP
 from django.contrib.contenttypes.models import ContentType
 from skul_data.action_logs.models.action_log import ActionLog, ActionCategory
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from skul_data.students.models.student import Student
+from skul_data.scheduler.models.scheduler import EventAudience
 
 
 class SchoolEventModelTest(TestCase):
@@ -291,4 +298,134 @@ class SchoolEventLoggingTests(TestCase):
         self.assertTrue(log.metadata["filename"].endswith(".txt"))
 
 
+class EventAudienceTest(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            email="admin@school.com",
+            password="testpass123",
+            user_type=User.SCHOOL_ADMIN,
+        )
+        self.school = School.objects.create(
+            name="Test School", email="test@school.com", schooladmin=self.admin_user
+        )
+        self.teacher_user = User.objects.create_user(
+            email="teacher@school.com", password="testpass123", user_type=User.TEACHER
+        )
+        self.teacher = Teacher.objects.create(
+            user=self.teacher_user, school=self.school
+        )
+        self.parent_user = User.objects.create_user(
+            email="parent@school.com", password="testpass123", user_type=User.PARENT
+        )
+        self.parent = Parent.objects.create(user=self.parent_user, school=self.school)
+        self.school_class = SchoolClass.objects.create(
+            name="Class 1", school=self.school, grade_level="Grade 3", level="PRIMARY"
+        )
+        self.student = Student.objects.create(
+            first_name="Test",
+            last_name="Student",
+            date_of_birth=timezone.now().date() - timedelta(days=365 * 10),
+            admission_date=timezone.now().date(),
+            gender="M",
+            school=self.school,
+        )
+
+    def create_event(self, target_type):
+        return SchoolEvent.objects.create(
+            title=f"{target_type} event",
+            start_datetime=timezone.now() + timedelta(days=1),
+            end_datetime=timezone.now() + timedelta(days=1, hours=2),
+            target_type=target_type,
+            created_by=self.admin_user,
+            school=self.school,
+        )
+
+    def audience(self, event):
+        return set(event.audience.values_list("pk", flat=True))
+
+    def test_audience_follows_target_type(self):
+        event = self.create_event("teachers")
+        self.assertEqual(self.audience(event), {self.teacher_user.pk})
+
+        event.target_type = "all"
+        event.save()
+        self.assertEqual(
+            self.audience(event), {self.teacher_user.pk, self.parent_user.pk}
+        )
+
+        event.target_type = "specific"
+        event.save()
+        self.assertEqual(self.audience(event), set())
+        event.targeted_parents.add(self.parent)
+        self.assertEqual(self.audience(event), {self.parent_user.pk})
+        self.parent.parent_events.clear()
+        self.assertEqual(self.audience(event), set())
+
+    def test_class_audience_follows_assignments_and_children(self):
+        event = self.create_event("classes")
+        event.targeted_classes.add(self.school_class)
+        self.assertEqual(self.audience(event), set())
+
+        self.teacher.assigned_classes.add(self.school_class)
+        self.student.student_class = self.school_class
+        self.student.save()
+        self.parent.children.add(self.student)
+        self.assertEqual(
+            self.audience(event), {self.teacher_user.pk, self.parent_user.pk}
+        )
+
+        self.school_class.teachers.clear()
+        self.student.student_class = None
+        self.student.save()
+        self.assertEqual(self.audience(event), set())
+
+    def test_audience_matches_target_rules(self):
+        event = self.create_event("classes")
+        event.targeted_classes.add(self.school_class)
+        self.student.student_class = self.school_class
+        self.student.parent = self.parent
+        self.student.save()
+        self.assertEqual(
+            self.audience(event),
+            set(event.get_target_users().values_list("pk", flat=True)),
+        )
+        self.assertEqual(
+            set(self.parent_user.audience_events.all()),
+            set(SchoolEvent.objects.filter(school=self.school)),
+        )
+
+    def test_rebuild_command_restores_audience(self):
+        event = self.create_event("all")
+        EventAudience.objects.all().delete()
+
+        call_command("rebuild_event_audience", stdout=open(os.devnull, "w"))
+
+        self.assertEqual(
+            self.audience(event), {self.teacher_user.pk, self.parent_user.pk}
+        )
+
+    def test_migration_backfills_existing_events(self):
+        migration = "0009_backfill_event_audience"
+        backfill = import_module(
+            f"skul_data.scheduler.migrations.{migration}"
+        ).backfill_event_audience
+        historical_apps = (
+            MigrationLoader(connection).project_state(("scheduler", migration)).apps
+        )
+        everyone = self.create_event("all")
+        classes = self.create_event("classes")
+        classes.targeted_classes.add(self.school_class)
+        self.student.student_class = self.school_class
+        self.student.parent = self.parent
+        self.student.save()
+        EventAudience.objects.all().delete()
+
+        backfill(historical_apps, None)
+
+        self.assertEqual(
+            self.audience(everyone), {self.teacher_user.pk, self.parent_user.pk}
+        )
+        self.assertEqual(self.audience(classes), {self.parent_user.pk})
+
+
 # python manage.py test skul_data.tests.scheduler_tests.test_scheduler_models
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -11,6 +13,7 @@ from skul_data.users.models.parent import Parent
 from skul_data.schools.models.school import School
 from skul_data.schools.models.schoolclass import SchoolClass
 from skul_data.scheduler.models.scheduler import SchoolEvent, EventRSVP
+from skul_data.scheduler.utils import calendar_feed
 from django.contrib.contenttypes.models import ContentType
 from skul_data.action_logs.models.action_log import ActionLog, ActionCategory
 
@@ -354,4 +357,119 @@ class CalendarExportLoggingTests(TestCase):
         self.assertEqual(log.metadata["event_count"], 2)  # Should include both events
 
 
+class CalendarFeedViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email="admin@school.com", password="adminpass", user_type=User.SCHOOL_ADMIN
+        )
+        self.school = School.objects.create(
+            name="Test School", email="test@school.com", schooladmin=self.admin
+        )
+        SchoolAdmin.objects.create(user=self.admin, school=self.school, is_primary=True)
+        self.parent_user = User.objects.create_user(
+            email="parent@school.com", password="parentpass", user_type=User.PARENT
+        )
+        Parent.objects.create(user=self.parent_user, school=self.school)
+        self.event = SchoolEvent.objects.create(
+            title="Parents Meeting",
+            start_datetime=timezone.now() + timedelta(days=1),
+            end_datetime=timezone.now() + timedelta(days=1, hours=2),
+            created_by=self.admin,
+            school=self.school,
+            target_type="parents",
+        )
+        SchoolEvent.objects.create(
+            title="Staff Meeting",
+            start_datetime=timezone.now() + timedelta(days=2),
+            end_datetime=timezone.now() + timedelta(days=2, hours=1),
+            created_by=self.admin,
+            school=self.school,
+            target_type="teachers",
+        )
+        self.url = reverse("scheduler:calendar-feed")
+
+    def test_feed_contains_only_the_users_events(self):
+        self.client.force_authenticate(user=self.parent_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/calendar")
+        self.assertIn(b"Parents Meeting", response.content)
+        self.assertNotIn(b"Staff Meeting", response.content)
+        self.assertIn("ETag", response)
+
+    def test_conditional_get_returns_304_until_an_event_changes(self):
+        self.client.force_authenticate(user=self.parent_user)
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.title = "Rescheduled Parents Meeting"
+            self.event.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b"Rescheduled Parents Meeting", response.content)
+
+    def test_local_cache_renders_changes_made_elsewhere(self):
+        self.client.force_authenticate(user=self.parent_user)
+        etag = self.client.get(self.url)["ETag"]
+
+        # A change another worker made: this process sees no invalidation
+        SchoolEvent.objects.filter(pk=self.event.pk).update(title="Moved Meeting")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b"Moved Meeting", response.content)
+        self.assertNotIn("Last-Modified", response)
+
+    @patch.object(calendar_feed, "cache_is_shared", return_value=True)
+    def test_shared_cache_renders_once_per_change(self, _):
+        self.client.force_authenticate(user=self.parent_user)
+        with patch.object(
+            calendar_feed, "render_calendar", wraps=calendar_feed.render_calendar
+        ) as render:
+            response = self.client.get(self.url)
+            self.client.get(self.url)
+            self.assertEqual(render.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.event.title = "Rescheduled Parents Meeting"
+                self.event.save()
+            self.assertIn(b"Rescheduled", self.client.get(self.url).content)
+            self.assertEqual(render.call_count, 2)
+        self.assertIn("Last-Modified", response)
+
+    def test_signed_link_serves_feed_without_login(self):
+        self.client.force_authenticate(user=self.parent_user)
+        link = self.client.get(reverse("scheduler:calendar-feed-link")).data["url"]
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(link)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b"Parents Meeting", response.content)
+
+        response = self.client.get(
+            reverse("scheduler:calendar-feed-token", kwargs={"token": "forged"})
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_regenerating_the_link_revokes_the_old_one(self):
+        self.client.force_authenticate(user=self.parent_user)
+        old_link = self.client.get(reverse("scheduler:calendar-feed-link")).data["url"]
+        new_link = self.client.post(
+            reverse("scheduler:calendar-feed-link-regenerate")
+        ).data["url"]
+        self.client.force_authenticate(user=None)
+
+        self.assertNotEqual(old_link, new_link)
+        response = self.client.get(old_link)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(new_link)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
 # python manage.py test skul_data.tests.scheduler_tests.test_scheduler_views
@@ -0,0 +1,191 @@
+from unittest.mock import patch
+from io import BytesIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from openpyxl import Workbook
+from skul_data.action_logs.models.action_log import ActionLog, ActionCategory
+from django.utils import timezone
+from skul_data.notifications.models.notification import Notification
+from skul_data.students.models.student import Student, StudentAttendance
+from skul_data.students.utils.attendance import bulk_upsert_attendance
+from skul_data.students.utils.student_import import import_students
+from skul_data.students.utils.tasks import notify_student_attendance_task
+from skul_data.tests.students_tests.test_helpers import (
+    create_test_school,
+    create_test_student,
+    create_test_parent,
+)
+from skul_data.users.models.base_user import User
+
+
+class StudentImportTest(TestCase):
+    def setUp(self):
+        # Don't attribute logs to a user left behind by an earlier test
+        User.set_current_user(None)
+        self.school, self.admin = create_test_school()
+        self.parent = create_test_parent(self.school)
+
+    def csv_file(self, content):
+        return SimpleUploadedFile(
+            "students.csv", content.encode("utf-8"), content_type="text/csv"
+        )
+
+    def test_import_in_chunks(self):
+        rows = "\n".join(
+            f"Student{i},Test,2012-01-{i + 1:02d},F,{self.parent.id}" for i in range(5)
+        )
+        upload = self.csv_file(
+            f"first_name,last_name,date_of_birth,gender,parent_id\n{rows}\n"
+        )
+
+        result = import_students(upload, self.school, user=self.admin, chunk_size=2)
+
+        self.assertEqual(result["created"], 5)
+        self.assertEqual(result["total_rows"], 5)
+        self.assertEqual(result["errors"], [])
+
+        students = Student.objects.filter(school=self.school, last_name="Test")
+        self.assertEqual(students.filter(parent=self.parent).count(), 5)
+        numbers = sorted(students.values_list("admission_number", flat=True))
+        self.assertEqual(len(set(numbers)), 5)
+        self.assertTrue(numbers[0].startswith(f"{self.school.code}-"))
+
+        # One summary log per chunk instead of one per student
+        logs = ActionLog.objects.filter(
+            category=ActionCategory.CREATE, action__startswith="Bulk created"
+        )
+        self.assertEqual(logs.count(), 3)
+
+    def test_per_row_errors(self):
+        existing = create_test_student(self.school, first_name="Jane", last_name="Doe")
+        upload = self.csv_file(
+            "first_name,last_name,date_of_birth,gender,parent_id\n"
+            f"Good,Row,2012-05-01,M,{self.parent.id}\n"
+            f"Jane,Doe,{existing.date_of_birth.isoformat()},F,\n"
+            "Bad,Date,01/05/2012,M,\n"
+            "Bad,Parent,2012-05-01,M,99999\n"
+            ",Missing,2012-05-01,M,\n"
+            "Good,Row,2012-05-01,M,\n"
+        )
+
+        result = import_students(upload, self.school, user=self.admin)
+
+        self.assertEqual(result["created"], 1)
+        errors = {error["row"]: error["error"] for error in result["errors"]}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6])
+        self.assertIn("already exists", errors[2])
+        self.assertIn("date_of_birth", errors[3])
+        self.assertIn("99999", errors[4])
+        self.assertEqual(errors[5], "Missing required fields: first_name")
+        self.assertIn("already exists", errors[6])
+        self.assertEqual(result["errors"][0]["data"]["first_name"], "Jane")
+
+    def test_xlsx_import(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["first_name", "last_name", "date_of_birth", "gender"])
+        ws.append(["Excel", "Student", "2013-02-03", "M"])
+        buffer = BytesIO()
+        wb.save(buffer)
+        upload = SimpleUploadedFile("students.xlsx", buffer.getvalue())
+
+        result = import_students(upload, self.school, user=self.admin)
+
+        self.assertEqual(result["created"], 1)
+        self.assertTrue(
+            Student.objects.filter(first_name="Excel", school=self.school).exists()
+        )
+
+
+class BulkAttendanceUpsertTest(TestCase):
+    def setUp(self):
+        # Don't attribute logs to a user left behind by an earlier test
+        User.set_current_user(None)
+        self.school, self.admin = create_test_school()
+        self.parent = create_test_parent(self.school)
+        self.students = [
+            create_test_student(self.school, first_name=f"Kid{i}") for i in range(3)
+        ]
+        self.students[0].parent = self.parent
+        self.students[0].save()
+        self.date = timezone.now().date()
+
+    def test_creates_and_updates_in_bulk(self):
+        StudentAttendance.objects.create(
+            student=self.students[0], date=self.date, status="PRESENT"
+        )
+        statuses = [
+            {
+                "student_id": str(self.students[0].id),
+                "status": "ABSENT",
+                "reason": "Sick",
+            },
+            {
+                "student_id": str(self.students[1].id),
+                "status": "LATE",
+                "time_in": "08:15",
+            },
+            {"student_id": str(self.students[2].id), "status": "PRESENT"},
+            {"student_id": "99999", "status": "PRESENT"},
+        ]
+
+        # school check, ids before, one upsert, ids after + savepoint
+        with self.assertNumQueries(6):
+            result = bulk_upsert_attendance(
+                self.school, self.date, statuses, recorded_by=self.admin
+            )
+
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(
+            result["errors"],
+            [{"student_id": 99999, "error": "Student not found or not in your school"}],
+        )
+        record = StudentAttendance.objects.get(student=self.students[0], date=self.date)
+        self.assertEqual(record.status, "ABSENT")
+        self.assertEqual(record.reason, "Sick")
+        late = StudentAttendance.objects.get(student=self.students[1], date=self.date)
+        self.assertEqual(late.time_in.strftime("%H:%M"), "08:15")
+
+    def test_row_inserted_concurrently_is_overwritten(self):
+        real_bulk_create = StudentAttendance.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # Another register saves the same student after our lookup
+            StudentAttendance.objects.create(
+                student=self.students[0], date=self.date, status="PRESENT"
+            )
+            return real_bulk_create(objs, **kwargs)
+
+        with patch.object(
+            StudentAttendance.objects, "bulk_create", side_effect=racing_bulk_create
+        ):
+            result = bulk_upsert_attendance(
+                self.school,
+                self.date,
+                [{"student_id": self.students[0].id, "status": "ABSENT"}],
+            )
+
+        self.assertEqual(result["created"] + result["updated"], 1)
+        record = StudentAttendance.objects.get(student=self.students[0], date=self.date)
+        self.assertEqual(record.status, "ABSENT")
+
+    def test_notification_fan_out(self):
+        statuses = [
+            {"student_id": str(student.id), "status": "ABSENT"}
+            for student in self.students
+        ]
+        result = bulk_upsert_attendance(self.school, self.date, statuses)
+
+        outcome = notify_student_attendance_task(
+            self.date.isoformat(), result["student_ids"]
+        )
+
+        # Only Kid0 has a parent
+        self.assertEqual(outcome["created"], 1)
+        notification = Notification.objects.get(user=self.parent.user)
+        self.assertEqual(notification.related_model, "StudentAttendance")
+        self.assertIn("Kid0", notification.title)
+
+
+# python manage.py test skul_data.tests.students_tests.test_students_utils
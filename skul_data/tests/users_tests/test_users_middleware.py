@@ -1,3 +1,4 @@
+import threading
 from django.test import TestCase, RequestFactory
 from django.contrib.sessions.models import Session
 from django.contrib.auth import get_user_model
@@ -6,13 +7,25 @@ from django.utils import timezone
 from skul_data.tests.users_tests.users_factories import UserFactory
 from skul_data.users.models.session import UserSession
 from skul_data.users.middleware.session import SessionTrackingMiddleware
-
+from skul_data.users.middleware.request_context import RequestContextMiddleware
+from skul_data.users.utils.request_context import (
+    get_current_user,
+    get_request_id,
+    request_context,
+)
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.http import HttpResponse
+from skul_data.users.utils.periodic_flush import PeriodicFlusher
+from skul_data.users.utils.session_activity import activity_buffer, parse_user_agent
+import threading
 
 User = get_user_model()
 
 
 class SessionTrackingMiddlewareTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.factory = RequestFactory()
         self.user = UserFactory()
         self.middleware = SessionTrackingMiddleware(lambda r: None)
@@ -55,5 +68,110 @@ class SessionTrackingMiddlewareTest(TestCase):
         ip = self.middleware.get_client_ip(request)
         self.assertEqual(ip, "127.0.0.1")
 
+    def test_writes_are_debounced_and_flushed_in_bulk(self):
+        session = Session.objects.create(
+            session_key="busy_session",
+            expire_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        request = self.factory.get("/")
+        request.user = self.user
+        request.session = session
+        request.META["HTTP_USER_AGENT"] = "Test User Agent"
+
+        self.middleware(request)
+        first_seen = UserSession.objects.get().last_activity
+
+        # Later requests in the write interval only mark the session active
+        with self.assertNumQueries(0):
+            self.middleware.process_session(request)
+        self.assertIn("busy_session", activity_buffer.pending)
+
+        self.assertEqual(activity_buffer.flush(), 1)
+        self.assertGreater(UserSession.objects.get().last_activity, first_seen)
+
+    def test_idle_buffer_is_flushed_periodically(self):
+        flushed = threading.Event()
+        flusher = PeriodicFlusher(flushed.set, 0.01, name="test-flush")
+        self.addCleanup(flusher.stop)
+
+        flusher.ensure_started()
+        flusher.ensure_started()  # one thread per process
+
+        self.assertTrue(flushed.wait(2))
+        self.assertEqual([t.name for t in threading.enumerate()].count("test-flush"), 1)
+
+    def test_user_agent_parsing_is_memoised(self):
+        parse_user_agent.cache_clear()
+        parse_user_agent("Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X)")
+        parse_user_agent("Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X)")
+        self.assertEqual(parse_user_agent.cache_info().hits, 1)
+
+
+class RequestContextMiddlewareTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = UserFactory()
+        self.other_user = UserFactory()
+
+    def test_user_and_request_id_visible_during_request(self):
+        seen = {}
+
+        def view(request):
+            seen["user"] = get_current_user()
+            seen["request_id"] = get_request_id()
+            return HttpResponse()
+
+        outer_request_id = get_request_id()
+        request = self.factory.get("/", HTTP_X_REQUEST_ID="abc-123")
+        request.user = self.user
+        response = RequestContextMiddleware(view)(request)
+
+        self.assertEqual(seen["user"], self.user)
+        self.assertEqual(seen["request_id"], "abc-123")
+        self.assertEqual(response["X-Request-ID"], "abc-123")
+        # Nothing leaks once the request is done
+        self.assertEqual(get_request_id(), outer_request_id)
+
+    def test_user_authenticated_after_middleware_is_picked_up(self):
+        def view(request):
+            # DRF authenticates JWT users inside the view
+            request.user = self.user
+            return HttpResponse(str(get_current_user().pk))
+
+        request = self.factory.get("/", HTTP_X_REQUEST_ID="not a valid id!")
+        request.user = AnonymousUser()
+        response = RequestContextMiddleware(view)(request)
+
+        self.assertEqual(response.content.decode(), str(self.user.pk))
+        self.assertNotEqual(response["X-Request-ID"], "not a valid id!")
+
+    def test_concurrent_requests_keep_their_own_user(self):
+        barrier = threading.Barrier(2)
+
+        def view(request):
+            barrier.wait(timeout=5)
+            return HttpResponse(str(get_current_user().pk))
+
+        def handle(user):
+            request = self.factory.get("/")
+            request.user = user
+            return RequestContextMiddleware(view)(request).content.decode()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(handle, [self.user, self.other_user]))
+
+        self.assertEqual(results, [str(self.user.pk), str(self.other_user.pk)])
+
+    def test_request_context_manager_restores_previous_user(self):
+        outer_request_id = get_request_id()
+        with request_context(user=self.user):
+            with request_context(user=self.other_user):
+                self.assertEqual(User.get_current_user(), self.other_user)
+            self.assertEqual(User.get_current_user(), self.user)
+
+            User.set_current_user(self.other_user)
+            self.assertEqual(get_current_user(), self.other_user)
+        self.assertEqual(get_request_id(), outer_request_id)
+
 
 # python manage.py test skul_data.tests.users_tests.test_users_middleware
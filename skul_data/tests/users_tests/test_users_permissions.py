@@ -1,3 +1,4 @@
+from unittest.mock import patch
 from django.test import TestCase, RequestFactory
 from skul_data.tests.users_tests.users_factories import (
     SchoolFactory,
@@ -15,8 +16,11 @@ from skul_data.users.permissions.permission import (
     IsTeacher,
     IsParent,
     HasRolePermission,
+    CanCreateEvent,
 )
 from skul_data.users.models.base_user import User
+from skul_data.users.utils import role_permissions
+from skul_data.users.utils.request_context import request_context
 
 
 class PermissionTests(TestCase):
@@ -112,4 +116,71 @@ class PermissionTests(TestCase):
         self.assertTrue(permission.has_permission(request, InvalidView()))
 
 
+class RolePermissionCacheTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.role = RoleFactory()
+        self.create_events = PermissionFactory(code="create_events")
+        self.user = UserFactory(user_type=User.TEACHER, role=self.role)
+
+    def check(self):
+        request = self.factory.post("/")
+        request.user = self.user
+        return CanCreateEvent().has_permission(request, None)
+
+    def test_local_cache_reads_codes_once_per_request(self):
+        self.role.permissions.add(self.create_events)
+
+        with request_context(user=self.user):
+            self.assertTrue(self.check())
+            with self.assertNumQueries(0):
+                self.assertTrue(self.check())
+
+        # The next request reads them again, so other workers' changes show
+        with request_context(user=self.user):
+            with self.assertNumQueries(1):
+                self.assertTrue(self.check())
+
+    @patch.object(role_permissions, "cache_is_shared", return_value=True)
+    def test_shared_cache_serves_checks_from_memory(self, _):
+        self.role.permissions.add(self.create_events)
+        self.assertTrue(self.check())
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.check())
+            self.assertTrue(self.check())
+
+    @patch.object(role_permissions, "cache_is_shared", return_value=True)
+    def test_shared_version_is_checked_on_every_call(self, _):
+        self.role.permissions.add(self.create_events)
+        self.assertTrue(self.check())
+
+        # Another process revoking the permission only bumps the version
+        role_permissions.cache.delete(role_permissions._version_key(self.role.id))
+        self.role.permissions.through.objects.filter(role=self.role).delete()
+        self.assertFalse(self.check())
+
+    def assert_role_changes_invalidate(self):
+        self.assertFalse(self.check())
+
+        self.role.permissions.add(self.create_events)
+        self.assertTrue(self.check())
+
+        self.create_events.role_set.remove(self.role)
+        self.assertFalse(self.check())
+
+        self.role.permissions.add(self.create_events)
+        self.create_events.code = "create_calendar_events"
+        self.create_events.save()
+        self.assertFalse(self.check())
+
+    def test_role_changes_invalidate_cached_set(self):
+        with request_context(user=self.user):
+            self.assert_role_changes_invalidate()
+
+    @patch.object(role_permissions, "cache_is_shared", return_value=True)
+    def test_role_changes_invalidate_shared_cache(self, _):
+        self.assert_role_changes_invalidate()
+
+
 # python manage.py test skul_data.tests.users_tests.test_users_permissions
@@ -2,7 +2,18 @@ from django.test import TestCase
 from django.core import mail
 from django.conf import settings
 
-from skul_data.tests.users_tests.users_factories import ParentFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from skul_data.tests.users_tests.users_factories import (
+    ParentFactory,
+    PermissionFactory,
+    RoleFactory,
+    SchoolFactory,
+    TeacherFactory,
+    UserFactory,
+)
+from skul_data.users.models.base_user import User
+from skul_data.users.models.teacher import Teacher
+from skul_data.users.utils.authentication import IdentityJWTAuthentication
 from skul_data.users.utils.parent import send_parent_email
 
 
@@ -26,4 +37,37 @@ class ParentUtilsTest(TestCase):
         self.assertFalse(result)
 
 
+class UserIdentityTest(TestCase):
+    def setUp(self):
+        self.teacher = TeacherFactory()
+        self.permission = PermissionFactory(code="view_reports")
+        role = RoleFactory(school=self.teacher.school)
+        role.permissions.add(self.permission)
+        self.teacher.user.role = role
+        self.teacher.user.save()
+
+    def test_jwt_user_resolves_school_and_permissions_without_queries(self):
+        token = AccessToken.for_user(self.teacher.user)
+        auth = IdentityJWTAuthentication()
+
+        with self.assertNumQueries(1):
+            user = auth.get_user(auth.get_validated_token(str(token)))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.school, self.teacher.school)
+            self.assertEqual(user.identity["profile"], self.teacher)
+            self.assertTrue(user.has_perm("view_reports"))
+            self.assertTrue(user.has_perm("view_reports"))
+
+    def test_identity_refreshes_when_profile_changes(self):
+        user = UserFactory(user_type=User.TEACHER)
+        self.assertIsNone(user.school)
+
+        school = SchoolFactory()
+        Teacher.objects.create(user=user, school=school)
+        self.assertEqual(user.school, school)
+
+        user.teacher_profile.delete()
+        self.assertIsNone(user.school)
+
+
 # python manage.py test skul_data.tests.users_tests.test_users_utils
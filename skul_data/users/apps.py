@@ -13,3 +13,5 @@ class UsersConfig(AppConfig):
         from skul_data.users.signals import role
         from skul_data.users.signals import parent
         from skul_data.users.signals import admin
+        from skul_data.users.signals import identity
+        from skul_data.users import tasks  # noqa
@@ -0,0 +1,52 @@
+import re
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from skul_data.users.utils.request_context import request_context
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Only trust incoming request ids that look like ids
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def get_incoming_request_id(request):
+    request_id = request.META.get("HTTP_X_REQUEST_ID", "")
+    return request_id if _REQUEST_ID_RE.match(request_id) else None
+
+
+class RequestContextMiddleware:
+    """
+    Open a request context for every request: the user (session or JWT,
+    resolved lazily from ``request.user``), their school and a request id,
+    echoed back in the ``X-Request-ID`` response header.
+
+    Works under WSGI threads and ASGI alike because the context lives in a
+    ``ContextVar`` rather than on a class attribute.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        with request_context(
+            request=request, request_id=get_incoming_request_id(request)
+        ) as context:
+            response = self.get_response(request)
+        response[REQUEST_ID_HEADER] = context.request_id
+        return response
+
+    async def __acall__(self, request):
+        with request_context(
+            request=request, request_id=get_incoming_request_id(request)
+        ) as context:
+            response = await self.get_response(request)
+        response[REQUEST_ID_HEADER] = context.request_id
+        return response
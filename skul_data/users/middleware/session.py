@@ -1,10 +1,21 @@
 # users/middleware.py
-import user_agents
 from django.utils import timezone
 from skul_data.users.models.session import UserSession
+from skul_data.users.utils.session_activity import (
+    activity_buffer,
+    get_device_name,
+    parse_user_agent,
+    should_write,
+)
 
 
 class SessionTrackingMiddleware:
+    """
+    Track session activity without a write per request: the first request
+    of a session in each write interval upserts the UserSession row, later
+    ones only mark the session active and are flushed in bulk.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
 
@@ -13,24 +24,35 @@ class SessionTrackingMiddleware:
 
         if request.user.is_authenticated and hasattr(request, "session"):
             self.process_session(request)
+            activity_buffer.maybe_flush()
 
         return response
 
     def process_session(self, request):
-        ua = user_agents.parse(request.META.get("HTTP_USER_AGENT", ""))
+        session_key = getattr(request.session, "session_key", None)
+        if not session_key:
+            return
+
+        if not should_write(session_key):
+            activity_buffer.add(session_key)
+            return
+
+        user_agent = request.META.get("HTTP_USER_AGENT", "")
+        device, browser, os = parse_user_agent(user_agent)
 
         UserSession.objects.update_or_create(
-            session=request.session,  # Use the session object directly
+            session_id=session_key,
             defaults={
                 "user": request.user,
                 "ip_address": self.get_client_ip(request),
-                "user_agent": request.META.get("HTTP_USER_AGENT", ""),
-                "device": self.get_device_name(ua),
-                "browser": ua.browser.family,
-                "os": ua.os.family,
+                "user_agent": user_agent[:255],
+                "device": device,
+                "browser": browser,
+                "os": os,
                 "last_activity": timezone.now(),
             },
         )
+        activity_buffer.discard(session_key)
 
     # Get the ip address of the user
     def get_client_ip(self, request):
@@ -43,8 +65,4 @@ class SessionTrackingMiddleware:
 
     # Get the device name of the user
     def get_device_name(self, ua):
-        if ua.is_mobile:
-            return ua.device.family
-        elif ua.is_tablet:
-            return f"{ua.device.family} Tablet"
-        return "Desktop"
+        return get_device_name(ua)
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-18 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0019_accountactivation_phoneverification_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="parentnotification",
+            index=models.Index(
+                fields=["parent", "-created_at", "-id"], name="parentnotif_created_idx"
+            ),
+        ),
+    ]
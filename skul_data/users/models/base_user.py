@@ -1,18 +1,28 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.utils.deprecation import MiddlewareMixin
 import uuid
 from django.contrib.auth.models import BaseUserManager
 from skul_data.users.models.role import Role
+from skul_data.action_logs.utils.dirty_fields import DirtyFieldsMixin
+from skul_data.users.utils import request_context
+from skul_data.users.utils.role_permissions import get_role_permission_codes
 
-
-class CurrentUserMiddleware(MiddlewareMixin):
-    def process_request(self, request):
-        if request.user.is_authenticated:
-            User.set_current_user(request.user)
+# Reverse one-to-one profiles a user may have, in order of precedence
+PROFILE_RELATIONS = [
+    "school_admin_profile",
+    "teacher_profile",
+    "parent_profile",
+    "administrator_profile",
+]
 
 
 class UserManager(BaseUserManager):
+    def with_identity(self):
+        """Users with their role, profiles and schools loaded in one query"""
+        return self.select_related(
+            "role", *[f"{relation}__school" for relation in PROFILE_RELATIONS]
+        )
+
     def create_user(self, email, username=None, password=None, **extra_fields):
         """
         Create and save a User with the given email, username and password.
@@ -47,7 +57,7 @@ class UserManager(BaseUserManager):
         return self.create_user(email, username, password, **extra_fields)
 
 
-class User(AbstractUser):
+class User(DirtyFieldsMixin, AbstractUser):
     SCHOOL_ADMIN = "school_admin"
     ADMINISTRATOR = "administrator"
     TEACHER = "teacher"
@@ -90,36 +100,24 @@ class User(AbstractUser):
     # Add this line to use our custom manager
     objects = UserManager()
 
-    _current_user = None
-
+    # The acting user lives in the per-request context (see
+    # skul_data.users.utils.request_context); these stay for existing callers.
     @classmethod
     def set_current_user(cls, user):
-        cls._current_user = user
+        request_context.set_current_user(user)
 
     @classmethod
     def get_current_user(cls):
-        return cls._current_user
+        return request_context.get_current_user()
 
     def save(self, *args, **kwargs):
         """
-        Override save method to track changed fields.
-        Uses *args, **kwargs as expected in Django model save methods.
+        Changed fields are tracked by DirtyFieldsMixin from the values the
+        user was loaded with, without re-reading the row.
         """
-        # Track changed fields
-        if self.pk:
-            try:
-                old = User.objects.get(pk=self.pk)
-                self._changed_fields = [
-                    field.name
-                    for field in self._meta.fields
-                    if getattr(old, field.name) != getattr(self, field.name)
-                ]
-            except User.DoesNotExist:
-                # If the user is new, there won't be any changed fields
-                self._changed_fields = []
-
-        # Call the parent save method with *args, **kwargs
         super().save(*args, **kwargs)
+        # User type may have changed
+        self.clear_identity()
 
     # @property
     # def school(self):
@@ -133,22 +131,48 @@ class User(AbstractUser):
     #     return None
 
     @property
-    def school(self):
-        """Returns the school associated with this user"""
-        # Check all possible profile relationships
-        profiles = [
-            getattr(self, "school_admin_profile", None),
-            getattr(self, "teacher_profile", None),
-            getattr(self, "parent_profile", None),
-            getattr(self, "administrator_profile", None),
-        ]
+    def identity(self):
+        """
+        The user's active profile and school, resolved once per instance.
+        Authentication loads a fresh user for every request, so this is
+        effectively per request; see UserManager.with_identity().
+        """
+        identity = self.__dict__.get("_identity")
+        if identity is None:
+            identity = self._identity = self._resolve_identity()
+        return identity
+
+    def _resolve_identity(self):
+        # Profiles in order of precedence; the first with a school wins
+        for relation in PROFILE_RELATIONS:
+            profile = getattr(self, relation, None)
+            if profile is not None and profile.school_id:
+                return {
+                    "user_type": self.user_type,
+                    "profile": profile,
+                    "school": profile.school,
+                    "school_id": profile.school_id,
+                }
+        return {
+            "user_type": self.user_type,
+            "profile": None,
+            "school": None,
+            "school_id": None,
+        }
+
+    @property
+    def permission_codes(self):
+        """Codes of the permissions granted by the user's role"""
+        return get_role_permission_codes(self.role_id)
 
-        # Return the first valid school found
-        for profile in profiles:
-            if profile and profile.school:
-                return profile.school
+    def clear_identity(self):
+        """Forget the resolved profile and school"""
+        self.__dict__.pop("_identity", None)
 
-        return None  # Explicit return if no school found
+    @property
+    def school(self):
+        """Returns the school associated with this user"""
+        return self.identity["school"]
 
     @property
     def primary_profile(self):
@@ -165,7 +189,7 @@ class User(AbstractUser):
     def has_perm(self, perm, obj=None):
         if self.user_type == self.SCHOOL_ADMIN:
             return True
-        if self.role and self.role.permissions.filter(code=perm).exists():
+        if perm in self.permission_codes:
             return True
         return super().has_perm(perm, obj)
 
@@ -216,3 +240,11 @@ class CustomUserModelBackend(ModelBackend):
             return user
 
         return None
+
+    def get_user(self, user_id):
+        # Session requests: load profiles and school with the user
+        try:
+            user = User.objects.with_identity().get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
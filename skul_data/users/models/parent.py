@@ -1,10 +1,11 @@
 from django.db import models
 from .base_user import User
+from skul_data.action_logs.utils.dirty_fields import DirtyFieldsMixin
 from django.utils import timezone
 from skul_data.users.utils.parent import send_parent_email
 
 
-class Parent(models.Model):
+class Parent(DirtyFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ("ACTIVE", "Active"),
         ("PENDING", "Pending Approval"),
@@ -120,6 +121,13 @@ class ParentNotification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of a parent's notifications on (created_at, id)
+            models.Index(
+                fields=["parent", "-created_at", "-id"],
+                name="parentnotif_created_idx",
+            ),
+        ]
 
     def mark_as_read(self):
         self.is_read = True
@@ -3,6 +3,7 @@ from django.utils import timezone
 from datetime import date
 from skul_data.users.models.base_user import User
 from skul_data.schools.models.school import School
+from skul_data.action_logs.utils.dirty_fields import DirtyFieldsMixin
 
 
 class SchoolAdmin(models.Model):
@@ -46,7 +47,7 @@ class SchoolAdmin(models.Model):
         super().save(*args, **kwargs)
 
 
-class AdministratorProfile(models.Model):
+class AdministratorProfile(DirtyFieldsMixin, models.Model):
     ACCESS_LEVEL_CHOICES = [
         ("standard", "Standard Access"),
         ("elevated", "Elevated Access"),
@@ -85,18 +86,8 @@ class AdministratorProfile(models.Model):
         return f"{self.user.get_full_name()} - {self.position}"
 
     def save(self, *args, **kwargs):
-        # Track changed fields for updates
-        if self.pk:
-            try:
-                old = AdministratorProfile.objects.get(pk=self.pk)
-                self._changed_fields = [
-                    field.name
-                    for field in self._meta.fields
-                    if getattr(old, field.name) != getattr(self, field.name)
-                ]
-            except AdministratorProfile.DoesNotExist:
-                self._changed_fields = []
-        else:
+        # Changed fields for updates are tracked by DirtyFieldsMixin
+        if not self.pk:
             # For new instances, set user type
             self.user.user_type = User.ADMINISTRATOR
             self.user.save()
@@ -1,11 +1,12 @@
 from django.db import models
 from .base_user import User
+from skul_data.action_logs.utils.dirty_fields import DirtyFieldsMixin
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 import datetime
 
 
-class Teacher(models.Model):
+class Teacher(DirtyFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ("ACTIVE", "Active"),
         ("ON_LEAVE", "On Leave"),
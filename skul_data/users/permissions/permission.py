@@ -96,7 +96,7 @@ class CanCreateEvent(BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and (
             request.user.user_type == User.SCHOOL_ADMIN
-            or request.user.role.permissions.filter(code="create_events").exists()
+            or CREATE_EVENTS in request.user.permission_codes
         )
 
 
@@ -125,8 +125,8 @@ class CanManageEvent(BasePermission):
             return True
 
         # Check role permissions if role exists
-        if hasattr(request.user, "role") and request.user.role:
-            return request.user.role.permissions.filter(code="manage_events").exists()
+        if request.user.role_id:
+            return MANAGE_EVENTS in request.user.permission_codes
 
         # Default deny
         return False
@@ -143,24 +143,20 @@ class HasRolePermission(BasePermission):
     """
 
     def has_permission(self, request, view):
-        print(f"Checking permission for {request.user}")
         user = request.user
 
         if not user.is_authenticated:
-            print("❌ Not authenticated")
             return False
 
         # 1. School owners (primary admins) have all permissions
         if user.user_type == User.SCHOOL_ADMIN and hasattr(
             user, "school_admin_profile"
         ):
-            print("✅ School admin - granting full access")
             return True  # School admins get full access - EARLY RETURN!
 
         # 2. Get required permission for other users
         required_permission = self._get_required_permission(view, request.method)
         if not required_permission:
-            print("❌ No required permission defined for this view/method")
             return False
 
         # 3. Administrator permissions (both standalone and teacher-administrators)
@@ -174,14 +170,11 @@ class HasRolePermission(BasePermission):
                 if required_permission in getattr(
                     user.administrator_profile, "permissions_granted", []
                 ):
-                    print("✅ Administrator with explicit permission")
                     return True
 
             # Then check role permissions
-            if hasattr(user, "role") and user.role:
-                if user.role.permissions.filter(code=required_permission).exists():
-                    print("✅ Administrator with role permission")
-                    return True
+            if required_permission in user.permission_codes:
+                return True
 
         # 4. Special cases (keep your existing special handling)
         if (
@@ -189,31 +182,19 @@ class HasRolePermission(BasePermission):
             and view.action == "mark_attendance"
             and user.user_type == User.TEACHER
         ):
-            print("✅ Teacher marking attendance")
             return True
 
         if request.method == "GET":
             view_action = getattr(view, "action", None)
             if view_action == "retrieve":
                 if user.user_type in [User.PARENT, User.TEACHER]:
-                    print("✅ Parent/Teacher viewing details")
                     return True
             elif view_action == "list":
                 if user.user_type in [User.PARENT, User.TEACHER]:
-                    print("✅ Parent/Teacher listing")
                     return True
 
         # 5. Standard role permission check (for non-administrators)
-        if hasattr(user, "role") and user.role:
-            has_perm = user.role.permissions.filter(code=required_permission).exists()
-            if has_perm:
-                print("✅ Has role permission")
-            else:
-                print("❌ Missing role permission")
-            return has_perm
-
-        print("❌ No matching permission found")
-        return False
+        return required_permission in user.permission_codes
 
     def _get_required_permission(self, view, method):
         """Helper to get the required permission from the view"""
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from skul_data.users.models.parent import Parent
+from skul_data.users.models.school_admin import AdministratorProfile, SchoolAdmin
+from skul_data.users.models.teacher import Teacher
+from skul_data.users.utils.request_context import get_current_user
+
+PROFILE_MODELS = (SchoolAdmin, Teacher, Parent, AdministratorProfile)
+
+
+def clear_profile_identity(sender, instance, signal=None, **kwargs):
+    """A profile changed: drop the memoised identity of its user"""
+    users = []
+    if sender.user.is_cached(instance):
+        users.append(instance.user)
+
+    # The request user is usually a different instance of the same user
+    current_user = get_current_user()
+    if current_user is not None and current_user.pk == instance.user_id:
+        users.append(current_user)
+
+    accessor = sender._meta.get_field("user").remote_field.get_accessor_name()
+    for user in users:
+        # The user may hold a stale (or missing) copy of this profile
+        if signal is post_save:
+            user._state.fields_cache[accessor] = instance
+        else:
+            user._state.fields_cache.pop(accessor, None)
+        user.clear_identity()
+
+
+for model in PROFILE_MODELS:
+    receiver(post_save, sender=model, dispatch_uid=f"identity_save_{model.__name__}")(
+        clear_profile_identity
+    )
+    receiver(
+        post_delete, sender=model, dispatch_uid=f"identity_delete_{model.__name__}"
+    )(clear_profile_identity)
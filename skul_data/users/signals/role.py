@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
 from skul_data.users.models.role import Role, Permission
 from skul_data.action_logs.utils.action_log import log_action
@@ -9,6 +9,7 @@ from rest_framework import status
 from django.db.utils import DatabaseError
 from django.db import transaction
 from django.contrib.contenttypes.models import ContentType
+from skul_data.users.utils.role_permissions import invalidate_role_permissions
 
 
 @receiver(post_save, sender=Permission)
@@ -190,3 +191,44 @@ def log_permission_assignments(sender, instance, action, pk_set, **kwargs):
 
         logger = logging.getLogger(__name__)
         logger.debug(f"Failed to log permission assignment: {str(e)}")
+
+
+# === PERMISSION CACHE INVALIDATION ===
+
+
+@receiver(post_save, sender=Permission)
+def invalidate_permission_roles_on_save(sender, instance, created, **kwargs):
+    """A renamed permission code changes every role that grants it"""
+    if not created:
+        invalidate_role_permissions(
+            list(Role.objects.filter(permissions=instance).values_list("id", flat=True))
+        )
+
+
+@receiver(pre_delete, sender=Permission)
+def invalidate_permission_roles_on_delete(sender, instance, **kwargs):
+    invalidate_role_permissions(
+        list(Role.objects.filter(permissions=instance).values_list("id", flat=True))
+    )
+
+
+@receiver(post_delete, sender=Role)
+def invalidate_deleted_role(sender, instance, **kwargs):
+    invalidate_role_permissions([instance.pk])
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def invalidate_role_permission_changes(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        # role.permissions.add/remove/clear(...)
+        if action in ["post_add", "post_remove", "post_clear"]:
+            invalidate_role_permissions([instance.pk])
+    elif action in ["post_add", "post_remove"]:
+        # permission.role_set.add/remove(...)
+        invalidate_role_permissions(list(pk_set or []))
+    elif action == "pre_clear":
+        invalidate_role_permissions(
+            list(instance.role_set.values_list("id", flat=True))
+        )
@@ -90,3 +90,35 @@ Skul Data Team
     except Exception as e:
         logger.error(f"Error sending password reset email: {str(e)}")
         return {"status": "error", "error": str(e)}
+
+
+@shared_task(name="skul_data.users.tasks.send_parent_welcome_emails")
+def send_parent_welcome_emails(parent_ids, school_name):
+    """
+    Send welcome emails to newly imported parents over a single mail
+    connection instead of one connection per parent.
+    """
+    from django.conf import settings
+    from django.core.mail import EmailMessage, get_connection
+    from skul_data.users.models.parent import Parent
+
+    parents = Parent.objects.filter(id__in=parent_ids).select_related("user")
+    messages = [
+        EmailMessage(
+            f"Welcome to {school_name}",
+            f"Hello {parent.user.first_name} {parent.user.last_name},\n\n"
+            f"You have been registered as a parent at {school_name}.",
+            settings.DEFAULT_FROM_EMAIL,
+            [parent.user.email],
+        )
+        for parent in parents
+        if parent.user.email
+    ]
+
+    try:
+        sent = get_connection().send_messages(messages) or 0
+        logger.info(f"Sent {sent} parent welcome emails for {school_name}")
+        return {"status": "success", "sent": sent}
+    except Exception as e:
+        logger.error(f"Error sending parent welcome emails: {str(e)}")
+        return {"status": "error", "error": str(e)}
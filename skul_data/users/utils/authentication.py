@@ -0,0 +1,31 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class _IdentityUsers:
+    """
+    Stands in for the user model in ``JWTAuthentication.get_user``, which
+    reads ``user_model.objects`` and ``user_model.DoesNotExist``, so the
+    lookup there goes through ``with_identity()``.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.DoesNotExist = model.DoesNotExist
+
+    @property
+    def objects(self):
+        return self.model.objects.with_identity()
+
+
+class IdentityJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the user together with their role,
+    profiles and school, so ``request.user.school`` and permission checks
+    need no further queries during the request. Token and user checks are
+    simplejwt's own.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # simplejwt's get_user (and any upstream fix to it) runs unchanged
+        self.user_model = _IdentityUsers(self.user_model)
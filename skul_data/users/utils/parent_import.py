@@ -0,0 +1,314 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.crypto import get_random_string
+from skul_data.action_logs.models.action_log import ActionCategory
+from skul_data.action_logs.utils.action_log import log_actions_bulk
+from skul_data.analytics.utils.response_cache import invalidate_model_sections
+from skul_data.scheduler.utils.audience import sync_user_audience
+from skul_data.users.models.base_user import User
+from skul_data.users.models.parent import Parent
+from skul_data.students.models.student import Student
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# hashlib.pbkdf2_hmac, behind Django's default PBKDF2 hasher, runs OpenSSL
+# with the GIL released (CPython Modules/_hashopenssl.c), so a small thread
+# pool hashes passwords in parallel on multi-core hosts
+HASH_WORKERS = getattr(settings, "PARENT_IMPORT_HASH_WORKERS", 4)
+
+REQUIRED_FIELDS = ["email", "first_name", "last_name"]
+OPTIONAL_FIELDS = ["phone_number", "address", "occupation", "preferred_language"]
+
+# Model max lengths the serializer used to enforce row by row
+MAX_LENGTHS = {
+    "first_name": User._meta.get_field("first_name").max_length,
+    "last_name": User._meta.get_field("last_name").max_length,
+    "phone_number": Parent._meta.get_field("phone_number").max_length,
+    "occupation": Parent._meta.get_field("occupation").max_length,
+    "address": Parent._meta.get_field("address").max_length,
+    "preferred_language": Parent._meta.get_field("preferred_language").max_length,
+}
+
+
+def _clean_column(series):
+    """Strip a column to strings, with blanks and NaN turned into ''"""
+    cleaned = series.astype("string").str.strip().fillna("")
+    return cleaned.mask(cleaned.str.lower() == "nan", "")
+
+
+def normalise_parent_frame(df):
+    """
+    Return a copy of the sheet with every known column cleaned in one pass:
+    strings stripped, phone numbers given a ``+`` prefix and ``children_ids``
+    split into lists of ints.
+    """
+    df = df.copy()
+    for column in REQUIRED_FIELDS + OPTIONAL_FIELDS:
+        if column in df.columns:
+            df[column] = _clean_column(df[column])
+        else:
+            df[column] = ""
+
+    phones = df["phone_number"]
+    df["phone_number"] = phones.where(
+        (phones == "") | phones.str.startswith("+"), "+" + phones
+    )
+
+    if "children_ids" in df.columns:
+        children = _clean_column(df["children_ids"]).str.split(r"[,;\s]", regex=True)
+        df["children_ids"] = children.map(
+            lambda parts: [int(part) for part in parts if part.isdigit()]
+        )
+    else:
+        df["children_ids"] = [[] for _ in range(len(df))]
+
+    return df
+
+
+# Language codes Django knows about; preferred_language drives translations
+LANGUAGE_CODES = {code.lower() for code, _ in settings.LANGUAGES}
+
+
+def _email_is_valid(email):
+    try:
+        validate_email(email)
+        return True
+    except ValidationError:
+        return False
+
+
+def validate_parent_frame(df, school):
+    """
+    Validate a normalised frame with column-wide checks and a fixed number of
+    queries. Returns ``(valid_df, errors)``; errors use the per-row shape the
+    bulk import endpoint has always reported.
+    """
+    errors = {}
+
+    def reject(mask, make_error):
+        for index in df.index[mask & ~df.index.isin(list(errors))]:
+            errors[index] = make_error(df.loc[index])
+
+    # Rows without an email are skipped silently, as before
+    df = df[df["email"] != ""]
+
+    missing = pd.DataFrame({field: df[field] == "" for field in REQUIRED_FIELDS})
+    reject(
+        missing.any(axis=1),
+        lambda row: "Missing required fields: "
+        + ", ".join(f for f in REQUIRED_FIELDS if row[f] == ""),
+    )
+
+    reject(
+        ~df["email"].map(_email_is_valid),
+        lambda row: {"email": ["Enter a valid email address."]},
+    )
+
+    for field, max_length in MAX_LENGTHS.items():
+        if max_length:
+            reject(
+                df[field].str.len() > max_length,
+                lambda row, field=field, max_length=max_length: {
+                    field: [
+                        f"Ensure this field has no more than {max_length} characters."
+                    ]
+                },
+            )
+
+    languages = df["preferred_language"]
+    reject(
+        (languages != "") & ~languages.str.lower().isin(LANGUAGE_CODES),
+        lambda row: {
+            "preferred_language": [
+                f'"{row["preferred_language"]}" is not a valid choice.'
+            ]
+        },
+    )
+
+    reject(
+        df["email"].str.lower().duplicated(),
+        lambda row: {"email": ["This email appears more than once in the file."]},
+    )
+
+    # One IN query for every email (usernames are emails for parents)
+    emails = df["email"].tolist()
+    taken = set()
+    for email, username in User.objects.filter(
+        Q(email__in=emails) | Q(username__in=emails)
+    ).values_list("email", "username"):
+        taken.update((email.lower(), username.lower()))
+    reject(
+        df["email"].str.lower().isin(taken),
+        lambda row: {"email": ["A user with this email already exists."]},
+    )
+
+    # One query for every referenced child
+    requested = {sid for ids in df["children_ids"] for sid in ids}
+    valid_children = set(
+        Student.objects.filter(id__in=requested, school=school).values_list(
+            "id", flat=True
+        )
+    )
+    invalid = df["children_ids"].map(lambda ids: sorted(set(ids) - valid_children))
+    reject(
+        invalid.map(bool),
+        lambda row: f"Invalid student IDs: {invalid[row.name]}",
+    )
+
+    error_list = [
+        {"row": index + 2, "email": df.loc[index, "email"], "error": error}
+        for index, error in sorted(errors.items())
+    ]
+    return df[~df.index.isin(list(errors))], error_list
+
+
+def _hash_random_passwords(count):
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        return list(
+            pool.map(lambda _: make_password(get_random_string(12)), range(count))
+        )
+
+
+def _insert_parents(rows, passwords, school, default_status):
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=row["email"],
+                email=row["email"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                user_type=User.PARENT,
+                password=password,
+            )
+            for row, password in zip(rows, passwords)
+        ]
+    )
+
+    parents = Parent.objects.bulk_create(
+        [
+            Parent(
+                user=user,
+                school=school,
+                status=default_status,
+                phone_number=row["phone_number"] or None,
+                address=row["address"] or None,
+                occupation=row["occupation"] or None,
+                preferred_language=row["preferred_language"].lower() or "en",
+            )
+            for row, user in zip(rows, users)
+        ]
+    )
+
+    Parent.children.through.objects.bulk_create(
+        [
+            Parent.children.through(parent_id=parent.id, student_id=student_id)
+            for row, parent in zip(rows, parents)
+            for student_id in set(row["children_ids"])
+        ],
+        ignore_conflicts=True,
+    )
+    return parents
+
+
+def create_parents(df, school, default_status):
+    """
+    Create users, parents and child links for a validated frame with one
+    bulk insert per table. If the batch hits an IntegrityError (e.g. an
+    email taken by a concurrent import since validation) the rows are
+    retried one by one in savepoints, so only the offending rows fail.
+
+    Returns ``(created, errors)``: ``[(index, parent)]`` in frame order and
+    per-row errors in the validation shape.
+    """
+    passwords = _hash_random_passwords(len(df))
+    rows = df.to_dict("records")
+
+    try:
+        with transaction.atomic():
+            parents = _insert_parents(rows, passwords, school, default_status)
+        return list(zip(df.index, parents)), []
+    except IntegrityError as e:
+        logger.warning(f"Bulk parent insert failed, retrying row by row: {str(e)}")
+
+    created, errors = [], []
+    for index, row, password in zip(df.index, rows, passwords):
+        try:
+            with transaction.atomic():
+                (parent,) = _insert_parents([row], [password], school, default_status)
+            created.append((index, parent))
+        except IntegrityError:
+            errors.append(
+                {
+                    "row": index + 2,
+                    "email": row["email"],
+                    "error": {"email": ["A user with this email already exists."]},
+                }
+            )
+    return created, errors
+
+
+def queue_welcome_emails(parent_ids, school_name):
+    """Send welcome emails once the import has committed"""
+    from skul_data.users.tasks import send_parent_welcome_emails
+
+    def enqueue():
+        try:
+            send_parent_welcome_emails.delay(parent_ids, school_name)
+        except Exception as e:
+            logger.warning(f"Could not queue welcome emails, sending inline: {str(e)}")
+            send_parent_welcome_emails(parent_ids, school_name)
+
+    transaction.on_commit(enqueue)
+
+
+def import_parents(
+    df, school, default_status="ACTIVE", send_welcome_email=False, user=None
+):
+    """
+    Bulk import parents from a sheet already loaded into pandas.
+    Returns ``{"success": [...], "errors": [...]}`` keyed by spreadsheet row.
+    """
+    df = normalise_parent_frame(df)
+    valid, errors = validate_parent_frame(df, school)
+
+    created, insert_errors = (
+        create_parents(valid, school, default_status) if len(valid) else ([], [])
+    )
+    errors = sorted(errors + insert_errors, key=lambda error: error["row"])
+    parents = [parent for _, parent in created]
+    if parents:
+        invalidate_model_sections(Parent, school.id)
+        # The Parent post_save receiver that fills the calendar audience
+        # doesn't run for bulk_create
+        sync_user_audience([parent.user_id for parent in parents])
+
+    # bulk_create skips the per-row "Created Parent" audit entries
+    log_actions_bulk(
+        user,
+        "Created Parent",
+        ActionCategory.CREATE,
+        parents,
+        metadata=lambda parent: {"email": parent.user.email, "source": "bulk_import"},
+    )
+
+    success = [
+        {
+            "row": index + 2,
+            "parent_id": parent.id,
+            "email": parent.user.email,
+            "name": f"{parent.user.first_name} {parent.user.last_name}",
+        }
+        for index, parent in created
+    ]
+
+    if send_welcome_email and parents:
+        queue_welcome_emails([parent.id for parent in parents], school.name)
+
+    return {"success": success, "errors": errors}
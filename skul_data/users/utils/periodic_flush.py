@@ -0,0 +1,52 @@
+import atexit
+import os
+import threading
+from django.db import connections
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlusher:
+    """
+    Calls ``flush`` every ``interval`` seconds from a daemon thread, so a
+    process-wide write-behind buffer is written even when no request comes
+    along to trigger it, and once more when the interpreter exits.
+
+    The thread is started lazily by ``ensure_started`` and restarted in a
+    forked worker, where the parent's thread does not exist.
+    """
+
+    def __init__(self, flush, interval, name):
+        self.flush = flush
+        self.interval = interval
+        self.name = name
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        atexit.register(self._flush)
+
+    def ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._flush()
+            # Don't hold this thread's database connection between flushes
+            connections.close_all()
+
+    def _flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Periodic flush of {self.name} failed: {str(e)}")
@@ -0,0 +1,195 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from celery.signals import before_task_publish, task_postrun, task_prerun
+import uuid
+
+# Header names used to carry the context from a request into Celery tasks
+TASK_USER_HEADER = "skul_user_id"
+TASK_SCHOOL_HEADER = "skul_school_id"
+TASK_REQUEST_ID_HEADER = "skul_request_id"
+
+_UNSET = object()
+
+_current_context = ContextVar("skul_request_context", default=None)
+
+
+class RequestContext:
+    """
+    Who the current unit of work runs for: a user, their school and a request
+    id. Each request, consumer or task gets its own instance through a
+    ``ContextVar``, so concurrent threads and coroutines never see each
+    other's user.
+
+    The user and school are resolved lazily. When built from a request the
+    user is read from ``request.user`` on first use, which picks up users
+    authenticated later by DRF (JWT) as well as session users.
+    """
+
+    def __init__(
+        self,
+        user=None,
+        school=None,
+        request_id=None,
+        request=None,
+        user_id=None,
+        school_id=None,
+    ):
+        self.request = request
+        self.request_id = request_id or uuid.uuid4().hex
+        self.user_id = user_id
+        self.school_id = school_id
+        self._user = user if user is not None else _UNSET
+        self._school = school if school is not None else _UNSET
+        # role_id -> permission codes read during this unit of work
+        self.role_permission_codes = {}
+
+    @property
+    def user(self):
+        if self._user is not _UNSET:
+            return self._user
+
+        if self.request is not None:
+            user = getattr(self.request, "user", None)
+            # Not cached: DRF may authenticate the request after we are asked
+            return user if user is not None and user.is_authenticated else None
+
+        user = None
+        if self.user_id is not None:
+            from django.contrib.auth import get_user_model
+
+            user = get_user_model().objects.filter(pk=self.user_id).first()
+        self._user = user
+        return user
+
+    @user.setter
+    def user(self, user):
+        self._user = user
+        self._school = _UNSET
+
+    @property
+    def school(self):
+        if self._school is not _UNSET:
+            return self._school
+
+        if self.school_id is not None:
+            from skul_data.schools.models.school import School
+
+            self._school = School.objects.filter(pk=self.school_id).first()
+            return self._school
+
+        user = self.user
+        if user is None:
+            return None
+        self._school = getattr(user, "school", None)
+        return self._school
+
+    @school.setter
+    def school(self, school):
+        self._school = school
+
+
+def get_context():
+    """The active RequestContext, or None outside any request or task"""
+    return _current_context.get()
+
+
+def get_current_user():
+    context = _current_context.get()
+    return context.user if context is not None else None
+
+
+def get_current_school():
+    context = _current_context.get()
+    return context.school if context is not None else None
+
+
+def get_request_id():
+    context = _current_context.get()
+    return context.request_id if context is not None else None
+
+
+def set_current_user(user):
+    """
+    Attribute the rest of the current context to ``user``. Outside a request
+    or task a context is opened for the current thread or coroutine only.
+    """
+    context = _current_context.get()
+    if context is None:
+        _current_context.set(RequestContext(user=user))
+    else:
+        context.user = user
+
+
+@contextmanager
+def request_context(user=None, school=None, request_id=None, **kwargs):
+    """
+    Run a block under its own context and restore the previous one on exit.
+    Use it in background tasks, management commands and consumers::
+
+        with request_context(user=admin, school=school):
+            generate_class_term_reports(...)
+    """
+    context = RequestContext(user=user, school=school, request_id=request_id, **kwargs)
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
+
+
+# Celery: carry the caller's context to the worker and open a fresh context
+# around every task, so a worker thread never keeps the previous task's user.
+_task_tokens = {}
+
+
+@before_task_publish.connect(dispatch_uid="skul_request_context_publish")
+def attach_context_to_task(headers=None, **kwargs):
+    context = _current_context.get()
+    if context is None or headers is None:
+        return
+
+    headers.setdefault(TASK_REQUEST_ID_HEADER, context.request_id)
+    user = context.user
+    if user is not None:
+        headers.setdefault(TASK_USER_HEADER, user.pk)
+        school = context.school
+        if school is not None:
+            headers.setdefault(TASK_SCHOOL_HEADER, school.pk)
+
+
+def _task_header(request, name):
+    value = getattr(request, name, None)
+    if value is None:
+        # Some Celery versions keep custom headers under request.headers
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+
+@task_prerun.connect(dispatch_uid="skul_request_context_prerun")
+def enter_task_context(task_id=None, task=None, **kwargs):
+    request = getattr(task, "request", None)
+    user_id = _task_header(request, TASK_USER_HEADER)
+    parent = _current_context.get()
+
+    if user_id is None and parent is not None:
+        # Eager task running inside the caller's request
+        context = RequestContext(user=parent.user, request_id=parent.request_id)
+    else:
+        context = RequestContext(
+            request_id=_task_header(request, TASK_REQUEST_ID_HEADER) or task_id,
+            user_id=user_id,
+            school_id=_task_header(request, TASK_SCHOOL_HEADER),
+        )
+    _task_tokens[task_id] = _current_context.set(context)
+
+
+@task_postrun.connect(dispatch_uid="skul_request_context_postrun")
+def exit_task_context(task_id=None, **kwargs):
+    token = _task_tokens.pop(task_id, None)
+    if token is None:
+        return
+    try:
+        _current_context.reset(token)
+    except ValueError:
+        # Reset from a different context than the one that set it
+        _current_context.set(None)
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from skul_data.notifications.utils.presence import (
+    cache_is_shared,
+    warn_if_local_cache,
+)
+from skul_data.users.models.role import Permission
+from skul_data.users.utils.request_context import get_context
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = getattr(settings, "ROLE_PERMISSION_CACHE_TIMEOUT", 60 * 60 * 24)
+
+# role_id -> (version, codes)
+_local = {}
+
+
+def _version_key(role_id):
+    return f"role_permissions:version:{role_id}"
+
+
+def _codes_key(role_id, version):
+    return f"role_permissions:{role_id}:{version}"
+
+
+def _current_version(role_id):
+    key = _version_key(role_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, CACHE_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def _load_codes(role_id):
+    return frozenset(
+        Permission.objects.filter(role__id=role_id).values_list("code", flat=True)
+    )
+
+
+def _request_codes():
+    context = get_context()
+    return context.role_permission_codes if context is not None else None
+
+
+def get_role_permission_codes(role_id):
+    """
+    Frozenset of permission codes granted by a role.
+
+    With a shared cache the set is held per process and in the cache under
+    a version that the role signals bump; every call checks that version,
+    so a change is seen by all processes at once. A per-process cache can't
+    carry the bump to other workers, so there the set is read from the
+    database once per request or task instead.
+    """
+    if not role_id:
+        return frozenset()
+
+    if not cache_is_shared():
+        warn_if_local_cache("Role permission cache")
+        request_codes = _request_codes()
+        if request_codes is None:
+            return _load_codes(role_id)
+        if role_id not in request_codes:
+            request_codes[role_id] = _load_codes(role_id)
+        return request_codes[role_id]
+
+    version = _current_version(role_id)
+    entry = _local.get(role_id)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    key = _codes_key(role_id, version)
+    codes = cache.get(key)
+    if codes is None:
+        codes = _load_codes(role_id)
+        cache.set(key, codes, CACHE_TIMEOUT)
+
+    _local[role_id] = (version, codes)
+    return codes
+
+
+def _bump(role_ids):
+    cache.set_many(
+        {_version_key(role_id): uuid.uuid4().hex for role_id in role_ids},
+        CACHE_TIMEOUT,
+    )
+    request_codes = _request_codes() or {}
+    for role_id in role_ids:
+        _local.pop(role_id, None)
+        request_codes.pop(role_id, None)
+
+
+def invalidate_role_permissions(role_ids):
+    """
+    Drop the cached permission sets of the given roles. Done again once the
+    transaction commits, so no process keeps a set read before the commit.
+    """
+    role_ids = [role_id for role_id in role_ids if role_id]
+    if not role_ids:
+        return
+    _bump(role_ids)
+    transaction.on_commit(lambda: _bump(role_ids))
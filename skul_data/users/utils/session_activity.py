@@ -0,0 +1,93 @@
+import threading
+from functools import lru_cache
+from time import monotonic
+import user_agents
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from skul_data.users.models.session import UserSession
+from skul_data.users.utils.periodic_flush import PeriodicFlusher
+import logging
+
+logger = logging.getLogger(__name__)
+
+# At most one full session write per session in this many seconds
+WRITE_INTERVAL = getattr(settings, "SESSION_TRACKING_WRITE_INTERVAL", 60)
+# Buffered last_activity updates are written at least this often
+FLUSH_INTERVAL = getattr(settings, "SESSION_TRACKING_FLUSH_INTERVAL", 30)
+MAX_PENDING = getattr(settings, "SESSION_TRACKING_MAX_PENDING", 500)
+
+
+def get_device_name(ua):
+    if ua.is_mobile:
+        return ua.device.family
+    elif ua.is_tablet:
+        return f"{ua.device.family} Tablet"
+    return "Desktop"
+
+
+@lru_cache(maxsize=getattr(settings, "SESSION_TRACKING_UA_CACHE_SIZE", 1024))
+def parse_user_agent(user_agent):
+    """``(device, browser, os)`` for a UA string; clients repeat the same few"""
+    ua = user_agents.parse(user_agent)
+    return get_device_name(ua), ua.browser.family, ua.os.family
+
+
+def should_write(session_key):
+    """True for the first request of a session in each write interval"""
+    return cache.add(f"session_activity:{session_key}", 1, WRITE_INTERVAL)
+
+
+class ActivityBuffer:
+    """
+    Process-wide buffer of ``session_key -> last seen`` for requests that
+    fall inside a session's write interval. Flushed as a single UPDATE by
+    the next request past ``flush_interval`` and by a background flusher
+    on the same interval, so an idle or restarting worker loses at most one
+    interval of last_activity updates.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = set()
+        self.last_flush = monotonic()
+        self._lock = threading.Lock()
+        self.flusher = PeriodicFlusher(
+            self.flush, flush_interval, name="session-activity-flush"
+        )
+
+    def add(self, session_key):
+        with self._lock:
+            self.pending.add(session_key)
+        self.flusher.ensure_started()
+
+    def discard(self, session_key):
+        with self._lock:
+            self.pending.discard(session_key)
+
+    def maybe_flush(self):
+        if (
+            len(self.pending) >= self.max_pending
+            or monotonic() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            session_keys, self.pending = self.pending, set()
+            self.last_flush = monotonic()
+        if not session_keys:
+            return 0
+
+        try:
+            # Every key was seen within the last flush interval
+            return UserSession.objects.filter(session_id__in=session_keys).update(
+                last_activity=timezone.now()
+            )
+        except Exception as e:
+            logger.error(f"Failed to flush session activity: {str(e)}")
+            return 0
+
+
+activity_buffer = ActivityBuffer()
@@ -26,15 +26,23 @@ from skul_data.users.models.base_user import User
 from skul_data.action_logs.utils.action_log import log_action
 from skul_data.action_logs.models.action_log import ActionCategory
 from skul_data.users.utils.parent import send_parent_email
+from skul_data.users.utils.parent_import import import_parents
+from skul_data.notifications.utils.pagination import InboxPagination
+from skul_data.notifications.utils.unread_counters import (
+    PARENT_NOTIFICATIONS,
+    get_unread_count,
+    invalidate_unread_count,
+    invalidate_school_unread_breakdown,
+)
 from openpyxl import Workbook
+from io import BytesIO
+from skul_data.documents.utils.template_cache import template_download
 from skul_data.users.serializers.parent import ParentBulkImportSerializer
 from rest_framework import status
-from django.db import transaction
 from django.http import HttpResponse
 import os
 import pandas as pd
 import logging
-import re
 
 logger = logging.getLogger(__name__)
 
@@ -305,12 +313,12 @@ class ParentViewSet(viewsets.ModelViewSet):
             #         file, sheet_name=0, dtype=str
             #     )  # Force all columns as strings
 
+            # Read phone numbers and child ids as strings to prevent float conversion
+            text_columns = {"phone_number": "str", "children_ids": "str"}
             if ext == ".csv":
-                # Read CSV with phone_number as string to prevent float conversion
-                df = pd.read_csv(file, dtype={"phone_number": "str"})
+                df = pd.read_csv(file, dtype=text_columns)
             else:  # Excel files
-                # Read Excel with phone_number as string
-                df = pd.read_excel(file, sheet_name=0, dtype={"phone_number": "str"})
+                df = pd.read_excel(file, sheet_name=0, dtype=text_columns)
 
             # Validate required columns
             required_columns = {"email", "first_name", "last_name"}
@@ -333,173 +341,14 @@ class ParentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Process each row
-            results = {"success": [], "errors": []}
-
-            with transaction.atomic():
-                for index, row in df.iterrows():
-                    try:
-                        # Skip empty rows
-                        if (
-                            pd.isna(row.get("email"))
-                            or not str(row.get("email")).strip()
-                        ):
-                            continue
-
-                        # Validate required fields
-                        required_fields = ["email", "first_name", "last_name"]
-                        missing_fields = []
-                        for field in required_fields:
-                            if (
-                                pd.isna(row.get(field))
-                                or not str(row.get(field)).strip()
-                            ):
-                                missing_fields.append(field)
-
-                        if missing_fields:
-                            results["errors"].append(
-                                {
-                                    "row": index + 2,
-                                    "email": str(row.get("email", "")).strip(),
-                                    "error": f"Missing required fields: {', '.join(missing_fields)}",
-                                }
-                            )
-                            continue
-
-                        # Prepare parent data - ENSURE STATUS IS SET
-                        parent_data = {
-                            "email": str(row["email"]).strip(),
-                            "first_name": str(row["first_name"]).strip(),
-                            "last_name": str(row["last_name"]).strip(),
-                            "school": school.id,
-                            "status": default_status,  # This should be preserved
-                        }
-
-                        # Handle optional fields with proper null checking
-                        # if "phone_number" in row and pd.notna(row["phone_number"]):
-                        #     parent_data["phone_number"] = str(
-                        #         row["phone_number"]
-                        #     ).strip()
-
-                        if (
-                            "phone_number" in row
-                            and pd.notna(row["phone_number"])
-                            and str(row["phone_number"]).strip() != "nan"
-                        ):
-                            phone_str = str(row["phone_number"]).strip()
-                            # Add + prefix if missing
-                            if not phone_str.startswith("+"):
-                                phone_str = "+" + phone_str
-                            parent_data["phone_number"] = phone_str
-
-                        if "address" in row and pd.notna(row["address"]):
-                            parent_data["address"] = str(row["address"]).strip()
-
-                        if "occupation" in row and pd.notna(row["occupation"]):
-                            parent_data["occupation"] = str(row["occupation"]).strip()
-
-                        if "preferred_language" in row and pd.notna(
-                            row["preferred_language"]
-                        ):
-                            parent_data["preferred_language"] = str(
-                                row["preferred_language"]
-                            ).strip()
-
-                        # Handle children assignment (your existing logic)
-                        children_ids = []
-                        if "children_ids" in row and pd.notna(row["children_ids"]):
-                            try:
-                                children_str = str(row["children_ids"]).strip()
-                                if children_str:
-                                    # Handle multiple separators: comma, semicolon, or space
-                                    id_parts = re.split(r"[,;\s]", children_str)
-                                    for id_part in id_parts:
-                                        id_clean = id_part.strip()
-                                        if id_clean and id_clean.isdigit():
-                                            children_ids.append(int(id_clean))
-                            except (ValueError, AttributeError) as e:
-                                results["errors"].append(
-                                    {
-                                        "row": index + 2,
-                                        "email": parent_data.get("email", ""),
-                                        "error": f"Invalid children_ids format: {str(e)}",
-                                    }
-                                )
-                                continue
-
-                        # Validate children exist in the school
-                        if children_ids:
-                            valid_children = Student.objects.filter(
-                                id__in=children_ids, school=school
-                            )
-                            invalid_ids = set(children_ids) - set(
-                                valid_children.values_list("id", flat=True)
-                            )
-                            if invalid_ids:
-                                results["errors"].append(
-                                    {
-                                        "row": index + 2,
-                                        "email": parent_data.get("email", ""),
-                                        "error": f"Invalid student IDs: {list(invalid_ids)}",
-                                    }
-                                )
-                                continue
-
-                        # Create parent
-                        parent_serializer = ParentCreateSerializer(
-                            data=parent_data, context={"request": request}
-                        )
-
-                        if parent_serializer.is_valid():
-                            parent = parent_serializer.save()
-
-                            # Assign children if specified and valid
-                            if children_ids:
-                                children = Student.objects.filter(
-                                    id__in=children_ids, school=school
-                                )
-                                parent.children.set(children)
-
-                            # Send welcome email if requested
-                            if send_welcome_email:
-                                try:
-                                    subject = f"Welcome to {school.name}"
-                                    message = f"Hello {parent.user.first_name} {parent.user.last_name},\n\nYou have been registered as a parent at {school.name}."
-                                    send_parent_email(parent, subject, message)
-                                except Exception as e:
-                                    logger.warning(
-                                        f"Failed to send welcome email to {parent.user.email}: {str(e)}"
-                                    )
-
-                            results["success"].append(
-                                {
-                                    "row": index + 2,
-                                    "parent_id": parent.id,
-                                    "email": parent.user.email,
-                                    "name": f"{parent.user.first_name} {parent.user.last_name}",
-                                }
-                            )
-                        else:
-                            results["errors"].append(
-                                {
-                                    "row": index + 2,
-                                    "email": parent_data.get("email", ""),
-                                    "error": parent_serializer.errors,
-                                }
-                            )
-
-                    except Exception as e:
-                        results["errors"].append(
-                            {
-                                "row": index + 2,
-                                "email": (
-                                    parent_data.get("email", "")
-                                    if "parent_data" in locals()
-                                    else ""
-                                ),
-                                "error": str(e),
-                            }
-                        )
+            # Validate, create and link all rows in bulk
+            results = import_parents(
+                df,
+                school,
+                default_status=default_status,
+                send_welcome_email=send_welcome_email,
+                user=request.user,
+            )
 
             if results["success"]:
                 # Get the first successfully created parent
@@ -541,47 +390,51 @@ class ParentViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="download-template")
     def download_template(self, request):
-        # Create a workbook and add a worksheet
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Parents Template"
-
-        # Add headers
-        headers = [
-            "email",
-            "first_name",
-            "last_name",
-            "phone_number",
-            "address",
-            "occupation",
-            "children_ids",
-            "preferred_language",
-        ]
-        ws.append(headers)
-
-        # Add example row
-        example_row = [
-            "parent@example.com",
-            "John",
-            "Doe",
-            "+254712345678",
-            "123 Main St",
-            "Engineer",
-            "1,2,3",
-            "en",
-        ]
-        ws.append(example_row)
-
-        # Create response
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = (
-            "attachment; filename=parents_import_template.xlsx"
+        def render():
+            # Create a workbook and add a worksheet
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Parents Template"
+
+            # Add headers
+            headers = [
+                "email",
+                "first_name",
+                "last_name",
+                "phone_number",
+                "address",
+                "occupation",
+                "children_ids",
+                "preferred_language",
+            ]
+            ws.append(headers)
+
+            # Add example row
+            example_row = [
+                "parent@example.com",
+                "John",
+                "Doe",
+                "+254712345678",
+                "123 Main St",
+                "Engineer",
+                "1,2,3",
+                "en",
+            ]
+            ws.append(example_row)
+
+            output = BytesIO()
+            wb.save(output)
+            return output.getvalue()
+
+        # The template has no school data, so one cached file serves everyone
+        return template_download(
+            request,
+            "parents_import_template.xlsx",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            "parents",
+            render,
+            "xlsx",
         )
-        wb.save(response)
-
-        return response
 
     def destroy(self, request, *args, **kwargs):
         parent = self.get_object()
@@ -595,6 +448,7 @@ class ParentViewSet(viewsets.ModelViewSet):
 
 class ParentNotificationViewSet(viewsets.ModelViewSet):
     serializer_class = ParentNotificationSerializer
+    pagination_class = InboxPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = [
         "parent",
@@ -661,12 +515,26 @@ class ParentNotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"])
     def mark_all_as_read(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.filter_queryset(self.get_queryset()).filter(is_read=False)
+        affected = set(queryset.values_list("parent_id", "parent__school_id"))
         queryset.update(is_read=True)
+        for parent_id, school_id in affected:
+            invalidate_unread_count(PARENT_NOTIFICATIONS, parent_id)
+            invalidate_school_unread_breakdown(school_id)
         return Response({"status": "all notifications marked as read"})
 
     @action(detail=False, methods=["get"])
     def unread_count(self, request):
+        # A parent's own unfiltered badge count is served from the cache
+        parent = getattr(request.user, "parent_profile", None)
+        if (
+            request.user.user_type == User.PARENT
+            and parent is not None
+            and not request.query_params
+        ):
+            count = get_unread_count(PARENT_NOTIFICATIONS, parent.id)
+            return Response({"unread_count": count})
+
         queryset = self.filter_queryset(self.get_queryset())
         count = queryset.filter(is_read=False).count()
         return Response({"unread_count": count})